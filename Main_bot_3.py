@@ -31,56 +31,96 @@ COPYRIGHT (c) TheHolyOneZ 2025
 
 # Libs
 
+import time
+IMPORT_STARTED = time.perf_counter()
 import string
 import traceback
 import typing
 import wave
-import numpy as np
-import openai
 import humanize
 import pytz
 import aiosqlite
 import emoji
 from typing import Union
 import asyncio
+import bisect
+import contextlib
 import copy
+import hashlib
+import heapq
+import importlib
 import io
 import json
 import logging
+import math
+import multiprocessing
 import os
+import pickle
 import platform
 import random
 import re
 import shlex
 import sqlite3
-import time
+import tempfile
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import aiohttp
 import discord
 from discord import ButtonStyle, app_commands
 from discord.ext import commands, tasks
 from discord.ui import View, Button, Select, Modal, TextInput
 from dotenv import load_dotenv
-import requests
-import yt_dlp 
-import wget
 import zipfile
 import platform
 import os
 import subprocess
 from io import BytesIO
-import colorsys
-from PIL import Image, ImageDraw, ImageFont
 import io 
 from enum import Enum
+from functools import cached_property
 from dataclasses import dataclass
-from anthropic import Anthropic
-import anthropic
+import dataclasses
 import uuid
-from googletrans import Translator
 from keep_alive import keep_alive
 
+
+class LazyModule:
+    # Stand-in for a heavy library that only a few commands use. The real module is imported
+    # the first time an attribute is read, so it costs nothing at startup; the import time is
+    # kept in LazyModule.loaded for the startup profile.
+    loaded: Dict[str, float] = {}
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def __getattr__(self, attr):
+        module = self.__dict__["_module"]
+        if module is None:
+            started = time.perf_counter()
+            module = importlib.import_module(self._name)
+            LazyModule.loaded[self._name] = time.perf_counter() - started
+            self.__dict__["_module"] = module
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+np = LazyModule("numpy")
+requests = LazyModule("requests")
+yt_dlp = LazyModule("yt_dlp")
+wget = LazyModule("wget")
+Image = LazyModule("PIL.Image")
+googletrans = LazyModule("googletrans")
+textblob = LazyModule("textblob")
+render_worker = LazyModule("render_worker")
+
 # Local Modules (.py)
 from update_checker import UpdateChecker
 from cogs_manager import CogManager
@@ -97,13 +137,1355 @@ logging.getLogger('discord.gateway').setLevel(logging.ERROR)
 load_dotenv()
 ZygnalBot_Version = "V7.9.7"
 
+class EmojiMatcher:
+    # Finds emoji by trying, at each character that can start one, the known emoji
+    # lengths longest first, so ZWJ sequences and skin-tone variants match whole.
+    def __init__(self, emojis):
+        self.emojis = frozenset(emojis)
+        self.lengths = sorted({len(e) for e in self.emojis}, reverse=True)
+        self.starts = re.compile("[" + "".join(sorted({re.escape(e[0]) for e in self.emojis})) + "]")
+
+    def findall(self, text: str) -> List[str]:
+        found = []
+        pos = 0
+        while True:
+            match = self.starts.search(text, pos)
+            if match is None:
+                return found
+            start = pos = match.start()
+            pos += 1
+            for length in self.lengths:
+                candidate = text[start:start + length]
+                if candidate in self.emojis:
+                    found.append(candidate)
+                    pos = start + len(candidate)
+                    break
+
+
+EMOJI_MATCHER = EmojiMatcher(emoji.EMOJI_DATA)
+
 def analyze_emoji_usage(content):
     emoji_count = {}
-    for char in content:
-        if char in emoji.EMOJI_DATA:
-            emoji_count[char] = emoji_count.get(char, 0) + 1
+    for char in EMOJI_MATCHER.findall(content):
+        emoji_count[char] = emoji_count.get(char, 0) + 1
     return emoji_count
 
+class MessageContext:
+    # Parsed view of a message, built once per message and shared by every handler.
+    # The heavier fields are computed lazily, the first time a handler asks for them.
+    URL_PATTERN = re.compile(r'https?://\S+', re.IGNORECASE)
+
+    def __init__(self, message, prefix=None):
+        self.message = message
+        self.content = message.content or ""
+        self.author_id = message.author.id
+        self.is_bot = message.author.bot
+        self.guild_id = message.guild.id if message.guild else None
+        self.channel_id = message.channel.id
+        self.prefix = prefix if isinstance(prefix, str) else None
+        self.has_prefix = bool(self.prefix) and self.content.startswith(self.prefix)
+
+    @cached_property
+    def lowered(self) -> str:
+        return self.content.lower()
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        return self.lowered.split()
+
+    @cached_property
+    def mention_ids(self) -> set:
+        return {user.id for user in self.message.mentions} | set(self.message.raw_mentions)
+
+    @cached_property
+    def role_mention_ids(self) -> set:
+        return {role.id for role in self.message.role_mentions} | set(self.message.raw_role_mentions)
+
+    @cached_property
+    def has_mentions(self) -> bool:
+        return bool(self.message.mentions or self.message.role_mentions or '<@' in self.content)
+
+    @cached_property
+    def url_spans(self) -> List[Tuple[int, int]]:
+        return [match.span() for match in self.URL_PATTERN.finditer(self.content)]
+
+    @cached_property
+    def command_name(self) -> Optional[str]:
+        if not self.has_prefix:
+            return None
+        parts = self.content[len(self.prefix):].split(maxsplit=1)
+        return parts[0].lower() if parts else None
+
+
+class MessageHandler:
+    def __init__(self, cog, callback, filters: Dict):
+        self.cog = cog
+        self.callback = callback
+        self.name = f"{cog.qualified_name}.{callback.__name__}"
+        self.guild_only = filters.get('guild_only', False)
+        self.dm_only = filters.get('dm_only', False)
+        self.ignore_bots = filters.get('ignore_bots', False)
+        self.requires_mentions = filters.get('requires_mentions', False)
+        self.requires_prefix = filters.get('requires_prefix', False)
+        self.channels = filters.get('channels')
+        self.enabled = filters.get('enabled')
+        self.when = filters.get('when')
+        self.calls = 0
+        self.filtered = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def accepts(self, context: MessageContext) -> bool:
+        if self.guild_only and context.guild_id is None:
+            return False
+        if self.dm_only and context.guild_id is not None:
+            return False
+        if self.ignore_bots and context.is_bot:
+            return False
+        if self.requires_prefix and not context.has_prefix:
+            return False
+        if self.requires_mentions and not context.has_mentions:
+            return False
+        if self.enabled and not getattr(self.cog, self.enabled, True):
+            return False
+        if self.channels and context.channel_id not in getattr(self.cog, self.channels, ()):
+            return False
+        if self.when and not self.when(self.cog, context):
+            return False
+        return True
+
+
+def message_handler(**filters):
+    # Marks a cog method as an on_message handler for MessageDispatcher. Filters:
+    # guild_only, dm_only, ignore_bots, requires_mentions, requires_prefix,
+    # channels="<cog attribute holding channel ids>", enabled="<cog bool attribute>",
+    # when=callable(cog, context) -> bool. The method is called as (message, context).
+    def decorator(func):
+        func.__message_filters__ = filters
+        return func
+    return decorator
+
+
+class MessageDispatcher:
+    # Single on_message entry point for the cogs. Each message is parsed once into a
+    # MessageContext, and only handlers whose filters accept it are scheduled.
+    def __init__(self, bot):
+        self.bot = bot
+        self.handlers: List[MessageHandler] = []
+        self._tasks = set()
+
+    def register_cog(self, cog):
+        for name in dir(type(cog)):
+            func = getattr(type(cog), name, None)
+            filters = getattr(func, '__message_filters__', None)
+            if filters is not None:
+                self.handlers.append(MessageHandler(cog, getattr(cog, name), filters))
+
+    def unregister_cog(self, cog):
+        self.handlers = [handler for handler in self.handlers if handler.cog is not cog]
+
+    async def dispatch(self, message):
+        if not self.handlers or message.author == self.bot.user:
+            return
+
+        if isinstance(message.content, bytes):
+            message.content = str(message.content.decode('utf-8'))
+
+        context = MessageContext(message, self.bot.command_prefix)
+        for handler in self.handlers:
+            try:
+                accepted = handler.accepts(context)
+            except Exception as e:
+                accepted = False
+                print(f"Message filter error in {handler.name}: {e}")
+            if not accepted:
+                handler.filtered += 1
+                continue
+            task = asyncio.create_task(self._run(handler, message, context))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, handler: MessageHandler, message, context: MessageContext):
+        start = time.perf_counter()
+        try:
+            await handler.callback(message, context)
+        except Exception as e:
+            handler.errors += 1
+            print(f"Message handler error in {handler.name}: {e}")
+        finally:
+            elapsed = time.perf_counter() - start
+            handler.calls += 1
+            handler.total_time += elapsed
+            handler.max_time = max(handler.max_time, elapsed)
+
+    def get_stats(self) -> List[Dict]:
+        return sorted(
+            (
+                {
+                    'name': handler.name,
+                    'calls': handler.calls,
+                    'filtered': handler.filtered,
+                    'errors': handler.errors,
+                    'total_ms': handler.total_time * 1000,
+                    'avg_ms': handler.total_time * 1000 / handler.calls if handler.calls else 0.0,
+                    'max_ms': handler.max_time * 1000
+                } for handler in self.handlers
+            ),
+            key=lambda stats: stats['total_ms'],
+            reverse=True
+        )
+
+
+class TimerJob:
+    __slots__ = ('key', 'job_type', 'due', 'payload', 'persist', 'seq')
+
+    def __init__(self, key: str, job_type: str, due: float, payload: Dict, persist: bool, seq: int):
+        self.key = key
+        self.job_type = job_type
+        self.due = due
+        self.payload = payload
+        self.persist = persist
+        self.seq = seq
+
+
+class TimerService:
+    # Shared scheduler for delayed work (reminders, giveaways, poll ends, temp bans...).
+    # Jobs are kept in a min-heap ordered by due time and mirrored to a SQLite table
+    # indexed on due, so one dispatcher task sleeps until the earliest job and jobs
+    # survive restarts. Cancelled or rescheduled jobs leave stale heap entries that are
+    # skipped when they surface, which keeps both operations O(log n).
+    # Cogs register a coroutine per job type; it is called with (payload, job).
+    def __init__(self, bot, db_path: str = "data/timers.db"):
+        self.bot = bot
+        self.db_path = db_path
+        self.db = None
+        self.handlers: Dict[str, callable] = {}
+        self.jobs: Dict[str, TimerJob] = {}
+        self.heap: List[Tuple[float, int, str]] = []
+        self.parked: Dict[str, List[TimerJob]] = defaultdict(list)
+        self.counter = 0
+        self.wakeup = None
+        self.task = None
+        self._running = set()
+        self.fired = 0
+        self.failed = 0
+
+    async def start(self):
+        # Created here rather than in __init__, which runs before the bot's loop exists
+        self.wakeup = asyncio.Event()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.db = await aiosqlite.connect(self.db_path)
+        await self.db.execute("PRAGMA journal_mode=WAL")
+        await self.db.execute("""
+            CREATE TABLE IF NOT EXISTS timer_jobs (
+                key TEXT PRIMARY KEY,
+                job_type TEXT NOT NULL,
+                due REAL NOT NULL,
+                payload TEXT NOT NULL
+            )
+        """)
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_timer_jobs_due ON timer_jobs(due)")
+        await self.db.commit()
+
+        async with self.db.execute("SELECT key, job_type, due, payload FROM timer_jobs") as cursor:
+            async for key, job_type, due, payload in cursor:
+                self.counter += 1
+                self.jobs[key] = TimerJob(key, job_type, due, json.loads(payload), True, self.counter)
+                self.heap.append((due, self.counter, key))
+        heapq.heapify(self.heap)
+
+        self.task = asyncio.create_task(self.dispatcher())
+        if self.jobs:
+            print(f"⏰ Restored {len(self.jobs)} scheduled job(s)")
+
+    def register(self, job_type: str, handler):
+        self.handlers[job_type] = handler
+        # Jobs that came due while nobody handled their type go back on the heap
+        for job in self.parked.pop(job_type, []):
+            if self.jobs.get(job.key) is job:
+                heapq.heappush(self.heap, (job.due, job.seq, job.key))
+        if self.wakeup:
+            self.wakeup.set()
+
+    def unregister(self, job_type: str):
+        self.handlers.pop(job_type, None)
+
+    def get(self, key: str) -> Optional[TimerJob]:
+        return self.jobs.get(key)
+
+    def pending(self, job_type: str) -> List[TimerJob]:
+        return sorted((job for job in self.jobs.values() if job.job_type == job_type), key=lambda job: job.due)
+
+    async def schedule(self, job_type: str, due: float, payload: Dict = None, key: str = None,
+                       persist: bool = True) -> str:
+        # Schedule job_type to fire at unix time due. Reusing a key replaces that job.
+        key = key or f"{job_type}:{uuid.uuid4().hex}"
+        payload = payload or {}
+        previous = self.jobs.get(key)
+        self.counter += 1
+        job = self.jobs[key] = TimerJob(key, job_type, due, payload, persist, self.counter)
+        heapq.heappush(self.heap, (due, job.seq, key))
+        self._compact()
+
+        if persist and self.db:
+            await self.db.execute(
+                """INSERT INTO timer_jobs (key, job_type, due, payload) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(key) DO UPDATE SET job_type = excluded.job_type, due = excluded.due,
+                   payload = excluded.payload""",
+                (key, job_type, due, json.dumps(payload))
+            )
+            await self.db.commit()
+        elif previous and previous.persist and self.db:
+            await self._delete(key)
+
+        if self.heap[0][1] == job.seq and self.wakeup:
+            self.wakeup.set()
+        return key
+
+    async def reschedule(self, key: str, due: float) -> bool:
+        job = self.jobs.get(key)
+        if job is None:
+            return False
+        await self.schedule(job.job_type, due, job.payload, key=key, persist=job.persist)
+        return True
+
+    async def update_payload(self, key: str, payload: Dict) -> bool:
+        job = self.jobs.get(key)
+        if job is None:
+            return False
+        job.payload = payload
+        if job.persist and self.db:
+            await self.db.execute("UPDATE timer_jobs SET payload = ? WHERE key = ?", (json.dumps(payload), key))
+            await self.db.commit()
+        return True
+
+    async def cancel(self, key: str) -> bool:
+        job = self.jobs.pop(key, None)
+        if job is None:
+            return False
+        if job.persist and self.db:
+            await self._delete(key)
+        return True
+
+    async def _delete(self, key: str):
+        await self.db.execute("DELETE FROM timer_jobs WHERE key = ?", (key,))
+        await self.db.commit()
+
+    def _compact(self):
+        if len(self.heap) > 2 * len(self.jobs) + 64:
+            self.heap = [(job.due, job.seq, job.key) for job in self.jobs.values()]
+            heapq.heapify(self.heap)
+
+    def _is_live(self, entry: Tuple[float, int, str]) -> bool:
+        job = self.jobs.get(entry[2])
+        return job is not None and job.seq == entry[1]
+
+    async def dispatcher(self):
+        await self.bot.wait_until_ready()
+        while True:
+            while self.heap and not self._is_live(self.heap[0]):
+                heapq.heappop(self.heap)
+
+            self.wakeup.clear()
+            if not self.heap:
+                await self.wakeup.wait()
+                continue
+
+            delay = self.heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, key = heapq.heappop(self.heap)
+            job = self.jobs[key]
+            if job.job_type not in self.handlers:
+                self.parked[job.job_type].append(job)
+                continue
+
+            task = asyncio.create_task(self._fire(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, job: TimerJob):
+        try:
+            await self.handlers[job.job_type](job.payload, job)
+            self.fired += 1
+        except Exception as e:
+            self.failed += 1
+            print(f"Timer job {job.key} ({job.job_type}) failed: {e}")
+        finally:
+            # The handler may have rescheduled the same key; only drop the job if it didn't
+            if self.jobs.get(job.key) is job:
+                await self.cancel(job.key)
+
+    async def close(self):
+        if self.task:
+            self.task.cancel()
+        for task in list(self._running):
+            task.cancel()
+        if self.db:
+            await self.db.close()
+            self.db = None
+
+
+class LLMError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def defer(self, seconds: float):
+        # Push the next token at least `seconds` out, e.g. to honour a Retry-After
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class LLMGateway:
+    # Single async path to the OpenAI and Anthropic HTTP APIs for every AI cog.
+    # One pooled aiohttp session is shared; each guild gets a concurrency cap and a
+    # token bucket so one busy server can't starve the rest, and completions are
+    # streamed (SSE) so replies can be edited in progressively instead of blocking.
+    # Base URLs come from OPENAI_BASE_URL / ANTHROPIC_BASE_URL, so a local stub
+    # server can stand in for the real APIs.
+    providers = {
+        "openai": ("OPENAI_BASE_URL", "https://api.openai.com/v1", "OPENAI_API_KEY"),
+        "anthropic": ("ANTHROPIC_BASE_URL", "https://api.anthropic.com/v1", "ANTHROPIC_API_KEY"),
+    }
+
+    def __init__(self, guild_concurrency: int = None, rate: float = None, burst: int = None):
+        self.guild_concurrency = guild_concurrency or int(os.getenv('LLM_GUILD_CONCURRENCY', 2))
+        self.rate = rate or float(os.getenv('LLM_GUILD_RATE', 0.5))
+        self.burst = burst or int(os.getenv('LLM_GUILD_BURST', 5))
+        self.edit_interval = 1.0
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.semaphores: Dict[int, asyncio.Semaphore] = {}
+        self.buckets: Dict[int, TokenBucket] = {}
+
+    def api_key(self, provider: str) -> Optional[str]:
+        return os.getenv(self.providers[provider][2])
+
+    def base_url(self, provider: str) -> str:
+        env, default, _ = self.providers[provider]
+        return os.getenv(env, default).rstrip('/')
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32),
+                timeout=aiohttp.ClientTimeout(total=300, sock_connect=10, sock_read=60)
+            )
+        return self.session
+
+    def headers(self, provider: str) -> Dict[str, str]:
+        key = self.api_key(provider)
+        if not key:
+            raise LLMError(401, f"{provider} API key not configured")
+        if provider == "anthropic":
+            return {"x-api-key": key, "anthropic-version": "2023-06-01", "content-type": "application/json"}
+        return {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
+
+    def limits(self, guild_id: Optional[int]) -> Tuple[TokenBucket, asyncio.Semaphore]:
+        guild_id = guild_id or 0
+        if guild_id not in self.semaphores:
+            self.semaphores[guild_id] = asyncio.Semaphore(self.guild_concurrency)
+            self.buckets[guild_id] = TokenBucket(self.rate, self.burst)
+        return self.buckets[guild_id], self.semaphores[guild_id]
+
+    @contextlib.asynccontextmanager
+    async def slot(self, guild_id: Optional[int]):
+        bucket, semaphore = self.limits(guild_id)
+        await bucket.acquire()
+        async with semaphore:
+            yield
+
+    async def raise_for_status(self, response: aiohttp.ClientResponse):
+        if response.status == 200:
+            return
+        try:
+            data = await response.json(content_type=None)
+            error = data.get('error', {})
+            message = error.get('message', str(error)) if isinstance(error, dict) else str(error)
+        except (aiohttp.ContentTypeError, json.JSONDecodeError, AttributeError):
+            message = await response.text()
+        raise LLMError(response.status, message or response.reason or "Unknown error")
+
+    async def request(self, provider: str, path: str, payload: Dict, guild_id: Optional[int] = None) -> Dict:
+        async with self.slot(guild_id):
+            async with self.get_session().post(
+                f"{self.base_url(provider)}{path}", headers=self.headers(provider), json=payload
+            ) as response:
+                await self.raise_for_status(response)
+                return await response.json(content_type=None)
+
+    async def stream(self, provider: str, model: str, messages: List[Dict], guild_id: Optional[int] = None,
+                     system: str = None, max_tokens: int = 1000, temperature: float = None):
+        # Yield text deltas of a chat completion as they arrive.
+        payload = {"model": model, "messages": messages, "max_tokens": max_tokens, "stream": True}
+        if temperature is not None:
+            payload["temperature"] = temperature
+        if provider == "anthropic":
+            path = "/messages"
+            if system:
+                payload["system"] = system
+        else:
+            path = "/chat/completions"
+            if system:
+                payload["messages"] = [{"role": "system", "content": system}, *messages]
+
+        bucket, semaphore = self.limits(guild_id)
+        await bucket.acquire()
+        await semaphore.acquire()
+        # The slot is held while the caller consumes the generator. Closing it early
+        # (aclose(), or relay() failing mid-stream) runs the finally and frees the slot
+        # right away instead of whenever the abandoned generator is collected.
+        try:
+            async with self.get_session().post(
+                f"{self.base_url(provider)}{path}", headers=self.headers(provider), json=payload
+            ) as response:
+                await self.raise_for_status(response)
+                async for line in response.content:
+                    line = line.strip()
+                    if not line.startswith(b"data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == b"[DONE]":
+                        break
+                    event = json.loads(data)
+                    if provider == "anthropic":
+                        if event.get("type") == "error":
+                            raise LLMError(500, event.get("error", {}).get("message", "Stream error"))
+                        if event.get("type") == "content_block_delta":
+                            text = event["delta"].get("text")
+                        else:
+                            text = None
+                    else:
+                        choices = event.get("choices") or [{}]
+                        text = choices[0].get("delta", {}).get("content")
+                    if text:
+                        yield text
+        finally:
+            semaphore.release()
+
+    async def complete(self, provider: str, model: str, messages: List[Dict], **kwargs) -> str:
+        return "".join([chunk async for chunk in self.stream(provider, model, messages, **kwargs)])
+
+    async def relay(self, chunks, send, render=None, limit: int = 1900) -> str:
+        # Stream chunks into Discord, editing the live message at most once per
+        # edit_interval and rolling over to a new message past limit characters.
+        # render(text, index, done) returns the send/edit kwargs for each message.
+        render = render or (lambda text, index, done: {"content": text})
+        text = ""
+        start = 0
+        index = 0
+        message = None
+        last_edit = 0.0
+
+        async def flush(segment: str, done: bool):
+            nonlocal message, last_edit
+            if message is None:
+                message = await send(**render(segment, index, done))
+            else:
+                await message.edit(**render(segment, index, done))
+            last_edit = time.monotonic()
+
+        try:
+            async for chunk in chunks:
+                text += chunk
+                while len(text) - start > limit:
+                    await flush(text[start:start + limit], False)
+                    start += limit
+                    index += 1
+                    message = None
+                if time.monotonic() - last_edit >= self.edit_interval and text[start:]:
+                    await flush(text[start:], False)
+        finally:
+            if hasattr(chunks, 'aclose'):
+                await chunks.aclose()
+
+        if text[start:] or message is None:
+            await flush(text[start:] or "…", True)
+        return text
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+
+class FanoutEngine:
+    # Shared engine for sending one thing to many targets (mass DMs, cross-server
+    # broadcasts). Every job's target list and per-target status are checkpointed in
+    # SQLite, so a restart resumes where it stopped instead of resending; statuses are
+    # written back in batches rather than one commit per target. Workers run with bounded
+    # concurrency under a global token bucket below Discord's 50 req/s limit, and each
+    # route (a DM or channel target by default) also gets its own small bucket, kept in an
+    # LRU. A 429's Retry-After defers the route's bucket (or the global one for global
+    # limits); 429/5xx failures are retried with jittered exponential backoff.
+    # Cogs register a coroutine per job kind; it is called with (payload, target_id).
+    # An optional route(payload, target_id) callable maps targets that share a Discord
+    # route (e.g. one channel) onto the same bucket, and route_rate/route_burst override
+    # that bucket's size for the kind. An optional skip(payload, target_id) predicate marks
+    # targets already in the wanted state as SKIPPED without spending any request.
+    PENDING, SENT, FAILED, SKIPPED = 0, 1, 2, 3
+
+    def __init__(self, bot, db_path: str = "data/fanout.db", concurrency: int = 8, rate: float = 40.0,
+                 max_retries: int = 4, route_rate: float = 1.0, route_burst: int = 5, max_routes: int = 1024,
+                 checkpoint_size: int = 50):
+        self.bot = bot
+        self.db_path = db_path
+        self.db = None
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, rate)
+        self.route_rate = route_rate
+        self.route_burst = route_burst
+        self.max_routes = max_routes
+        self.routes: OrderedDict = OrderedDict()
+        self.checkpoint_size = checkpoint_size
+        self.max_retries = max_retries
+        self.progress_interval = 2.0
+        self.handlers: Dict[str, callable] = {}
+        self.route_keys: Dict[str, callable] = {}
+        self.route_limits: Dict[str, Tuple[float, int]] = {}
+        self.skips: Dict[str, callable] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.resumes = set()
+
+    async def start(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.db = await aiosqlite.connect(self.db_path)
+        await self.db.execute("PRAGMA journal_mode=WAL")
+        await self.db.execute("PRAGMA synchronous=NORMAL")
+        await self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS fanout_jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created REAL NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS fanout_targets (
+                job_id TEXT NOT NULL,
+                target_id INTEGER NOT NULL,
+                status INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (job_id, target_id)
+            );
+        """)
+        await self.db.commit()
+
+    def register(self, kind: str, handler, route=None, skip=None, route_rate: float = None,
+                 route_burst: int = None):
+        self.handlers[kind] = handler
+        if route:
+            self.route_keys[kind] = route
+        if route_rate:
+            self.route_limits[kind] = (route_rate, route_burst or self.route_burst)
+        if skip:
+            self.skips[kind] = skip
+        if self.db:
+            task = asyncio.create_task(self.resume(kind))
+            self.resumes.add(task)
+            task.add_done_callback(self.resumes.discard)
+
+    def unregister(self, kind: str):
+        self.handlers.pop(kind, None)
+        self.route_keys.pop(kind, None)
+        self.route_limits.pop(kind, None)
+        self.skips.pop(kind, None)
+
+    def route_bucket(self, key, limits: Tuple[float, int] = None) -> TokenBucket:
+        bucket = self.routes.get(key)
+        if bucket is None:
+            bucket = self.routes[key] = TokenBucket(*(limits or (self.route_rate, self.route_burst)))
+            if len(self.routes) > self.max_routes:
+                self.routes.popitem(last=False)
+        else:
+            self.routes.move_to_end(key)
+        return bucket
+
+    async def resume(self, kind: str):
+        await self.bot.wait_until_ready()
+        async with self.db.execute("SELECT job_id FROM fanout_jobs WHERE kind = ? AND done = 0", (kind,)) as cursor:
+            job_ids = [row[0] async for row in cursor]
+        for job_id in job_ids:
+            if job_id not in self.tasks:
+                print(f"📨 Resuming broadcast {job_id}")
+                self.launch(job_id)
+
+    async def broadcast(self, kind: str, targets: List[int], payload: Dict = None, job_id: str = None,
+                        progress=None) -> str:
+        # Queue targets for kind and start sending in the background.
+        # Re-using a job id resumes that job rather than sending twice.
+        # progress(sent, failed, total, done) is awaited at most every couple of seconds.
+        job_id = job_id or f"{kind}:{uuid.uuid4().hex}"
+        await self.db.execute(
+            "INSERT OR IGNORE INTO fanout_jobs (job_id, kind, payload, created) VALUES (?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload or {}), time.time())
+        )
+        await self.db.executemany(
+            "INSERT OR IGNORE INTO fanout_targets (job_id, target_id) VALUES (?, ?)",
+            [(job_id, target_id) for target_id in dict.fromkeys(targets)]
+        )
+        await self.db.commit()
+        if job_id not in self.tasks:
+            self.launch(job_id, progress)
+        return job_id
+
+    def launch(self, job_id: str, progress=None):
+        task = self.tasks[job_id] = asyncio.create_task(self.run(job_id, progress))
+        task.add_done_callback(lambda _: self.tasks.pop(job_id, None))
+
+    async def wait(self, job_id: str):
+        task = self.tasks.get(job_id)
+        if task:
+            await asyncio.shield(task)
+
+    async def cancel(self, job_id: str):
+        # Marked done first so a restart doesn't resume it; pending targets stay pending
+        await self.db.execute("UPDATE fanout_jobs SET done = 1 WHERE job_id = ?", (job_id,))
+        await self.db.commit()
+        task = self.tasks.get(job_id)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def counts(self, job_id: str) -> Dict[int, int]:
+        async with self.db.execute(
+            "SELECT status, COUNT(*) FROM fanout_targets WHERE job_id = ? GROUP BY status", (job_id,)
+        ) as cursor:
+            return {status: count async for status, count in cursor}
+
+    async def run(self, job_id: str, progress=None):
+        async with self.db.execute("SELECT kind, payload FROM fanout_jobs WHERE job_id = ?", (job_id,)) as cursor:
+            kind, payload = await cursor.fetchone()
+        payload = json.loads(payload)
+        handler = self.handlers.get(kind)
+        if handler is None:
+            return
+        route = self.route_keys.get(kind)
+        limits = self.route_limits.get(kind)
+        skip = self.skips.get(kind)
+
+        async with self.db.execute(
+            "SELECT target_id FROM fanout_targets WHERE job_id = ? AND status = ?", (job_id, self.PENDING)
+        ) as cursor:
+            queue = asyncio.Queue()
+            async for (target_id,) in cursor:
+                queue.put_nowait(target_id)
+
+        counts = await self.counts(job_id)
+        # Skipped targets already had the outcome, so progress reports them as sent
+        sent, failed = counts.get(self.SENT, 0) + counts.get(self.SKIPPED, 0), counts.get(self.FAILED, 0)
+        total = sum(counts.values())
+        last_report = time.monotonic()
+
+        async def report(done: bool):
+            if progress:
+                try:
+                    await progress(sent, failed, total, done)
+                except Exception as e:
+                    print(f"Broadcast progress callback failed: {e}")
+
+        results = []
+
+        async def checkpoint():
+            if not results:
+                return
+            batch = results[:]
+            results.clear()
+            await self.db.executemany(
+                "UPDATE fanout_targets SET status = ? WHERE job_id = ? AND target_id = ?", batch
+            )
+            await self.db.commit()
+
+        async def worker():
+            nonlocal sent, failed, last_report
+            while True:
+                try:
+                    target_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                if skip and skip(payload, target_id):
+                    status = self.SKIPPED
+                else:
+                    key = route(payload, target_id) if route else (kind, target_id)
+                    ok = await self.deliver(handler, payload, target_id, key, limits)
+                    status = self.SENT if ok else self.FAILED
+                results.append((status, job_id, target_id))
+                if status != self.FAILED:
+                    sent += 1
+                else:
+                    failed += 1
+                if len(results) >= self.checkpoint_size:
+                    await checkpoint()
+                if time.monotonic() - last_report >= self.progress_interval:
+                    last_report = time.monotonic()
+                    await checkpoint()
+                    await report(False)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, max(queue.qsize(), 1)))))
+        finally:
+            # Also runs on cancellation, so finished targets aren't resent after a restart
+            await checkpoint()
+        await self.db.execute("UPDATE fanout_jobs SET done = 1 WHERE job_id = ?", (job_id,))
+        await self.db.commit()
+        await report(True)
+
+    async def deliver(self, handler, payload: Dict, target_id: int, key=None,
+                      limits: Tuple[float, int] = None) -> bool:
+        bucket = self.route_bucket(key if key is not None else target_id, limits)
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            await self.bucket.acquire()
+            try:
+                # Handlers return False when the target no longer exists
+                return await handler(payload, target_id) is not False
+            except (discord.Forbidden, discord.NotFound):
+                return False
+            except discord.HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    return False
+                if attempt == self.max_retries:
+                    print(f"Giving up on broadcast target {target_id}: {e}")
+                    return False
+                if e.status == 429:
+                    headers = getattr(e.response, 'headers', None) or {}
+                    try:
+                        retry_after = float(headers.get('Retry-After', 0))
+                    except (TypeError, ValueError):
+                        retry_after = 0
+                    if retry_after:
+                        is_global = headers.get('X-RateLimit-Global') == 'true' or \
+                            headers.get('X-RateLimit-Scope') == 'global'
+                        (self.bucket if is_global else bucket).defer(retry_after)
+                        continue
+                await asyncio.sleep(min(2 ** attempt, 30) * (0.5 + random.random()))
+            except Exception as e:
+                print(f"Broadcast target {target_id} failed: {e}")
+                return False
+
+    async def close(self):
+        for task in [*self.resumes, *self.tasks.values()]:
+            task.cancel()
+        await asyncio.gather(*self.resumes, *self.tasks.values(), return_exceptions=True)
+        if self.db:
+            await self.db.close()
+            self.db = None
+
+
+class Conversation:
+    __slots__ = ('turns', 'tokens', 'summary', 'last_used')
+
+    def __init__(self, max_turns: int):
+        self.turns: deque = deque(maxlen=max_turns)
+        self.tokens = 0
+        self.summary = ""
+        self.last_used = time.monotonic()
+
+
+class ConversationStore:
+    # Bounded chat memory for the AI cogs, keyed by (guild_id, scope_id) where scope is a
+    # channel or user. Each conversation is a ring buffer trimmed to a token budget (turns
+    # that fall off are folded into a short extractive summary). Hot conversations sit in
+    # an LRU capped globally and per guild; idle or evicted ones are spilled to disk as
+    # JSON and loaded back on the next access.
+    # Disk access runs in worker threads. One lock keeps spills, loads and removals in the
+    # order they were asked for, so a reload never overtakes the spill it depends on.
+    def __init__(self, name: str, token_budget: int = 1500, max_turns: int = 20, summary_budget: int = 200,
+                 max_hot: int = 256, max_per_guild: int = 16, idle_seconds: int = 1800):
+        self.spill_dir = os.path.join("data", "conversations", name)
+        self.token_budget = token_budget
+        self.max_turns = max_turns
+        self.summary_budget = summary_budget
+        self.max_hot = max_hot
+        self.max_per_guild = max_per_guild
+        self.idle_seconds = idle_seconds
+        self.hot: OrderedDict = OrderedDict()
+        self.guild_counts: Dict[int, int] = defaultdict(int)
+        self.last_sweep = time.monotonic()
+        self._io_lock = None
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        # ~4 characters per token for English text, plus per-message overhead
+        return len(text) // 4 + 4
+
+    def spill_path(self, key: Tuple[int, int]) -> str:
+        return os.path.join(self.spill_dir, f"{key[0]}_{key[1]}.json")
+
+    @property
+    def io_lock(self) -> asyncio.Lock:
+        if self._io_lock is None:
+            self._io_lock = asyncio.Lock()
+        return self._io_lock
+
+    async def get(self, key: Tuple[int, int]) -> Conversation:
+        conversation = self.hot.get(key)
+        if conversation is not None:
+            self.hot.move_to_end(key)
+        else:
+            conversation = await self.load(key)
+            # Another caller may have loaded it while this one waited on the disk
+            if key in self.hot:
+                conversation = self.hot[key]
+                self.hot.move_to_end(key)
+            else:
+                self.hot[key] = conversation
+                self.guild_counts[key[0]] += 1
+                await self.enforce_caps(key[0])
+        conversation.last_used = time.monotonic()
+        return conversation
+
+    async def messages(self, key: Tuple[int, int]) -> List[Dict]:
+        return list((await self.get(key)).turns)
+
+    async def summary(self, key: Tuple[int, int]) -> str:
+        return (await self.get(key)).summary
+
+    async def add(self, key: Tuple[int, int], role: str, content: str):
+        conversation = await self.get(key)
+        if len(conversation.turns) == conversation.turns.maxlen:
+            self.retire(conversation, conversation.turns[0])
+        conversation.turns.append({"role": role, "content": content})
+        conversation.tokens += self.estimate_tokens(content)
+        while conversation.tokens > self.token_budget and len(conversation.turns) > 1:
+            self.retire(conversation, conversation.turns.popleft())
+        await self.sweep()
+
+    async def add_exchange(self, key: Tuple[int, int], prompt: str, reply: str):
+        # Upstream APIs expect alternating roles, so turns are stored in user/assistant pairs
+        await self.add(key, "user", prompt)
+        await self.add(key, "assistant", reply)
+        conversation = await self.get(key)
+        while conversation.turns and conversation.turns[0]["role"] != "user":
+            self.retire(conversation, conversation.turns.popleft())
+
+    def retire(self, conversation: Conversation, turn: Dict):
+        conversation.tokens -= self.estimate_tokens(turn["content"])
+        if not self.summary_budget:
+            return
+        first_sentence = re.split(r'(?<=[.!?])\s', turn["content"].strip(), maxsplit=1)[0][:160]
+        summary = f"{conversation.summary}\n{turn['role']}: {first_sentence}".strip()
+        # Keep the newest part of the summary within its own budget
+        max_chars = self.summary_budget * 4
+        if len(summary) > max_chars:
+            summary = summary[-max_chars:].split("\n", 1)[-1]
+        conversation.summary = summary
+
+    async def clear(self, key: Tuple[int, int]):
+        if self.hot.pop(key, None) is not None:
+            self.guild_counts[key[0]] -= 1
+            if not self.guild_counts[key[0]]:
+                del self.guild_counts[key[0]]
+        async with self.io_lock:
+            await asyncio.to_thread(self.remove_spill, key)
+
+    def remove_spill(self, key: Tuple[int, int]):
+        try:
+            os.remove(self.spill_path(key))
+        except FileNotFoundError:
+            pass
+
+    def spilled_keys(self, scope_id: int) -> set:
+        keys = set()
+        if os.path.isdir(self.spill_dir):
+            for filename in os.listdir(self.spill_dir):
+                guild_id, _, rest = filename.partition("_")
+                if rest == f"{scope_id}.json":
+                    keys.add((int(guild_id), scope_id))
+        return keys
+
+    async def clear_scope(self, scope_id: int):
+        keys = {key for key in self.hot if key[1] == scope_id}
+        async with self.io_lock:
+            keys |= await asyncio.to_thread(self.spilled_keys, scope_id)
+        for key in keys:
+            await self.clear(key)
+
+    async def enforce_caps(self, guild_id: int):
+        if self.guild_counts[guild_id] > self.max_per_guild:
+            oldest = next(key for key in self.hot if key[0] == guild_id)
+            await self.evict(oldest)
+        while len(self.hot) > self.max_hot:
+            await self.evict(next(iter(self.hot)))
+
+    async def sweep(self):
+        now = time.monotonic()
+        if now - self.last_sweep < 60:
+            return
+        self.last_sweep = now
+        while self.hot and now - next(iter(self.hot.values())).last_used > self.idle_seconds:
+            await self.evict(next(iter(self.hot)))
+
+    async def evict(self, key: Tuple[int, int]):
+        conversation = self.hot.pop(key)
+        self.guild_counts[key[0]] -= 1
+        if not self.guild_counts[key[0]]:
+            del self.guild_counts[key[0]]
+        if conversation.turns or conversation.summary:
+            await self.spill(key, conversation)
+
+    async def spill(self, key: Tuple[int, int], conversation: Conversation):
+        data = {"turns": list(conversation.turns), "summary": conversation.summary}
+        async with self.io_lock:
+            await asyncio.to_thread(self.write_spill, key, data)
+
+    def write_spill(self, key: Tuple[int, int], data: Dict):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = self.spill_path(key)
+        try:
+            with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            print(f"Error spilling conversation {key}: {e}")
+
+    async def load(self, key: Tuple[int, int]) -> Conversation:
+        conversation = Conversation(self.max_turns)
+        async with self.io_lock:
+            data = await asyncio.to_thread(self.read_spill, key)
+        if data is None:
+            return conversation
+        conversation.summary = data.get("summary", "")
+        for turn in data.get("turns", [])[-self.max_turns:]:
+            conversation.turns.append(turn)
+            conversation.tokens += self.estimate_tokens(turn["content"])
+        return conversation
+
+    def read_spill(self, key: Tuple[int, int]) -> Optional[Dict]:
+        path = self.spill_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            os.remove(path)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error loading conversation {key}: {e}")
+            return None
+        return data
+
+    async def flush(self):
+        for key in list(self.hot):
+            await self.evict(key)
+
+
+class RenderBusy(Exception):
+    pass
+
+
+class RenderService:
+    # Runs Pillow jobs from render_worker.py off the event loop. start() forks a process
+    # pool, and is only called from __main__ before keep_alive() and bot.run() start any
+    # thread: forking a process that already runs threads (aiosqlite, the executor) can
+    # deadlock the child. Spawned workers are not an option since they would re-run this
+    # module. Without fork, without start(), or once a worker has died, jobs go to a
+    # thread pool instead, which never forks.
+    # At most max_pending jobs may be queued at once; past that render() raises RenderBusy
+    # straight away rather than letting callers pile up. Results are cached by a hash of
+    # the job kind and parameters, and identical in-flight jobs share one render.
+    def __init__(self, workers: int = None, max_pending: int = 16, cache_bytes: int = 32 * 1024 * 1024):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self.cache_bytes = cache_bytes
+        self.cache: OrderedDict = OrderedDict()
+        self.cache_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.pending = 0
+        self.executor = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def start(self):
+        if self.executor is not None or 'fork' not in multiprocessing.get_all_start_methods():
+            return
+        executor = ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context('fork'), initializer=render_worker.init_worker
+        )
+        # Fork pools start every worker on the first submit, before their helper threads
+        executor.submit(render_worker.ping).result()
+        self.executor = executor
+
+    def create_executor(self):
+        render_worker.init_worker()
+        return ThreadPoolExecutor(self.workers, thread_name_prefix="render")
+
+    async def get_executor(self):
+        if self.executor is None:
+            self.executor = self.create_executor()
+        return self.executor
+
+    def discard_executor(self, executor):
+        if self.executor is executor:
+            self.executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def cache_key(kind: str, params: Dict) -> str:
+        return hashlib.sha256(pickle.dumps((kind, sorted(params.items())))).hexdigest()
+
+    @staticmethod
+    def result_size(result) -> int:
+        if isinstance(result, (bytes, str)):
+            return len(result)
+        return sum(len(part) for part in result)
+
+    def store(self, key: str, result):
+        size = self.result_size(result)
+        if size > self.cache_bytes:
+            return
+        self.cache[key] = result
+        self.cache_size += size
+        while self.cache_size > self.cache_bytes:
+            _, evicted = self.cache.popitem(last=False)
+            self.cache_size -= self.result_size(evicted)
+
+    async def render(self, kind: str, **params):
+        key = self.cache_key(kind, params)
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        if self.pending >= self.max_pending:
+            raise RenderBusy(f"{self.pending} renders already queued")
+        self.misses += 1
+        self.pending += 1
+        loop = asyncio.get_running_loop()
+        future = self._inflight[key] = loop.create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        executor = None
+        try:
+            executor = await self.get_executor()
+            result = await loop.run_in_executor(executor, render_worker.render, kind, params)
+        except BrokenProcessPool as e:
+            print(f"Render pool crashed, rendering in threads from now on: {e}")
+            if executor is not None:
+                self.discard_executor(executor)
+            future.set_exception(e)
+            raise
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            self.store(key, result)
+            return result
+        finally:
+            self.pending -= 1
+            self._inflight.pop(key, None)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class RankedIndex:
+    # Order-statistics index of member scores, highest first (ties by member id).
+    # Keys live in sorted buckets of at most 2 * load entries; a Fenwick tree over the
+    # bucket sizes turns a position inside a bucket into an overall rank, so updates and
+    # rank lookups are O(log n) and the top k entries are read in O(k).
+    def __init__(self, scores: Optional[Dict] = None, load: int = 256):
+        self.load = load
+        self.scores = dict(scores or {})
+        keys = sorted((-score, member) for member, score in self.scores.items())
+        self.buckets = [keys[i:i + load] for i in range(0, len(keys), load)]
+        self.maxes = [bucket[-1] for bucket in self.buckets]
+        self._rebuild()
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __contains__(self, member):
+        return member in self.scores
+
+    def score(self, member):
+        return self.scores.get(member)
+
+    def update(self, member, score):
+        old = self.scores.get(member)
+        if old == score:
+            return
+        if old is not None:
+            self._remove((-old, member))
+        self.scores[member] = score
+        self._insert((-score, member))
+
+    def remove(self, member):
+        score = self.scores.pop(member, None)
+        if score is not None:
+            self._remove((-score, member))
+
+    def rank(self, member) -> Optional[int]:
+        score = self.scores.get(member)
+        if score is None:
+            return None
+        key = (-score, member)
+        i = bisect.bisect_left(self.maxes, key)
+        return self._prefix(i) + bisect.bisect_left(self.buckets[i], key) + 1
+
+    def top(self, k: int) -> List[Tuple]:
+        entries = []
+        for bucket in self.buckets:
+            for score, member in bucket:
+                if len(entries) >= k:
+                    return entries
+                entries.append((member, -score))
+        return entries
+
+    def _insert(self, key):
+        if not self.buckets:
+            self.buckets.append([key])
+            self.maxes.append(key)
+            self._rebuild()
+            return
+        i = min(bisect.bisect_left(self.maxes, key), len(self.buckets) - 1)
+        bucket = self.buckets[i]
+        bisect.insort(bucket, key)
+        self.maxes[i] = bucket[-1]
+        if len(bucket) > 2 * self.load:
+            self.buckets[i:i + 1] = [bucket[:self.load], bucket[self.load:]]
+            self.maxes[i:i + 1] = [bucket[self.load - 1], bucket[-1]]
+            self._rebuild()
+        else:
+            self._add(i, 1)
+
+    def _remove(self, key):
+        i = bisect.bisect_left(self.maxes, key)
+        bucket = self.buckets[i]
+        del bucket[bisect.bisect_left(bucket, key)]
+        if bucket:
+            self.maxes[i] = bucket[-1]
+            self._add(i, -1)
+        else:
+            del self.buckets[i]
+            del self.maxes[i]
+            self._rebuild()
+
+    def _rebuild(self):
+        self.tree = [0] * (len(self.buckets) + 1)
+        for i, bucket in enumerate(self.buckets, 1):
+            self.tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    def _add(self, i, delta):
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, i):
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+
+@dataclass
+class CogSpec:
+    # One entry of the startup cog list. A lazy cog that only has prefix commands is not
+    # built at startup: its command names are read from the class and the cog is loaded the
+    # first time one of them is used. Listeners, message handlers and app commands have to
+    # be live from the start, so cogs with any of those always load eagerly.
+    cls: type
+    label: Optional[str] = None
+    lazy: bool = False
+    quiet: bool = False
+    kwargs: dict = dataclasses.field(default_factory=dict)
+
+    @property
+    def name(self):
+        return self.cls.__cog_name__
+
+    def command_names(self):
+        names = []
+        for command in self.cls.__cog_commands__:
+            if command.parent is None:
+                names.append(command.name)
+                names.extend(command.aliases)
+        return names
+
+    def can_defer(self):
+        if not self.lazy or self.cls.__cog_listeners__ or self.cls.__cog_app_commands__:
+            return False
+        return not any(hasattr(getattr(self.cls, attr, None), '__message_filters__') for attr in dir(self.cls))
+
+
+class StartupProfile:
+    # Where startup time goes: module import, each setup_hook phase, every cog's constructor
+    # and add_cog (which runs cog_load), and the time until on_ready. Libraries behind a
+    # LazyModule show up once something has used them.
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.cogs: Dict[str, Dict] = {}
+        self.ready_after = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+
+    def record_cog(self, name, mode, init=0.0, load=0.0):
+        self.cogs[name] = {"mode": mode, "init": init, "load": load}
+
+    async def on_ready(self):
+        if self.ready_after is None:
+            self.ready_after = time.perf_counter() - IMPORT_STARTED
+            print(f"Ready {self.ready_after:.2f}s after start ({self.cog_count('deferred')} cogs deferred)")
+
+    def cog_count(self, mode):
+        return sum(1 for entry in self.cogs.values() if entry["mode"] == mode)
+
+    def slowest_cogs(self, limit=10):
+        timed = [(name, entry) for name, entry in self.cogs.items() if entry["mode"] != "deferred"]
+        timed.sort(key=lambda item: item[1]["init"] + item[1]["load"], reverse=True)
+        return timed[:limit]
+
+    def summary(self, limit=5):
+        lines = [f"{name}: {seconds * 1000:.0f} ms" for name, seconds in self.phases.items()]
+        lines.append(f"Cogs: {self.cog_count('eager')} loaded, {self.cog_count('deferred')} deferred")
+        for name, entry in self.slowest_cogs(limit):
+            lines.append(f"  {name}: {(entry['init'] + entry['load']) * 1000:.1f} ms")
+        return lines
+
+
 class ZygnalBot(commands.Bot):
     def print_banner(self):
         banner = """
@@ -137,6 +1519,16 @@ class ZygnalBot(commands.Bot):
             help_command=None
         )
         self.webhook_logger = None
+        self.message_dispatcher = MessageDispatcher(self)
+        self.add_listener(self.message_dispatcher.dispatch, 'on_message')
+        self.timers = TimerService(self)
+        self.llm = LLMGateway()
+        self.fanout = FanoutEngine(self)
+        self.renderer = RenderService()
+        self.startup = StartupProfile()
+        self.add_listener(self.startup.on_ready, 'on_ready')
+        self.lazy_cogs: Dict[str, CogSpec] = {}
+        self.lazy_loads: Dict[str, asyncio.Task] = {}
         self.ticket_counter = 0
         self.start_time = time.time()
         self.mod_logs = {}
@@ -164,206 +1556,197 @@ class ZygnalBot(commands.Bot):
         self.status_url = "https://zygnalbot.de/status.php"                                 # Website to see Tracking: https://zygnalbot.de/status.html | We are not tracking you only if the bot is online etc. like mee6 shows on what servers its online on.
         self.status_update_task = tasks.loop(minutes=0.1)(self.periodic_status_update)      
 
+    def cog_specs(self):
+        # Startup order matters: later cogs look up earlier ones with get_cog. AiCommands
+        # stays disabled.
+        return [
+            CogSpec(CommandErrorHandler),
+            CogSpec(ModerationCommands),
+            CogSpec(TicketSystem),
+            CogSpec(ServerManagement),
+            CogSpec(ServerInfo, lazy=True),
+            CogSpec(HelpSystem),
+            CogSpec(AutoMod),
+            CogSpec(WelcomeSystem),
+            CogSpec(RoleManager),
+            CogSpec(UserTracker),
+            CogSpec(BackupSystem, lazy=True),
+            CogSpec(Config),
+            CogSpec(OwnerOnly),
+            CogSpec(MinigamesCog),
+            CogSpec(Analytics),
+            CogSpec(AdvancedInviteTracker),
+            CogSpec(Snipe),
+            CogSpec(ReminderSystem),
+            CogSpec(MessagePurge),
+            CogSpec(CustomLogging),
+            CogSpec(LevelingSystem),
+            CogSpec(MuteSystem),
+            CogSpec(VerificationSetup, "VerificationSystem", lazy=True),
+            CogSpec(BotVerificationSystem),
+            CogSpec(RatingSystem, lazy=True),
+            CogSpec(MoodTracker),
+            CogSpec(IdeaSystem, lazy=True),
+            CogSpec(MusicPlayer),
+            CogSpec(ChannelManager, lazy=True),
+            CogSpec(RoleBackup, lazy=True),
+            CogSpec(EnhancedMinigames),
+            CogSpec(AFKSystem),
+            CogSpec(JSONEmbeds, lazy=True),
+            CogSpec(TempChannels),
+            CogSpec(ProfileSystem),
+            CogSpec(WebhookManager, lazy=True),
+            CogSpec(CustomVerification),
+            CogSpec(ServerAdsHub),
+            CogSpec(AdvancedUserAnalytics),
+            CogSpec(AI_CHAT),
+            CogSpec(BMICalculator, lazy=True),
+            CogSpec(MathPhysicsTools, lazy=True),
+            CogSpec(TimeTools, lazy=True),
+            CogSpec(CodingTools, lazy=True),
+            CogSpec(StudyTools, lazy=True),
+            CogSpec(URLShortener, lazy=True),
+            CogSpec(PasswordGenerator, lazy=True),
+            CogSpec(MorseCodeTools, lazy=True),
+            CogSpec(ASCIIArtGenerator, lazy=True),
+            CogSpec(URLStatusChecker, lazy=True),
+            CogSpec(IPLookupTools, lazy=True),
+            CogSpec(FileSizeConverter, lazy=True),
+            CogSpec(FileTypeIdentifier, lazy=True),
+            CogSpec(DownloadCalculator, lazy=True),
+            CogSpec(WordAnalytics),
+            CogSpec(AdvancedRNG, lazy=True),
+            CogSpec(ChemicalElements),
+            CogSpec(ISBNLookup, lazy=True),
+            CogSpec(CitationGenerator, lazy=True),
+            CogSpec(AdvancedPollSystem),
+            CogSpec(HackerCommands, lazy=True),
+            CogSpec(RoastCommands),
+            CogSpec(BotSassResponses),
+            CogSpec(AntiGhostPing),
+            CogSpec(ClaudeAI),
+            CogSpec(Announcements, lazy=True),
+            CogSpec(BeatUpCommands, lazy=True),
+            CogSpec(ShootingCommands, lazy=True),
+            CogSpec(LoveCommands, lazy=True),
+            CogSpec(TeamFightCommands, lazy=True),
+            CogSpec(BlackjackGame),
+            CogSpec(RiotGamesAPI, lazy=True),
+            CogSpec(ClearChannel, "ClearChannel Function"),
+            CogSpec(AntiNukeSystem),
+            CogSpec(TranslationSystem),
+            CogSpec(SecurityAudit, lazy=True),
+            CogSpec(Sudo, "sudo", lazy=True),
+            CogSpec(GiveawaySystem),
+            CogSpec(SocialMediaManager, "SocialMediaManager | Only Framework"),
+            CogSpec(BirthdayReminder),
+            CogSpec(CustomCommands),
+            CogSpec(CommandAliases),
+            CogSpec(UserNotebook, lazy=True),
+            CogSpec(EmotionalSupportCog, quiet=True),
+            CogSpec(UpdateChecker),
+            CogSpec(CogManager),
+            CogSpec(ZSortCommands),
+            CogSpec(ServerConfig, "ServerConfig | Not Done | in Development"),
+            CogSpec(CreatorResponseCog, quiet=True),
+            CogSpec(AutoConfigLoader)
+        ], [
+            CogSpec(RuleMaker),
+            CogSpec(ExtensionMarketplace, "Ext. Marketplace"),
+            CogSpec(TrollFriend, quiet=True, kwargs={"target_user_id": 524385308662562826})
+        ]
+
     async def setup_cogs(self):
-        await self.add_cog(CommandErrorHandler(self))
-        print("✓ Loaded CommandErrorHandler")
-        await self.add_cog(ModerationCommands(self))
-        print("✓ Loaded ModerationCommands")
-        await self.add_cog(TicketSystem(self))
-        print("✓ Loaded TicketSystem")
-        await self.add_cog(ServerManagement(self))
-        print("✓ Loaded ServerManagement")
-        await self.add_cog(ServerInfo(self))
-        print("✓ Loaded ServerInfo")
-        await self.add_cog(HelpSystem(self))
-        print("✓ Loaded HelpSystem")
-        await self.add_cog(AutoMod(self))
-        print("✓ Loaded AutoMod")
-        await self.add_cog(WelcomeSystem(self))
-        print("✓ Loaded WelcomeSystem")
-        await self.add_cog(RoleManager(self))
-        print("✓ Loaded RoleManager")
-        await self.add_cog(UserTracker(self))
-        print("✓ Loaded UserTracker")
-        await self.add_cog(BackupSystem(self))
-        print("✓ Loaded BackupSystem")
-        await self.add_cog(Config(self))
-        print("✓ Loaded Config")
-        await self.add_cog(OwnerOnly(self))
-        print("✓ Loaded OwnerOnly")
-        await self.add_cog(MinigamesCog(self))
-        print("✓ Loaded MinigamesCog")
-        await self.add_cog(Analytics(self))
-        print("✓ Loaded Analytics")
-        await self.add_cog(AdvancedInviteTracker(self))
-        print("✓ Loaded AdvancedInviteTracker")
-        await self.add_cog(Snipe(self))
-        print("✓ Loaded Snipe")
-        await self.add_cog(ReminderSystem(self))
-        print("✓ Loaded ReminderSystem")
-        await self.add_cog(MessagePurge(self))
-        print("✓ Loaded MessagePurge")
-        await self.add_cog(CustomLogging(self))
-        print("✓ Loaded CustomLogging")
-        await self.add_cog(LevelingSystem(self))
-        print("✓ Loaded LevelingSystem")
-        await self.add_cog(MuteSystem(self))
-        print("✓ Loaded MuteSystem")
-        await self.add_cog(VerificationSetup(self))
-        print("✓ Loaded VerificationSystem")
-        await self.add_cog(BotVerificationSystem(self))
-        print("✓ Loaded BotVerificationSystem")
-        await self.add_cog(RatingSystem(self))
-        print("✓ Loaded RatingSystem")
-        await self.add_cog(MoodTracker(self))
-        print("✓ Loaded MoodTracker")
-        await self.add_cog(IdeaSystem(self))
-        print("✓ Loaded IdeaSystem")
-        await self.add_cog(MusicPlayer(self))
-        print("✓ Loaded MusicPlayer")
-        await self.add_cog(ChannelManager(self))
-        print("✓ Loaded ChannelManager")
-        await self.add_cog(RoleBackup(self))
-        print("✓ Loaded RoleBackup")
-        # await self.add_cog(AiCommands(self))
-        # print("✓ Loaded AiCommands")
-        await self.add_cog(EnhancedMinigames(self))
-        print("✓ Loaded EnhancedMinigames")
-        await self.add_cog(AFKSystem(self))
-        print("✓ Loaded AFKSystem")
-        await self.add_cog(JSONEmbeds(self))
-        print("✓ Loaded JSONEmbeds")
-        await self.add_cog(TempChannels(self))
-        print("✓ Loaded TempChannels")
-        await self.add_cog(ProfileSystem(self))
-        print("✓ Loaded ProfileSystem")
-        await self.add_cog(WebhookManager(self))
-        print("✓ Loaded WebhookManager")
-        await self.add_cog(CustomVerification(self))
-        print("✓ Loaded CustomVerification")
-        await self.add_cog(ServerAdsHub(self))
-        print("✓ Loaded ServerAdsHub")
-        await self.add_cog(AdvancedUserAnalytics(self))
-        print("✓ Loaded AdvancedUserAnalytics")
-        await self.add_cog(AI_CHAT(self))
-        print("✓ Loaded AI_CHAT")
-        await self.add_cog(BMICalculator(self))
-        print("✓ Loaded BMICalculator")
-        await self.add_cog(MathPhysicsTools(self))
-        print("✓ Loaded MathPhysicsTools")
-        await self.add_cog(TimeTools(self))
-        print("✓ Loaded TimeTools")
-        await self.add_cog(CodingTools(self))
-        print("✓ Loaded CodingTools")
-        await self.add_cog(StudyTools(self))
-        print("✓ Loaded StudyTools")
-        await self.add_cog(URLShortener(self))
-        print("✓ Loaded URLShortener")
-        await self.add_cog(PasswordGenerator(self))
-        print("✓ Loaded PasswordGenerator")
-        await self.add_cog(MorseCodeTools(self))
-        print("✓ Loaded MorseCodeTools")
-        await self.add_cog(ASCIIArtGenerator(self))
-        print("✓ Loaded ASCIIArtGenerator")
-        await self.add_cog(URLStatusChecker(self))
-        print("✓ Loaded URLStatusChecker")
-        await self.add_cog(IPLookupTools(self))
-        print("✓ Loaded IPLookupTools")
-        await self.add_cog(FileSizeConverter(self))
-        print("✓ Loaded FileSizeConverter")
-        await self.add_cog(FileTypeIdentifier(self))
-        print("✓ Loaded FileTypeIdentifier")
-        await self.add_cog(DownloadCalculator(self))
-        print("✓ Loaded DownloadCalculator")
-        await self.add_cog(WordAnalytics(self))
-        print("✓ Loaded WordAnalytics")
-        await self.add_cog(AdvancedRNG(self))
-        print("✓ Loaded AdvancedRNG")
-        await self.add_cog(ChemicalElements(self))
-        print("✓ Loaded ChemicalElements")
-        await self.add_cog(ISBNLookup(self))
-        print("✓ Loaded ISBNLookup")
-        await self.add_cog(CitationGenerator(self))
-        print("✓ Loaded CitationGenerator")
-        await self.add_cog(AdvancedPollSystem(self))
-        print("✓ Loaded AdvancedPollSystem")
-        await self.add_cog(HackerCommands(self))
-        print("✓ Loaded HackerCommands")
-        await self.add_cog(RoastCommands(self))
-        print("✓ Loaded RoastCommands")
-        await self.add_cog(BotSassResponses(self))
-        print("✓ Loaded BotSassResponses")
-        await self.add_cog(AntiGhostPing(self))
-        print("✓ Loaded AntiGhostPing")
-        await self.add_cog(ClaudeAI(self))
-        print("✓ Loaded ClaudeAI")
-        await self.add_cog(Announcements(self))
-        print("✓ Loaded Announcements")
-        await self.add_cog(BeatUpCommands(self))
-        print("✓ Loaded BeatUpCommands")
-        await self.add_cog(ShootingCommands(self))
-        print("✓ Loaded ShootingCommands")
-        await self.add_cog(LoveCommands(self))
-        print("✓ Loaded LoveCommands")
-        await self.add_cog(TeamFightCommands(self))
-        print("✓ Loaded TeamFightCommands")
-        await self.add_cog(BlackjackGame(self))
-        print("✓ Loaded BlackjackGame")
-        await self.add_cog(RiotGamesAPI(self))
-        print("✓ Loaded RiotGamesAPI")
-        await self.add_cog(ClearChannel(self))
-        print ("✓ Loaded ClearChannel Function")
-        await self.add_cog(AntiNukeSystem(self))
-        print("✓ Loaded AntiNukeSystem")
-        await self.add_cog(TranslationSystem(self))
-        print("✓ Loaded TranslationSystem")
-        await self.add_cog(SecurityAudit(self))
-        print("✓ Loaded SecurityAudit")
-        await self.add_cog(Sudo(self))
-        print("✓ Loaded sudo")
-        await self.add_cog(GiveawaySystem(self))
-        print("✓ Loaded GiveawaySystem")
-        await self.add_cog(SocialMediaManager(self))
-        print("✓ Loaded SocialMediaManager | Only Framework")
-        await self.add_cog(BirthdayReminder(self))
-        print("✓ Loaded BirthdayReminder")
-        await self.add_cog(CustomCommands(self))
-        print("✓ Loaded CustomCommands")
-        await self.add_cog(CommandAliases(self))
-        print("✓ Loaded CommandAliases")
-        await self.add_cog(UserNotebook(self))
-        print("✓ Loaded UserNotebook")
-        await self.add_cog(EmotionalSupportCog(self))
-        await bot.add_cog(UpdateChecker(bot))
-        print("✓ Loaded UpdateChecker")
-        await bot.add_cog(CogManager(bot))
-        print("✓ Loaded CogManager")
-        await bot.add_cog(ZSortCommands(bot))
-        print("✓ Loaded ZSortCommands")
-        self.config_manager = ConfigManager(self)  
-        await self.add_cog(ServerConfig(self))
-        print("✓ Loaded ServerConfig | Not Done | in Development")
-        await self.add_cog(CreatorResponseCog(self))
-        await bot.add_cog(AutoConfigLoader(bot))
-        print("✓ AutoConfigLoader")
+        core, extras = self.cog_specs()
+        for spec in core:
+            await self.load_cog(spec)
+        started = time.perf_counter()
         await bot.load_extension("extension_loader")
+        self.startup.record_cog("ExtensionLoader", "eager", load=time.perf_counter() - started)
         print("✓ Loaded ExtensionLoader")
-        await self.add_cog(RuleMaker(self))
-        print("✓ Loaded RuleMaker")
-        await self.add_cog(ExtensionMarketplace(bot))
-        print("✓ Loaded Ext. Marketplace")
-        
-        await self.add_cog(TrollFriend(self, target_user_id=524385308662562826))
+        for spec in extras:
+            await self.load_cog(spec)
         print("All Cogs Loaded!")
         print("-------------------------------------------------------")
         print("Waiting for bot to be ready...")
         print("-------------------------------------------------------")
-        
+
+    async def load_cog(self, spec):
+        if spec.can_defer():
+            for name in spec.command_names():
+                self.lazy_cogs[name] = spec
+            self.startup.record_cog(spec.name, "deferred")
+            return
+        started = time.perf_counter()
+        cog = spec.cls(self, **spec.kwargs)
+        built = time.perf_counter()
+        await self.add_cog(cog)
+        self.startup.record_cog(spec.name, "eager", built - started, time.perf_counter() - built)
+        if not spec.quiet:
+            print(f"✓ Loaded {spec.label or spec.name}")
+
+    async def load_lazy_cog(self, name):
+        # Concurrent first uses of a deferred cog share one load
+        spec = self.lazy_cogs.get(name)
+        if spec is None:
+            return False
+        task = self.lazy_loads.get(spec.name)
+        if task is None:
+            task = self.lazy_loads[spec.name] = asyncio.create_task(self._load_deferred(spec))
+        try:
+            await asyncio.shield(task)
+        except Exception as e:
+            print(f"Failed to load {spec.name} on demand: {e}")
+            return False
+        return True
+
+    async def _load_deferred(self, spec):
+        try:
+            started = time.perf_counter()
+            cog = spec.cls(self, **spec.kwargs)
+            built = time.perf_counter()
+            await self.add_cog(cog)
+            self.startup.record_cog(spec.name, "on demand", built - started, time.perf_counter() - built)
+            for name in spec.command_names():
+                self.lazy_cogs.pop(name, None)
+        finally:
+            self.lazy_loads.pop(spec.name, None)
+
+    def command_exists(self, name):
+        return name in self.all_commands or name in self.lazy_cogs
+
+    async def get_context(self, origin, /, *, cls=commands.Context):
+        ctx = await super().get_context(origin, cls=cls)
+        if ctx.command is None and ctx.invoked_with in self.lazy_cogs:
+            if await self.load_lazy_cog(ctx.invoked_with):
+                ctx = await super().get_context(origin, cls=cls)
+        return ctx
+
+    async def add_cog(self, cog, /, **kwargs):
+        await super().add_cog(cog, **kwargs)
+        self.message_dispatcher.register_cog(cog)
+
+    async def remove_cog(self, name, /, **kwargs):
+        cog = await super().remove_cog(name, **kwargs)
+        if cog is not None:
+            self.message_dispatcher.unregister_cog(cog)
+        return cog
+
     async def setup_hook(self):
-        await self.setup_cogs()
+        self.startup.phases["module import"] = IMPORT_FINISHED - IMPORT_STARTED
+        with self.startup.phase("services"):
+            await self.timers.start()
+            await self.fanout.start()
+            await self.renderer.get_executor()
+            self.config_manager = ConfigManager(self)
+            self.analytics = AnalyticsDatabase(self)
+            await self.analytics.start()
+        with self.startup.phase("cogs"):
+            await self.setup_cogs()
         self.add_view(PersistentVerifyView())    
-        self.config_manager = ConfigManager()
-        await bot.tree.sync()
+        with self.startup.phase("command tree sync"):
+            await bot.tree.sync()
+        print("\n".join(self.startup.summary()))
                                    
         await self.send_status_update("online")
                                     
@@ -389,7 +1772,8 @@ class ZygnalBot(commands.Bot):
                 print(f"Failed to send status update: {e}")                             
 
     async def on_ready(self):
-        self.webhook_logger = WebhookLogger(self)
+        if self.webhook_logger is None:
+            self.webhook_logger = WebhookLogger(self)
         self.print_banner()
         print('\033[92m' + '🚀 ' + '\033[94m' + f'{self.user}' + '\033[92m' + ' ZygnalBot is Online! ' + '\033[91m' + '(c) TheHolyOneZ' + '\033[0m')
         
@@ -453,95 +1837,236 @@ class ZygnalBot(commands.Bot):
 
     async def close(self):
         await self.send_status_update("offline")
+        if self.webhook_logger:
+            await self.webhook_logger.close()
         await super().close()
+        await self.timers.close()
+        await self.llm.close()
+        await self.fanout.close()
+        self.renderer.close()
+        if hasattr(self, 'config_manager'):
+            self.config_manager.close()
+        if hasattr(self, 'analytics'):
+            await self.analytics.close()
                                              
 bot = ZygnalBot()
-keep_alive()
 
 """Below Is Not Tested/Not Fully Implented and Wont Work Correctly"""
 
-from collections import defaultdict
-
 
 logger = logging.getLogger('zygnal_config')
 
-class ConfigManager:
+class ConfigNamespace(MutableMapping):
+    # Dict-like view of one config namespace, keyed by guild id. A guild's value is read
+    # from the ConfigManager on first access and kept decoded (e.g. as a dataclass).
+    # Assigning writes it back; after editing a value in place, call save(guild_id).
+    def __init__(self, manager, name: str, decode=None, encode=None, default=None):
+        self.manager = manager
+        self.name = name
+        self.decode = decode
+        self.encode = encode
+        self.default = default
+        self._values: Dict[int, object] = {}
+
+    def __getitem__(self, guild_id):
+        if guild_id in self._values:
+            return self._values[guild_id]
+        data = self.manager.load_config(guild_id).get(self.name)
+        if data is None:
+            if self.default is None:
+                raise KeyError(guild_id)
+            value = self.default()
+        else:
+            value = self.decode(data) if self.decode else data
+        self._values[guild_id] = value
+        return value
+
+    def __setitem__(self, guild_id, value):
+        self._values[guild_id] = value
+        self.save(guild_id)
 
-    def __init__(self, data_folder="config"):  
+    def __delitem__(self, guild_id):
+        self._values.pop(guild_id, None)
+        if not self.manager.delete_category(guild_id, self.name):
+            raise KeyError(guild_id)
+
+    def __contains__(self, guild_id):
+        return self.name in self.manager.load_config(guild_id)
+
+    def __iter__(self):
+        return iter(self.manager.guild_ids(self.name))
+
+    def __len__(self):
+        return len(self.manager.guild_ids(self.name))
+
+    def save(self, guild_id) -> bool:
+        value = self[guild_id]
+        return self.manager.set_category(guild_id, self.name, self.encode(value) if self.encode else value)
+
+
+class ConfigManager:
+    # Per-guild settings store. Every category ("namespace") of a guild is one JSON row
+    # in a WAL-mode SQLite table. A guild's rows are loaded on first access and then
+    # served from memory; writes update the cache at once and are committed together
+    # shortly afterwards, so a burst of changes costs a single transaction.
+    def __init__(self, bot, db_path: str = "data/config.db", flush_delay: float = 1.0):
         self.bot = bot
-        self.config_dir = "data/server_configs"
-        self.ensure_directory_exists()
-        self.cache = defaultdict(dict)
-        self.load_all_configs()
-        
-    def ensure_directory_exists(self):
+        self.db_path = db_path
+        self.flush_delay = flush_delay
+        self.legacy_dir = "data/server_configs"
+        self.cache: Dict[int, Dict] = {}
+        self.namespaces: Dict[str, ConfigNamespace] = {}
+        self._dirty = set()
+        self._flush_handle = None
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS config (
+                guild_id INTEGER NOT NULL,
+                namespace TEXT NOT NULL,
+                data TEXT NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (guild_id, namespace)
+            )
+        """)
+        self.db.commit()
+        if self.db.execute("PRAGMA user_version").fetchone()[0] == 0:
+            self.import_legacy_configs()
+
+    def import_legacy_configs(self):
+        # One-time move of the old data/server_configs/<guild>.json files into the table
+        if os.path.isdir(self.legacy_dir):
+            for filename in os.listdir(self.legacy_dir):
+                if not filename.endswith('.json'):
+                    continue
+                try:
+                    guild_id = int(filename[:-5])
+                    with open(os.path.join(self.legacy_dir, filename), 'r') as f:
+                        config = json.load(f)
+                except (ValueError, OSError) as e:
+                    logger.error(f"Skipping legacy config {filename}: {e}")
+                    continue
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO config (guild_id, namespace, data, updated) VALUES (?, ?, ?, ?)",
+                    [(guild_id, name, self.encode(data), time.time()) for name, data in config.items()]
+                )
+                logger.info(f"Imported legacy config for guild {guild_id}")
+        self.db.execute("PRAGMA user_version = 1")
+        self.db.commit()
 
-        if not os.path.exists(self.config_dir):
-            os.makedirs(self.config_dir)
-            logger.info(f"Created config directory: {self.config_dir}")
-    
-    def get_server_config_path(self, guild_id):
+    @staticmethod
+    def encode(data) -> str:
+        def default(value):
+            if isinstance(value, discord.Color):
+                return value.value
+            if isinstance(value, (set, frozenset)):
+                return sorted(value)
+            raise TypeError(f"{type(value).__name__} is not JSON serializable")
+        return json.dumps(data, default=default)
+
+    def namespace(self, name: str, decode=None, encode=None, default=None) -> ConfigNamespace:
+        if name not in self.namespaces:
+            self.namespaces[name] = ConfigNamespace(self, name, decode, encode, default)
+        return self.namespaces[name]
+
+    def load_config(self, guild_id) -> Dict:
+        config = self.cache.get(guild_id)
+        if config is None:
+            config = self.cache[guild_id] = {}
+            rows = self.db.execute("SELECT namespace, data FROM config WHERE guild_id = ?", (guild_id,))
+            for name, data in rows:
+                try:
+                    config[name] = json.loads(data)
+                except json.JSONDecodeError:
+                    logger.error(f"Failed to parse {name} config for guild {guild_id}")
+        return config
 
-        return os.path.join(self.config_dir, f"{guild_id}.json")
-    
-    def load_all_configs(self):
+    def has_config(self, guild_id) -> bool:
+        return bool(self.load_config(guild_id))
 
-        for filename in os.listdir(self.config_dir):
-            if filename.endswith('.json'):
-                guild_id = int(filename.split('.')[0])
-                self.load_config(guild_id)
-                
-    def load_config(self, guild_id):
+    def guild_ids(self, category) -> set:
+        guild_ids = {guild_id for guild_id, config in self.cache.items() if category in config}
+        rows = self.db.execute("SELECT guild_id FROM config WHERE namespace = ?", (category,))
+        guild_ids.update(guild_id for (guild_id,) in rows if guild_id not in self.cache)
+        return guild_ids
 
-        path = self.get_server_config_path(guild_id)
-        if os.path.exists(path):
+    def save_config(self, guild_id, category) -> bool:
+        self._dirty.add((guild_id, category))
+        if self._flush_handle is None:
             try:
-                with open(path, 'r') as f:
-                    self.cache[guild_id] = json.load(f)
-                logger.info(f"Loaded config for guild {guild_id}")
-            except json.JSONDecodeError:
-                logger.error(f"Failed to parse config for guild {guild_id}")
-                self.cache[guild_id] = {}
-        else:
-            self.cache[guild_id] = {}
-        return self.cache[guild_id]
-    
-    def save_config(self, guild_id):
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return self.flush()
+            self._flush_handle = loop.call_later(self.flush_delay, self.flush)
+        return True
 
-        path = self.get_server_config_path(guild_id)
+    def flush(self) -> bool:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._dirty:
+            return True
+        dirty, self._dirty = self._dirty, set()
+        now = time.time()
+        upserts, deletes = [], []
+        for guild_id, category in dirty:
+            data = self.cache.get(guild_id, {}).get(category)
+            if data is None:
+                deletes.append((guild_id, category))
+                continue
+            try:
+                upserts.append((guild_id, category, self.encode(data), now))
+            except (TypeError, ValueError) as e:
+                logger.error(f"Cannot save {category} config for guild {guild_id}: {e}")
         try:
-            with open(path, 'w') as f:
-                json.dump(self.cache[guild_id], f, indent=4)
-            logger.info(f"Saved config for guild {guild_id}")
+            with self.db:
+                self.db.executemany(
+                    "INSERT INTO config (guild_id, namespace, data, updated) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(guild_id, namespace) DO UPDATE SET data = excluded.data, updated = excluded.updated",
+                    upserts
+                )
+                self.db.executemany("DELETE FROM config WHERE guild_id = ? AND namespace = ?", deletes)
             return True
         except Exception as e:
-            logger.error(f"Failed to save config for guild {guild_id}: {e}")
+            # Keep the rows dirty so the next flush retries them
+            self._dirty |= dirty
+            logger.error(f"Failed to save server configs: {e}")
             return False
-    
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
     def get_setting(self, guild_id, category, key, default=None):
-      
-        config = self.cache[guild_id]
+
+        config = self.load_config(guild_id)
         if category not in config:
             return default
         return config[category].get(key, default)
-    
+
     def set_setting(self, guild_id, category, key, value):
-       
-        if guild_id not in self.cache:
-            self.cache[guild_id] = {}
-        if category not in self.cache[guild_id]:
-            self.cache[guild_id][category] = {}
-        self.cache[guild_id][category][key] = value
-        return self.save_config(guild_id)
-    
+
+        config = self.load_config(guild_id)
+        config.setdefault(category, {})[key] = value
+        return self.save_config(guild_id, category)
+
     def get_category(self, guild_id, category):
 
-        return self.cache[guild_id].get(category, {})
-    
+        return self.load_config(guild_id).get(category, {})
+
     def set_category(self, guild_id, category, settings):
 
-        self.cache[guild_id][category] = settings
-        return self.save_config(guild_id)
+        self.load_config(guild_id)[category] = settings
+        return self.save_config(guild_id, category)
+
+    def delete_category(self, guild_id, category) -> bool:
+        if self.load_config(guild_id).pop(category, None) is None:
+            return False
+        self.save_config(guild_id, category)
+        return True
 
 class EnhancedServerConfigUI:
     def __init__(self, bot):
@@ -6388,7 +7913,7 @@ class CommandAliases(commands.Cog):
                     command = command_msg.content
                 except asyncio.TimeoutError:
                     return await ctx.send("⏱️ Alias creation timed out.")
-        if alias in self.bot.all_commands:
+        if self.bot.command_exists(alias):
             return await ctx.send(f"⚠️ `{alias}` is already a built-in command. Please choose a different alias.")
         
         if alias in self.command_aliases.get(guild_id, {}):
@@ -6397,7 +7922,7 @@ class CommandAliases(commands.Cog):
         if not command.startswith(prefix):
             command = prefix + command
         base_command = command.split()[0][len(prefix):]
-        if base_command not in self.bot.all_commands:
+        if not self.bot.command_exists(base_command):
             confirm_embed = discord.Embed(
                 title="⚠️ Command Not Found",
                 description=f"The command `{prefix}{base_command}` doesn't appear to be a built-in command. Create the alias anyway?",
@@ -6544,10 +8069,8 @@ class CommandAliases(commands.Cog):
         embed.set_footer(text="ZygnalBot Command Aliases | © TheHolyOneZ")
         await ctx.send(embed=embed)
     
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot or not message.guild:
-            return
+    @message_handler(guild_only=True, ignore_bots=True, requires_prefix=True)
+    async def on_message(self, message, context):
         if message.guild:  
             return           
         guild_id = str(message.guild.id)
@@ -6555,12 +8078,9 @@ class CommandAliases(commands.Cog):
         if guild_id not in self.command_aliases:
             return
         
-        prefix = self.bot.command_prefix
-        if not message.content.startswith(prefix):
-            return
-        
+        prefix = context.prefix
         content = message.content[len(prefix):]
-        potential_alias = content.split()[0].lower()
+        potential_alias = context.command_name
         
         if potential_alias in self.command_aliases[guild_id]:
             alias_data = self.command_aliases[guild_id][potential_alias]
@@ -6661,7 +8181,7 @@ class CustomCommands(commands.Cog):
             
             cmd_name = cmd_msg.content.lower()
             
-            if cmd_name in self.bot.all_commands:
+            if self.bot.command_exists(cmd_name):
                 return await ctx.send(f"⚠️ `{cmd_name}` is already a built-in command. Please choose a different name.")
             
             if cmd_name in self.custom_commands.get(guild_id, {}):
@@ -7045,7 +8565,7 @@ class CustomCommands(commands.Cog):
                     
                     new_name = name_msg.content.lower()
                     
-                    if new_name in self.bot.all_commands:
+                    if self.bot.command_exists(new_name):
                         return await ctx.send(f"⚠️ `{new_name}` is already a built-in command. Please choose a different name.")
                     
                     if new_name in self.custom_commands[guild_id]:
@@ -7123,7 +8643,7 @@ class CustomCommands(commands.Cog):
                     
                     new_name = name_msg.content.lower()
                     
-                    if new_name in self.bot.all_commands:
+                    if self.bot.command_exists(new_name):
                         return await ctx.send(f"⚠️ `{new_name}` is already a built-in command. Please choose a different name.")
                     
                     if new_name in self.custom_commands[guild_id]:
@@ -7206,7 +8726,7 @@ class CustomCommands(commands.Cog):
                     
                     new_name = name_msg.content.lower()
                     
-                    if new_name in self.bot.all_commands:
+                    if self.bot.command_exists(new_name):
                         return await ctx.send(f"⚠️ `{new_name}` is already a built-in command. Please choose a different name.")
                     
                     if new_name in self.custom_commands[guild_id]:
@@ -7220,19 +8740,11 @@ class CustomCommands(commands.Cog):
         except asyncio.TimeoutError:
             await ctx.send("⏱️ Command edit timed out.")
     
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot or not message.guild:
-            return
-        
+    @message_handler(guild_only=True, ignore_bots=True, requires_prefix=True,
+                     when=lambda cog, context: str(context.guild_id) in cog.custom_commands)
+    async def on_message(self, message, context):
         guild_id = str(message.guild.id)
-        
-        if guild_id not in self.custom_commands:
-            return
-        prefix = self.bot.command_prefix
-        if not message.content.startswith(prefix):
-            return
-        cmd_name = message.content[len(prefix):].split()[0].lower()
+        cmd_name = context.command_name
         
         if cmd_name in self.custom_commands[guild_id]:
             self.custom_commands[guild_id][cmd_name]["uses"] += 1
@@ -7669,7 +9181,14 @@ class BirthdayReminder(commands.Cog):
                 await interaction.followup.send(f"Error posting embed: {e}", ephemeral=True)
 
     
-    @tasks.loop(hours=24)
+    async def on_birthday_check(self, payload: Dict, job):
+        try:
+            await self.check_birthdays()
+        finally:
+            # Next run at local midnight; the job is durable so restarts don't re-announce
+            tomorrow = (datetime.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+            await self.bot.timers.schedule('birthday_check', tomorrow.timestamp(), key='birthdays:daily')
+
     async def check_birthdays(self):
         today = datetime.now()
         current_month = today.month
@@ -7682,31 +9201,37 @@ class BirthdayReminder(commands.Cog):
                 continue
             
             try:
-                guild = self.bot.get_guild(int(guild_id))
-                if not guild:
-                    continue
-                
-                channel = guild.get_channel(int(config["announcement_channel"]))
-                if not channel:
-                    continue
-                
-                for user_id, birthday_data in guild_birthdays.items():
-                    if birthday_data["month"] == current_month and birthday_data["day"] == current_day:
-                       
-                        user = guild.get_member(int(user_id))
-                        if user:
-                            message = config["announcement_message"].replace("{user_mention}", user.mention)
-                            await channel.send(message)
-                            
-                            if config["role_id"]:
-                                try:
-                                    role = guild.get_role(int(config["role_id"]))
-                                    if role:
-                                        await user.add_roles(role)
-                                except Exception as e:
-                                    print(f"Error assigning birthday role: {e}")
+                members = [
+                    int(user_id) for user_id, birthday_data in guild_birthdays.items()
+                    if birthday_data["month"] == current_month and birthday_data["day"] == current_day
+                ]
+                if members:
+                    # One job per guild per day: re-running the check the same day can't announce twice
+                    await self.bot.fanout.broadcast(
+                        'birthday_announce', members, {"guild_id": int(guild_id)},
+                        job_id=f"birthday:{guild_id}:{today.date().isoformat()}"
+                    )
             except Exception as e:
                 print(f"Error checking birthdays for guild {guild_id}: {e}")
+
+    async def announce_birthday(self, payload: Dict, user_id: int):
+        guild = self.bot.get_guild(payload["guild_id"])
+        config = self.get_guild_config(str(payload["guild_id"]))
+        channel = guild.get_channel(int(config["announcement_channel"])) if guild and config["announcement_channel"] else None
+        user = guild.get_member(user_id) if guild else None
+        if not channel or not user:
+            return False
+
+        message = config["announcement_message"].replace("{user_mention}", user.mention)
+        await channel.send(message)
+        
+        if config["role_id"]:
+            try:
+                role = guild.get_role(int(config["role_id"]))
+                if role:
+                    await user.add_roles(role)
+            except Exception as e:
+                print(f"Error assigning birthday role: {e}")
     
     @commands.command(name="birthday_help")
     async def birthday_help(self, ctx):
@@ -8507,11 +10032,16 @@ class BirthdayReminder(commands.Cog):
     
     def cog_unload(self):
         
-        self.check_birthdays.cancel()
+        self.bot.timers.unregister('birthday_check')
+        self.bot.fanout.unregister('birthday_announce')
     
     async def cog_load(self):
        
-        self.check_birthdays.start()
+        self.bot.timers.register('birthday_check', self.on_birthday_check)
+        self.bot.fanout.register('birthday_announce', self.announce_birthday,
+                                route=lambda payload, user_id: ('birthday_announce', payload["guild_id"]))
+        if not self.bot.timers.get('birthdays:daily'):
+            await self.bot.timers.schedule('birthday_check', time.time(), key='birthdays:daily')
 
 from typing import Dict, List, Optional, Union
 
@@ -10270,15 +11800,91 @@ class GiveawayEntryView(discord.ui.View):
         else:
             
             giveaway_data["entries"].add(user_id)
+            giveaway_cog.add_entry(message_id, user_id)
             await interaction.response.send_message("You have entered the giveaway! Good luck! 🍀", ephemeral=True)
 
 class GiveawaySystem(commands.Cog):
-    def __init__(self, bot):
+    # Running giveaways live on as pending timer jobs. Button entries are stored as one
+    # row each in their own table; clicks are queued and inserted together shortly after,
+    # so a busy giveaway costs one small batched insert instead of a rewrite per click.
+    def __init__(self, bot, db_path: str = "data/giveaways.db"):
         self.bot = bot
         self.active_giveaways = {}
-        self.giveaway_task = self.bot.loop.create_task(self.check_giveaways())
         self.entry_update_task = self.bot.loop.create_task(self.update_giveaway_entries())
         self.use_buttons = True  
+        self.db_path = db_path
+        self.db = None
+        self.pending_entries: List[Tuple[int, int]] = []
+        self.save_delay = 2.0
+        self.save_task = None
+        self.bot.timers.register('giveaway_end', self.on_giveaway_due)
+
+    async def cog_load(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.db = await aiosqlite.connect(self.db_path)
+        await self.db.execute("PRAGMA journal_mode=WAL")
+        await self.db.execute("""
+            CREATE TABLE IF NOT EXISTS giveaway_entries (
+                message_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                PRIMARY KEY (message_id, user_id)
+            ) WITHOUT ROWID
+        """)
+        await self.db.commit()
+
+        for job in self.bot.timers.pending('giveaway_end'):
+            data = dict(job.payload)
+            # Older payloads carried the entry list inline
+            data["entries"] = set(data.get("entries", []))
+            self.active_giveaways[data["message_id"]] = data
+        async with self.db.execute("SELECT message_id, user_id FROM giveaway_entries") as cursor:
+            async for message_id, user_id in cursor:
+                if message_id in self.active_giveaways:
+                    self.active_giveaways[message_id]["entries"].add(user_id)
+        if self.active_giveaways:
+            self.bot.add_view(GiveawayEntryView(self.bot))
+
+    async def cog_unload(self):
+        self.entry_update_task.cancel()
+        self.bot.timers.unregister('giveaway_end')
+        if self.save_task:
+            self.save_task.cancel()
+        await self.save_entries()
+        if self.db:
+            await self.db.close()
+
+    def giveaway_payload(self, data: Dict) -> Dict:
+        payload = dict(data)
+        payload.pop("entries", None)
+        return payload
+
+    def add_entry(self, message_id: int, user_id: int):
+        self.pending_entries.append((message_id, user_id))
+        if self.save_task is None or self.save_task.done():
+            self.save_task = asyncio.create_task(self._delayed_save())
+
+    async def _delayed_save(self):
+        await asyncio.sleep(self.save_delay)
+        await self.save_entries()
+
+    async def save_entries(self):
+        if not self.pending_entries or not self.db:
+            return
+        rows, self.pending_entries = self.pending_entries, []
+        try:
+            await self.db.executemany(
+                "INSERT OR IGNORE INTO giveaway_entries (message_id, user_id) VALUES (?, ?)", rows
+            )
+            await self.db.commit()
+        except Exception as e:
+            self.pending_entries[:0] = rows
+            print(f"Error saving giveaway entries: {e}")
+
+    async def delete_entries(self, message_id: int):
+        self.pending_entries = [row for row in self.pending_entries if row[0] != message_id]
+        if self.db:
+            await self.db.execute("DELETE FROM giveaway_entries WHERE message_id = ?", (message_id,))
+            await self.db.commit()
 
     @commands.command()
     @commands.has_permissions(manage_messages=True)
@@ -10419,7 +12025,8 @@ class GiveawaySystem(commands.Cog):
             giveaway_msg = await channel.send(embed=embed)
             await giveaway_msg.add_reaction("🎉")
         
-        self.active_giveaways[giveaway_msg.id] = {
+        data = self.active_giveaways[giveaway_msg.id] = {
+            "message_id": giveaway_msg.id,
             "prize": settings['prize'],
             "winners": settings['winners'],
             "end_time": time.time() + (settings['duration'] * duration_multiplier),  
@@ -10429,49 +12036,16 @@ class GiveawaySystem(commands.Cog):
             "use_buttons": use_buttons,
             "entries": set()
         }
+        await self.bot.timers.schedule(
+            'giveaway_end', data["end_time"], self.giveaway_payload(data), key=f"giveaway:{giveaway_msg.id}"
+        )
 
     @commands.command()
     @commands.has_permissions(manage_messages=True)
     async def gend(self, ctx, message_id: int):
         if message_id in self.active_giveaways:
-            data = self.active_giveaways[message_id]
-            channel = self.bot.get_channel(data["channel_id"])
-            message = await channel.fetch_message(message_id)
-            
-            if data.get("use_buttons", False):
-                
-                user_ids = data.get("entries", set())
-                users = [self.bot.get_user(user_id) for user_id in user_ids if self.bot.get_user(user_id)]
-            else:
-                
-                users = [user async for user in message.reactions[0].users() if not user.bot]
-            
-            if not users:
-                await channel.send("No valid entries for the giveaway!")
-                return
-                
-            winners = random.sample(users, min(data["winners"], len(users)))
-            winner_text = ", ".join(w.mention for w in winners)
-            note_text = f"\n\n📝 **Note:** {data['note']}" if data.get('note') else ""
-            await channel.send(f"🎉 Congratulations {winner_text}! You won: {data['prize']}{note_text}")
-            
-            try:
-                embed = message.embeds[0]
-                embed.description = embed.description.replace("React with 🎉 to enter!", "**GIVEAWAY ENDED**").replace("Click the Enter button below to enter!", "**GIVEAWAY ENDED**")
-                embed.color = discord.Color.red()
-                
-                if data.get("use_buttons", False):
-                
-                    view = discord.ui.View.from_message(message)
-                    for child in view.children:
-                        child.disabled = True
-                    await message.edit(embed=embed, view=view)
-                else:
-                    await message.edit(embed=embed)
-            except:
-                pass
-                
-            del self.active_giveaways[message_id]
+            await self.bot.timers.cancel(f"giveaway:{message_id}")
+            await self.end_giveaway(message_id, self.active_giveaways[message_id])
 
     @commands.command()
     @commands.has_permissions(manage_messages=True)
@@ -10504,87 +12078,70 @@ class GiveawaySystem(commands.Cog):
         except Exception as e:
             await ctx.send(f"Error rerolling giveaway: {str(e)}")
 
-    async def check_giveaways(self):
-        await self.bot.wait_until_ready()
-        while not self.bot.is_closed():
+    async def on_giveaway_due(self, payload: Dict, job):
+        data = self.active_giveaways.get(payload["message_id"])
+        if data is None:
+            data = dict(payload)
+            data["entries"] = set(payload.get("entries", []))
+        await self.end_giveaway(payload["message_id"], data)
+
+    async def end_giveaway(self, giveaway_id: int, data: Dict):
+        try:
+            channel = self.bot.get_channel(data["channel_id"])
+            if not channel:
+                print(f"Channel for giveaway {giveaway_id} not found, removing giveaway")
+                return
+
             try:
-                current_time = time.time()
-                ended_giveaways = []
-                
-                for giveaway_id, data in list(self.active_giveaways.items()):
-                    if current_time >= data["end_time"]:
-                        channel = self.bot.get_channel(data["channel_id"])
-                        if channel:
-                            try:
-                                message = await channel.fetch_message(giveaway_id)
-                                
-                                users = []
-                                if data.get("use_buttons", False):
-                                   
-                                    user_ids = data.get("entries", set())
-                                    users = [self.bot.get_user(user_id) for user_id in user_ids if self.bot.get_user(user_id)]
-                                else:
-                                    
-                                    try:
-                                    
-                                        if message.reactions:
-                                            
-                                            for reaction in message.reactions:
-                                                if str(reaction.emoji) == "🎉":
-                                                    
-                                                    reaction_users = [user async for user in reaction.users() if not user.bot]
-                                                    users = reaction_users
-                                                    break
-                                    except Exception as e:
-                                        print(f"Error getting reactions: {e}")
-                                
-                                if not users:
-                                    await channel.send("No valid entries for the giveaway!")
-                                else:
-                                   
-                                    winners = random.sample(users, min(data["winners"], len(users)))
-                                    winner_text = ", ".join(w.mention for w in winners)
-                                    note_text = f"\n\n📝 **Note:** {data['note']}" if data.get('note') else ""
-                                    await channel.send(f"🎉 Congratulations {winner_text}! You won: {data['prize']}{note_text}")
-                                
-                                try:
-                                    embed = message.embeds[0]
-                                    
-                                    embed.description = embed.description.replace("React with 🎉 to enter!", "**GIVEAWAY ENDED**").replace("Click the Enter button below to enter!", "**GIVEAWAY ENDED**")
-                                    embed.color = discord.Color.red()
-                                    
-                                    if data.get("use_buttons", False):
-                                        try:
-                                            view = discord.ui.View.from_message(message)
-                                            for child in view.children:
-                                                child.disabled = True
-                                            await message.edit(embed=embed, view=view)
-                                        except Exception as e:
-                                            print(f"Error updating view: {e}")
-                                            await message.edit(embed=embed)
-                                    else:
-                                        await message.edit(embed=embed)
-                                except Exception as e:
-                                    print(f"Error updating ended giveaway message: {e}")
-                                
-                                ended_giveaways.append(giveaway_id)
-                            except discord.NotFound:
-                                print(f"Message {giveaway_id} not found, removing giveaway")
-                                ended_giveaways.append(giveaway_id)
-                            except Exception as e:
-                                print(f"Error ending giveaway {giveaway_id}: {e}")
-                                ended_giveaways.append(giveaway_id)
-                        else:
-                            print(f"Channel for giveaway {giveaway_id} not found, removing giveaway")
-                            ended_giveaways.append(giveaway_id)
-                
-                for giveaway_id in ended_giveaways:
-                    self.active_giveaways.pop(giveaway_id, None)
-                
-                await asyncio.sleep(10)  
+                message = await channel.fetch_message(giveaway_id)
+            except discord.NotFound:
+                print(f"Message {giveaway_id} not found, removing giveaway")
+                return
+
+            users = []
+            if data.get("use_buttons", False):
+                user_ids = data.get("entries", set())
+                users = [self.bot.get_user(user_id) for user_id in user_ids if self.bot.get_user(user_id)]
+            else:
+                try:
+                    for reaction in message.reactions:
+                        if str(reaction.emoji) == "🎉":
+                            users = [user async for user in reaction.users() if not user.bot]
+                            break
+                except Exception as e:
+                    print(f"Error getting reactions: {e}")
+
+            if not users:
+                await channel.send("No valid entries for the giveaway!")
+            else:
+                winners = random.sample(users, min(data["winners"], len(users)))
+                winner_text = ", ".join(w.mention for w in winners)
+                note_text = f"\n\n📝 **Note:** {data['note']}" if data.get('note') else ""
+                await channel.send(f"🎉 Congratulations {winner_text}! You won: {data['prize']}{note_text}")
+
+            try:
+                embed = message.embeds[0]
+                embed.description = embed.description.replace("React with 🎉 to enter!", "**GIVEAWAY ENDED**").replace("Click the Enter button below to enter!", "**GIVEAWAY ENDED**")
+                embed.color = discord.Color.red()
+
+                if data.get("use_buttons", False):
+                    try:
+                        view = discord.ui.View.from_message(message)
+                        for child in view.children:
+                            child.disabled = True
+                        await message.edit(embed=embed, view=view)
+                    except Exception as e:
+                        print(f"Error updating view: {e}")
+                        await message.edit(embed=embed)
+                else:
+                    await message.edit(embed=embed)
             except Exception as e:
-                print(f"Error in giveaway check task: {e}")
-                await asyncio.sleep(10)
+                print(f"Error updating ended giveaway message: {e}")
+        except Exception as e:
+            print(f"Error ending giveaway {giveaway_id}: {e}")
+        finally:
+            self.active_giveaways.pop(giveaway_id, None)
+            await self.delete_entries(giveaway_id)
 
 class Sudo(commands.Cog):
     def __init__(self, bot):
@@ -11022,7 +12579,6 @@ class SecurityAudit(commands.Cog):
 class TranslationSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.translator = Translator()
         self.auto_translate_channels = {}
         self.selected_manual_lang = None
         self.selected_auto_lang = None
@@ -11034,12 +12590,16 @@ class TranslationSystem(commands.Cog):
             "Spanish": "es", "Turkish": "tr", "Vietnamese": "vi"
         }
 
+    @cached_property
+    def translator(self):
+        return googletrans.Translator()
+
     @commands.command()
     async def translate(self, ctx):
         await self.create_translation_ui(ctx)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
+    @message_handler(ignore_bots=True, channels='auto_translate_channels')
+    async def on_message(self, message, context):
         if message.guild:  
             return   
         if message.channel.id in self.auto_translate_channels and not message.author.bot:
@@ -11231,6 +12791,71 @@ class LanguageDetectionModal(discord.ui.Modal):
                 ephemeral=True
             )
 
+ANTINUKE_THRESHOLDS = {
+    "ban_limit": 3,
+    "kick_limit": 5,
+    "channel_delete_limit": 2,
+    "role_delete_limit": 2,
+    "webhook_create_limit": 3,
+    "mass_mention_limit": 5,
+    "emoji_delete_limit": 3,
+    "bot_add_limit": 2
+}
+# Thresholds count actions inside this many seconds, not over a user's lifetime
+ANTINUKE_WINDOW = 10
+
+# Audit log actions streamed over the gateway and the limit each one counts towards
+ANTINUKE_ACTIONS = {
+    discord.AuditLogAction.ban: "ban_limit",
+    discord.AuditLogAction.kick: "kick_limit",
+    discord.AuditLogAction.channel_delete: "channel_delete_limit",
+    discord.AuditLogAction.role_delete: "role_delete_limit",
+    discord.AuditLogAction.webhook_create: "webhook_create_limit",
+    discord.AuditLogAction.emoji_delete: "emoji_delete_limit",
+    discord.AuditLogAction.bot_add: "bot_add_limit"
+}
+# Panel toggle guarding each limit; limits without one use "<name>_protection"
+ANTINUKE_PROTECTIONS = {
+    "channel_delete_limit": "channel_protection",
+    "role_delete_limit": "role_protection",
+    "webhook_create_limit": "webhook_protection",
+    "bot_add_limit": "bot_protection"
+}
+
+
+@dataclass
+class AntiNukeConfig:
+    settings: Dict[str, bool] = dataclasses.field(default_factory=dict)
+    thresholds: Dict[str, int] = dataclasses.field(default_factory=lambda: dict(ANTINUKE_THRESHOLDS))
+    alert_channel: Optional[int] = None
+    whitelist: set = dataclasses.field(default_factory=set)
+    protected_roles: set = dataclasses.field(default_factory=set)
+    window: int = ANTINUKE_WINDOW
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'AntiNukeConfig':
+        thresholds = dict(ANTINUKE_THRESHOLDS)
+        thresholds.update({key: int(value) for key, value in data.get('thresholds', {}).items()})
+        return cls(
+            settings=dict(data.get('settings', {})),
+            thresholds=thresholds,
+            alert_channel=data.get('alert_channel'),
+            whitelist=set(data.get('whitelist', [])),
+            protected_roles=set(data.get('protected_roles', [])),
+            window=int(data.get('window', ANTINUKE_WINDOW))
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            'settings': self.settings,
+            'thresholds': self.thresholds,
+            'alert_channel': self.alert_channel,
+            'whitelist': sorted(self.whitelist),
+            'protected_roles': sorted(self.protected_roles),
+            'window': self.window
+        }
+
+
 class AntiNukeConfirmView(discord.ui.View):
     def __init__(self, antinuke_system):
         super().__init__(timeout=60.0)
@@ -11249,16 +12874,10 @@ class AntiNukeConfirmView(discord.ui.View):
             "bot_protection": True
         }
         
-        default_thresholds = {
-            "ban_limit": 3,
-            "kick_limit": 5,
-            "channel_limit": 2,
-            "role_limit": 2,
-            "webhook_limit": 3
-        }
-
-        self.antinuke.settings[interaction.guild_id] = default_settings
-        self.antinuke.thresholds[interaction.guild_id] = default_thresholds
+        config = self.antinuke.config(interaction.guild_id)
+        config.settings = default_settings
+        config.thresholds = dict(ANTINUKE_THRESHOLDS)
+        self.antinuke.save_config(interaction.guild_id)
 
         embed = discord.Embed(
             title="✅ Settings Reset Complete",
@@ -11289,10 +12908,12 @@ class WhitelistManagementView(discord.ui.View):
         await interaction.response.defer()
         added_items = []
         
+        whitelist = self.antinuke.config(interaction.guild_id).whitelist
         for user in select.values:
-            if user.id not in self.antinuke.whitelist:
-                self.antinuke.whitelist.add(user.id)
+            if user.id not in whitelist:
+                whitelist.add(user.id)
                 added_items.append(f"User: {user.mention}")
+        self.antinuke.save_config(interaction.guild_id)
         
         embed = discord.Embed(
             title="✅ Whitelist Updated",
@@ -11312,10 +12933,12 @@ class WhitelistManagementView(discord.ui.View):
         await interaction.response.defer()
         added_items = []
         
+        whitelist = self.antinuke.config(interaction.guild_id).whitelist
         for role in select.values:
-            if role.id not in self.antinuke.whitelist:
-                self.antinuke.whitelist.add(role.id)
+            if role.id not in whitelist:
+                whitelist.add(role.id)
                 added_items.append(f"Role: {role.mention}")
+        self.antinuke.save_config(interaction.guild_id)
         
         embed = discord.Embed(
             title="✅ Whitelist Updated",
@@ -11327,7 +12950,7 @@ class WhitelistManagementView(discord.ui.View):
     @discord.ui.button(label="View Whitelist", style=discord.ButtonStyle.blurple)
     async def view_whitelist(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
-            whitelist = list(self.antinuke.whitelist)
+            whitelist = list(self.antinuke.config(interaction.guild_id).whitelist)
             user_mentions = []
             role_mentions = []
             
@@ -11364,7 +12987,7 @@ class WhitelistManagementView(discord.ui.View):
     @discord.ui.button(label="Remove from Whitelist", style=discord.ButtonStyle.red)
     async def remove_whitelist(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer()
-        whitelist = list(self.antinuke.whitelist)
+        whitelist = list(self.antinuke.config(interaction.guild_id).whitelist)
         options = []
 
         for id in whitelist:
@@ -11401,7 +13024,7 @@ class WhitelistManagementView(discord.ui.View):
             removed_items = []
             for value in select.values:
                 item_id = int(value)
-                self.antinuke.whitelist.remove(item_id)
+                self.antinuke.config(interaction.guild_id).whitelist.discard(item_id)
                 
                 if item_id < 9223372036854775807:
                     user = interaction.guild.get_member(item_id)
@@ -11409,6 +13032,7 @@ class WhitelistManagementView(discord.ui.View):
                 else:
                     role = interaction.guild.get_role(item_id)
                     removed_items.append(f"🎭 Role: {role.mention if role else item_id}")
+            self.antinuke.save_config(interaction.guild_id)
 
             embed = discord.Embed(
                 title="✅ Removed from Whitelist",
@@ -11435,16 +13059,17 @@ class WhitelistManagementView(discord.ui.View):
 
 
 class ThresholdSettingsModal1(discord.ui.Modal):
-    def __init__(self, antinuke_system):
+    def __init__(self, antinuke_system, guild_id):
         super().__init__(title="Primary Thresholds")
         self.antinuke = antinuke_system
+        thresholds = antinuke_system.config(guild_id).thresholds
         
         key_thresholds = {
-            'ban_limit': antinuke_system.thresholds['ban_limit'],
-            'kick_limit': antinuke_system.thresholds['kick_limit'],
-            'channel_delete_limit': antinuke_system.thresholds['channel_delete_limit'],
-            'role_delete_limit': antinuke_system.thresholds['role_delete_limit'],
-            'webhook_create_limit': antinuke_system.thresholds['webhook_create_limit']
+            'ban_limit': thresholds['ban_limit'],
+            'kick_limit': thresholds['kick_limit'],
+            'channel_delete_limit': thresholds['channel_delete_limit'],
+            'role_delete_limit': thresholds['role_delete_limit'],
+            'webhook_create_limit': thresholds['webhook_create_limit']
         }
         
         for threshold, current in key_thresholds.items():
@@ -11467,7 +13092,8 @@ class ThresholdSettingsModal1(discord.ui.Modal):
             except ValueError:
                 continue
                 
-        self.antinuke.thresholds.update(updates)
+        self.antinuke.config(interaction.guild_id).thresholds.update(updates)
+        self.antinuke.save_config(interaction.guild_id)
         
         embed = discord.Embed(
             title="Primary Thresholds Updated",
@@ -11479,14 +13105,15 @@ class ThresholdSettingsModal1(discord.ui.Modal):
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
 class ThresholdSettingsModal2(discord.ui.Modal):
-    def __init__(self, antinuke_system):
+    def __init__(self, antinuke_system, guild_id):
         super().__init__(title="Secondary Thresholds")
         self.antinuke = antinuke_system
+        thresholds = antinuke_system.config(guild_id).thresholds
         
         secondary_thresholds = {
-            'mass_mention_limit': antinuke_system.thresholds['mass_mention_limit'],
-            'emoji_delete_limit': antinuke_system.thresholds['emoji_delete_limit'],
-            'bot_add_limit': antinuke_system.thresholds['bot_add_limit']
+            'mass_mention_limit': thresholds['mass_mention_limit'],
+            'emoji_delete_limit': thresholds['emoji_delete_limit'],
+            'bot_add_limit': thresholds['bot_add_limit']
         }
         
         for threshold, current in secondary_thresholds.items():
@@ -11509,7 +13136,8 @@ class ThresholdSettingsModal2(discord.ui.Modal):
             except ValueError:
                 continue
                 
-        self.antinuke.thresholds.update(updates)
+        self.antinuke.config(interaction.guild_id).thresholds.update(updates)
+        self.antinuke.save_config(interaction.guild_id)
         
         embed = discord.Embed(
             title="Secondary Thresholds Updated",
@@ -11547,11 +13175,11 @@ class ToggleButton(discord.ui.Button):
 
     async def callback(self, interaction: discord.Interaction):
         guild_id = interaction.guild_id
-        if guild_id not in self.view.antinuke.settings:
-            self.view.antinuke.settings[guild_id] = {}
+        settings = self.view.antinuke.config(guild_id).settings
         
-        current = self.view.antinuke.settings[guild_id].get(self.feature, False)
-        self.view.antinuke.settings[guild_id][self.feature] = not current
+        current = settings.get(self.feature, False)
+        settings[self.feature] = not current
+        self.view.antinuke.save_config(guild_id)
         
         self.style = discord.ButtonStyle.green if not current else discord.ButtonStyle.red
         
@@ -11578,15 +13206,15 @@ class ThresholdButton(discord.ui.Button):
         )
 
     async def callback(self, interaction: discord.Interaction):
-        modal = ThresholdModal(self.view.antinuke)
+        modal = ThresholdModal(self.view.antinuke, interaction.guild_id)
         await interaction.response.send_modal(modal)
 
 class ThresholdModal(discord.ui.Modal):
-    def __init__(self, antinuke):
+    def __init__(self, antinuke, guild_id):
         super().__init__(title="🎚️ Threshold Settings")
         self.antinuke = antinuke
        
-        for i, (threshold, value) in enumerate(antinuke.thresholds.items()):
+        for i, (threshold, value) in enumerate(antinuke.config(guild_id).thresholds.items()):
             self.add_item(
                 discord.ui.TextInput(
                     label=threshold.replace('_', ' ').title(),
@@ -11614,7 +13242,8 @@ class ThresholdModal(discord.ui.Modal):
                 )
                 return
 
-        self.antinuke.thresholds.update(updates)
+        self.antinuke.config(interaction.guild_id).thresholds.update(updates)
+        self.antinuke.save_config(interaction.guild_id)
        
         embed = discord.Embed(
             title="✅ Thresholds Updated",
@@ -11670,9 +13299,11 @@ class WhitelistView(discord.ui.View):
 
     async def handle_select(self, interaction: discord.Interaction, selected, type_str):
         added_items = []
+        whitelist = self.system.config(interaction.guild_id).whitelist
         for item in selected:
-            self.system.whitelist.add(item.id)
+            whitelist.add(item.id)
             added_items.append(f"{'User' if type_str == 'users' else 'Role'}: {item.mention}")
+        self.system.save_config(interaction.guild_id)
             
         embed = discord.Embed(
             title="✨ Whitelist Updated",
@@ -11712,8 +13343,10 @@ class WhitelistRemoveModal(discord.ui.Modal):
     async def on_submit(self, interaction: discord.Interaction):
         try:
             id_to_remove = int(self.id_input.value)
-            if id_to_remove in self.antinuke.whitelist:
-                self.antinuke.whitelist.remove(id_to_remove)
+            whitelist = self.antinuke.config(interaction.guild_id).whitelist
+            if id_to_remove in whitelist:
+                whitelist.remove(id_to_remove)
+                self.antinuke.save_config(interaction.guild_id)
                 await interaction.response.send_message("✅ Successfully removed from whitelist!", ephemeral=True)
             else:
                 await interaction.response.send_message("❌ ID not found in whitelist", ephemeral=True)
@@ -11728,8 +13361,9 @@ class ResetConfirmationView(discord.ui.View):
     @discord.ui.button(label="Confirm", style=discord.ButtonStyle.danger)
     async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
         guild_id = interaction.guild_id
-        self.system.settings[guild_id] = {}
-        self.system.violation_counts[guild_id] = {}
+        self.antinuke.config(guild_id).settings = {}
+        self.antinuke.save_config(guild_id)
+        self.antinuke.violation_counts[guild_id] = {}
         
         embed = discord.Embed(
             title="🔄 Settings Reset",
@@ -11739,29 +13373,26 @@ class ResetConfirmationView(discord.ui.View):
         await interaction.response.edit_message(embed=embed, view=None)
 
 class AntiNukeSystem(commands.Cog):
+    # Detection runs off the gateway's audit log stream (on_audit_log_entry_create), which
+    # already names the actor, so no per-event audit log fetches are needed. Each
+    # (guild, actor, limit) keeps a sliding window of recent action times.
     def __init__(self, bot):
         self.bot = bot
+        # guild_id -> user_id -> violation type -> deque of monotonic timestamps
         self.violation_counts = {}
         self.action_cooldowns = {}
-        self.settings = {}
-        self.thresholds = {
-            "ban_limit": 3,
-            "kick_limit": 5,
-            "channel_delete_limit": 2,
-            "role_delete_limit": 2,
-            "webhook_create_limit": 3,
-            "mass_mention_limit": 5,
-            "emoji_delete_limit": 3,
-            "bot_add_limit": 2
-        }
+        self.configs = bot.config_manager.namespace(
+            "antinuke", AntiNukeConfig.from_dict, AntiNukeConfig.to_dict, default=AntiNukeConfig
+        )
         self.action_logs = {}
-        self.whitelist = set()
-        self.violation_counts = {}
-        self.protected_roles = set()
-        self.alert_channels = {}  
-        self.action_cooldowns = {}
         self.last_actions = {}
 
+    def config(self, guild_id) -> AntiNukeConfig:
+        return self.configs[guild_id]
+
+    def save_config(self, guild_id):
+        self.configs.save(guild_id)
+
     @commands.command(name="antinuke", aliases=["an"])
     @commands.has_permissions(administrator=True)
     async def antinuke_settings(self, ctx):
@@ -11771,8 +13402,9 @@ class AntiNukeSystem(commands.Cog):
             color=discord.Color.blue()
         )
 
-        guild_settings = self.settings.get(ctx.guild.id, {})
-        guild_thresholds = self.thresholds.get(ctx.guild.id, self.thresholds)
+        config = self.config(ctx.guild.id)
+        guild_settings = config.settings
+        guild_thresholds = config.thresholds
 
         protection_status = "\n".join(
             f"{protection.replace('_', ' ').title()}: {'✅' if enabled else '❌'}"
@@ -11796,7 +13428,8 @@ class AntiNukeSystem(commands.Cog):
     async def set_alert_channel(self, ctx, channel: discord.TextChannel = None):
         
         channel = channel or ctx.channel
-        self.alert_channels[ctx.guild.id] = channel.id
+        self.config(ctx.guild.id).alert_channel = channel.id
+        self.save_config(ctx.guild.id)
         
         embed = discord.Embed(
             title="✅ Alert Channel Set",
@@ -11805,19 +13438,33 @@ class AntiNukeSystem(commands.Cog):
         )
         await ctx.send(embed=embed)
 
+    @commands.command(name="setnukewindow")
+    @commands.has_permissions(administrator=True)
+    async def set_window(self, ctx, seconds: int):
+
+        if not 1 <= seconds <= 3600:
+            await ctx.send("❌ The window must be between 1 and 3600 seconds")
+            return
+        self.config(ctx.guild.id).window = seconds
+        self.save_config(ctx.guild.id)
+        await ctx.send(f"✅ Anti-Nuke limits now count actions within {seconds} seconds")
+
     @commands.command(name="addprotected")
     @commands.has_permissions(administrator=True)
     async def add_protected_role(self, ctx, role: discord.Role):
         
-        self.protected_roles.add(role.id)
+        self.config(ctx.guild.id).protected_roles.add(role.id)
+        self.save_config(ctx.guild.id)
         await ctx.send(f"✅ Added {role.mention} to protected roles")
 
     @commands.command(name="removeprotected")
     @commands.has_permissions(administrator=True)
     async def remove_protected_role(self, ctx, role: discord.Role):
        
-        if role.id in self.protected_roles:
-            self.protected_roles.remove(role.id)
+        protected_roles = self.config(ctx.guild.id).protected_roles
+        if role.id in protected_roles:
+            protected_roles.remove(role.id)
+            self.save_config(ctx.guild.id)
             await ctx.send(f"✅ Removed {role.mention} from protected roles")
         else:
             await ctx.send(f"❌ {role.mention} is not in the protected roles list")
@@ -11826,11 +13473,12 @@ class AntiNukeSystem(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def list_protected_roles(self, ctx):
         
-        if not self.protected_roles:
+        protected_roles = self.config(ctx.guild.id).protected_roles
+        if not protected_roles:
             await ctx.send("No protected roles configured")
             return
             
-        roles = [ctx.guild.get_role(role_id) for role_id in self.protected_roles]
+        roles = [ctx.guild.get_role(role_id) for role_id in protected_roles]
         roles = [role.mention for role in roles if role]
         
         embed = discord.Embed(
@@ -11841,43 +13489,48 @@ class AntiNukeSystem(commands.Cog):
         await ctx.send(embed=embed)
 
     async def get_alert_channel(self, guild_id):
-        channel_id = self.alert_channels.get(guild_id)
+        channel_id = self.config(guild_id).alert_channel
         if not channel_id:
             return None
         return self.bot.get_channel(channel_id)
 
     async def handle_violation(self, guild, user, violation_type):
-        if user.id in self.whitelist:
+        config = self.config(guild.id)
+        if user.id in config.whitelist:
             return False
-        if guild.id not in self.settings:
+        protection_type = ANTINUKE_PROTECTIONS.get(violation_type, violation_type.replace("_limit", "_protection"))
+        if not config.settings.get(protection_type, False):
             return False
-        protection_type = violation_type.replace("_limit", "_protection")
-        if not self.settings[guild.id].get(protection_type, False):
-            return False
-            
-        if guild.id not in self.violation_counts:
-            self.violation_counts[guild.id] = {}
-            
-        if user.id not in self.violation_counts[guild.id]:
-            self.violation_counts[guild.id][user.id] = {}
-            
-        if violation_type not in self.violation_counts[guild.id][user.id]:
-            self.violation_counts[guild.id][user.id][violation_type] = 0
-            
-        self.violation_counts[guild.id][user.id][violation_type] += 1
-        count = self.violation_counts[guild.id][user.id][violation_type]
-        
-        guild_thresholds = self.thresholds.get(guild.id, self.thresholds)
-        threshold = guild_thresholds.get(violation_type, self.thresholds[violation_type])
-        
-        await self.log_violation(guild, user, violation_type, count, threshold)
-        
+
+        threshold = config.thresholds.get(violation_type, ANTINUKE_THRESHOLDS[violation_type])
+        count = self.record_violation(guild.id, user.id, violation_type, threshold, config.window)
+
         if count >= threshold:
+            # Act before the alert so enforcement doesn't wait on a message send
             await self.take_action(guild, user, violation_type)
+            await self.log_violation(guild, user, violation_type, count, threshold)
             return True
-            
+
+        await self.log_violation(guild, user, violation_type, count, threshold)
         return False
 
+    def record_violation(self, guild_id, user_id, violation_type, threshold, window, now=None) -> int:
+        # Only the last `threshold` times matter, so each window is capped at that length
+        now = time.monotonic() if now is None else now
+        user_counts = self.violation_counts.setdefault(guild_id, {}).setdefault(user_id, {})
+        times = user_counts.get(violation_type)
+        if times is None or times.maxlen != max(threshold, 1):
+            times = user_counts[violation_type] = deque(times or (), maxlen=max(threshold, 1))
+        times.append(now)
+        return self.window_count(times, window, now)
+
+    @staticmethod
+    def window_count(times, window, now=None) -> int:
+        now = time.monotonic() if now is None else now
+        while times and now - times[0] > window:
+            times.popleft()
+        return len(times)
+
     async def log_violation(self, guild, user, violation_type, count, threshold):
         alert_channel = await self.get_alert_channel(guild.id)
         if not alert_channel:
@@ -11916,8 +13569,9 @@ class AntiNukeSystem(commands.Cog):
                 await guild.kick(user, reason=f"Anti-Nuke: Exceeded {violation_type}")
                 action_taken = "Kicked"
             else:
+                protected_roles = self.config(guild.id).protected_roles
                 for role in user.roles[1:]:
-                    if role.id not in self.protected_roles:
+                    if role.id not in protected_roles:
                         try:
                             await user.remove_roles(role, reason=f"Anti-Nuke: Exceeded {violation_type}")
                         except discord.HTTPException:
@@ -11947,143 +13601,30 @@ class AntiNukeSystem(commands.Cog):
             print(f"[DEBUG] Error taking action: {e}")
 
     @commands.Cog.listener()
-    async def on_member_ban(self, guild, user):
-       
-        if self.bot.user.id == getattr(guild.me, "id", None):
+    async def on_audit_log_entry_create(self, entry):
+        violation_type = ANTINUKE_ACTIONS.get(entry.action)
+        if violation_type is None or entry.user_id == self.bot.user.id:
             return
-            
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.ban):
-                if entry.target.id == user.id:
-              
-                    if entry.user.id in self.whitelist:
-                        return
-                        
-                    await self.handle_violation(guild, entry.user, "ban_limit")
-                    break
-        except discord.HTTPException:
-            pass
 
-    @commands.Cog.listener()
-    async def on_member_remove(self, member):
-       
-        guild = member.guild
-        
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.kick):
-                if entry.target.id == member.id and entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                   
-                    if entry.user.id in self.whitelist:
-                        return
-                        
-                    await self.handle_violation(guild, entry.user, "kick_limit")
-                    break
-        except discord.HTTPException:
-            pass
-
-    @commands.Cog.listener()
-    async def on_guild_channel_delete(self, channel):
-        guild = channel.guild
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.channel_delete):
-                if entry.target.id == channel.id and entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                  
-                    if entry.user.id in self.whitelist:
-                        return
-                    await self.handle_violation(guild, entry.user, "channel_delete_limit")
-                    break
-        except discord.HTTPException:
-            pass
-
-    @commands.Cog.listener()
-    async def on_guild_role_delete(self, role):
-        
-        guild = role.guild
-        
-        if role.id in self.protected_roles:
-            
-            try:
-                async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.role_delete):
-                    if entry.target.id == role.id and entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                       
-                        await self.take_action(guild, entry.user, "role_delete_limit")
-                        break
-            except discord.HTTPException:
-                pass
+        guild = entry.guild
+        actor = entry.user if isinstance(entry.user, discord.Member) else guild.get_member(entry.user_id)
+        if actor is None:
             return
-            
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.role_delete):
-                if entry.target.id == role.id and entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                
-                    if entry.user.id in self.whitelist:
-                        return
-                        
-                    await self.handle_violation(guild, entry.user, "role_delete_limit")
-                    break
-        except discord.HTTPException:
-            pass
-
-    @commands.Cog.listener()
-    async def on_webhook_update(self, channel):
-     
-        guild = channel.guild
-        
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.webhook_create):
-                if entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                    
-                    if entry.user.id in self.whitelist:
-                        return
-                        
-                    await self.handle_violation(guild, entry.user, "webhook_create_limit")
-                    break
-        except discord.HTTPException:
-            pass
-
-    @commands.Cog.listener()
-    async def on_guild_emojis_update(self, guild, before, after):
 
-        if len(before) > len(after):
-            
-            try:
-                async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.emoji_delete):
-                    if entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                      
-                        if entry.user.id in self.whitelist:
-                            return
-                            
-                        await self.handle_
-                      
-                        await self.handle_violation(guild, entry.user, "emoji_delete_limit")
-                        break
-            except discord.HTTPException:
-                pass
+        config = self.config(guild.id)
+        if entry.action is discord.AuditLogAction.role_delete and entry.target.id in config.protected_roles:
+            await self.take_action(guild, actor, violation_type)
+            return
 
-    @commands.Cog.listener()
-    async def on_guild_integrations_update(self, guild):
-   
-    
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.bot_add):
-                if entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                    
-                    if entry.user.id in self.whitelist:
-                        return
-                        
-                    await self.handle_violation(guild, entry.user, "bot_add_limit")
-                    break
-        except discord.HTTPException:
-            pass
+        if actor.id in config.whitelist:
+            return
+        await self.handle_violation(guild, actor, violation_type)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
+    @message_handler(guild_only=True, ignore_bots=True, requires_mentions=True)
+    async def on_message(self, message, context):
         if message.guild:  
             return           
-        if message.author.bot or not message.guild:
-            return
-            
-        if message.author.id in self.whitelist:
+        if message.author.id in self.config(message.guild.id).whitelist:
             return
             
         if len(message.mentions) + len(message.role_mentions) >= 5:
@@ -12094,15 +13635,18 @@ class AntiNukeSystem(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def add_whitelist(self, ctx, user: discord.Member):
        
-        self.whitelist.add(user.id)
+        self.config(ctx.guild.id).whitelist.add(user.id)
+        self.save_config(ctx.guild.id)
         await ctx.send(f"✅ Added {user.mention} to the anti-nuke whitelist")
 
     @commands.command(name="removewhitelist")
     @commands.has_permissions(administrator=True)
     async def remove_whitelist(self, ctx, user: discord.Member):
      
-        if user.id in self.whitelist:
-            self.whitelist.remove(user.id)
+        whitelist = self.config(ctx.guild.id).whitelist
+        if user.id in whitelist:
+            whitelist.remove(user.id)
+            self.save_config(ctx.guild.id)
             await ctx.send(f"✅ Removed {user.mention} from the anti-nuke whitelist")
         else:
             await ctx.send(f"❌ {user.mention} is not in the whitelist")
@@ -12111,12 +13655,13 @@ class AntiNukeSystem(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def list_whitelist(self, ctx):
        
-        if not self.whitelist:
+        whitelist = self.config(ctx.guild.id).whitelist
+        if not whitelist:
             await ctx.send("No users in the whitelist")
             return
             
         users = []
-        for user_id in self.whitelist:
+        for user_id in whitelist:
             user = ctx.guild.get_member(user_id)
             if user:
                 users.append(f"{user.mention} (ID: {user.id})")
@@ -12161,21 +13706,23 @@ class AntiNukeSystem(commands.Cog):
             timestamp=datetime.now()
         )
         
-        settings = self.settings.get(guild_id, {})
+        config = self.config(guild_id)
+        settings = config.settings
         settings_text = "\n".join(
             f"{k.replace('_', ' ').title()}: {'✅' if v else '❌'}"
             for k, v in settings.items()
         ) or "No settings configured"
         embed.add_field(name="Protection Settings", value=settings_text, inline=False)
         
-        thresholds = self.thresholds.get(guild_id, self.thresholds)
+        thresholds = config.thresholds
         thresholds_text = "\n".join(
             f"{k.replace('_', ' ').title()}: {v}"
             for k, v in thresholds.items()
         )
         embed.add_field(name="Action Thresholds", value=thresholds_text, inline=False)
+        embed.add_field(name="Window", value=f"{config.window} seconds", inline=False)
         
-        alert_channel_id = self.alert_channels.get(guild_id)
+        alert_channel_id = config.alert_channel
         alert_channel = ctx.guild.get_channel(alert_channel_id) if alert_channel_id else None
         embed.add_field(
             name="Alert Channel", 
@@ -12183,16 +13730,16 @@ class AntiNukeSystem(commands.Cog):
             inline=False
         )
         
-        whitelist_count = sum(1 for user_id in self.whitelist if ctx.guild.get_member(user_id))
+        whitelist_count = sum(1 for user_id in config.whitelist if ctx.guild.get_member(user_id))
         embed.add_field(name="Whitelisted Users", value=str(whitelist_count), inline=True)
         
-        protected_roles_count = sum(1 for role_id in self.protected_roles if ctx.guild.get_role(role_id))
+        protected_roles_count = sum(1 for role_id in config.protected_roles if ctx.guild.get_role(role_id))
         embed.add_field(name="Protected Roles", value=str(protected_roles_count), inline=True)
         
         violations_count = 0
         if guild_id in self.violation_counts:
             for user_id, violations in self.violation_counts[guild_id].items():
-                violations_count += sum(1 for v in violations.values() if v > 0)
+                violations_count += sum(1 for v in violations.values() if self.window_count(v, config.window))
         embed.add_field(name="Active Violations", value=str(violations_count), inline=True)
         
         embed.set_footer(text="© ZygnalBot Anti-Nuke System | Created by TheZ")
@@ -12206,7 +13753,8 @@ class ResetConfirmationView(discord.ui.View):
     @discord.ui.button(label="Confirm", style=discord.ButtonStyle.danger)
     async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
         guild_id = interaction.guild_id
-        self.antinuke.settings[guild_id] = {}  
+        self.antinuke.config(guild_id).settings = {}
+        self.antinuke.save_config(guild_id)
         self.antinuke.violation_counts[guild_id] = {}  
         
         embed = discord.Embed(
@@ -12234,7 +13782,8 @@ class AntiNukeView(discord.ui.View):
             "webhook_protection": True,
             "bot_protection": True
         }
-        self.antinuke.settings[guild_id] = default_settings
+        self.antinuke.config(guild_id).settings = dict(default_settings)
+        self.antinuke.save_config(guild_id)
         
         embed = discord.Embed(
             title="✅ Quick Setup Complete",
@@ -12261,14 +13810,15 @@ class AntiNukeView(discord.ui.View):
         
         settings_view = AdvancedSettingsView(self.antinuke)
 
-        for threshold, value in self.antinuke.thresholds.items():
+        config = self.antinuke.config(interaction.guild_id)
+        for threshold, value in config.thresholds.items():
             embed.add_field(
                 name=str(threshold).replace('_', ' ').title(),
                 value=f"Limit: {value}",
                 inline=True
             )
             
-        guild_settings = self.antinuke.settings.get(interaction.guild_id, {})
+        guild_settings = config.settings
         status_text = "\n".join(f"{protection}: {'✅' if enabled else '❌'}"
                                for protection, enabled in guild_settings.items())
 
@@ -12287,13 +13837,7 @@ class AntiNukeView(discord.ui.View):
         )
         
         limits_view = LimitsSettingsView(self.antinuke)
-        current_limits = self.antinuke.thresholds.get(interaction.guild_id, {
-            "ban_limit": 3,
-            "kick_limit": 5,
-            "channel_limit": 2,
-            "role_limit": 2,
-            "webhook_limit": 3
-        })
+        current_limits = self.antinuke.config(interaction.guild_id).thresholds
 
         for limit_name, value in current_limits.items():
             embed.add_field(
@@ -12348,6 +13892,14 @@ class LimitsSettingsView(discord.ui.View):
         await interaction.response.edit_message(view=main_view)
 
 class LimitModal(discord.ui.Modal, title="Set Limit"):
+    LIMIT_KEYS = {
+        "Ban Limit": "ban_limit",
+        "Kick Limit": "kick_limit",
+        "Channel Limit": "channel_delete_limit",
+        "Role Limit": "role_delete_limit",
+        "Webhook Limit": "webhook_create_limit"
+    }
+
     def __init__(self, limit_type, antinuke_system):
         super().__init__()
         self.limit_type = limit_type
@@ -12365,18 +13917,9 @@ class LimitModal(discord.ui.Modal, title="Set Limit"):
         try:
             value = int(self.limit.value)
             if 1 <= value <= 10:
-                
-                if interaction.guild_id not in self.antinuke.thresholds:
-                    self.antinuke.thresholds[interaction.guild_id] = {
-                        "ban_limit": 3,
-                        "kick_limit": 5,
-                        "channel_limit": 2,
-                        "role_limit": 2,
-                        "webhook_limit": 3
-                    }
-                
-                limit_key = f"{self.limit_type.lower().replace(' ', '_')}"
-                self.antinuke.thresholds[interaction.guild_id][limit_key] = value
+                limit_key = self.LIMIT_KEYS.get(self.limit_type, self.limit_type.lower().replace(' ', '_'))
+                self.antinuke.config(interaction.guild_id).thresholds[limit_key] = value
+                self.antinuke.save_config(interaction.guild_id)
                 await interaction.response.send_message(f"✅ {self.limit_type} set to {value}", ephemeral=True)
             else:
                 await interaction.response.send_message("❌ Please enter a number between 1-10", ephemeral=True)
@@ -12400,12 +13943,12 @@ class AdvancedSettingsView(discord.ui.View):
 
     @discord.ui.button(label="Primary Thresholds", style=discord.ButtonStyle.blurple)
     async def threshold_settings_1(self, interaction: discord.Interaction, button: discord.ui.Button):
-        modal = ThresholdSettingsModal1(self.antinuke)
+        modal = ThresholdSettingsModal1(self.antinuke, interaction.guild_id)
         await interaction.response.send_modal(modal)
 
     @discord.ui.button(label="Secondary Thresholds", style=discord.ButtonStyle.blurple)
     async def threshold_settings_2(self, interaction: discord.Interaction, button: discord.ui.Button):
-        modal = ThresholdSettingsModal2(self.antinuke)
+        modal = ThresholdSettingsModal2(self.antinuke, interaction.guild_id)
         await interaction.response.send_modal(modal)
 
     @discord.ui.button(label="Whitelist Management", style=discord.ButtonStyle.grey)
@@ -12429,6 +13972,226 @@ class AdvancedSettingsView(discord.ui.View):
         embed.set_footer(text="© ZygnalBot Anti-Nuke System | Created by TheZ")
         await interaction.response.edit_message(embed=embed, view=main_view)
 
+class PurgeFilter:
+    # Purge arguments compiled once into a list of checks: `all`, `bots`, `links`, user ids
+    # or mentions, `regex:<pattern>`, `after:YYYY-MM-DD` and `before:YYYY-MM-DD`. Every term
+    # must match; user ids are pooled into one set lookup. Date bounds are handed to
+    # channel.history so Discord does the range filtering instead of Python.
+    # Patterns run on the event loop, so they are capped in length and a repeated group
+    # that itself repeats, like (a+)+, is refused: those backtrack exponentially.
+    USER = re.compile(r'<@!?(\d+)>|(\d+)')
+    MAX_REGEX_LENGTH = 100
+
+    @staticmethod
+    def nested_quantifier(pattern: str) -> bool:
+        groups = [False]
+        i = 0
+        while i < len(pattern):
+            char = pattern[i]
+            if char == "\\":
+                i += 1
+            elif char == "[":
+                i += 2 if pattern[i + 1:i + 2] == "]" else 1
+                while i < len(pattern) and pattern[i] != "]":
+                    i += 2 if pattern[i] == "\\" else 1
+            elif char == "(":
+                groups.append(False)
+            elif char == ")" and len(groups) > 1:
+                repeats = groups.pop()
+                if repeats and pattern[i + 1:i + 2] in ("*", "+", "{"):
+                    return True
+                groups[-1] = groups[-1] or repeats
+            elif char in "*+{":
+                groups[-1] = True
+            i += 1
+        return False
+
+    def __init__(self, terms: List[str]):
+        self.checks = []
+        self.after = self.before = None
+        user_ids = set()
+        for term in terms:
+            lowered = term.lower()
+            if lowered == "all":
+                continue
+            elif lowered == "bots":
+                self.checks.append(lambda message: message.author.bot)
+            elif lowered == "links":
+                self.checks.append(lambda message: "http://" in message.content or "https://" in message.content)
+            elif lowered.startswith("regex:"):
+                if len(term) - 6 > self.MAX_REGEX_LENGTH:
+                    raise ValueError(f"Regex is too long, keep it under {self.MAX_REGEX_LENGTH} characters.")
+                if self.nested_quantifier(term[6:]):
+                    raise ValueError(f"Regex `{term[6:]}` repeats a repeated group, which can hang the bot.")
+                try:
+                    search = re.compile(term[6:], re.IGNORECASE).search
+                except re.error as e:
+                    raise ValueError(f"Invalid regex `{term[6:]}`: {e}")
+                self.checks.append(lambda message, search=search: search(message.content) is not None)
+            elif lowered.startswith(("after:", "before:")):
+                bound, _, value = lowered.partition(":")
+                try:
+                    when = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+                except ValueError:
+                    raise ValueError(f"Invalid date `{value}`. Use YYYY-MM-DD.")
+                setattr(self, bound, when)
+            else:
+                match = self.USER.fullmatch(term)
+                if not match:
+                    raise ValueError(
+                        f"Invalid condition: `{term}`. Use 'all', 'bots', 'links', a user ID, "
+                        f"regex:<pattern>, after:<date> or before:<date>."
+                    )
+                user_ids.add(int(match.group(1) or match.group(2)))
+        if user_ids:
+            self.checks.append(lambda message: message.author.id in user_ids)
+        self.wipe = not self.checks and self.after is None and self.before is None
+
+    def matches(self, message: discord.Message) -> bool:
+        for check in self.checks:
+            if not check(message):
+                return False
+        return True
+
+
+@dataclass
+class PurgePlan:
+    bulk: List[List[int]]
+    tail: List[int]
+    scanned: int = 0
+
+    @property
+    def total(self) -> int:
+        return sum(map(len, self.bulk)) + len(self.tail)
+
+
+class PurgeJob:
+    # Plans a purge before deleting anything: one history scan sorts the matching messages
+    # into bulk-deletable batches of 100 (younger than 14 days, with an hour's margin so a
+    # batch can't age out mid-run) and a tail of older ones Discord only deletes one by one.
+    # progress(stage, done, total) is awaited at most every couple of seconds; cancel the
+    # task running run() to stop, `deleted` says how far it got.
+    BULK_LIMIT = 100
+    BULK_WINDOW = timedelta(days=14) - timedelta(hours=1)
+    TOO_OLD_TO_BULK_DELETE = 50034
+
+    def __init__(self, channel: discord.TextChannel, purge_filter: PurgeFilter, limit: Optional[int] = None,
+                 before=None, progress=None, progress_interval: float = 2.0):
+        self.channel = channel
+        self.filter = purge_filter
+        self.limit = limit
+        self.before = purge_filter.before or before
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.last_report = 0.0
+        self.plan = None
+        self.deleted = 0
+
+    async def report(self, stage: str, done: int, total: Optional[int], force: bool = False):
+        if not self.progress or (not force and time.monotonic() - self.last_report < self.progress_interval):
+            return
+        self.last_report = time.monotonic()
+        try:
+            await self.progress(stage, done, total)
+        except Exception as e:
+            print(f"Purge progress callback failed: {e}")
+
+    async def build_plan(self) -> PurgePlan:
+        cutoff = discord.utils.utcnow() - self.BULK_WINDOW
+        recent, tail = [], []
+        scanned = 0
+        async for message in self.channel.history(limit=self.limit, after=self.filter.after, before=self.before):
+            scanned += 1
+            if self.filter.matches(message):
+                (recent if message.created_at > cutoff else tail).append(message.id)
+            await self.report("scan", scanned, None)
+        bulk = [recent[i:i + self.BULK_LIMIT] for i in range(0, len(recent), self.BULK_LIMIT)]
+        return PurgePlan(bulk, tail, scanned)
+
+    async def run(self) -> int:
+        self.plan = await self.build_plan()
+        total = self.plan.total
+        await self.report("delete", 0, total, force=True)
+
+        for batch in self.plan.bulk:
+            try:
+                await self.channel.delete_messages([discord.Object(id=message_id) for message_id in batch])
+            except discord.HTTPException as e:
+                if e.code != self.TOO_OLD_TO_BULK_DELETE:
+                    raise
+                self.plan.tail.extend(batch)
+                continue
+            self.deleted += len(batch)
+            await self.report("delete", self.deleted, total)
+
+        for message_id in self.plan.tail:
+            try:
+                await self.channel.get_partial_message(message_id).delete()
+            except discord.NotFound:
+                pass
+            self.deleted += 1
+            await self.report("delete", self.deleted, total)
+
+        return self.deleted
+
+    @staticmethod
+    async def replace_channel(channel: discord.TextChannel, reason: str = None) -> discord.TextChannel:
+        # A full wipe without touching a single message: clone keeps name, topic, category
+        # and permission overwrites, then the clone takes the old channel's position
+        clone = await channel.clone(reason=reason)
+        await clone.edit(position=channel.position, reason=reason)
+        await channel.delete(reason=reason)
+        return clone
+
+
+class PurgeView(discord.ui.View):
+    # Cancel button for a running purge; the caller sets `task` once the job starts
+    def __init__(self, author_id: int):
+        super().__init__(timeout=None)
+        self.author_id = author_id
+        self.task = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id and not interaction.user.guild_permissions.manage_messages:
+            await interaction.response.send_message("You can't cancel this purge.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.red, emoji="✖️")
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer()
+        if self.task:
+            self.task.cancel()
+        self.stop()
+
+
+class PurgeWipeView(discord.ui.View):
+    def __init__(self, author_id: int):
+        super().__init__(timeout=60)
+        self.author_id = author_id
+        self.choice = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.author_id
+
+    @discord.ui.button(label="Clone & Replace", style=discord.ButtonStyle.red, emoji="♻️")
+    async def clone(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.choice = "clone"
+        await interaction.response.defer()
+        self.stop()
+
+    @discord.ui.button(label="Delete Messages", style=discord.ButtonStyle.gray, emoji="🧹")
+    async def delete(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.choice = "delete"
+        await interaction.response.defer()
+        self.stop()
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer()
+        self.stop()
+
+
 class ClearChannel(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -12450,7 +14213,7 @@ class ClearChannel(commands.Cog):
     async def clear_channel_periodic(self, channel, interval):
         while True:
             try:
-                await channel.purge(limit=None)
+                await PurgeJob(channel, PurgeFilter(["all"])).run()
                 await asyncio.sleep(interval)
             except Exception as e:
                 print(f"Error in periodic clear for {channel.name}: {e}")
@@ -12586,9 +14349,9 @@ class TrollFriend(commands.Cog):
         self.bot = bot
         self.target_user_id = target_user_id
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.id == self.target_user_id and message.content.lower() == "yes":
+    @message_handler(when=lambda cog, context: context.author_id == cog.target_user_id)
+    async def on_message(self, message, context):
+        if context.lowered == "yes":
             await message.channel.send("What are you Talkin about? you little brat")
         if message.guild:  
             return   
@@ -14044,12 +15807,12 @@ class ClaudeChatView(discord.ui.View):
         if interaction:
             channel_id = interaction.channel.id
             await interaction.channel.delete()
-            self.cog.unregister_chat_channel(channel_id)
+            await self.cog.unregister_chat_channel(channel_id)
         else:
             channel = self.message.channel
             await channel.send("Chat session closed due to inactivity.")
             await asyncio.sleep(5)
-            self.cog.unregister_chat_channel(channel.id)
+            await self.cog.unregister_chat_channel(channel.id)
             await channel.delete()
 
 
@@ -14082,18 +15845,16 @@ class ClaudeInterface(discord.ui.View):
     @discord.ui.button(label="Memory Mode", style=ButtonStyle.blurple, emoji="🧠")
     async def toggle_memory(self, interaction: discord.Interaction, button: discord.ui.Button):
         guild_id = interaction.guild_id
+        memory_enabled = self.cog.memory_enabled
+        memory_enabled[guild_id] = not memory_enabled.get(guild_id, False)
         
-        if not hasattr(self, 'memory_enabled'):
-            self.memory_enabled = {}
-        self.memory_enabled[guild_id] = not self.memory_enabled.get(guild_id, False)
-        
-        button.style = ButtonStyle.green if self.memory_enabled[guild_id] else ButtonStyle.red
-        button.label = "Memory Mode (On)" if self.memory_enabled[guild_id] else "Memory Mode (Off)"
+        button.style = ButtonStyle.green if memory_enabled[guild_id] else ButtonStyle.red
+        button.label = "Memory Mode (On)" if memory_enabled[guild_id] else "Memory Mode (Off)"
         
         embed = discord.Embed(
             title="🧠 Memory Status Updated",
-            description=f"Memory mode is now {'enabled' if self.memory_enabled[guild_id] else 'disabled'}",
-            color=discord.Color.green() if self.memory_enabled[guild_id] else discord.Color.red()
+            description=f"Memory mode is now {'enabled' if memory_enabled[guild_id] else 'disabled'}",
+            color=discord.Color.green() if memory_enabled[guild_id] else discord.Color.red()
         )
         
         await interaction.response.edit_message(view=self)
@@ -14154,10 +15915,9 @@ class ClaudeSettingsView(discord.ui.View):
 class ClaudeAI(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.conversations = {}
+        self.conversations = ConversationStore("claude")
         self.settings = {}
         self.api_key = os.getenv('ANTHROPIC_API_KEY', None)
-        self.client = None
         self.memory_enabled = {}
         self.active_channels = {}
         self.personality_settings = {}
@@ -14168,16 +15928,10 @@ class ClaudeAI(commands.Cog):
             print("\033[93m[CLAUDE AI] API key validation pending\033[0m")
 
     def validate_api_key(self):
-        if not self.api_key:
-            return False
-        try:
-            self.client = Anthropic(api_key=self.api_key)
-            return True
-        except:
-            return False
+        return bool(self.api_key and self.api_key.strip())
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
+    @message_handler(ignore_bots=True, channels='active_channels')
+    async def on_message(self, message, context):
         if message.guild:  
             return   
         if not isinstance(message.channel, discord.TextChannel):
@@ -14212,8 +15966,6 @@ class ClaudeAI(commands.Cog):
 
         async with message.channel.typing():
             try:
-                print("Making API request...")
-
                 special_responses = {
                     "nixon": {
                         "keywords": ["nixon", "who is nixon", "Nixon"],
@@ -14276,33 +16028,39 @@ class ClaudeAI(commands.Cog):
                         await message.channel.send(response)
                         return
 
-                response = self.client.messages.create(
-                    model="claude-3-haiku-20240307", # Type: NOTE: BUDGET CLAUDE 3
-                    max_tokens=1000,
-                    messages=[{
-                        "role": "user",
-                        "content": f"{personality_prompts[personality]}{message.content}"
-                    }],
-                    stream=False
+                prompt = f"{personality_prompts[personality]}{message.content}"
+                memory_key = (message.guild.id, message.channel.id)
+                remember = self.memory_enabled.get(message.guild.id, False)
+                history, summary = [], None
+                if remember:
+                    history = await self.conversations.messages(memory_key)
+                    if await self.conversations.summary(memory_key):
+                        summary = f"Earlier in this conversation:\n{await self.conversations.summary(memory_key)}"
+
+                stream = self.bot.llm.stream(
+                    "anthropic",
+                    "claude-3-haiku-20240307", # Type: NOTE: BUDGET CLAUDE 3
+                    [*history, {"role": "user", "content": prompt}],
+                    guild_id=message.guild.id,
+                    system=summary,
+                    max_tokens=1000
                 )
 
-                ai_response = response.content[0].text
-              
-                chunks = [ai_response[i:i+1900] for i in range(0, len(ai_response), 1900)]
+                def render(chunk, index, done):
+                    if index == 0:
+                        chunk = f"**Claude:** {chunk}"
+                    if done:
+                        chunk = f"{chunk}\n\n*Powered by Anthropic | Bot created by TheZ | Special thanks to Nixon*"
+                    return {"content": chunk}
 
-                for i, chunk in enumerate(chunks):
-                    if i == 0:
-                        await message.channel.send(f"**Claude:** {chunk}")
-                    elif i == len(chunks) - 1:
-                        await message.channel.send(f"{chunk}\n\n*Powered by Anthropic | Bot created by TheZ | Special thanks to Nixon*")
-                    else:
-                        await message.channel.send(chunk)
+                reply = await self.bot.llm.relay(stream, message.channel.send, render)
+                if remember:
+                    await self.conversations.add_exchange(memory_key, prompt, reply)
 
             except Exception as e:
-                print("Error occurred:", str(e))
-                print("Error type:", type(e))
+                print(f"Claude request failed: {e}")
                 
-                if isinstance(e, anthropic.AuthenticationError):
+                if isinstance(e, LLMError) and e.status == 401:
                     embed = discord.Embed(
                         title="🔐 Authentication Failed",
                         description="Invalid API key configuration detected. Please verify API credentials.",
@@ -14317,7 +16075,7 @@ class ClaudeAI(commands.Cog):
                         color=discord.Color.red(),
                         timestamp=datetime.now(timezone.utc)
                     )
-                    await message.channel.send(error_embed)
+                    await message.channel.send(embed=error_embed)
 
     @commands.group(invoke_without_command=True)
     @commands.has_permissions(administrator=True)
@@ -14346,14 +16104,15 @@ class ClaudeAI(commands.Cog):
     def register_chat_channel(self, channel_id: int, user_id: int):
         self.active_channels[channel_id] = user_id
 
-    def unregister_chat_channel(self, channel_id: int):
+    async def unregister_chat_channel(self, channel_id: int):
         if channel_id in self.active_channels:
             del self.active_channels[channel_id]
+        await self.conversations.clear_scope(channel_id)
 
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel):
         if channel.id in self.active_channels:
-            self.unregister_chat_channel(channel.id)
+            await self.unregister_chat_channel(channel.id)
 
     @commands.Cog.listener()
     async def on_guild_channel_create(self, channel):
@@ -14364,7 +16123,7 @@ class ClaudeAI(commands.Cog):
                     await channel.send("Chat session timed out due to inactivity.")
                     await asyncio.sleep(5)
                     await channel.delete()
-                    self.unregister_chat_channel(channel.id)
+                    await self.unregister_chat_channel(channel.id)
                 except discord.NotFound:
                     pass
 
@@ -14374,7 +16133,7 @@ class ClaudeAI(commands.Cog):
             for channel_id in list(self.active_channels.keys()):
                 channel = self.bot.get_channel(channel_id)
                 if not channel:
-                    self.unregister_chat_channel(channel_id)
+                    await self.unregister_chat_channel(channel_id)
                     continue
 
                 async for message in channel.history(limit=1):
@@ -14382,12 +16141,13 @@ class ClaudeAI(commands.Cog):
                         try:
                             await channel.send("Chat session closed due to inactivity.")
                             await channel.delete()
-                            self.unregister_chat_channel(channel_id)
+                            await self.unregister_chat_channel(channel_id)
                         except discord.NotFound:
                             pass
 
-    def cog_unload(self):
+    async def cog_unload(self):
         self.cleanup_inactive_channels.cancel()
+        await self.conversations.flush()
 
 class CreativePromptModal(discord.ui.Modal):
     def __init__(self, *args, **kwargs):
@@ -14453,12 +16213,57 @@ class CreativePromptModal(discord.ui.Modal):
             
             await before.channel.send(embed=embed)
 
+class CachedPing:
+    __slots__ = ('author_id', 'channel_id', 'mentions', 'role_mentions', 'everyone', 'reference', 'cached_at')
+
+    def __init__(self, message: discord.Message):
+        content = message.content.lower()
+        self.author_id = message.author.id
+        self.channel_id = message.channel.id
+        self.mentions = tuple(user.id for user in message.mentions)
+        self.role_mentions = tuple(role.id for role in message.role_mentions)
+        self.everyone = message.mention_everyone or '@everyone' in content or '@here' in content
+        self.reference = message.reference.message_id if message.reference else None
+        self.cached_at = time.monotonic()
+
+
+class GhostPingCache:
+    # Message id -> CachedPing, bounded by both age and size. Entries are only ever
+    # appended and removed (never refreshed), so insertion order is also age and LRU
+    # order and both bounds are enforced by popping from the front: amortized O(1).
+    def __init__(self, max_entries: int = 5000, ttl: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, message: discord.Message):
+        self.entries[message.id] = CachedPing(message)
+        self.entries.move_to_end(message.id)
+        self.evict()
+
+    def pop(self, message_id: int) -> Optional[CachedPing]:
+        record = self.entries.pop(message_id, None)
+        if record and time.monotonic() - record.cached_at > self.ttl:
+            return None
+        return record
+
+    def evict(self):
+        cutoff = time.monotonic() - self.ttl
+        entries = self.entries
+        while entries and (len(entries) > self.max_entries or next(iter(entries.values())).cached_at < cutoff):
+            entries.popitem(last=False)
+
+
 class AntiGhostPing(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self._cached_messages = {}
+        self._cached_messages = GhostPingCache()
         self._edited_messages = {}
-        self._deletion_history = {}
+        # author id -> recent deletion times, oldest author first so stale ones drop off the front
+        self._deletion_history: OrderedDict = OrderedDict()
         self._rapid_delete_threshold = 5
         self._rapid_delete_timeframe = 60
         self.ghost_ping_counts = {}  
@@ -14623,13 +16428,9 @@ class AntiGhostPing(commands.Cog):
 
         return member and member.guild_permissions.administrator
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
-        if message.guild is None:
-            return
-        
+    @message_handler(guild_only=True, ignore_bots=True,
+                     when=lambda cog, context: context.has_mentions or context.message.reference is not None)
+    async def on_message(self, message, context):
         server_id = str(message.guild.id)
         if server_id in self.settings and not self.settings[server_id].get("ghost_ping_enabled", True):
             return  
@@ -14643,43 +16444,42 @@ class AntiGhostPing(commands.Cog):
         ])
         
         if has_ping:
-            print("Message cached for ghost ping detection")
-            self._cached_messages[message.id] = {
-                'content': message.content,
-                'author': message.author,
-                'mentions': [user.id for user in message.mentions],
-                'role_mentions': [role.id for role in message.role_mentions],
-                'everyone': True if (message.mention_everyone or
-                                '@everyone' in message.content.lower() or
-                                '@here' in message.content.lower()) else False,
-                'reference': message.reference.message_id if message.reference else None,
-                'timestamp': message.created_at,
-                'channel': message.channel.id,
-                'attachments': [att.url for att in message.attachments]
-            }
-            print(f"Cached message data: {self._cached_messages[message.id]}")
+            self._cached_messages.add(message)
+
+    def record_deletion(self, author_id: int) -> int:
+        now = time.monotonic()
+        history = self._deletion_history.pop(author_id, None)
+        if history is None:
+            history = deque(maxlen=self._rapid_delete_threshold)
+        history.append(now)
+        self._deletion_history[author_id] = history
+
+        cutoff = now - self._rapid_delete_timeframe
+        while self._deletion_history:
+            oldest = next(iter(self._deletion_history.values()))
+            if oldest[-1] >= cutoff:
+                break
+            self._deletion_history.popitem(last=False)
+        return sum(1 for t in history if t >= cutoff)
 
     @commands.Cog.listener()
     async def on_message_delete(self, message):
       
+        if message.guild:  
+            return               
         server_id = str(message.guild.id)
         if server_id in self.settings and not self.settings[server_id].get("ghost_ping_enabled", True):
             return  
-        if message.guild:  
-            return               
-        if message.id in self._cached_messages:
-            cached = self._cached_messages[message.id]
+        cached = self._cached_messages.pop(message.id)
+        if cached:
+            # The deleted message itself still carries author, content and attachments
+            author = message.author
 
-            if self.is_admin(cached['author']):
-                del self._cached_messages[message.id]
+            if self.is_admin(author):
                 return          
 
-            author_id = cached['author'].id
-            current_time = datetime.now()
-            
-            if author_id not in self._deletion_history:
-                self._deletion_history[author_id] = []
-            self._deletion_history[author_id].append(current_time)
+            author_id = cached.author_id
+            recent_deletions = self.record_deletion(author_id)
             
             if author_id not in self.ghost_ping_counts:
                 self.ghost_ping_counts[author_id] = 1
@@ -14688,64 +16488,62 @@ class AntiGhostPing(commands.Cog):
 
             embed = discord.Embed(
                 title="🚨 GHOST PING ALERT 🚨",
-                description=f"**{cached['author'].name}** ({cached['author'].id}) tried to ghost ping!\nThis is ghost ping #{self.ghost_ping_counts[author_id]}",
+                description=f"**{author.name}** ({author_id}) tried to ghost ping!\nThis is ghost ping #{self.ghost_ping_counts[author_id]}",
                 color=discord.Color.red()
             )
             
-            if cached['mentions']:
+            if cached.mentions:
                 embed.add_field(
                     name="👤 User Pings",
-                    value=", ".join([f"<@{uid}>" for uid in cached['mentions']]),
+                    value=", ".join([f"<@{uid}>" for uid in cached.mentions]),
                     inline=False
                 )
                 
-            if cached['role_mentions']:
+            if cached.role_mentions:
                 embed.add_field(
                     name="👥 Role Pings",
-                    value=", ".join([f"<@&{rid}>" for rid in cached['role_mentions']]),
+                    value=", ".join([f"<@&{rid}>" for rid in cached.role_mentions]),
                     inline=False
                 )
                 
-            if cached['everyone']:
+            if cached.everyone:
                 embed.add_field(
                     name="📢 Mass Ping",
                     value="@everyone or @here was used",
                     inline=False
                 )
                 
-            if cached['reference']:
+            if cached.reference:
                 embed.add_field(
                     name="💬 Reply Reference",
-                    value=f"Replied to message: {cached['reference']}",
+                    value=f"Replied to message: {cached.reference}",
                     inline=False
                 )
                 
             embed.add_field(
                 name="📝 Deleted Message",
-                value=f"```{cached['content'][:1000]}```",
+                value=f"```{message.content[:1000]}```",
                 inline=False
             )
             
-            if cached['attachments']:
+            if message.attachments:
                 embed.add_field(
                     name="📎 Attachments",
-                    value="\n".join(cached['attachments']),
+                    value="\n".join(att.url for att in message.attachments),
                     inline=False
                 )
             
-            recent_deletions = [t for t in self._deletion_history[author_id]
-                            if (current_time - t).seconds < self._rapid_delete_timeframe]
-            if len(recent_deletions) >= self._rapid_delete_threshold:
+            if recent_deletions >= self._rapid_delete_threshold:
                 embed.add_field(
                     name="⚠️ WARNING",
                     value="User showing suspicious rapid deletion pattern!",
                     inline=False
                 )
             
-            embed.set_thumbnail(url=cached['author'].avatar.url if cached['author'].avatar else cached['author'].default_avatar.url)
-            embed.set_footer(text=f"Message sent at {cached['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}")
+            embed.set_thumbnail(url=author.display_avatar.url)
+            embed.set_footer(text=f"Message sent at {message.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
             
-            channel = self.bot.get_channel(cached['channel'])
+            channel = self.bot.get_channel(cached.channel_id)
             await channel.send(embed=embed)
 
             if server_id in self.settings and "log_channel_id" in self.settings[server_id]:
@@ -14766,18 +16564,18 @@ class AntiGhostPing(commands.Cog):
                             await ch.set_permissions(muted_role, send_messages=False, add_reactions=False)
                     
                     self.ghost_ping_counts[author_id] = 0
-                    await cached['author'].add_roles(muted_role)
+                    await author.add_roles(muted_role)
                     
                     embed = discord.Embed(
                         title="🔇 Ghost Ping Mute",
-                        description=f"{cached['author'].mention} has been muted for 30 minutes.",
+                        description=f"{author.mention} has been muted for 30 minutes.",
                         color=discord.Color.red()
                     )
                     embed.add_field(name="Reason", value="Repeated ghost pinging (3+ times)")
                     embed.add_field(name="Duration", value="30 minutes")
                     await channel.send(embed=embed)
                     
-                    self.bot.loop.create_task(self._unmute_user(cached['author'], muted_role, channel))
+                    self.bot.loop.create_task(self._unmute_user(author, muted_role, channel))
                     
                     if self.mod_log_channel:
                         await self.mod_log_channel.send(embed=embed)
@@ -14787,14 +16585,12 @@ class AntiGhostPing(commands.Cog):
             elif self.ghost_ping_counts[author_id] == 2:
                 embed = discord.Embed(
                     title="⚠️ Ghost Ping Warning",
-                    description=f"{cached['author'].mention} This is your second warning.",
+                    description=f"{author.mention} This is your second warning.",
                     color=discord.Color.yellow()
                 )
                 embed.add_field(name="Next Offense", value="One more ghost ping will result in a 30-minute mute")
                 await channel.send(embed=embed)
 
-            del self._cached_messages[message.id]
-
     @commands.Cog.listener()
     async def on_message_edit(self, before, after):
         if before.guild is None:
@@ -14901,13 +16697,9 @@ class BotSassResponses(commands.Cog):
             "Did mommy not give you enough attention? 👶"
         ]
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if not self.enabled:
-            return
-        if message.author.bot:
-            return              
-        if (self.bot.user in message.mentions) or (str(self.bot.user.id) in ''.join(message.content.split())):
+    @message_handler(ignore_bots=True, enabled='enabled')
+    async def on_message(self, message, context):
+        if (self.bot.user.id in context.mention_ids) or (str(self.bot.user.id) in ''.join(context.tokens)):
             sass = random.choice(self.sass_responses)
             
             colors = [
@@ -14998,13 +16790,11 @@ class RoastCommands(commands.Cog):
             "Cannot compute: Target too awesome 🌟"
         ]
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
+    @message_handler(ignore_bots=True)
+    async def on_message(self, message, context):
         if message.guild:  
             return               
-        if any(trigger in message.content.lower() for trigger in self.triggers):
+        if any(trigger in context.lowered for trigger in self.triggers):
             roast = random.choice(self.roasts)
             embed = discord.Embed(
                 title="🔥 CRITICAL HIT 🔥",
@@ -15186,6 +16976,18 @@ class RatingModal(discord.ui.Modal):
             max_length=1
         ))
 
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            rating = int(self.children[0].value)
+        except ValueError:
+            return await interaction.response.send_message("Invalid rating!", ephemeral=True)
+        if not 1 <= rating <= 5:
+            return await interaction.response.send_message("Please rate between 1-5!", ephemeral=True)
+
+        cog = interaction.client.get_cog('AdvancedPollSystem')
+        cog.record_rating(self.poll_data, str(interaction.user.id), self.option_num, rating)
+        await interaction.response.send_message(f"Rated with {rating} {'⭐' * rating}", ephemeral=True)
+
 class WeightedVoteModal(discord.ui.Modal):
     def __init__(self, option_num: int, poll_data: Dict):
         super().__init__(title="Weight Your Vote")
@@ -15197,17 +16999,48 @@ class WeightedVoteModal(discord.ui.Modal):
             max_length=2
         ))
 
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            points = int(self.children[0].value)
+        except ValueError:
+            return await interaction.response.send_message("Invalid number of points!", ephemeral=True)
+        if not 1 <= points <= 10:
+            return await interaction.response.send_message("Please assign between 1-10 points!", ephemeral=True)
+
+        cog = interaction.client.get_cog('AdvancedPollSystem')
+        cog.record_weight(self.poll_data, str(interaction.user.id), self.option_num, points)
+        await interaction.response.send_message(f"🎯 Assigned {points} points!", ephemeral=True)
+
 class RankedChoiceModal(discord.ui.Modal):
+    # Modals hold at most five inputs, so ranked polls are limited to five options
+    MAX_OPTIONS = 5
+
     def __init__(self, poll_data: Dict):
         super().__init__(title="Rank Your Choices")
         self.poll_data = poll_data
-        for i, option in enumerate(poll_data['options']):
+        options = poll_data['options'][:self.MAX_OPTIONS]
+        for i, option in enumerate(options):
             self.add_item(discord.ui.TextInput(
-                label=f"Rank for {option[:40]}",
-                placeholder=f"Enter rank (1-{len(poll_data['options'])})",
+                label=f"Rank for {str(option)[:40]}",
+                placeholder=f"Enter rank (1-{len(options)})",
                 max_length=2
             ))
 
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            ranks = [int(child.value) for child in self.children]
+        except ValueError:
+            return await interaction.response.send_message("Ranks must be numbers!", ephemeral=True)
+        if sorted(ranks) != list(range(1, len(ranks) + 1)):
+            return await interaction.response.send_message(
+                f"Use each rank from 1 to {len(ranks)} exactly once!", ephemeral=True
+            )
+
+        order = sorted(range(len(ranks)), key=lambda index: ranks[index])
+        cog = interaction.client.get_cog('AdvancedPollSystem')
+        cog.record_ranking(self.poll_data, str(interaction.user.id), order)
+        await interaction.response.send_message("🏆 Ranking recorded!", ephemeral=True)
+
 @dataclass
 class PollOption:
     text: str
@@ -15227,12 +17060,69 @@ class PollOption:
 
 
 
+class PollTally:
+    # Running per-option totals for a poll.
+    # Votes update the totals by delta, so rendering results never rescans every voter.
+
+    def __init__(self, option_count: int):
+        self.counts = [0] * option_count
+        self.rating_sums = [0] * option_count
+        self.rating_counts = [0] * option_count
+        self.raters: Dict[str, int] = {}
+        self.points = [0] * option_count
+        self.rank_points = [0] * option_count
+        self.first_choices = [0] * option_count
+
+    @classmethod
+    def from_poll(cls, poll_data: Dict) -> 'PollTally':
+        tally = cls(len(poll_data['options']))
+        for choices in poll_data.get('votes', {}).values():
+            tally.set_choices([], choices)
+        for option, ratings in poll_data.get('ratings', {}).items():
+            for user_id, rating in ratings.items():
+                tally.set_rating(user_id, int(option), None, rating)
+        for weights in poll_data.get('weighted_votes', {}).values():
+            for option, points in weights.items():
+                tally.set_weight(int(option), 0, points)
+        for order in poll_data.get('ranked_votes', {}).values():
+            tally.set_ranking([], order)
+        return tally
+
+    def set_choices(self, previous: List[int], current: List[int]):
+        for index in previous:
+            self.counts[index] -= 1
+        for index in current:
+            self.counts[index] += 1
+
+    def set_rating(self, user_id: str, option: int, previous: Optional[int], rating: int):
+        if previous is None:
+            self.rating_counts[option] += 1
+            self.raters[user_id] = self.raters.get(user_id, 0) + 1
+            previous = 0
+        self.rating_sums[option] += rating - previous
+
+    def set_weight(self, option: int, previous: int, points: int):
+        self.points[option] += points - previous
+
+    def set_ranking(self, previous: List[int], order: List[int]):
+        # Borda count: first place earns one point per option, last place earns one
+        size = len(self.rank_points)
+        for sign, ranking in ((-1, previous), (1, order)):
+            for position, index in enumerate(ranking):
+                self.rank_points[index] += sign * (size - position)
+            if ranking:
+                self.first_choices[ranking[0]] += sign
+
+    def average_rating(self, option: int) -> float:
+        count = self.rating_counts[option]
+        return self.rating_sums[option] / count if count else 0
+
+
 class AdvancedPollSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.active_polls: Dict[str, 'PollData'] = {}
         self.vote_locks: Dict[str, asyncio.Lock] = {}
-        self.poll_tasks: Dict[str, asyncio.Task] = {}
         self.poll_types = {
             "single": "Single Choice ✨",
             "multiple": "Multiple Choice 📝", 
@@ -15241,6 +17131,174 @@ class AdvancedPollSystem(commands.Cog):
             "weighted": "Weighted Voting 🎯",
             "ranked": "Ranked Choice 🏆"
         }
+        self.tallies: Dict[str, PollTally] = {}
+        self.render_tasks: Dict[str, asyncio.Task] = {}
+        self.dirty_polls = set()
+        self.last_render: Dict[str, float] = {}
+        self.render_interval = 2.0
+        self.polls_file = "data/active_polls.json"
+        self.save_task = None
+        self.bot.timers.register('poll_end', self.on_poll_due)
+
+    async def cog_load(self):
+        if not os.path.exists(self.polls_file):
+            return
+        try:
+            with open(self.polls_file, 'r') as f:
+                saved_polls = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Error loading active polls: {e}")
+            return
+
+        for poll_data in saved_polls.values():
+            poll_data['created_at'] = datetime.fromisoformat(poll_data['created_at'])
+            poll_id = poll_data['id']
+            self.active_polls[poll_id] = poll_data
+            self.bot.add_view(self.AdvancedPollView(poll_data, self), message_id=poll_data['message_id'])
+            if not self.bot.timers.get(f"poll:{poll_id}"):
+                await self.start_poll_timer(poll_data)
+        print(f"📊 Restored {len(saved_polls)} active poll(s)")
+
+    def serialize_poll(self, poll_data: Dict) -> Dict:
+        data = dict(poll_data)
+        data['created_at'] = poll_data['created_at'].isoformat()
+        data['options'] = [option.text if isinstance(option, PollOption) else option for option in poll_data['options']]
+        return data
+
+    def write_polls(self, payload: str):
+        os.makedirs(os.path.dirname(self.polls_file), exist_ok=True)
+        tmp_path = f"{self.polls_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(payload)
+        os.replace(tmp_path, self.polls_file)
+
+    async def save_polls(self):
+        # Serialize on the loop so votes landing mid-save can't mutate what is being written;
+        # the worker thread only gets the finished string.
+        try:
+            payload = json.dumps({
+                poll_id: self.serialize_poll(poll_data)
+                for poll_id, poll_data in self.active_polls.items()
+                if poll_data.get('message_id')
+            })
+            await asyncio.to_thread(self.write_polls, payload)
+        except Exception as e:
+            print(f"Error saving active polls: {e}")
+
+    def schedule_save(self):
+        if self.save_task is None or self.save_task.done():
+            self.save_task = asyncio.create_task(self._delayed_save())
+
+    async def _delayed_save(self):
+        await asyncio.sleep(self.render_interval)
+        await self.save_polls()
+
+    def get_vote_lock(self, poll_id: str) -> asyncio.Lock:
+        return self.vote_locks.setdefault(poll_id, asyncio.Lock())
+
+    def get_tally(self, poll_data: Dict) -> PollTally:
+        tally = self.tallies.get(poll_data['id'])
+        if tally is None:
+            tally = self.tallies[poll_data['id']] = PollTally.from_poll(poll_data)
+        return tally
+
+    def results_hidden(self, poll_data: Dict) -> bool:
+        return str(poll_data['settings'].get('hide_results', False)).lower() == 'true'
+
+    def toggle_vote(self, poll_data: Dict, user_id: str, option_index: int) -> str:
+        tally = self.get_tally(poll_data)
+        previous = poll_data['votes'].get(user_id, [])
+        if poll_data['settings']['type'] == 'single':
+            current = [option_index]
+            message = "✅ Vote recorded!"
+        else:
+            current = list(previous)
+            if option_index in current:
+                current.remove(option_index)
+                message = "❌ Vote removed!"
+            elif len(current) < int(poll_data['settings'].get('max_votes', 3)):
+                current.append(option_index)
+                message = "✅ Vote added!"
+            else:
+                message = "⚠️ Maximum votes reached!"
+
+        poll_data['votes'][user_id] = current
+        tally.set_choices(previous, current)
+        self.schedule_render(poll_data)
+        return message
+
+    def record_rating(self, poll_data: Dict, user_id: str, option_index: int, rating: int):
+        ratings = poll_data.setdefault('ratings', {}).setdefault(str(option_index), {})
+        self.get_tally(poll_data).set_rating(user_id, option_index, ratings.get(user_id), rating)
+        ratings[user_id] = rating
+        self.schedule_render(poll_data)
+
+    def record_weight(self, poll_data: Dict, user_id: str, option_index: int, points: int):
+        weights = poll_data.setdefault('weighted_votes', {}).setdefault(user_id, {})
+        self.get_tally(poll_data).set_weight(option_index, weights.get(str(option_index), 0), points)
+        weights[str(option_index)] = points
+        self.schedule_render(poll_data)
+
+    def record_ranking(self, poll_data: Dict, user_id: str, order: List[int]):
+        ranked_votes = poll_data.setdefault('ranked_votes', {})
+        self.get_tally(poll_data).set_ranking(ranked_votes.get(user_id, []), order)
+        ranked_votes[user_id] = order
+        self.schedule_render(poll_data)
+
+    @staticmethod
+    def option_limit_error(poll_type: str, option_count: int) -> Optional[str]:
+        if poll_type == 'ranked' and option_count > RankedChoiceModal.MAX_OPTIONS:
+            return f"Ranked polls support at most {RankedChoiceModal.MAX_OPTIONS} options!"
+        return None
+
+    def special_vote_modal(self, poll_data: Dict, option_index: int) -> Optional[discord.ui.Modal]:
+        poll_type = poll_data['settings']['type']
+        if poll_type == 'rating':
+            return RatingModal(option_index, poll_data)
+        if poll_type == 'weighted':
+            return WeightedVoteModal(option_index, poll_data)
+        if poll_type == 'ranked':
+            return RankedChoiceModal(poll_data)
+        return None
+
+    def schedule_render(self, poll_data: Dict):
+        # Mark a poll's message as stale; bursts of votes collapse into one edit per render interval.
+        poll_id = poll_data['id']
+        self.dirty_polls.add(poll_id)
+        if poll_id not in self.render_tasks:
+            self.render_tasks[poll_id] = asyncio.create_task(self.render_poll(poll_data))
+
+    async def render_poll(self, poll_data: Dict):
+        poll_id = poll_data['id']
+        try:
+            delay = self.last_render.get(poll_id, 0) + self.render_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            while poll_id in self.dirty_polls:
+                self.dirty_polls.discard(poll_id)
+                self.last_render[poll_id] = time.monotonic()
+                channel = self.bot.get_channel(poll_data['channel_id'])
+                if channel and poll_data.get('message_id'):
+                    try:
+                        await channel.get_partial_message(poll_data['message_id']).edit(embed=self.create_poll_embed(poll_data))
+                    except discord.HTTPException as e:
+                        print(f"Error updating poll {poll_id}: {e}")
+                self.schedule_save()
+                await asyncio.sleep(self.render_interval)
+        finally:
+            self.render_tasks.pop(poll_id, None)
+
+    def discard_poll(self, poll_id: str):
+        self.active_polls.pop(poll_id, None)
+        self.vote_locks.pop(poll_id, None)
+        self.tallies.pop(poll_id, None)
+        self.last_render.pop(poll_id, None)
+        self.dirty_polls.discard(poll_id)
+        task = self.render_tasks.pop(poll_id, None)
+        if task:
+            task.cancel()
+        self.schedule_save()
 
     class PollSettingsModal(discord.ui.Modal):
         def __init__(self, poll_data: Dict):
@@ -15274,6 +17332,10 @@ class AdvancedPollSystem(commands.Cog):
 
         async def on_submit(self, interaction: discord.Interaction):
             try:
+                error = AdvancedPollSystem.option_limit_error(self.children[0].value.lower(), len(self.poll_data['options']))
+                if error:
+                    await interaction.response.send_message(error, ephemeral=True)
+                    return
                 self.poll_data['settings']['type'] = self.children[0].value.lower()
                 self.poll_data['advanced']['end_time'] = self.children[1].value
                 
@@ -15305,22 +17367,12 @@ class AdvancedPollSystem(commands.Cog):
                     row=i // 4
                 )
                 async def vote_callback(interaction, button=vote_button, option_index=i):
-                    user_id = str(interaction.user.id)
-                    if poll_data['settings']['type'] == 'single':
-                        poll_data['votes'][user_id] = [option_index]
-                        message = "✅ Vote recorded!"
-                    else:
-                        if user_id not in poll_data['votes']:
-                            poll_data['votes'][user_id] = []
-                        if option_index in poll_data['votes'][user_id]:
-                            poll_data['votes'][user_id].remove(option_index)
-                            message = "❌ Vote removed!"
-                        else:
-                            poll_data['votes'][user_id].append(option_index)
-                            message = "✅ Vote added!"
-                    
-                    embed = cog.create_poll_embed(poll_data)
-                    await interaction.message.edit(embed=embed)
+                    modal = cog.special_vote_modal(poll_data, option_index)
+                    if modal:
+                        await interaction.response.send_modal(modal)
+                        return
+
+                    message = cog.toggle_vote(poll_data, str(interaction.user.id), option_index)
                     await interaction.response.send_message(message, ephemeral=True)
                 
                 vote_button.callback = vote_callback
@@ -15357,6 +17409,10 @@ class AdvancedPollSystem(commands.Cog):
 
     async def create_poll(self, interaction: discord.Interaction, question: str, options: List[str], 
                          poll_type: str = "single", duration: str = "24h", settings: Dict = None) -> Optional[discord.Message]:
+        error = self.option_limit_error((settings or {}).get('type', poll_type), len(options))
+        if error:
+            await interaction.response.send_message(error, ephemeral=True)
+            return None
         poll_id = f"poll_{int(time.time())}_{interaction.user.id}"
         
         poll_data = {
@@ -15384,7 +17440,7 @@ class AdvancedPollSystem(commands.Cog):
         
         self.active_polls[poll_id] = poll_data
         self.vote_locks[poll_id] = asyncio.Lock()
-        self.poll_tasks[poll_id] = asyncio.create_task(self.start_poll_timer(poll_data))
+        await self.start_poll_timer(poll_data)
         
         return message
             
@@ -15395,11 +17451,16 @@ class AdvancedPollSystem(commands.Cog):
             color=discord.Color(poll_data['settings'].get('color', 0x3498db))
         )
         
+        show_results = not self.results_hidden(poll_data)
+        total_votes = self.calculate_total_votes(poll_data) if show_results else 0
+
         for i, option in enumerate(poll_data['options']):
             option_text = option.text if isinstance(option, PollOption) else str(option)
             emoji = option.emoji if isinstance(option, PollOption) else None
             
             value = f"{emoji} {option_text}" if emoji else option_text
+            if show_results:
+                value += f"\n{self.describe_option(poll_data, i, total_votes)}"
             embed.add_field(
                 name=f"Option {i+1}",
                 value=value,
@@ -15438,9 +17499,10 @@ class AdvancedPollSystem(commands.Cog):
         return settings
        
     async def cog_unload(self):
-        
-        for task in self.poll_tasks.values():
+        self.bot.timers.unregister('poll_end')
+        for task in self.render_tasks.values():
             task.cancel()
+        await self.save_polls()
         
     async def create_poll(self, ctx, question: str, options: List[str],
                         poll_type: PollType = PollType.SINGLE,
@@ -15457,13 +17519,19 @@ class AdvancedPollSystem(commands.Cog):
             channel_id = ctx.channel.id
             send = ctx.send
 
+        settings = settings or self._default_settings(poll_type)
+        error = self.option_limit_error(settings['type'], len(options))
+        if error:
+            await send(error)
+            return None
+
         poll_id = f"poll_{int(time.time())}_{user.id}"
         
         poll_data = {
             'id': poll_id,
             'question': question,
             'options': [PollOption(text=opt) for opt in options],
-            'settings': settings or self._default_settings(poll_type),
+            'settings': settings,
             'advanced': {'end_time': duration, 'required_role': 0},
             'author_id': user.id,
             'author': str(user),
@@ -15483,9 +17551,7 @@ class AdvancedPollSystem(commands.Cog):
             poll_data['message_id'] = message.id
             self.active_polls[poll_id] = poll_data
             
-            self.poll_tasks[poll_id] = asyncio.create_task(
-                self.start_poll_timer(poll_data)
-            )
+            await self.start_poll_timer(poll_data)
             
             return message
         except Exception as e:
@@ -15503,11 +17569,25 @@ class AdvancedPollSystem(commands.Cog):
             'color': 0x3498db
         }
     async def start_poll_timer(self, poll_data: Dict):
-        duration = self.parse_duration(poll_data['advanced']['end_time'])
-        end_time = datetime.now() + timedelta(seconds=duration)
-        poll_data['end_timestamp'] = end_time.timestamp()
-        
-        await asyncio.sleep(duration)
+        if 'end_timestamp' not in poll_data:
+            duration = self.parse_duration(poll_data['advanced']['end_time'])
+            end_time = datetime.now() + timedelta(seconds=duration)
+            poll_data['end_timestamp'] = end_time.timestamp()
+            self.schedule_save()
+
+        await self.bot.timers.schedule(
+            'poll_end', poll_data['end_timestamp'], {'poll_id': poll_data['id']}, key=f"poll:{poll_data['id']}"
+        )
+
+    async def on_poll_due(self, payload: Dict, job):
+        poll_data = self.active_polls.get(payload['poll_id'])
+        if poll_data:
+            await self.finish_poll(poll_data)
+
+    async def finish_poll(self, poll_data: Dict):
+        task = self.render_tasks.pop(poll_data['id'], None)
+        if task:
+            task.cancel()
         
         channel = self.bot.get_channel(poll_data['channel_id'])
         if channel:
@@ -15524,14 +17604,17 @@ class AdvancedPollSystem(commands.Cog):
                     color=discord.Color.gold()
                 )
                 
-                total_votes = len(poll_data.get('votes', {}))
+                total_votes = self.calculate_total_votes(poll_data)
+                tally = self.get_tally(poll_data)
                 for i, option in enumerate(poll_data['options']):
-                    votes = sum(1 for vote_list in poll_data.get('votes', {}).values() 
-                            if isinstance(vote_list, list) and i in vote_list)
-                    percentage = (votes / total_votes * 100) if total_votes > 0 else 0
+                    if poll_data['settings']['type'] in ('rating', 'weighted', 'ranked'):
+                        value = self.describe_option(poll_data, i, total_votes)
+                    else:
+                        percentage = (tally.counts[i] / total_votes * 100) if total_votes > 0 else 0
+                        value = f"Votes: {tally.counts[i]} ({percentage:.1f}%)"
                     results_embed.add_field(
                         name=option,
-                        value=f"Votes: {votes} ({percentage:.1f}%)",
+                        value=value,
                         inline=False
                     )
                 
@@ -15547,6 +17630,8 @@ class AdvancedPollSystem(commands.Cog):
             except discord.NotFound:
                 print(f"❌ Poll message {poll_data['message_id']} not found")
 
+        self.discard_poll(poll_data['id'])
+
 
 
     def parse_duration(self, duration_str: str) -> int:
@@ -15571,8 +17656,7 @@ class AdvancedPollSystem(commands.Cog):
             results_embed = self.create_results_summary(poll_data)
             await channel.send(embed=results_embed)
             
-            self.active_polls.pop(poll_data['id'], None)
-            self.vote_locks.pop(poll_data['id'], None)
+            self.discard_poll(poll_data['id'])
             
         except discord.NotFound:
             print(f"Poll message not found: {poll_data['id']}")
@@ -15655,40 +17739,15 @@ class AdvancedPollSystem(commands.Cog):
             return True
 
         async def _handle_special_vote(self, interaction: discord.Interaction):
-            modal_classes = {
-                'rating': RatingModal,
-                'weighted': WeightedVoteModal,
-                'ranked': RankedChoiceModal
-            }
-            modal_class = modal_classes.get(self.poll_type)
-            if modal_class:
-                modal = modal_class(self.option_num, self.view.poll_data)
+            modal = self.view.cog.special_vote_modal(self.view.poll_data, self.option_num)
+            if modal:
                 await interaction.response.send_modal(modal)
 
         async def _handle_standard_vote(self, interaction: discord.Interaction):
             poll_data = self.view.poll_data
-            user_id = str(interaction.user.id)
             
             async with self.view.cog.get_vote_lock(poll_data['id']):
-                if user_id not in poll_data['votes']:
-                    poll_data['votes'][user_id] = []
-
-                if self.poll_type == 'single':
-                    poll_data['votes'][user_id] = [self.option_num]
-                    message = "✅ Vote recorded!"
-                else:
-                    current_votes = poll_data['votes'][user_id]
-                    if self.option_num in current_votes:
-                        current_votes.remove(self.option_num)
-                        message = "❌ Vote removed!"
-                    elif len(current_votes) < poll_data['settings']['max_votes']:
-                        current_votes.append(self.option_num)
-                        message = "✅ Vote added!"
-                    else:
-                        message = "⚠️ Maximum votes reached!"
-
-                embed = self.view.cog.create_poll_embed(poll_data)
-                await interaction.message.edit(embed=embed)
+                message = self.view.cog.toggle_vote(poll_data, str(interaction.user.id), self.option_num)
                 await interaction.response.send_message(message, ephemeral=True)
 
 
@@ -15797,6 +17856,10 @@ class AdvancedPollSystem(commands.Cog):
                 if len(options) < 2:
                     await interaction.response.send_message("Please provide at least 2 options!", ephemeral=True)
                     return
+                error = self.cog.option_limit_error(self.children[2].value.lower(), len(options))
+                if error:
+                    await interaction.response.send_message(error, ephemeral=True)
+                    return
 
                 poll_id = f"poll_{int(time.time())}_{interaction.user.id}"
                 
@@ -15836,7 +17899,7 @@ class AdvancedPollSystem(commands.Cog):
                 poll_data['message_id'] = message.id
                 self.cog.active_polls[poll_id] = poll_data
                 self.cog.vote_locks[poll_id] = asyncio.Lock()
-                self.cog.poll_tasks[poll_id] = asyncio.create_task(self.cog.start_poll_timer(poll_data))
+                await self.cog.start_poll_timer(poll_data)
 
             except Exception as e:
                 print(f"Poll creation error: {e}")
@@ -15860,12 +17923,8 @@ class AdvancedPollSystem(commands.Cog):
             try:
                 rating = int(self.children[0].value)
                 if 1 <= rating <= 5:
-                    if 'ratings' not in self.poll_data:
-                        self.poll_data['ratings'] = {}
-                    if str(self.option_num) not in self.poll_data['ratings']:
-                        self.poll_data['ratings'][str(self.option_num)] = {}
-                    
-                    self.poll_data['ratings'][str(self.option_num)][str(interaction.user.id)] = rating
+                    cog = interaction.client.get_cog('AdvancedPollSystem')
+                    cog.record_rating(self.poll_data, str(interaction.user.id), self.option_num, rating)
                     await interaction.response.send_message(
                         f"Rated with {rating} {'⭐' * rating}",
                         ephemeral=True
@@ -15896,32 +17955,37 @@ class AdvancedPollSystem(commands.Cog):
 
     def calculate_total_votes(self, poll_data: Dict) -> int:
         if poll_data['settings']['type'] == 'rating':
-            return len(poll_data.get('ratings', {}).get('0', {}))
+            return len(self.get_tally(poll_data).raters)
         elif poll_data['settings']['type'] == 'weighted':
             return len(poll_data.get('weighted_votes', {}))
+        elif poll_data['settings']['type'] == 'ranked':
+            return len(poll_data.get('ranked_votes', {}))
         else:
             return len(poll_data.get('votes', {}))
 
-    def format_result_value(self, poll_data: Dict, option_index: int, total_votes: int) -> str:
-        option = poll_data['options'][option_index]
+    def describe_option(self, poll_data: Dict, option_index: int, total_votes: int) -> str:
+        tally = self.get_tally(poll_data)
         poll_type = poll_data['settings']['type']
-        
+
         if poll_type == 'rating':
-            ratings = poll_data.get('ratings', {}).get(str(option_index), {})
-            avg_rating = sum(ratings.values()) / len(ratings) if ratings else 0
-            return f"{option}\n{'⭐' * round(avg_rating)} ({avg_rating:.1f}/5)"
-        
+            avg_rating = tally.average_rating(option_index)
+            return f"{'⭐' * round(avg_rating)} ({avg_rating:.1f}/5)"
+
         elif poll_type == 'weighted':
-            points = sum(vote.get(str(option_index), 0) 
-                        for vote in poll_data.get('weighted_votes', {}).values())
-            return f"{option}\n📊 {points} points"
-        
+            return f"📊 {tally.points[option_index]} points"
+
+        elif poll_type == 'ranked':
+            return f"🏆 {tally.rank_points[option_index]} points ({tally.first_choices[option_index]} first choices)"
+
         else:
-            votes = len([1 for vote_list in poll_data.get('votes', {}).values()
-                        if option_index in vote_list])
+            votes = tally.counts[option_index]
             percentage = (votes / total_votes * 100) if total_votes > 0 else 0
             bar = self.generate_progress_bar(percentage)
-            return f"{option}\n{bar} ({votes} votes)"
+            return f"{bar} ({votes} votes)"
+
+    def format_result_value(self, poll_data: Dict, option_index: int, total_votes: int) -> str:
+        option = poll_data['options'][option_index]
+        return f"{option}\n{self.describe_option(poll_data, option_index, total_votes)}"
 
     def generate_progress_bar(self, percentage: float, length: int = 20) -> str:
         filled = int(length * percentage / 100)
@@ -16484,26 +18548,283 @@ class RNGRangeModal(discord.ui.Modal, title="Change RNG Range"):
             await interaction.response.send_message(f"Error: {str(e)}", ephemeral=True)
 
 
+class SpaceSaving:
+    # Heavy-hitters sketch holding at most `capacity` counters. A new item arriving while
+    # the table is full takes over the smallest counter and its count, so every item seen
+    # more than total/capacity times is kept and no count is ever under-reported.
+    __slots__ = ('capacity', 'counts')
+
+    def __init__(self, capacity: int = 64, counts: Dict = None):
+        self.capacity = capacity
+        self.counts = dict(counts or {})
+
+    def add(self, item, count: int = 1):
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+        elif len(counts) < self.capacity:
+            counts[item] = count
+        else:
+            smallest = min(counts, key=counts.get)
+            counts[item] = counts.pop(smallest) + count
+
+    def merge(self, other: 'SpaceSaving'):
+        merged = dict(self.counts)
+        for item, count in other.counts.items():
+            merged[item] = merged.get(item, 0) + count
+        self.counts = dict(heapq.nlargest(self.capacity, merged.items(), key=lambda pair: pair[1]))
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        return heapq.nlargest(k, self.counts.items(), key=lambda pair: pair[1])
+
+
+class HyperLogLog:
+    # Cardinality sketch: 2**p one-byte registers (~3% error at p=10), mergeable by
+    # taking the register-wise maximum.
+    __slots__ = ('p', 'registers')
+
+    def __init__(self, p: int = 10, registers: bytes = None):
+        self.p = p
+        self.registers = bytearray(registers) if registers else bytearray(1 << p)
+
+    @staticmethod
+    def hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+    def add_hash(self, hashed: int):
+        bits = 64 - self.p
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog'):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class WordBucket:
+    # Aggregates for one time bucket of a guild. Users and channels are keyed by str(id)
+    # so the bucket survives a JSON round trip unchanged.
+    __slots__ = ('start', 'messages', 'words', 'hours', 'top_words', 'emojis', 'users', 'channels',
+                 'unique_words', 'active_users')
+
+    def __init__(self, start: int):
+        self.start = start
+        self.messages = 0
+        self.words = 0
+        self.hours = [0] * 24
+        self.top_words = SpaceSaving(64)
+        self.emojis = SpaceSaving(32)
+        self.users = SpaceSaving(32)
+        self.channels = SpaceSaving(32)
+        self.unique_words = HyperLogLog()
+        self.active_users = HyperLogLog()
+
+    def add(self, hour: int, word_count: int, tracked_words: List[str], word_hashes: List[int],
+            emojis: List[str], user: str, user_hash: int, channel: str):
+        self.messages += 1
+        self.words += word_count
+        self.hours[hour] += 1
+        for word in tracked_words:
+            self.top_words.add(word)
+        for found in emojis:
+            self.emojis.add(found)
+        for hashed in word_hashes:
+            self.unique_words.add_hash(hashed)
+        self.active_users.add_hash(user_hash)
+        if word_count:
+            self.users.add(user, word_count)
+            self.channels.add(channel, word_count)
+
+    def merge(self, other: 'WordBucket'):
+        self.messages += other.messages
+        self.words += other.words
+        self.hours = [a + b for a, b in zip(self.hours, other.hours)]
+        self.top_words.merge(other.top_words)
+        self.emojis.merge(other.emojis)
+        self.users.merge(other.users)
+        self.channels.merge(other.channels)
+        self.unique_words.merge(other.unique_words)
+        self.active_users.merge(other.active_users)
+
+    def to_dict(self) -> Dict:
+        return {
+            'messages': self.messages,
+            'words': self.words,
+            'hours': self.hours,
+            'top_words': self.top_words.counts,
+            'emojis': self.emojis.counts,
+            'users': self.users.counts,
+            'channels': self.channels.counts,
+            'unique_words': self.unique_words.registers.hex(),
+            'active_users': self.active_users.registers.hex()
+        }
+
+    @classmethod
+    def from_dict(cls, start: int, data: Dict) -> 'WordBucket':
+        bucket = cls(start)
+        bucket.messages = data['messages']
+        bucket.words = data['words']
+        bucket.hours = data['hours']
+        bucket.top_words = SpaceSaving(64, data['top_words'])
+        bucket.emojis = SpaceSaving(32, data['emojis'])
+        bucket.users = SpaceSaving(32, data['users'])
+        bucket.channels = SpaceSaving(32, data['channels'])
+        bucket.unique_words = HyperLogLog(registers=bytes.fromhex(data['unique_words']))
+        bucket.active_users = HyperLogLog(registers=bytes.fromhex(data['active_users']))
+        return bucket
+
+
 class WordAnalytics(commands.Cog):
-    def __init__(self, bot):
+    # Word statistics are aggregated per guild as messages arrive, into hourly, daily and
+    # 30-day buckets. A !wordstats query merges a bounded number of buckets (at most 31),
+    # so it costs the same regardless of message volume. Buckets are stored in SQLite and a
+    # guild's are loaded the first time it is seen.
+    TIERS = {
+        'hour': (3600, 48),
+        'day': (86400, 31),
+        'month': (30 * 86400, 13)
+    }
+    TIMEFRAMES = {
+        'hour': ('hour', 1),
+        'day': ('hour', 24),
+        'week': ('day', 7),
+        'month': ('day', 30),
+        'year': ('month', 12)
+    }
+    COMMON_WORDS = {'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i', 'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at'}
+
+    def __init__(self, bot, db_path: str = "data/word_stats.db"):
         self.bot = bot
-        self.word_stats = {}
-        self.channel_stats = {}
-        self.user_stats = {}
+        self.db_path = db_path
+        self.db = None
+        self.buckets: Dict[int, Dict[str, OrderedDict]] = {}
+        self.dirty = set()
+        self._loading: Dict[int, asyncio.Task] = {}
 
-    def get_time_threshold(self, timeframe: str) -> datetime:
-        now = datetime.now(timezone.utc)
-        timeframe = timeframe.lower()
-        thresholds = {
-            'hour': now - timedelta(hours=1),
-            'day': now - timedelta(days=1),
-            'week': now - timedelta(weeks=1),
-            'month': now - timedelta(days=30),
-            'year': now - timedelta(days=365)
-        }
-        return thresholds.get(timeframe, thresholds['day'])
+    async def cog_load(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.db = await aiosqlite.connect(self.db_path)
+        await self.db.execute("PRAGMA journal_mode=WAL")
+        await self.db.execute("""
+            CREATE TABLE IF NOT EXISTS word_buckets (
+                guild_id INTEGER NOT NULL,
+                tier TEXT NOT NULL,
+                start INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (guild_id, tier, start)
+            )
+        """)
+        await self.db.commit()
+        self.flush_stats.start()
+
+    async def cog_unload(self):
+        self.flush_stats.cancel()
+        await self.flush()
+        if self.db:
+            await self.db.close()
+
+    async def guild_buckets(self, guild_id: int) -> Dict[str, OrderedDict]:
+        tiers = self.buckets.get(guild_id)
+        if tiers is not None:
+            return tiers
+        task = self._loading.get(guild_id)
+        if task is None:
+            task = self._loading[guild_id] = asyncio.create_task(self.load_guild(guild_id))
+            task.add_done_callback(lambda _: self._loading.pop(guild_id, None))
+        return await asyncio.shield(task)
+
+    async def load_guild(self, guild_id: int) -> Dict[str, OrderedDict]:
+        tiers = {tier: OrderedDict() for tier in self.TIERS}
+        if self.db:
+            async with self.db.execute(
+                "SELECT tier, start, data FROM word_buckets WHERE guild_id = ? ORDER BY start", (guild_id,)
+            ) as cursor:
+                async for tier, start, data in cursor:
+                    if tier in tiers:
+                        tiers[tier][start] = WordBucket.from_dict(start, json.loads(data))
+        self.buckets[guild_id] = tiers
+        return tiers
+
+    def current_bucket(self, guild_id: int, tiers: Dict[str, OrderedDict], tier: str, now: float) -> WordBucket:
+        span, keep = self.TIERS[tier]
+        start = int(now // span * span)
+        buckets = tiers[tier]
+        bucket = buckets.get(start)
+        if bucket is None:
+            bucket = buckets[start] = WordBucket(start)
+            while len(buckets) > keep:
+                buckets.popitem(last=False)
+        self.dirty.add((guild_id, tier, start))
+        return bucket
+
+    @message_handler(guild_only=True, ignore_bots=True)
+    async def on_message(self, message, context):
+        tiers = await self.guild_buckets(context.guild_id)
+
+        tokens = context.tokens
+        tracked = [word for word in tokens if len(word) > 3 and word not in self.COMMON_WORDS]
+        hashes = [HyperLogLog.hash(word) for word in set(tokens)]
+        emojis = EMOJI_MATCHER.findall(context.content)
+        user = str(context.author_id)
+        user_hash = HyperLogLog.hash(user)
+        channel = str(context.channel_id)
+        hour = message.created_at.hour
+
+        now = time.time()
+        for tier in self.TIERS:
+            bucket = self.current_bucket(context.guild_id, tiers, tier, now)
+            bucket.add(hour, len(tokens), tracked, hashes, emojis, user, user_hash, channel)
+
+    async def summary(self, guild_id: int, timeframe: str) -> WordBucket:
+        tier, count = self.TIMEFRAMES.get(timeframe.lower(), self.TIMEFRAMES['day'])
+        span = self.TIERS[tier][0]
+        tiers = await self.guild_buckets(guild_id)
+        oldest = int(time.time() // span * span) - (count - 1) * span
+        merged = WordBucket(oldest)
+        for start, bucket in tiers[tier].items():
+            if start >= oldest:
+                merged.merge(bucket)
+        return merged
+
+    @tasks.loop(minutes=1)
+    async def flush_stats(self):
+        await self.flush()
+
+    async def flush(self):
+        if not self.db or not self.dirty:
+            return
+        dirty, self.dirty = self.dirty, set()
+        rows = []
+        for guild_id, tier, start in dirty:
+            bucket = self.buckets.get(guild_id, {}).get(tier, {}).get(start)
+            if bucket is not None:
+                rows.append((guild_id, tier, start, json.dumps(bucket.to_dict())))
+        try:
+            await self.db.executemany(
+                """INSERT INTO word_buckets (guild_id, tier, start, data) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(guild_id, tier, start) DO UPDATE SET data = excluded.data""",
+                rows
+            )
+            now = time.time()
+            for tier, (span, keep) in self.TIERS.items():
+                cutoff = int(now // span * span) - keep * span
+                await self.db.execute("DELETE FROM word_buckets WHERE tier = ? AND start <= ?", (tier, cutoff))
+            await self.db.commit()
+        except Exception as e:
+            self.dirty |= dirty
+            print(f"Failed to save word stats: {e}")
 
     @commands.command()
+    @commands.guild_only()
     async def wordstats(self, ctx, timeframe: str = "day"):
         embed = discord.Embed(
             title="📊 Advanced Word Statistics",
@@ -16511,164 +18832,94 @@ class WordAnalytics(commands.Cog):
             description=f"Statistics for the last {timeframe}"
         )
         
-        view = WordStatsView(self.bot)
-        time_threshold = self.get_time_threshold(timeframe)
-        filtered_messages = [msg for msg in self.bot.cached_messages 
-                           if msg.created_at > time_threshold]
+        summary = await self.summary(ctx.guild.id, timeframe)
+        view = WordStatsView(self.bot, summary)
 
-        stats = {
-            "total_words": sum(len(msg.content.split()) for msg in filtered_messages),
-            "unique_words": len(set(word.lower() for msg in filtered_messages 
-                                  for word in msg.content.split())),
-            "avg_words_per_msg": round(sum(len(msg.content.split()) 
-                                         for msg in filtered_messages) / max(len(filtered_messages), 1), 2),
-            "emoji_usage": analyze_emoji_usage(" ".join(msg.content for msg in filtered_messages)),
-            "active_users": len(set(msg.author.id for msg in filtered_messages)),
-            "total_messages": len(filtered_messages)
-        }
-
-        embed.add_field(name="Total Words", value=f"📝 {stats['total_words']:,}", inline=True)
-        embed.add_field(name="Unique Words", value=f"🔤 {stats['unique_words']:,}", inline=True)
-        embed.add_field(name="Avg Words/Message", value=f"📊 {stats['avg_words_per_msg']}", inline=True)
-        embed.add_field(name="Active Users", value=f"👥 {stats['active_users']:,}", inline=True)
-        embed.add_field(name="Total Messages", value=f"💬 {stats['total_messages']:,}", inline=True)
+        embed.add_field(name="Total Words", value=f"📝 {summary.words:,}", inline=True)
+        embed.add_field(name="Unique Words", value=f"🔤 ~{summary.unique_words.count():,}", inline=True)
+        embed.add_field(name="Avg Words/Message", value=f"📊 {round(summary.words / max(summary.messages, 1), 2)}", inline=True)
+        embed.add_field(name="Active Users", value=f"👥 ~{summary.active_users.count():,}", inline=True)
+        embed.add_field(name="Total Messages", value=f"💬 {summary.messages:,}", inline=True)
 
-        word_freq = self.get_word_frequency(filtered_messages)
         top_words = "\n".join(f"`{word}`: {count:,} times" 
-                             for word, count in word_freq[:5])
+                             for word, count in summary.top_words.top(5))
         embed.add_field(name="Top Words", value=top_words or "No words found", inline=False)
 
         top_emojis = "\n".join(f"{emoji}: {count:,} times" 
-                              for emoji, count in list(stats['emoji_usage'].items())[:3])
+                              for emoji, count in summary.emojis.top(3))
         if top_emojis:
             embed.add_field(name="Top Emojis", value=top_emojis, inline=False)
 
-        user_activity = self.generate_activity_chart(filtered_messages)
-        embed.set_image(url="attachment://activity_chart.png")
         embed.set_footer(text=f"Generated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-        await ctx.send(embed=embed, view=view, file=discord.File(user_activity, "activity_chart.png"))
-
-    def get_word_frequency(self, messages):
-        word_counts = {}
-        common_words = {'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i', 'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at'}
-        
-        for msg in messages:
-            if not msg.content:
-                continue
-            words = msg.content.lower().split()
-            for word in words:
-                if len(word) > 3 and word not in common_words:
-                    word_counts[word] = word_counts.get(word, 0) + 1
-        return sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
-
-    def generate_activity_chart(self, messages):
-        width, height = 800, 400
-        img = Image.new('RGB', (width, height), color='white')
-        draw = ImageDraw.Draw(img)
-
-        hour_counts = {}
-        for msg in messages:
-            hour = msg.created_at.hour
-            hour_counts[hour] = hour_counts.get(hour, 0) + 1
-
-        draw.line([(50, 350), (750, 350)], fill='black', width=2)
-        draw.line([(50, 50), (50, 350)], fill='black', width=2)
-
-        max_count = max(hour_counts.values()) if hour_counts else 1
-        bar_width = 25
-        for hour in range(24):
-            count = hour_counts.get(hour, 0)
-            bar_height = (count / max_count) * 250
-            x = 50 + (hour * 30)
-            draw.rectangle([(x, 350 - bar_height), (x + bar_width, 350)], fill='blue')
-
         try:
-            font = ImageFont.truetype("arial.ttf", 12)
-        except:
-            font = ImageFont.load_default()
+            user_activity = await self.generate_activity_chart(summary.hours)
+        except RenderBusy:
+            await ctx.send(embed=embed, view=view)
+            return
+        embed.set_image(url="attachment://activity_chart.png")
 
-        for hour in range(0, 24, 3):
-            x = 50 + (hour * 30)
-            draw.text((x, 360), f"{hour:02d}:00", fill='black', font=font)
+        await ctx.send(embed=embed, view=view, file=discord.File(user_activity, "activity_chart.png"))
 
-        buffer = BytesIO()
-        img.save(buffer, 'PNG')
-        buffer.seek(0)
-        return buffer
+    async def generate_activity_chart(self, hour_counts):
+        return BytesIO(await self.bot.renderer.render("activity_chart", hour_counts=tuple(hour_counts)))
 
 class WordStatsView(View):
-    def __init__(self, bot):
+    def __init__(self, bot, summary: WordBucket):
         super().__init__(timeout=180)
         self.bot = bot
+        self.summary = summary
+
+    @staticmethod
+    def member_name(guild, user_id: str) -> str:
+        member = guild.get_member(int(user_id))
+        return member.name if member else user_id
+
+    @staticmethod
+    def channel_name(guild, channel_id: str) -> str:
+        channel = guild.get_channel(int(channel_id))
+        return channel.name if channel else channel_id
 
     @discord.ui.button(label="Most Used Words", style=ButtonStyle.primary)
     async def most_used_words(self, interaction: discord.Interaction, button: discord.ui.Button):
         embed = discord.Embed(title="📊 Most Used Words", color=discord.Color.blue())
-        word_counts = {}
-        for msg in self.bot.cached_messages:
-            if msg.content:
-                words = msg.content.lower().split()
-                for word in words:
-                    if len(word) > 3:
-                        word_counts[word] = word_counts.get(word, 0) + 1
-        
-        top_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        stats_text = "\n".join(f"`{word}`: {count:,} times" for word, count in top_words)
+        stats_text = "\n".join(f"`{word}`: {count:,} times" for word, count in self.summary.top_words.top(10))
         embed.description = stats_text or "No words found"
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @discord.ui.button(label="User Activity", style=ButtonStyle.success)
     async def user_activity(self, interaction: discord.Interaction, button: discord.ui.Button):
         embed = discord.Embed(title="👥 User Activity Stats", color=discord.Color.green())
-        user_stats = {}
-        for msg in self.bot.cached_messages:
-            user_stats[msg.author.name] = user_stats.get(msg.author.name, 0) + len(msg.content.split())
-        
-        top_users = sorted(user_stats.items(), key=lambda x: x[1], reverse=True)[:5]
-        stats_text = "\n".join(f"`{user}`: {count:,} words" for user, count in top_users)
+        stats_text = "\n".join(f"`{self.member_name(interaction.guild, user)}`: {count:,} words"
+                               for user, count in self.summary.users.top(5))
         embed.description = stats_text or "No user activity found"
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @discord.ui.button(label="Channel Stats", style=ButtonStyle.secondary)
     async def channel_stats(self, interaction: discord.Interaction, button: discord.ui.Button):
         embed = discord.Embed(title="📊 Channel Statistics", color=discord.Color.greyple())
-        channel_stats = {}
-        
-        for msg in self.bot.cached_messages:
-            channel_name = getattr(msg.channel, 'name', 'Direct Messages')
-            channel_stats[channel_name] = channel_stats.get(channel_name, 0) + len(msg.content.split())
-        
-        top_channels = sorted(channel_stats.items(), key=lambda x: x[1], reverse=True)[:5]
-        stats_text = "\n".join(f"#{channel}: {count:,} words" for channel, count in top_channels)
+        stats_text = "\n".join(f"#{self.channel_name(interaction.guild, channel)}: {count:,} words"
+                               for channel, count in self.summary.channels.top(5))
         embed.description = stats_text or "No channel statistics found"
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @discord.ui.button(label="Export Data", style=ButtonStyle.primary)
     async def export_data(self, interaction: discord.Interaction, button: discord.ui.Button):
+        guild = interaction.guild
         stats_data = {
             "timestamp": datetime.now().isoformat(),
-            "server_name": interaction.guild.name,
+            "server_name": guild.name,
             "statistics": {
-                "word_frequency": {},
-                "user_activity": {},
-                "channel_activity": {}
+                "total_messages": self.summary.messages,
+                "total_words": self.summary.words,
+                "unique_words": self.summary.unique_words.count(),
+                "active_users": self.summary.active_users.count(),
+                "word_frequency": dict(self.summary.top_words.top(64)),
+                "emoji_usage": dict(self.summary.emojis.top(32)),
+                "user_activity": {self.member_name(guild, user): count for user, count in self.summary.users.top(32)},
+                "channel_activity": {self.channel_name(guild, channel): count for channel, count in self.summary.channels.top(32)},
+                "messages_by_hour": self.summary.hours
             }
         }
-        
-        for msg in self.bot.cached_messages:
-            if msg.content:
-                words = msg.content.lower().split()
-                for word in words:
-                    if len(word) > 3:
-                        stats_data["statistics"]["word_frequency"][word] = \
-                            stats_data["statistics"]["word_frequency"].get(word, 0) + 1
-                
-                stats_data["statistics"]["user_activity"][msg.author.name] = \
-                    stats_data["statistics"]["user_activity"].get(msg.author.name, 0) + len(words)
-                
-                stats_data["statistics"]["channel_activity"][msg.channel.name] = \
-                    stats_data["statistics"]["channel_activity"].get(msg.channel.name, 0) + len(words)
 
         file = discord.File(
             BytesIO(json.dumps(stats_data, indent=2).encode()),
@@ -17585,22 +19836,21 @@ class ASCIIGeneratorView(discord.ui.View):
 
             try:
                 msg = await interaction.client.wait_for('message', timeout=30.0, check=check)
-                await self.process_image(msg)
+                await self.process_image(interaction.client, msg)
             except asyncio.TimeoutError:
                 await interaction.followup.send("⏰ Image upload timed out!", ephemeral=True)
 
 
-    async def process_image(self, message):
+    async def process_image(self, bot, message):
         try:
-            response = requests.get(message.attachments[0].url)
-            image = Image.open(BytesIO(response.content)).convert('RGB')
-            
-            ascii_art = self.create_ascii_art(image)
-            colored_art = self.create_colored_ascii(image)
+            data = await message.attachments[0].read()
+            ascii_art, colored_art = await bot.renderer.render("image_ascii", data=data)
             
             await message.channel.send(f"```\n{ascii_art}\n```")
             await message.channel.send(f"```ansi\n{colored_art}\n```")
             
+        except RenderBusy:
+            await message.channel.send("🕒 The image renderer is busy, please try again in a moment.")
         except Exception as e:
             await message.channel.send("❌ Failed to process image!")
 
@@ -17637,33 +19887,22 @@ class ASCIITextImageModal(discord.ui.Modal, title="Text to ASCII Image"):
     )
 
     async def on_submit(self, interaction: discord.Interaction):
+        await interaction.response.defer()
         try:
+            image = await interaction.client.renderer.render(
+                "text_image", text=self.text_input.value, color=self.color.value
+            )
             
-            img = Image.new('RGB', (500, 100), color='black')
-            draw = ImageDraw.Draw(img)
-            font = ImageFont.truetype("arial.ttf", 60)
-            text = self.text_input.value
-            color = self.color.value
-            
-            text_width = draw.textlength(text, font=font)
-            text_height = 60
-            x = (500 - text_width) / 2
-            y = (100 - text_height) / 2
-            
-            draw.text((x, y), text, fill=color, font=font)
-            
-            buffer = BytesIO()
-            img.save(buffer, 'PNG')
-            buffer.seek(0)
-            
-            file = discord.File(buffer, filename='ascii_text.png')
+            file = discord.File(BytesIO(image), filename='ascii_text.png')
             embed = discord.Embed(title="✨ ASCII Text Image", color=discord.Color.gold())
             embed.set_image(url="attachment://ascii_text.png")
             
-            await interaction.response.send_message(file=file, embed=embed)
+            await interaction.followup.send(file=file, embed=embed)
             
+        except RenderBusy:
+            await interaction.followup.send("🕒 The image renderer is busy, please try again in a moment.", ephemeral=True)
         except Exception as e:
-            await interaction.response.send_message("Failed to generate ASCII text image!", ephemeral=True)
+            await interaction.followup.send("Failed to generate ASCII text image!", ephemeral=True)
 
 class ASCIITextModal(discord.ui.Modal, title="Text to ASCII Art"):
     text_input = discord.ui.TextInput(
@@ -18435,29 +20674,14 @@ class ColorPickerView(discord.ui.View):
         self.current_color = {"r": 255, "g": 0, "b": 0}
         self.current_hex = "#FF0000"
         
-    def create_color_preview(self):
-        
-        img = Image.new('RGB', (300, 100), (self.current_color["r"], 
-                                           self.current_color["g"], 
-                                           self.current_color["b"]))
-        draw = ImageDraw.Draw(img)
-        
-        rgb_text = f"RGB: ({self.current_color['r']}, {self.current_color['g']}, {self.current_color['b']})"
-        hex_text = f"HEX: {self.current_hex}"
-        hsv = colorsys.rgb_to_hsv(self.current_color["r"]/255, 
-                                 self.current_color["g"]/255, 
-                                 self.current_color["b"]/255)
-        hsv_text = f"HSV: ({int(hsv[0]*360)}°, {int(hsv[1]*100)}%, {int(hsv[2]*100)}%)"
+    async def create_color_preview(self, bot):
         
-        text_color = (0, 0, 0) if sum(self.current_color.values())/3 > 128 else (255, 255, 255)
-        draw.text((10, 10), rgb_text, fill=text_color)
-        draw.text((10, 40), hex_text, fill=text_color)
-        draw.text((10, 70), hsv_text, fill=text_color)
-        
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        return buffer
+        image = await bot.renderer.render(
+            "color_preview",
+            r=self.current_color["r"], g=self.current_color["g"], b=self.current_color["b"],
+            hex_text=self.current_hex
+        )
+        return io.BytesIO(image)
 
     @discord.ui.select(
         placeholder="Color Presets",
@@ -18481,7 +20705,7 @@ class ColorPickerView(discord.ui.View):
         self.current_color["b"] = int(hex_color[4:6], 16)
         self.current_hex = f"#{hex_color.upper()}"
         
-        file = discord.File(self.create_color_preview(), filename="color.png")
+        file = discord.File(await self.create_color_preview(interaction.client), filename="color.png")
         await interaction.response.edit_message(attachments=[file])
 
     @discord.ui.button(label="RGB Sliders", style=discord.ButtonStyle.primary, emoji="🎚️")
@@ -18528,7 +20752,7 @@ class RGBSliderModal(discord.ui.Modal, title="RGB Color Picker"):
             self.color_view.current_color = {"r": r, "g": g, "b": b}
             self.color_view.current_hex = f"#{r:02x}{g:02x}{b:02x}".upper()
             
-            file = discord.File(self.color_view.create_color_preview(), filename="color.png")
+            file = discord.File(await self.color_view.create_color_preview(interaction.client), filename="color.png")
             await interaction.response.edit_message(attachments=[file])
             
         except ValueError:
@@ -18585,7 +20809,7 @@ class CodingToolsView(discord.ui.View):
     async def select_tool(self, interaction: discord.Interaction, select: discord.ui.Select):
         if select.values[0] == "color":
             view = ColorPickerView()
-            file = discord.File(view.create_color_preview(), filename="color.png")
+            file = discord.File(await view.create_color_preview(interaction.client), filename="color.png")
             await interaction.response.edit_message(content="🎨 **Color Tools**", attachments=[file], view=view)
         elif select.values[0] == "base":
             await interaction.response.send_modal(BaseConverterModal())
@@ -19055,8 +21279,6 @@ class TimeZoneView(discord.ui.View):
         if self.from_tz:
             await interaction.response.send_modal(TimeZoneModal(self.from_tz, self.to_tz))
 
-from textblob import TextBlob
-
 class EmotionalSupportCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -19079,7 +21301,7 @@ class EmotionalSupportCog(commands.Cog):
 
     def detect_sentiment(self, user_input):
         
-        analysis = TextBlob(user_input)
+        analysis = textblob.TextBlob(user_input)
         sentiment = analysis.sentiment.polarity  
         return sentiment
     
@@ -19108,14 +21330,9 @@ class EmotionalSupportCog(commands.Cog):
             "Take care, and remember that there’s always light ahead. 💫\n\nGreetings, Z"
         )
 
-    @commands.Cog.listener()
-    async def on_message(self, message):  
-        if not self.enabled:
-            return       
-        if message.author == self.bot.user:
-            return
-
-        user_message = message.content.lower()
+    @message_handler(enabled='enabled')
+    async def on_message(self, message, context):  
+        user_message = context.lowered
 
         sentiment_score = self.detect_sentiment(user_message)
 
@@ -19635,7 +21852,7 @@ class AI_CHAT(commands.Cog):
         }
         self.default_model = "gpt-3.5-turbo"
         self.channel_states = {}
-        self.conversation_history = {}
+        self.conversation_history = ConversationStore("ai_chat")
         self.api_key = os.getenv('OPENAI_API_KEY')  
         self.rate_limits = {}  
         self.rate_limit_cooldown = 30  
@@ -19644,6 +21861,9 @@ class AI_CHAT(commands.Cog):
         if not self.api_key:
             print("⚠️ Warning: OPENAI_API_KEY not found in .env file")
 
+    async def cog_unload(self):
+        await self.conversation_history.flush()
+
 
     @commands.command(name="ai_info")
     async def ai_info(self, ctx):
@@ -19745,6 +21965,7 @@ class AI_CHAT(commands.Cog):
             channel_id = self.ai_channels[guild_id].get("channel")
             if channel_id:
                 del self.channel_states[channel_id]
+                await self.conversation_history.clear((guild_id, channel_id))
             del self.ai_channels[guild_id]
             await ctx.send("✅ AI chat configuration has been reset")
         else:
@@ -19782,12 +22003,9 @@ class AI_CHAT(commands.Cog):
         else:
             await ctx.send("❌ No AI chat channel found")
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
-        if message.guild is None:
-            return  # Skip processing for DM messages
+    @message_handler(guild_only=True, ignore_bots=True,
+                     when=lambda cog, context: context.channel_id == cog.ai_channels.get(context.guild_id, {}).get("channel"))
+    async def on_message(self, message, context):
         guild_id = message.guild.id
 
         if guild_id not in self.ai_channels:
@@ -19820,64 +22038,45 @@ class AI_CHAT(commands.Cog):
                     await message.channel.send("⚠️ OpenAI API key not configured!")
                     return
 
-                if guild_id not in self.conversation_history:
-                    self.conversation_history[guild_id] = []
-                
-                self.conversation_history[guild_id].append({"role": "user", "content": message.content})
-                
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
+                memory_key = (guild_id, channel_id)
+                system = "You are a helpful AI assistant."
+                summary = await self.conversation_history.summary(memory_key)
+                if summary:
+                    system += f"\n\nEarlier in this conversation:\n{summary}"
+
+                stream = self.bot.llm.stream(
+                    "openai",
+                    model,
+                    [*(await self.conversation_history.messages(memory_key)), {"role": "user", "content": message.content}],
+                    guild_id=guild_id,
+                    system=system,
+                    temperature=0.7
+                )
+                ai_response = await self.bot.llm.relay(stream, message.reply)
 
-                payload = {
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": "You are a helpful AI assistant."},
-                        *self.conversation_history[guild_id][-5:]  
-                    ],
-                    "temperature": 0.7
-                }
-
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        "https://api.openai.com/v1/chat/completions",
-                        headers=headers,
-                        json=payload
-                    ) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            ai_response = data['choices'][0]['message']['content']
-                            
-                            self.conversation_history[guild_id].append(
-                                {"role": "assistant", "content": ai_response}
-                            )
-                            
-                            await message.reply(ai_response)
-                        elif response.status == 402:
-                            embed = discord.Embed(
-                                title="❌ Insufficient Credits",
-                                description="AI chat has been automatically paused. Please add credits to your OpenAI account.",
-                                color=discord.Color.red()
-                            )
-                            self.channel_states[channel_id] = False
-                            await message.channel.send(embed=embed)
-                        elif response.status == 429:
-                            embed = discord.Embed(
-                                title="⚠️ Rate Limited",
-                                description="Too many requests. Please try again in a few minutes.",
-                                color=discord.Color.orange()
-                            )
-                            await message.channel.send(embed=embed)
-                        else:
-                            error_data = await response.json()
-                            embed = discord.Embed(
-                                title="❌ API Error",
-                                description=error_data.get('error', {}).get('message', 'Unknown error'),
-                                color=discord.Color.red()
-                            )
-                            await message.channel.send(embed=embed)
+                await self.conversation_history.add_exchange(memory_key, message.content, ai_response)
 
+        except LLMError as e:
+            if e.status == 402:
+                embed = discord.Embed(
+                    title="❌ Insufficient Credits",
+                    description="AI chat has been automatically paused. Please add credits to your OpenAI account.",
+                    color=discord.Color.red()
+                )
+                self.channel_states[channel_id] = False
+            elif e.status == 429:
+                embed = discord.Embed(
+                    title="⚠️ Rate Limited",
+                    description="Too many requests. Please try again in a few minutes.",
+                    color=discord.Color.orange()
+                )
+            else:
+                embed = discord.Embed(
+                    title="❌ API Error",
+                    description=str(e),
+                    color=discord.Color.red()
+                )
+            await message.channel.send(embed=embed)
         except aiohttp.ClientError as e:
             embed = discord.Embed(
                 title="❌ Network Error",
@@ -19894,14 +22093,478 @@ class AI_CHAT(commands.Cog):
             )
             await message.channel.send(embed=embed)
 
+class MessageIndex:
+    # Compact per-channel, per-hour activity index fed from gateway events. Analytics views
+    # query this instead of walking channel.history() over every text channel per click.
+    def __init__(self, bot, db_path: str = 'data/message_index.db', retention_days: int = 90):
+        self.bot = bot
+        self.db_path = db_path
+        self.db = None
+        self.ready = asyncio.Event()
+        self.retention_days = retention_days
+        self.flush_interval = 5
+        self.channel_deltas: Dict[Tuple[int, int, int], List[int]] = {}
+        self.author_deltas: Dict[Tuple[int, int, int, int], int] = {}
+        self.flush_lock = asyncio.Lock()
+        self.tasks = [
+            bot.loop.create_task(self.initialize_db()),
+            bot.loop.create_task(self.flush_queue_loop())
+        ]
+
+    async def initialize_db(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.db = await aiosqlite.connect(self.db_path)
+        await self.db.execute('PRAGMA journal_mode=WAL')
+        await self.db.execute('PRAGMA synchronous=NORMAL')
+        await self.db.execute('''
+            CREATE TABLE IF NOT EXISTS channel_activity (
+                guild_id INTEGER,
+                channel_id INTEGER,
+                hour INTEGER,
+                message_count INTEGER DEFAULT 0,
+                reaction_count INTEGER DEFAULT 0,
+                text_count INTEGER DEFAULT 0,
+                image_count INTEGER DEFAULT 0,
+                link_count INTEGER DEFAULT 0,
+                PRIMARY KEY (guild_id, channel_id, hour)
+            ) WITHOUT ROWID
+        ''')
+        await self.db.execute('''
+            CREATE TABLE IF NOT EXISTS author_activity (
+                guild_id INTEGER,
+                channel_id INTEGER,
+                hour INTEGER,
+                user_id INTEGER,
+                message_count INTEGER DEFAULT 0,
+                PRIMARY KEY (guild_id, channel_id, hour, user_id)
+            ) WITHOUT ROWID
+        ''')
+        await self.db.execute('CREATE INDEX IF NOT EXISTS idx_channel_activity_hour ON channel_activity(guild_id, hour)')
+        await self.db.execute('CREATE INDEX IF NOT EXISTS idx_author_activity_hour ON author_activity(guild_id, hour)')
+        await self.db.commit()
+        self.ready.set()
+
+    @staticmethod
+    def hour_bucket(moment: datetime) -> int:
+        return int(moment.timestamp() // 3600)
+
+    @staticmethod
+    def content_type(message) -> int:
+        # Offsets into the delta vector: 2 = text, 3 = images, 4 = links.
+        if message.attachments:
+            return 3
+        if 'http://' in message.content or 'https://' in message.content:
+            return 4
+        return 2
+
+    def _channel_delta(self, message) -> List[int]:
+        key = (message.guild.id, message.channel.id, self.hour_bucket(message.created_at))
+        delta = self.channel_deltas.get(key)
+        if delta is None:
+            delta = self.channel_deltas[key] = [0, 0, 0, 0, 0]
+        return delta
+
+    def record_message(self, message, sign: int = 1):
+        delta = self._channel_delta(message)
+        delta[0] += sign
+        delta[self.content_type(message)] += sign
+        if sign < 0:
+            delta[1] -= sum(reaction.count for reaction in message.reactions)
+
+        author_key = (message.guild.id, message.channel.id, self.hour_bucket(message.created_at), message.author.id)
+        self.author_deltas[author_key] = self.author_deltas.get(author_key, 0) + sign
+
+    def record_edit(self, before, after):
+        old_type, new_type = self.content_type(before), self.content_type(after)
+        if old_type != new_type:
+            delta = self._channel_delta(after)
+            delta[old_type] -= 1
+            delta[new_type] += 1
+
+    def record_reaction(self, message, sign: int = 1):
+        self._channel_delta(message)[1] += sign
+
+    async def flush_queue_loop(self):
+        await self.ready.wait()
+        last_prune = 0
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+                if time.time() - last_prune > 3600:
+                    await self.prune()
+                    last_prune = time.time()
+            except Exception as e:
+                print(f"Error in message index flush loop: {e}")
+
+    async def flush(self):
+        await self.ready.wait()
+        async with self.flush_lock:
+            await self._flush_deltas()
+
+    async def _flush_deltas(self):
+        # Callers hold flush_lock
+        channel_deltas, self.channel_deltas = self.channel_deltas, {}
+        author_deltas, self.author_deltas = self.author_deltas, {}
+        if not channel_deltas and not author_deltas:
+            return
+
+        try:
+            await self.db.executemany('''
+                INSERT INTO channel_activity VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(guild_id, channel_id, hour) DO UPDATE SET
+                    message_count = message_count + excluded.message_count,
+                    reaction_count = reaction_count + excluded.reaction_count,
+                    text_count = text_count + excluded.text_count,
+                    image_count = image_count + excluded.image_count,
+                    link_count = link_count + excluded.link_count
+            ''', [key + tuple(delta) for key, delta in channel_deltas.items()])
+            await self.db.executemany('''
+                INSERT INTO author_activity VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(guild_id, channel_id, hour, user_id) DO UPDATE SET
+                    message_count = message_count + excluded.message_count
+            ''', [key + (count,) for key, count in author_deltas.items() if count])
+            await self.db.commit()
+        except Exception as e:
+            print(f"Error flushing message index: {e}")
+            for key, delta in channel_deltas.items():
+                pending = self.channel_deltas.setdefault(key, [0, 0, 0, 0, 0])
+                for i, value in enumerate(delta):
+                    pending[i] += value
+            for key, count in author_deltas.items():
+                self.author_deltas[key] = self.author_deltas.get(key, 0) + count
+
+    async def prune(self):
+        cutoff = self.hour_bucket(datetime.now(timezone.utc) - timedelta(days=self.retention_days))
+        await self.db.execute('DELETE FROM channel_activity WHERE hour < ?', (cutoff,))
+        await self.db.execute('DELETE FROM author_activity WHERE hour < ?', (cutoff,))
+        await self.db.commit()
+
+    async def hourly_totals(self, guild_id: int, since: datetime) -> Dict[int, Tuple[int, int]]:
+        await self.flush()
+        async with self.db.execute('''
+            SELECT hour, SUM(message_count), SUM(reaction_count) FROM channel_activity
+            WHERE guild_id = ? AND hour >= ? GROUP BY hour
+        ''', (guild_id, self.hour_bucket(since))) as cursor:
+            return {hour: (messages, reactions) async for hour, messages, reactions in cursor}
+
+    async def channel_totals(self, guild_id: int, since: datetime) -> Dict[int, Dict[str, int]]:
+        await self.flush()
+        since_hour = self.hour_bucket(since)
+        totals = {}
+        async with self.db.execute('''
+            SELECT channel_id, SUM(message_count), SUM(reaction_count), SUM(text_count), SUM(image_count), SUM(link_count)
+            FROM channel_activity WHERE guild_id = ? AND hour >= ? GROUP BY channel_id
+        ''', (guild_id, since_hour)) as cursor:
+            async for channel_id, messages, reactions, text, images, links in cursor:
+                totals[channel_id] = {
+                    'messages': messages, 'reactions': reactions, 'unique_users': 0,
+                    'text': text, 'images': images, 'links': links
+                }
+        async with self.db.execute('''
+            SELECT channel_id, COUNT(DISTINCT user_id) FROM author_activity
+            WHERE guild_id = ? AND hour >= ? AND message_count > 0 GROUP BY channel_id
+        ''', (guild_id, since_hour)) as cursor:
+            async for channel_id, users in cursor:
+                if channel_id in totals:
+                    totals[channel_id]['unique_users'] = users
+        return totals
+
+    async def active_users(self, guild_id: int, since: datetime) -> set:
+        await self.flush()
+        async with self.db.execute('''
+            SELECT DISTINCT user_id FROM author_activity
+            WHERE guild_id = ? AND hour >= ? AND message_count > 0
+        ''', (guild_id, self.hour_bucket(since))) as cursor:
+            return {row[0] async for row in cursor}
+
+    async def backfill_channel(self, channel, after: datetime, before: datetime) -> int:
+        # Rebuilds the buckets in [after, before) from history. before should be on an hour
+        # boundary so live events for the current hour are not overwritten.
+        await self.flush()
+        channel_rows: Dict[int, List[int]] = {}
+        author_rows: Dict[Tuple[int, int], int] = {}
+        scanned = 0
+        async for message in channel.history(after=after, before=before, limit=None):
+            hour = self.hour_bucket(message.created_at)
+            row = channel_rows.setdefault(hour, [0, 0, 0, 0, 0])
+            row[0] += 1
+            row[1] += sum(reaction.count for reaction in message.reactions)
+            row[self.content_type(message)] += 1
+            author_rows[(hour, message.author.id)] = author_rows.get((hour, message.author.id), 0) + 1
+            scanned += 1
+
+        guild_id, channel_id = channel.guild.id, channel.id
+        bounds = (guild_id, channel_id, self.hour_bucket(after), self.hour_bucket(before))
+        async with self.flush_lock:
+            # Events recorded while history was being read are written out first, so the
+            # rewrite below replaces them instead of a later flush adding them on top.
+            await self._flush_deltas()
+            await self.db.execute(
+                'DELETE FROM channel_activity WHERE guild_id = ? AND channel_id = ? AND hour >= ? AND hour < ?', bounds
+            )
+            await self.db.execute(
+                'DELETE FROM author_activity WHERE guild_id = ? AND channel_id = ? AND hour >= ? AND hour < ?', bounds
+            )
+            await self.db.executemany(
+                'INSERT INTO channel_activity VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(guild_id, channel_id, hour) + tuple(row) for hour, row in channel_rows.items()]
+            )
+            await self.db.executemany(
+                'INSERT INTO author_activity VALUES (?, ?, ?, ?, ?)',
+                [(guild_id, channel_id, hour, user_id, count) for (hour, user_id), count in author_rows.items()]
+            )
+            await self.db.commit()
+        return scanned
+
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        try:
+            if self.ready.is_set():
+                await self.flush()
+            if self.db:
+                await self.db.close()
+        except Exception as e:
+            print(f"Error closing message index: {e}")
+
+
+class AnalyticsDatabase:
+    # Activity analytics engine shared as bot.analytics. Events go into one in-memory
+    # queue that coalesces counts per (user, guild, hour); a flush loop upserts them as
+    # hourly raw buckets. A compactor rolls the raw hours up into daily and monthly
+    # tables and applies retention, so reports read pre-aggregated rollups (plus the few
+    # raw hours since the last compaction) instead of re-scanning raw rows.
+    KINDS = ('message', 'voice', 'reaction', 'command')
+    COLUMNS = ('message_count', 'voice_minutes', 'reaction_count', 'command_count')
+
+    def __init__(self, bot, db_path: str = 'data/analytics.db', flush_interval: int = 5,
+                 compact_interval: int = 3600, raw_retention_days: int = 14, daily_retention_days: int = 400):
+        self.bot = bot
+        self.db_path = db_path
+        self.db = None
+        self.queue: Dict[Tuple[int, int, str], List[int]] = {}
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self.raw_retention_days = raw_retention_days
+        self.daily_retention_days = daily_retention_days
+        self.queue_lock = asyncio.Lock()
+        self.batch_size = 1000
+        self.tasks = []
+
+    async def start(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.db = await aiosqlite.connect(self.db_path)
+        await self.db.execute('PRAGMA journal_mode=WAL')
+        await self.db.execute('PRAGMA synchronous=NORMAL')
+        await self.db.execute('PRAGMA cache_size=-64000')
+        await self.setup_database()
+        self.tasks = [
+            self.bot.loop.create_task(self.flush_queue_loop()),
+            self.bot.loop.create_task(self.compact_loop())
+        ]
+
+    async def setup_database(self):
+        counts = '''
+                message_count INTEGER DEFAULT 0,
+                voice_minutes INTEGER DEFAULT 0,
+                reaction_count INTEGER DEFAULT 0,
+                command_count INTEGER DEFAULT 0,'''
+        covering = 'user_id, message_count, voice_minutes, reaction_count, command_count'
+        await self.db.executescript(f'''
+            CREATE TABLE IF NOT EXISTS user_activity (
+                user_id INTEGER,
+                guild_id INTEGER,{counts}
+                timestamp DATETIME,
+                PRIMARY KEY (user_id, guild_id, timestamp)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS user_activity_daily (
+                user_id INTEGER,
+                guild_id INTEGER,{counts}
+                day TEXT,
+                PRIMARY KEY (user_id, guild_id, day)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS user_activity_monthly (
+                user_id INTEGER,
+                guild_id INTEGER,{counts}
+                month TEXT,
+                PRIMARY KEY (user_id, guild_id, month)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS analytics_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_timestamp ON user_activity(timestamp);
+            CREATE INDEX IF NOT EXISTS idx_activity_guild ON user_activity(guild_id, timestamp, {covering});
+            CREATE INDEX IF NOT EXISTS idx_daily_guild ON user_activity_daily(guild_id, day, {covering});
+            CREATE INDEX IF NOT EXISTS idx_monthly_guild ON user_activity_monthly(guild_id, month, {covering});
+        ''')
+        await self.db.commit()
+
+    async def flush_queue_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush_queue()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error in flush queue loop: {e}")
+
+    async def compact_loop(self):
+        while True:
+            try:
+                await self.compact()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error compacting analytics: {e}")
+            await asyncio.sleep(self.compact_interval)
+
+    async def flush_queue(self):
+        async with self.queue_lock:
+            if not self.queue:
+                return
+            current_queue, self.queue = self.queue, {}
+
+            rows = [(user_id, guild_id, *counts, timestamp, *counts)
+                    for (user_id, guild_id, timestamp), counts in current_queue.items()]
+            try:
+                for i in range(0, len(rows), self.batch_size):
+                    await self.db.executemany('''
+                        INSERT INTO user_activity
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(user_id, guild_id, timestamp)
+                        DO UPDATE SET
+                            message_count = message_count + ?,
+                            voice_minutes = voice_minutes + ?,
+                            reaction_count = reaction_count + ?,
+                            command_count = command_count + ?
+                    ''', rows[i:i + self.batch_size])
+                await self.db.commit()
+            except Exception as e:
+                print(f"Error during queue flush: {e}")
+                await self.db.rollback()
+                for key, counts in current_queue.items():
+                    self.record_counts(key, counts)
+
+    def record_counts(self, key: Tuple[int, int, str], counts):
+        pending = self.queue.setdefault(key, [0, 0, 0, 0])
+        for i, count in enumerate(counts):
+            pending[i] += count
+
+    def record(self, user_id, guild_id, activity_type, amount=1):
+        if not amount:
+            return
+        counts = [0, 0, 0, 0]
+        counts[self.KINDS.index(activity_type)] = amount
+        self.record_counts((user_id, guild_id, datetime.now().strftime('%Y-%m-%d %H:00:00')), counts)
+
+    async def get_meta(self, key, default=None):
+        async with self.db.execute('SELECT value FROM analytics_meta WHERE key = ?', (key,)) as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else default
+
+    async def compact(self):
+        # Rollups are recomputed from the tier below for every day since the previous
+        # run, so running twice (or after a crash) never double counts
+        await self.flush_queue()
+        now = datetime.now()
+        today = now.strftime('%Y-%m-%d')
+        since = await self.get_meta('compacted_day', '')
+        sums = ', '.join(f'SUM({column})' for column in self.COLUMNS)
+        columns = ', '.join(self.COLUMNS)
+        await self.db.execute(f'''
+            INSERT OR REPLACE INTO user_activity_daily (user_id, guild_id, {columns}, day)
+            SELECT user_id, guild_id, {sums}, substr(timestamp, 1, 10) FROM user_activity
+            WHERE timestamp >= ? GROUP BY user_id, guild_id, substr(timestamp, 1, 10)
+        ''', (since,))
+        await self.db.execute(f'''
+            INSERT OR REPLACE INTO user_activity_monthly (user_id, guild_id, {columns}, month)
+            SELECT user_id, guild_id, {sums}, substr(day, 1, 7) FROM user_activity_daily
+            WHERE day >= ? GROUP BY user_id, guild_id, substr(day, 1, 7)
+        ''', (since[:7],))
+        await self.db.execute(
+            'INSERT OR REPLACE INTO analytics_meta (key, value) VALUES (?, ?)', ('compacted_day', today)
+        )
+        raw_cutoff = (now - timedelta(days=self.raw_retention_days)).strftime('%Y-%m-%d')
+        daily_cutoff = (now - timedelta(days=self.daily_retention_days)).strftime('%Y-%m-01')
+        await self.db.execute('DELETE FROM user_activity WHERE timestamp < ?', (raw_cutoff,))
+        await self.db.execute('DELETE FROM user_activity_daily WHERE day < ?', (daily_cutoff,))
+        await self.db.commit()
+
+    async def totals(self, guild_id: int, days: Optional[int] = None, user_id: Optional[int] = None,
+                     group_by_user: bool = False):
+        # Whole months come from the monthly rollup, whole days since then from the daily
+        # one and anything from the last compacted day on from the raw hours
+        await self.flush_queue()
+        compacted = await self.get_meta('compacted_day', '')
+        if days is None:
+            since_day = ''
+            month_end = compacted[:7]
+            day_start = month_end and f"{month_end}-01"
+        else:
+            since_day = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+            month_end = ''
+            day_start = since_day
+
+        sums = ', '.join(f'SUM({column})' for column in self.COLUMNS)
+        columns = ', '.join(self.COLUMNS)
+        where = 'guild_id = ?' + (' AND user_id = ?' if user_id is not None else '')
+        params = (guild_id, user_id) if user_id is not None else (guild_id,)
+        query = f'''
+            SELECT user_id, {sums} FROM (
+                SELECT user_id, {columns} FROM user_activity_monthly WHERE {where} AND month < ?
+                UNION ALL
+                SELECT user_id, {columns} FROM user_activity_daily WHERE {where} AND day >= ? AND day < ?
+                UNION ALL
+                SELECT user_id, {columns} FROM user_activity WHERE {where} AND timestamp >= ?
+            ) {'GROUP BY user_id' if group_by_user else ''}
+        '''
+        async with self.db.execute(query, (
+            *params, month_end,
+            *params, day_start, compacted,
+            *params, max(compacted, since_day)
+        )) as cursor:
+            rows = await cursor.fetchall()
+
+        results = {
+            row[0]: dict(zip(self.KINDS, (value or 0 for value in row[1:])))
+            for row in rows if row[0] is not None or not group_by_user
+        }
+        if group_by_user:
+            return results
+        return next(iter(results.values()), dict.fromkeys(self.KINDS, 0))
+
+    async def top_users(self, guild_id: int, days: Optional[int] = None, kind: str = 'message',
+                        limit: int = 10) -> List[Tuple[int, int]]:
+        per_user = await self.totals(guild_id, days, group_by_user=True)
+        ranked = sorted(((user_id, counts[kind]) for user_id, counts in per_user.items() if counts[kind]),
+                        key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        try:
+            if self.queue and self.db:
+                await self.flush_queue()
+            if self.db:
+                await self.db.execute('PRAGMA optimize')
+                await self.db.close()
+                self.db = None
+        except Exception as e:
+            print(f"Error during database close: {e}")
+
+
 class AdvancedUserAnalytics(commands.Cog):
+    # Read side of analytics: activity counts come from the shared bot.analytics rollups
+    # (recorded by the Analytics cog) and per-channel detail from the message index.
+    TIMEFRAMES = {'day': 1, 'week': 7, 'month': 30, 'all': None}
+
     def __init__(self, bot):
         self.bot = bot
-        self.user_data = {}
-        self.voice_times = {}
-        self.analytics_db = AnalyticsDatabase()
-        self.load_data()
-        self.bot.loop.create_task(self.initialize_analytics_data())
+        self.message_index = MessageIndex(bot)
         self.prediction_model = self.setup_prediction_model()
         
     def calculate_influence_score(self, user_data):
@@ -19952,82 +22615,6 @@ class AdvancedUserAnalytics(commands.Cog):
             
         return round(score, 2)
 
-    async def initialize_analytics_data(self):
-        for guild in self.bot.guilds:
-            if guild.id not in self.user_data:
-                self.user_data[guild.id] = {}
-                
-            for member in guild.members:
-                if member.id not in self.user_data[guild.id]:
-                    self.user_data[guild.id][member.id] = {
-                        'messages': 0,
-                        'voice_time': 0,
-                        'reactions': 0,
-                        'commands': 0,
-                        'activity_hours': {str(i): 0 for i in range(24)},
-                        'channel_activity': {},
-                        'role_history': [role.name for role in member.roles],
-                        'join_date': member.joined_at.isoformat() if member.joined_at else None,
-                        'last_active': datetime.now().isoformat(),
-                        'infractions': [],
-                        'achievements': [],
-                        'engagement_metrics': {
-                            'replies': 0,
-                            'mentions': 0,
-                            'threads': 0,
-                            'reactions_given': 0,
-                            'reactions_received': 0
-                        }
-                    }
-        self.save_data()
-
-    def load_data(self):
-        try:
-            with open('data/analytics_data.json', 'r') as f:
-                self.user_data = json.load(f)
-        except FileNotFoundError:
-            self.user_data = {}
-            self.save_data()
-
-    def save_data(self):
-        guild_data = {}
-        for guild in self.bot.guilds:
-            guild_data[guild.id] = {
-                'roles': {
-                    role.id: {
-                        'name': role.name,
-                        'color': role.color.value,
-                        'members': len(role.members),
-                        'position': role.position,
-                        'hoisted': role.hoist,
-                        'mentionable': role.mentionable
-                    } for role in guild.roles
-                },
-                'members': {
-                    member.id: {
-                        'messages': self.user_data.get(guild.id, {}).get(member.id, {}).get('messages', 0),
-                        'voice_time': self.user_data.get(guild.id, {}).get(member.id, {}).get('voice_time', 0),
-                        'reactions': self.user_data.get(guild.id, {}).get(member.id, {}).get('reactions', 0),
-                        'commands': self.user_data.get(guild.id, {}).get(member.id, {}).get('commands', 0),
-                        'activity_hours': self.user_data.get(guild.id, {}).get(member.id, {}).get('activity_hours', {}),
-                        'channel_activity': self.user_data.get(guild.id, {}).get(member.id, {}).get('channel_activity', {}),
-                        'role_history': self.user_data.get(guild.id, {}).get(member.id, {}).get('role_history', []),
-                        'join_date': member.joined_at.isoformat() if member.joined_at else None,
-                        'last_active': datetime.now().isoformat(),
-                        'engagement_metrics': self.user_data.get(guild.id, {}).get(member.id, {}).get('engagement_metrics', {
-                            'replies': 0,
-                            'mentions': 0,
-                            'threads': 0,
-                            'reactions_given': 0,
-                            'reactions_received': 0
-                        })
-                    } for member in guild.members
-                }
-            }
-        
-        with open('data/analytics_data.json', 'w') as f:
-            json.dump(guild_data, f, indent=4)
-
     def setup_prediction_model(self):
         return {
             'activity_weights': {
@@ -20039,9 +22626,33 @@ class AdvancedUserAnalytics(commands.Cog):
             'trend_window': 7
         }
 
-    def prepare_export_data(self, guild_id, timeframe):
+    async def user_stats(self, member) -> Dict:
+        counts = await self.bot.analytics.totals(member.guild.id, user_id=member.id)
+        return {
+            'messages': counts['message'],
+            'voice_minutes': counts['voice'],
+            'reactions': counts['reaction'],
+            'reactions_given': counts['reaction'],
+            'commands': counts['command']
+        }
+
+    async def prepare_export_data(self, guild_id, timeframe):
         guild = self.bot.get_guild(guild_id)
-        guild_data = self.user_data.get(guild_id, {})
+        days = self.TIMEFRAMES.get(timeframe.lower())
+        since = datetime.now(timezone.utc) - timedelta(days=days or self.message_index.retention_days)
+        totals = await self.bot.analytics.totals(guild_id, days)
+        hourly = {}
+        for bucket, (messages, _) in (await self.message_index.hourly_totals(guild_id, since)).items():
+            hourly[str(bucket % 24)] = hourly.get(str(bucket % 24), 0) + messages
+        guild_data = {
+            'total_messages': totals['message'],
+            'total_reactions': totals['reaction'],
+            'hourly_activity': hourly,
+            'channel_stats': {
+                str(channel_id): channel['messages']
+                for channel_id, channel in (await self.message_index.channel_totals(guild_id, since)).items()
+            }
+        }
 
         data = {
             'timeframe': timeframe,
@@ -20050,6 +22661,8 @@ class AdvancedUserAnalytics(commands.Cog):
             'analytics': {
                 'activity': {
                     'messages': guild_data.get('total_messages', 0),
+                    'voice_minutes': totals['voice'],
+                    'commands': totals['command'],
                     'active_users': len([m for m in guild.members if not m.bot]),
                     'reactions': guild_data.get('total_reactions', 0),
                     'peak_hour': max(range(24), key=lambda h: guild_data.get('hourly_activity', {}).get(str(h), 0)),
@@ -20107,139 +22720,111 @@ class AdvancedUserAnalytics(commands.Cog):
     async def show_analytics(self, ctx, target: Union[discord.Member, str] = None):
         if isinstance(target, str) and target.lower() == "server":
             view = ServerAnalyticsView(self, ctx)
-            embed = self.create_server_overview(ctx.guild)
+            embed = await self.create_server_overview(ctx.guild)
             await ctx.send(embed=embed, view=view)
         else:
             member = target or ctx.author
             view = EnhancedUserAnalyticsView(self, ctx, member)
-            embed = self.create_advanced_overview(member)
+            embed = await self.create_advanced_overview(member)
             await ctx.send(embed=embed, view=view)
 
     @commands.command(name="analytics_export")
     @commands.has_permissions(administrator=True)
     async def export_analytics(self, ctx, timeframe: str = "all"):
-        data = self.prepare_export_data(ctx.guild.id, timeframe)
+        data = await self.prepare_export_data(ctx.guild.id, timeframe)
         file = discord.File(
             io.StringIO(json.dumps(data, indent=2)),
             filename=f"analytics_export_{ctx.guild.id}_{timeframe}.json"
         )
         await ctx.send("Analytics data export:", file=file)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if not message.guild or message.author.bot:
-            return
-        if message.guild:  
-            return               
-        guild_id = message.guild.id
-        hour = message.created_at.hour
-        
-
-        if guild_id not in self.user_data:
-            self.user_data[guild_id] = {
-                'total_messages': 0,
-                'message_types': {'text': 0, 'images': 0, 'videos': 0, 'links': 0, 'embeds': 0, 'files': 0},
-                'hourly_activity': {str(h): 0 for h in range(24)},
-                'channel_stats': {},
-                'trending_topics': {},
-                'content_metrics': {'total_length': 0}
-            }
-        
+    @commands.command(name="analytics_backfill")
+    @commands.has_permissions(administrator=True)
+    async def backfill_message_index(self, ctx, days: int = 30):
+        days = max(1, min(days, self.message_index.retention_days))
+        cutoff = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        after = cutoff - timedelta(days=days)
+        channels = ctx.guild.text_channels
+        status = await ctx.send(f"📥 Indexing the last {days} days across {len(channels)} channels...")
+
+        scanned = 0
+        for i, channel in enumerate(channels, 1):
+            try:
+                scanned += await self.message_index.backfill_channel(channel, after, cutoff)
+            except discord.Forbidden:
+                continue
+            if i % 5 == 0:
+                await status.edit(content=f"📥 Indexed {i}/{len(channels)} channels ({scanned} messages)...")
 
-        if 'total_messages' not in self.user_data[guild_id]:
-            self.user_data[guild_id]['total_messages'] = 0
-        
-        if 'hourly_activity' not in self.user_data[guild_id]:
-            self.user_data[guild_id]['hourly_activity'] = {str(h): 0 for h in range(24)}
-        elif str(hour) not in self.user_data[guild_id]['hourly_activity']:
-            self.user_data[guild_id]['hourly_activity'][str(hour)] = 0
-        
-        if 'message_types' not in self.user_data[guild_id]:
-            self.user_data[guild_id]['message_types'] = {'text': 0, 'images': 0, 'videos': 0, 'links': 0, 'embeds': 0, 'files': 0}
-        
-        if 'channel_stats' not in self.user_data[guild_id]:
-            self.user_data[guild_id]['channel_stats'] = {}
-        
-        if 'trending_topics' not in self.user_data[guild_id]:
-            self.user_data[guild_id]['trending_topics'] = {}
-        
-        if 'content_metrics' not in self.user_data[guild_id]:
-            self.user_data[guild_id]['content_metrics'] = {'total_length': 0}
-        elif 'total_length' not in self.user_data[guild_id]['content_metrics']:
-            self.user_data[guild_id]['content_metrics']['total_length'] = 0
+        await status.edit(content=f"✅ Indexed {scanned} messages from {len(channels)} channels.")
 
+    async def cog_unload(self):
+        await self.message_index.close()
 
-        self.user_data[guild_id]['total_messages'] += 1
-        self.user_data[guild_id]['hourly_activity'][str(hour)] += 1
-        
-        if message.attachments:
-            for attachment in message.attachments:
-                if hasattr(attachment, 'content_type') and attachment.content_type:
-                    if 'image' in attachment.content_type:
-                        self.user_data[guild_id]['message_types']['images'] += 1
-                    elif 'video' in attachment.content_type:
-                        self.user_data[guild_id]['message_types']['videos'] += 1
-                    else:
-                        self.user_data[guild_id]['message_types']['files'] += 1
-                else:
-                    
-                    self.user_data[guild_id]['message_types']['files'] += 1
-        elif message.embeds:
-            self.user_data[guild_id]['message_types']['embeds'] += 1
-        elif any(url in message.content for url in ['http://', 'https://']):
-            self.user_data[guild_id]['message_types']['links'] += 1
-        else:
-            self.user_data[guild_id]['message_types']['text'] += 1
+    @message_handler(guild_only=True, ignore_bots=True)
+    async def index_message(self, message, context):
+        self.message_index.record_message(message)
 
-        channel_id = str(message.channel.id)
-        self.user_data[guild_id]['channel_stats'][channel_id] = self.user_data[guild_id]['channel_stats'].get(channel_id, 0) + 1
+    @commands.Cog.listener()
+    async def on_message_edit(self, before, after):
+        if after.guild and not after.author.bot:
+            self.message_index.record_edit(before, after)
 
-        self.user_data[guild_id]['content_metrics']['total_length'] += len(message.content)
-        
-        words = message.content.lower().split()
-        for word in words:
-            if len(word) > 3:
-                self.user_data[guild_id]['trending_topics'][word] = self.user_data[guild_id]['trending_topics'].get(word, 0) + 1
+    @commands.Cog.listener()
+    async def on_message_delete(self, message):
+        if message.guild and not message.author.bot:
+            self.message_index.record_message(message, sign=-1)
 
-        self.save_data()
+    @commands.Cog.listener()
+    async def on_reaction_remove(self, reaction, user):
+        if reaction.message.guild and not user.bot:
+            self.message_index.record_reaction(reaction.message, sign=-1)
 
     @commands.Cog.listener()
     async def on_reaction_add(self, reaction, user):
-        if not reaction.message.guild or user.bot:
-            return
-        await self.analytics_db.update_user_activity(
-            user.id,
-            reaction.message.guild.id,
-            'reaction',
-            1
+        if reaction.message.guild and not user.bot:
+            self.message_index.record_reaction(reaction.message)
+
+    async def create_server_overview(self, guild):
+        embed = discord.Embed(
+            title=f"Server Analytics for {guild.name}",
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
         )
 
-    @commands.Cog.listener()
-    async def on_voice_state_update(self, member, before, after):
-        if member.bot:
-            return
-            
-        if not before.channel and after.channel:
-            self.voice_times[member.id] = time.time()
-        elif before.channel and not after.channel and member.id in self.voice_times:
-            duration = time.time() - self.voice_times[member.id]
-            minutes = int(duration / 60)
-            await self.analytics_db.update_user_activity(
-                member.id,
-                member.guild.id,
-                'voice',
-                minutes
+        week = await self.bot.analytics.totals(guild.id, 7)
+        embed.add_field(
+            name="Last 7 Days",
+            value=f"Messages: {week['message']}\n"
+                f"Voice Time: {week['voice']} minutes\n"
+                f"Reactions: {week['reaction']}\n"
+                f"Commands Used: {week['command']}",
+            inline=True
+        )
+        embed.add_field(
+            name="Members",
+            value=f"Total: {guild.member_count}\n"
+                f"In Voice: {sum(len(vc.members) for vc in guild.voice_channels)}",
+            inline=True
+        )
+
+        top = await self.bot.analytics.top_users(guild.id, 7, limit=5)
+        if top:
+            embed.add_field(
+                name="Most Active (7 days)",
+                value="\n".join(f"<@{user_id}>: {count} messages" for user_id, count in top),
+                inline=False
             )
-            del self.voice_times[member.id]
+        return embed
 
-    def create_advanced_overview(self, member):
+    async def create_advanced_overview(self, member):
         embed = discord.Embed(
             title=f"Analytics Overview for {member.name}",
             color=member.color,
             timestamp=datetime.now()
         )
 
-        user_stats = self.user_data.get(member.guild.id, {}).get(str(member.id), {})
+        user_stats = await self.user_stats(member)
         
         activity_score = self.calculate_activity_score(user_stats)
         engagement_rate = self.calculate_engagement_rate(user_stats)
@@ -20248,7 +22833,7 @@ class AdvancedUserAnalytics(commands.Cog):
         embed.add_field(
             name="Activity Metrics",
             value=f"Messages: {user_stats.get('messages', 0)}\n"
-                f"Voice Time: {user_stats.get('voice_time', 0)} minutes\n"
+                f"Voice Time: {user_stats.get('voice_minutes', 0)} minutes\n"
                 f"Reactions: {user_stats.get('reactions', 0)}\n"
                 f"Commands Used: {user_stats.get('commands', 0)}",
             inline=True
@@ -20297,8 +22882,12 @@ class BaseAnalyticsButton(discord.ui.Button):
             pattern.append(sum(week_data) / 7)
         return pattern
 
+    @property
+    def message_index(self):
+        return self.view.cog.message_index
+
     async def get_historical_data(self, guild):
-        now = datetime.now()
+        now = datetime.now(timezone.utc)
         thirty_days_ago = now - timedelta(days=30)
         
         data = {
@@ -20312,18 +22901,11 @@ class BaseAnalyticsButton(discord.ui.Button):
         async for entry in guild.audit_logs(action=discord.AuditLogAction.member_update, after=thirty_days_ago):
             data['members'].append(entry.target.id)
             
+        channel_totals = await self.message_index.channel_totals(guild.id, thirty_days_ago)
         for channel in guild.text_channels:
-            try:
-                message_count = 0
-                reaction_count = 0
-                async for message in channel.history(after=thirty_days_ago, limit=None):
-                    message_count += 1
-                    reaction_count += sum(reaction.count for reaction in message.reactions)
-                    
-                data['message_history'].append(message_count)
-                data['reaction_history'].append(reaction_count)
-            except discord.Forbidden:
-                continue
+            totals = channel_totals.get(channel.id, {})
+            data['message_history'].append(totals.get('messages', 0))
+            data['reaction_history'].append(totals.get('reactions', 0))
                 
         voice_users = sum(len(vc.members) for vc in guild.voice_channels)
         data['voice_history'].append(voice_users)
@@ -20348,16 +22930,12 @@ class ActivityHeatmapButton(BaseAnalyticsButton):
 
     async def get_hourly_activity_data(self, guild):
         data = {i: 0 for i in range(24)}
-        now = datetime.now()
+        now = datetime.now(timezone.utc)
         day_ago = now - timedelta(days=1)
         
-        for channel in guild.text_channels:
-            try:
-                async for message in channel.history(after=day_ago):
-                    hour = message.created_at.hour
-                    data[hour] += 1
-            except discord.Forbidden:
-                continue
+        hourly_totals = await self.message_index.hourly_totals(guild.id, day_ago)
+        for bucket, (messages, _) in hourly_totals.items():
+            data[bucket % 24] += messages
         
         return data
 
@@ -20440,12 +23018,13 @@ class PredictiveTrendsButton(BaseAnalyticsButton):
         }
 
     async def get_historical_data(self, guild):
-        now = datetime.now()
+        now = datetime.now(timezone.utc)
         week_ago = now - timedelta(days=7)
         
         data = {
             'members': [],
-            'message_history': [],
+            'message_count': 0,
+            'hourly_messages': {},
             'reaction_history': [],
             'active_users': set(),
             'channel_activity': {},
@@ -20453,25 +23032,18 @@ class PredictiveTrendsButton(BaseAnalyticsButton):
             'content_types': {'text': 0, 'images': 0, 'links': 0}
         }
         
-        for channel in guild.text_channels:
-            try:
-                async for message in channel.history(after=week_ago):
-                    hour = message.created_at.hour
-                    data['peak_posting_times'][hour] = data['peak_posting_times'].get(hour, 0) + 1
-                    data['active_users'].add(message.author.id)
-                    data['message_history'].append(message.created_at.timestamp())
-                    data['reaction_history'].append(sum(r.count for r in message.reactions))
-                    data['channel_activity'][channel.id] = data['channel_activity'].get(channel.id, 0) + 1
-                    
-                    if message.attachments:
-                        data['content_types']['images'] += 1
-                    elif any(url in message.content for url in ['http://', 'https://']):
-                        data['content_types']['links'] += 1
-                    else:
-                        data['content_types']['text'] += 1
-            except discord.Forbidden:
-                continue
-                
+        for bucket, (messages, _) in (await self.message_index.hourly_totals(guild.id, week_ago)).items():
+            data['hourly_messages'][bucket * 3600] = messages
+            data['peak_posting_times'][bucket % 24] = data['peak_posting_times'].get(bucket % 24, 0) + messages
+            data['message_count'] += messages
+
+        for channel_id, totals in (await self.message_index.channel_totals(guild.id, week_ago)).items():
+            data['channel_activity'][channel_id] = totals['messages']
+            data['reaction_history'].append(totals['reactions'])
+            for content_type in data['content_types']:
+                data['content_types'][content_type] += totals[content_type]
+
+        data['active_users'] = await self.message_index.active_users(guild.id, week_ago)
         data['members'] = [m.id for m in guild.members]
         return data
 
@@ -20494,8 +23066,11 @@ class PredictiveTrendsButton(BaseAnalyticsButton):
         }
 
     def predict_activity_trends(self, data):
-        message_history = data.get('message_history', [])
-        activity_pattern = [sum(1 for msg in message_history if msg > time.time() - 86400 * (i + 1)) for i in range(7)]
+        hourly_messages = data.get('hourly_messages', {})
+        activity_pattern = [
+            sum(count for hour, count in hourly_messages.items() if hour > time.time() - 86400 * (i + 1))
+            for i in range(7)
+        ]
         
         return {
             'daily_predictions': activity_pattern,
@@ -20520,7 +23095,7 @@ class PredictiveTrendsButton(BaseAnalyticsButton):
     def predict_engagement_levels(self, data):
         return {
             'daily_active_users': len(data.get('active_users', [])),
-            'message_frequency': len(data.get('message_history', [])),
+            'message_frequency': data.get('message_count', 0),
             'reaction_rate': sum(data.get('reaction_history', [])),
             'trend': 'increasing'
         }
@@ -20848,7 +23423,7 @@ class ChannelHealthButton(BaseAnalyticsButton):
         await interaction.response.edit_message(embed=embed)
 
     async def analyze_channel_health(self, guild):
-        now = datetime.now()
+        now = datetime.now(timezone.utc)
         week_ago = now - timedelta(days=7)
         
         health_data = {
@@ -20861,38 +23436,31 @@ class ChannelHealthButton(BaseAnalyticsButton):
             'engagement_distribution': {}
         }
         
+        channel_totals = await self.message_index.channel_totals(guild.id, week_ago)
         for channel in guild.text_channels:
-            try:
-                message_count = 0
-                unique_users = set()
-                reaction_count = 0
-                
-                async for message in channel.history(after=week_ago):
-                    message_count += 1
-                    unique_users.add(message.author.id)
-                    reaction_count += sum(r.count for r in message.reactions)
-                    
-                health_score = self.calculate_channel_health_score(
-                    message_count,
-                    len(unique_users),
-                    reaction_count
-                )
-                
-                health_data['channels'][channel.id] = {
-                    'name': channel.name,
-                    'message_count': message_count,
-                    'unique_users': len(unique_users),
-                    'reaction_count': reaction_count,
-                    'health_score': health_score
-                }
-                
-                if health_score < 30:
-                    health_data['inactive_channels'].append(channel.id)
-                elif health_score > 80:
-                    health_data['overactive_channels'].append(channel.id)
-                    
-            except discord.Forbidden:
-                continue
+            totals = channel_totals.get(channel.id, {})
+            message_count = totals.get('messages', 0)
+            unique_users = totals.get('unique_users', 0)
+            reaction_count = totals.get('reactions', 0)
+
+            health_score = self.calculate_channel_health_score(
+                message_count,
+                unique_users,
+                reaction_count
+            )
+            
+            health_data['channels'][channel.id] = {
+                'name': channel.name,
+                'message_count': message_count,
+                'unique_users': unique_users,
+                'reaction_count': reaction_count,
+                'health_score': health_score
+            }
+            
+            if health_score < 30:
+                health_data['inactive_channels'].append(channel.id)
+            elif health_score > 80:
+                health_data['overactive_channels'].append(channel.id)
                 
         return health_data
 
@@ -21085,177 +23653,6 @@ class ContentAnalysisButton(BaseAnalyticsButton):
 
 
 
-class AnalyticsDatabase:
-    def __init__(self):
-        self.db_path = 'data/analytics.db'
-        self.db = None
-        self.queue = []
-        self.flush_interval = 5  
-        self.queue_lock = asyncio.Lock()
-        self.batch_size = 1000  
-        self.last_flush = time.time()
-        asyncio.create_task(self.initialize_db())
-        asyncio.create_task(self.flush_queue_loop())
-
-    async def initialize_db(self):
-        self.db = await aiosqlite.connect(self.db_path)
-        await self.db.execute('PRAGMA journal_mode=WAL')  
-        await self.db.execute('PRAGMA synchronous=NORMAL')  
-        await self.db.execute('PRAGMA cache_size=-64000')  
-        await self.setup_database()
-
-    async def setup_database(self):
-        await self.db.execute('''
-            CREATE TABLE IF NOT EXISTS user_activity (
-                user_id INTEGER,
-                guild_id INTEGER,
-                message_count INTEGER DEFAULT 0,
-                voice_minutes INTEGER DEFAULT 0,
-                reaction_count INTEGER DEFAULT 0,
-                command_count INTEGER DEFAULT 0,
-                timestamp DATETIME,
-                PRIMARY KEY (user_id, guild_id, timestamp)
-            ) WITHOUT ROWID
-        ''')
-        
-        await self.db.execute('''
-            CREATE TABLE IF NOT EXISTS guild_metrics (
-                guild_id INTEGER,
-                member_count INTEGER DEFAULT 0,
-                active_members INTEGER DEFAULT 0,
-                message_count INTEGER DEFAULT 0,
-                voice_users INTEGER DEFAULT 0,
-                timestamp DATETIME,
-                PRIMARY KEY (guild_id, timestamp)
-            ) WITHOUT ROWID
-        ''')
-        
-        await self.db.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON user_activity(timestamp)')
-        await self.db.commit()
-
-    async def flush_queue_loop(self):
-        while True:
-            try:
-                await asyncio.sleep(self.flush_interval)
-                await self.flush_queue()
-            except Exception as e:
-                print(f"Error in flush queue loop: {e}")
-
-    async def flush_queue(self):
-        async with self.queue_lock:
-            if not self.queue:
-                return
-            
-            current_queue = self.queue
-            self.queue = []
-
-        try:
-           
-            for i in range(0, len(current_queue), self.batch_size):
-                batch = current_queue[i:i + self.batch_size]
-                await self.db.executemany('''
-                    INSERT INTO user_activity 
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(user_id, guild_id, timestamp) 
-                    DO UPDATE SET 
-                        message_count = message_count + ?,
-                        voice_minutes = voice_minutes + ?,
-                        reaction_count = reaction_count + ?,
-                        command_count = command_count + ?
-                ''', batch)
-                
-                await self.db.commit()
-
-        except Exception as e:
-            print(f"Error during queue flush: {e}")
-            
-            async with self.queue_lock:
-                self.queue.extend(current_queue)
-
-    async def update_user_activity(self, user_id, guild_id, activity_type, amount):
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:00:00')
-        
-        values = (
-            user_id, guild_id,
-            amount if activity_type == 'message' else 0,
-            amount if activity_type == 'voice' else 0,
-            amount if activity_type == 'reaction' else 0,
-            amount if activity_type == 'command' else 0,
-            timestamp,
-            amount if activity_type == 'message' else 0,
-            amount if activity_type == 'voice' else 0,
-            amount if activity_type == 'reaction' else 0,
-            amount if activity_type == 'command' else 0
-        )
-        
-        async with self.queue_lock:
-            self.queue.append(values)
-            
-            if len(self.queue) >= self.batch_size:
-                asyncio.create_task(self.flush_queue())
-
-    async def close(self):
-        try:
-            if self.queue:
-                await self.flush_queue()
-            if self.db:
-                await self.db.execute('PRAGMA optimize')  
-                await self.db.close()
-        except Exception as e:
-            print(f"Error during database close: {e}")
-
-
-class Analytics(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.voice_times = {}
-        self.analytics_db = AnalyticsDatabase()
-
-    def cog_unload(self):
-        asyncio.create_task(self.analytics_db.close())
-
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if not message.guild or message.author.bot:
-            return
-        if message.guild:  
-            return           
-        await self.analytics_db.update_user_activity(
-            message.author.id,
-            message.guild.id,
-            'message',
-            1
-        )
-
-    @commands.Cog.listener()
-    async def on_reaction_add(self, reaction, user):
-        if not reaction.message.guild or user.bot:
-            return
-        await self.analytics_db.update_user_activity(
-            user.id,
-            reaction.message.guild.id,
-            'reaction',
-            1
-        )
-
-    @commands.Cog.listener()
-    async def on_voice_state_update(self, member, before, after):
-        if member.bot:
-            return
-            
-        if not before.channel and after.channel:
-            self.voice_times[member.id] = time.time()
-        elif before.channel and not after.channel and member.id in self.voice_times:
-            duration = time.time() - self.voice_times[member.id]
-            minutes = int(duration / 60)
-            await self.analytics_db.update_user_activity(
-                member.id,
-                member.guild.id,
-                'voice',
-                minutes
-            )
-            del self.voice_times[member.id]
-
 class ServerAnalyticsView(discord.ui.View):
     def __init__(self, cog, ctx):
         super().__init__(timeout=300)
@@ -23186,15 +25583,13 @@ class AFKSystem(commands.Cog):
         embed = self.create_afk_embed(ctx.author, message)
         await ctx.send(embed=embed)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
+    @message_handler(ignore_bots=True)
+    async def on_message(self, message, context):
         if message.guild:  
             return               
         show_author_afk = False
         if message.author.id in self.bot.afk_users:
-            if not message.content.lower().startswith(f"{self.bot.command_prefix}afk"):
+            if not context.lowered.startswith(f"{self.bot.command_prefix}afk"):
                 show_author_afk = True
 
         for mention in message.mentions:
@@ -23229,6 +25624,7 @@ class EnhancedMinigames(commands.Cog):
         self.bot = bot
         self.active_games = {}
         self.scores = {}
+        self.rankings = defaultdict(RankedIndex)
         self.streaks = {}
         self.achievements = {}
         self.daily_challenges = {}
@@ -23311,6 +25707,8 @@ class EnhancedMinigames(commands.Cog):
         
         stats['games'][game_type]['played'] += 1
         stats['games'][game_type]['win_rate'] = (stats['games'][game_type]['wins'] / stats['games'][game_type]['played']) * 100
+        self.rankings['all'].update(user_id, stats['total_wins'])
+        self.rankings[game_type].update(user_id, stats['games'][game_type]['wins'])
 
         if extra_data:
             game_stats = stats['games'][game_type]
@@ -23647,6 +26045,7 @@ class EnhancedMinigames(commands.Cog):
             self.streaks[user_id] = self.streaks.get(user_id, 0) + 1
         else:
             self.streaks[user_id] = 0
+        self.rankings['all'].update(user_id, self.scores[user_id]['wins'])
 
     async def create_game_channel(self, ctx, interaction, game_type):
         overwrites = {
@@ -25048,45 +27447,23 @@ class EnhancedMinigames(commands.Cog):
             f"Top players in {game_type.title()}"
         ).set_color(discord.Color.gold())
 
-        if game_type == "all":
-            sorted_scores = sorted(
-                self.scores.items(),
-                key=lambda x: x[1]['wins'],
-                reverse=True
-            )[:10]
-
-            for i, (user_id, stats) in enumerate(sorted_scores, 1):
-                user = self.bot.get_user(user_id)
-                if user:
-                    embed.add_field(
-                        name=f"#{i} {user.name}",
-                        value=f"Wins: {stats['wins']}\n"
-                              f"Games: {stats['total_games']}\n"
-                              f"Win Rate: {(stats['wins']/stats['total_games']*100):.1f}%",
-                        inline=True
-                    )
-        else:
-            
-            game_scores = {
-                user_id: stats['game_specific'].get(game_type, {'score': 0})
-                for user_id, stats in self.scores.items()
-                if game_type in stats['game_specific']
-            }
-            sorted_scores = sorted(
-                game_scores.items(),
-                key=lambda x: x[1]['score'],
-                reverse=True
-            )[:10]
-
-            for i, (user_id, stats) in enumerate(sorted_scores, 1):
-                user = self.bot.get_user(user_id)
-                if user:
-                    embed.add_field(
-                        name=f"#{i} {user.name}",
-                        value=f"Score: {stats['score']}\n"
-                              f"Best Streak: {stats.get('best_streak', 0)}",
-                        inline=True
-                    )
+        # Ranked by wins from the incrementally maintained index, no re-sort per call
+        game_key = 'aimtrainer' if game_type == "aim" else game_type
+        for i, (user_id, wins) in enumerate(self.rankings[game_key].top(10), 1):
+            user = self.bot.get_user(user_id)
+            if user:
+                stats = self.scores[user_id]
+                if game_key == "all":
+                    played = stats.get('total_games', 0)
+                else:
+                    played = stats['games'][game_key]['played']
+                embed.add_field(
+                    name=f"#{i} {user.name}",
+                    value=f"Wins: {wins}\n"
+                          f"Games: {played}\n"
+                          f"Win Rate: {(wins / played * 100) if played else 0:.1f}%",
+                    inline=True
+                )
 
         await ctx.send(embed=embed.build())
 
@@ -25651,7 +28028,7 @@ class EnhancedAI:
         
     async def process_with_context(self, user_id: int, input_text: str, context: str) -> str:
         if user_id not in self.context_memory:
-            self.context_memory[user_id] = []
+            self.context_memory[user_id] = deque(maxlen=20)
         self.context_memory[user_id].append((datetime.now(), input_text))
         return f"{context}\n{input_text}"
 
@@ -25748,7 +28125,6 @@ class AiResponseSelectView(discord.ui.View):
 class AiCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.client = openai(api_key=os.getenv('OPENAI_API_KEY'))
         self.ai_engine = EnhancedAI()
         self.cooldowns = {}
         self.load_custom_prompts()
@@ -25788,26 +28164,33 @@ class AiCommands(commands.Cog):
             )
             
             try:
-                response = self.client.chat.completions.create(
-                    model=self.ai_engine.model_configs['balanced'],
-                    messages=[
-                        {"role": "system", "content": "You are a highly intelligent and witty AI assistant with deep knowledge and creative thinking capabilities."},
-                        {"role": "user", "content": enhanced_prompt}
-                    ],
+                stream = self.bot.llm.stream(
+                    "openai",
+                    self.ai_engine.model_configs['balanced'],
+                    [{"role": "user", "content": enhanced_prompt}],
+                    guild_id=ctx.guild.id if ctx.guild else None,
+                    system="You are a highly intelligent and witty AI assistant with deep knowledge and creative thinking capabilities.",
                     temperature=0.8,
                     max_tokens=2000
                 )
+                sent = []
+
+                def render(answer, index, done):
+                    embed = discord.Embed(
+                        title="💡 AI Response",
+                        description=answer,
+                        color=self.get_dynamic_color(answer) if done else discord.Color.blue()
+                    )
+                    embed.set_footer(text=f"Chatting with {ctx.author.name} | Context Memory: {len(self.ai_engine.context_memory.get(user_id, []))} messages")
+                    return {"embed": embed}
+
+                async def send(**kwargs):
+                    sent.append(await ctx.send(**kwargs))
+                    return sent[-1]
+
+                await self.bot.llm.relay(stream, send, render, limit=4000)
                 
-                answer = response.choices[0].message.content
-                
-                embed = discord.Embed(
-                    title="💡 AI Response",
-                    description=answer,
-                    color=self.get_dynamic_color(answer)
-                )
-                embed.set_footer(text=f"Chatting with {ctx.author.name} | Context Memory: {len(self.ai_engine.context_memory.get(user_id, []))} messages")
-                
-                message = await ctx.send(embed=embed)
+                message = sent[-1]
                 await message.add_reaction("🔄")  
                 await message.add_reaction("📝")  
                 await message.add_reaction("💾")  
@@ -25826,19 +28209,19 @@ class AiCommands(commands.Cog):
                 
                 enhanced_prompt = f"Create a {style} style image of {actual_prompt}"
                 
-                response = self.client.images.generate(
-                    prompt=enhanced_prompt,
-                    n=1,
-                    size="1024x1024",
-                    quality="hd"
-                )
+                response = await self.bot.llm.request("openai", "/images/generations", {
+                    "prompt": enhanced_prompt,
+                    "n": 1,
+                    "size": "1024x1024",
+                    "quality": "hd"
+                }, guild_id=ctx.guild.id if ctx.guild else None)
                 
                 embed = discord.Embed(
                     title="🎨 AI Creation",
                     description=f"**Style:** {style}\n**Prompt:** {actual_prompt}",
                     color=discord.Color.purple()
                 )
-                embed.set_image(url=response.data[0].url)
+                embed.set_image(url=response["data"][0]["url"])
                 
                 message = await ctx.send(embed=embed)
                 await message.add_reaction("🎨") 
@@ -25853,10 +28236,11 @@ class AiCommands(commands.Cog):
        
         async with ctx.typing():
             try:
+                guild_id = ctx.guild.id if ctx.guild else None
                 analyses = await asyncio.gather(
-                    self.get_sentiment_analysis(content),
-                    self.get_topic_analysis(content),
-                    self.get_style_analysis(content)
+                    self.get_sentiment_analysis(content, guild_id),
+                    self.get_topic_analysis(content, guild_id),
+                    self.get_style_analysis(content, guild_id)
                 )
                 
                 embed = discord.Embed(
@@ -25907,35 +28291,32 @@ class AiCommands(commands.Cog):
         )
         return embed
 
-    async def get_sentiment_analysis(self, text):
-        response = self.client.chat.completions.create(
-            model=self.ai_engine.model_configs['fast'],
-            messages=[
-                {"role": "system", "content": "Analyze the sentiment and emotional tone of the following text."},
-                {"role": "user", "content": text}
-            ]
+    async def get_sentiment_analysis(self, text, guild_id: Optional[int] = None):
+        return await self.bot.llm.complete(
+            "openai",
+            self.ai_engine.model_configs['fast'],
+            [{"role": "user", "content": text}],
+            guild_id=guild_id,
+            system="Analyze the sentiment and emotional tone of the following text."
         )
-        return response.choices[0].message.content
 
-    async def get_topic_analysis(self, text):
-        response = self.client.chat.completions.create(
-            model=self.ai_engine.model_configs['fast'],
-            messages=[
-                {"role": "system", "content": "Identify main topics and themes in the following text."},
-                {"role": "user", "content": text}
-            ]
+    async def get_topic_analysis(self, text, guild_id: Optional[int] = None):
+        return await self.bot.llm.complete(
+            "openai",
+            self.ai_engine.model_configs['fast'],
+            [{"role": "user", "content": text}],
+            guild_id=guild_id,
+            system="Identify main topics and themes in the following text."
         )
-        return response.choices[0].message.content
 
-    async def get_style_analysis(self, text):
-        response = self.client.chat.completions.create(
-            model=self.ai_engine.model_configs['fast'],
-            messages=[
-                {"role": "system", "content": "Analyze the writing style and linguistic patterns."},
-                {"role": "user", "content": text}
-            ]
+    async def get_style_analysis(self, text, guild_id: Optional[int] = None):
+        return await self.bot.llm.complete(
+            "openai",
+            self.ai_engine.model_configs['fast'],
+            [{"role": "user", "content": text}],
+            guild_id=guild_id,
+            system="Analyze the writing style and linguistic patterns."
         )
-        return response.choices[0].message.content
 
     def get_dynamic_color(self, text: str) -> discord.Color:
         
@@ -25962,88 +28343,216 @@ class AiCommands(commands.Cog):
 
 
 
+class ArchiveWriter:
+    # Owns one zip file on a single worker thread, so compression and disk writes stay off
+    # the event loop and entries land in the order they were queued.
+    def __init__(self, path: str):
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="archive")
+        self.zip = None
+
+    async def run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def open(self):
+        self.zip = await self.run(zipfile.ZipFile, self.path, 'w', zipfile.ZIP_DEFLATED)
+
+    async def write(self, name: str, data, compress: bool = True):
+        # Attachments are mostly compressed media already, so they are stored as-is
+        await self.run(self.zip.writestr, name, data, zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED)
+
+    async def close(self):
+        if self.zip is not None:
+            await self.run(self.zip.close)
+            self.zip = None
+        self.executor.shutdown(wait=False)
+
+
+class ChannelBackupJob:
+    # Streams one channel into a zip without holding its history in memory: metadata.json,
+    # messages as JSONL chunks (messages/00000.jsonl, ...) and each distinct attachment once
+    # under attachments/<sha256>, with attachments.json mapping attachment ids to entries.
+    # Downloads run on a bounded worker pool fed by a bounded queue while the scan goes on.
+    # With after_id set only newer messages are read, for incremental snapshots.
+    def __init__(self, channel: discord.TextChannel, path: str, after_id: Optional[int] = None,
+                 workers: int = 4, chunk_size: int = 1000, progress=None, progress_interval: float = 2.0):
+        self.channel = channel
+        self.archive = ArchiveWriter(path)
+        self.after_id = after_id
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.last_report = 0.0
+        self.downloads = asyncio.Queue(maxsize=workers * 4)
+        self.stored: Dict[str, str] = {}
+        self.manifest: Dict[str, str] = {}
+        self.messages = 0
+        self.attachments = 0
+        self.deduped = 0
+        self.last_message_id = after_id
+
+    def metadata(self) -> Dict:
+        channel = self.channel
+        return {
+            "name": channel.name,
+            "topic": channel.topic,
+            "category": channel.category.id if channel.category else None,
+            "position": channel.position,
+            "slowmode_delay": channel.slowmode_delay,
+            "nsfw": channel.nsfw,
+            "incremental_after": self.after_id,
+            "permissions": [
+                {
+                    "id": target.id,
+                    "type": "role" if isinstance(target, discord.Role) else "member",
+                    "allow": overwrite.pair()[0].value,
+                    "deny": overwrite.pair()[1].value
+                }
+                for target, overwrite in channel.overwrites.items()
+            ]
+        }
+
+    async def report(self, force: bool = False):
+        if not self.progress or (not force and time.monotonic() - self.last_report < self.progress_interval):
+            return
+        self.last_report = time.monotonic()
+        try:
+            await self.progress(self.messages, self.attachments)
+        except Exception as e:
+            print(f"Backup progress callback failed: {e}")
+
+    async def download_worker(self):
+        while True:
+            attachment = await self.downloads.get()
+            if attachment is None:
+                return
+            try:
+                data = await attachment.read()
+                digest = hashlib.sha256(data).hexdigest()
+                path = self.stored.get(digest)
+                if path is None:
+                    path = self.stored[digest] = f"attachments/{digest}{os.path.splitext(attachment.filename)[1]}"
+                    await self.archive.write(path, data, compress=False)
+                else:
+                    self.deduped += 1
+                self.manifest[str(attachment.id)] = path
+                self.attachments += 1
+            except Exception as e:
+                # A worker that died here would leave the scan blocked on a full queue
+                print(f"Could not back up attachment {attachment.filename}: {e}")
+
+    async def run(self) -> Dict:
+        await self.archive.open()
+        workers = [asyncio.create_task(self.download_worker()) for _ in range(self.workers)]
+        try:
+            await self.archive.write("metadata.json", json.dumps(self.metadata()))
+            chunk, chunk_index = [], 0
+            after = discord.Object(id=self.after_id) if self.after_id else None
+            async for message in self.channel.history(limit=None, after=after, oldest_first=True):
+                chunk.append(json.dumps({
+                    "id": message.id,
+                    "content": message.content,
+                    "author": str(message.author),
+                    "author_id": message.author.id,
+                    "timestamp": message.created_at.isoformat(),
+                    "attachments": [{"id": a.id, "filename": a.filename} for a in message.attachments],
+                    "embeds": [{
+                        "title": embed.title,
+                        "description": embed.description,
+                        "color": embed.color.value if embed.color else None
+                    } for embed in message.embeds if embed.type == 'rich']
+                }, ensure_ascii=False))
+                for attachment in message.attachments:
+                    await self.downloads.put(attachment)
+                self.messages += 1
+                self.last_message_id = message.id
+                if len(chunk) >= self.chunk_size:
+                    await self.archive.write(f"messages/{chunk_index:05d}.jsonl", "\n".join(chunk))
+                    chunk, chunk_index = [], chunk_index + 1
+                await self.report()
+            if chunk:
+                await self.archive.write(f"messages/{chunk_index:05d}.jsonl", "\n".join(chunk))
+
+            for _ in workers:
+                await self.downloads.put(None)
+            await asyncio.gather(*workers)
+            await self.archive.write("attachments.json", json.dumps(self.manifest))
+            await self.report(force=True)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await self.archive.close()
+
+        return {
+            "messages": self.messages,
+            "attachments": self.attachments,
+            "deduped": self.deduped,
+            "last_message_id": self.last_message_id
+        }
+
+
 class ChannelManager(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Last backed-up message per channel, the starting point for incremental snapshots
+        self.snapshots_file = "data/channel_backups.json"
+        self.snapshots = {}
+        if os.path.exists(self.snapshots_file):
+            with open(self.snapshots_file, 'r') as f:
+                self.snapshots = json.load(f)
+
+    def save_snapshots(self):
+        os.makedirs(os.path.dirname(self.snapshots_file), exist_ok=True)
+        with open(self.snapshots_file, 'w') as f:
+            json.dump(self.snapshots, f, indent=4)
 
     @commands.command()
     @commands.has_permissions(manage_channels=True)
-    async def copychannel(self, ctx, channel_id: int):
+    async def copychannel(self, ctx, channel_id: int, mode: str = "full"):
         channel = ctx.guild.get_channel(channel_id)
         if not channel:
             await ctx.send("Channel not found!")
             return
 
-        await ctx.send("Starting channel backup process... This may take a while.")
+        incremental = mode.lower() == "incremental"
+        snapshot = self.snapshots.get(str(channel.id)) if incremental else None
+        if incremental and not snapshot:
+            await ctx.send("No earlier backup of this channel, making a full one.")
 
-        channel_dir = f"channel_backup_{channel.id}"
-        os.makedirs(channel_dir, exist_ok=True)
+        status = await ctx.send("Starting channel backup process... This may take a while.")
 
-        channel_data = {
-            "name": channel.name,
-            "topic": channel.topic,
-            "category": channel.category.id if channel.category else None,
-            "position": channel.position,
-            "slowmode_delay": channel.slowmode_delay,
-            "nsfw": channel.nsfw,
-            "permissions": []
-        }
-
-        for target, overwrite in channel.overwrites.items():
-            perm_dict = {
-                "id": target.id,
-                "type": "role" if isinstance(target, discord.Role) else "member",
-                "allow": overwrite.pair()[0].value,
-                "deny": overwrite.pair()[1].value
-            }
-            channel_data["permissions"].append(perm_dict)
-
-        with open(f"{channel_dir}/metadata.json", "w") as f:
-            json.dump(channel_data, f)
-
-        messages_data = []
-        async for message in channel.history(limit=None, oldest_first=True):
-            msg_data = {
-                "content": message.content,
-                "author": str(message.author),
-                "author_id": message.author.id,
-                "timestamp": message.created_at.isoformat(),
-                "attachments": [],
-                "embeds": [{
-                    "title": embed.title,
-                    "description": embed.description,
-                    "color": embed.color.value if embed.color else None
-                } for embed in message.embeds if embed.type == 'rich']
-            }
-            
-            for attachment in message.attachments:
-                file_path = f"{channel_dir}/{attachment.id}_{attachment.filename}"
-                await attachment.save(file_path)
-                msg_data["attachments"].append({
-                    "filename": attachment.filename,
-                    "backup_path": f"{attachment.id}_{attachment.filename}"
-                })
-            
-            messages_data.append(msg_data)
+        async def progress(messages, attachments):
+            await status.edit(content=f"📦 Backing up... {messages} messages, {attachments} attachments")
 
-        with open(f"{channel_dir}/messages.json", "w", encoding='utf-8') as f:
-            json.dump(messages_data, f, ensure_ascii=False, indent=4)
+        kind = "incremental" if snapshot else "full"
+        zip_filename = f"channel_backup_{channel.id}_{kind}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        job = ChannelBackupJob(channel, zip_filename, after_id=snapshot["last_message_id"] if snapshot else None,
+                               progress=progress)
+        try:
+            summary = await job.run()
+        except discord.Forbidden:
+            await status.edit(content="❌ I can't read that channel's history.")
+            os.remove(zip_filename)
+            return
 
-        zip_filename = f"channel_backup_{channel.id}.zip"
-        with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(channel_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, channel_dir)
-                    zipf.write(file_path, arcname)
+        if summary["last_message_id"]:
+            self.snapshots[str(channel.id)] = {
+                "last_message_id": summary["last_message_id"],
+                "timestamp": datetime.now().isoformat()
+            }
+            self.save_snapshots()
 
-        await ctx.send("Channel backup complete!", file=discord.File(zip_filename))
-        
+        await status.edit(
+            content=f"Channel backup complete! ({kind}: {summary['messages']} messages, {summary['attachments']} "
+                    f"attachments, {summary['deduped']} duplicates stored once)"
+        )
+        try:
+            await ctx.send(file=discord.File(zip_filename))
+        except discord.HTTPException as e:
+            await ctx.send(f"❌ Could not upload the backup ({e}). It was kept on the bot host as `{zip_filename}`.")
+            return
         os.remove(zip_filename)
-        for root, dirs, files in os.walk(channel_dir, topdown=False):
-            for name in files:
-                os.remove(os.path.join(root, name))
-            os.rmdir(root)
 
     @commands.command()
     @commands.has_permissions(manage_channels=True)
@@ -26063,8 +28572,11 @@ class ChannelManager(commands.Cog):
         temp_dir = "temp_channel_restore"
         os.makedirs(temp_dir, exist_ok=True)
         
-        with zipfile.ZipFile("temp_backup.zip", 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
+        def extract():
+            with zipfile.ZipFile("temp_backup.zip", 'r') as zip_ref:
+                zip_ref.extractall(temp_dir)
+
+        await asyncio.to_thread(extract)
 
         with open(f"{temp_dir}/metadata.json", "r") as f:
             channel_data = json.load(f)
@@ -26089,12 +28601,9 @@ class ChannelManager(commands.Cog):
                 overwrite = discord.PermissionOverwrite.from_pair(allow, deny)
                 await new_channel.set_permissions(target, overwrite=overwrite)
 
-        with open(f"{temp_dir}/messages.json", "r", encoding='utf-8') as f:
-            messages_data = json.load(f)
-
         webhook = await new_channel.create_webhook(name="Channel Restore")
         
-        for msg in messages_data:
+        for msg in self.read_backup_messages(temp_dir):
             files = []
             for attachment in msg["attachments"]:
                 file_path = f"{temp_dir}/{attachment['backup_path']}"
@@ -26122,6 +28631,28 @@ class ChannelManager(commands.Cog):
 
         await ctx.send(f"Channel has been restored: {new_channel.mention}")
 
+    def read_backup_messages(self, backup_dir: str):
+        # Streams messages from either layout: the old single messages.json, or the JSONL
+        # chunks plus attachments.json manifest written by ChannelBackupJob
+        legacy = os.path.join(backup_dir, "messages.json")
+        if os.path.exists(legacy):
+            with open(legacy, "r", encoding='utf-8') as f:
+                yield from json.load(f)
+            return
+
+        with open(os.path.join(backup_dir, "attachments.json"), "r") as f:
+            manifest = json.load(f)
+        chunk_dir = os.path.join(backup_dir, "messages")
+        for name in sorted(os.listdir(chunk_dir)) if os.path.isdir(chunk_dir) else []:
+            with open(os.path.join(chunk_dir, name), "r", encoding='utf-8') as f:
+                for line in f:
+                    msg = json.loads(line)
+                    msg["attachments"] = [
+                        {"filename": a["filename"], "backup_path": manifest[str(a["id"])]}
+                        for a in msg["attachments"] if str(a["id"]) in manifest
+                    ]
+                    yield msg
+
 
 class RoleBackup(commands.Cog):
     def __init__(self, bot):
@@ -26325,10 +28856,7 @@ class MusicPlayerView(discord.ui.View):
             if not self.cog.now_playing.get(self.ctx.guild.id) and not interaction.guild.voice_client.is_paused() and self.cog.queues.get(self.ctx.guild.id):
                 first_song = self.cog.queues[self.ctx.guild.id][0]
                 try:
-                    source = await discord.FFmpegOpusAudio.from_probe(
-                        first_song['url'], 
-                        **self.cog.FFMPEG_OPTIONS
-                    )
+                    source = await self.cog.make_source(first_song)
                     interaction.guild.voice_client.play(
                         source, 
                         after=lambda e: asyncio.run_coroutine_threadsafe(
@@ -26361,7 +28889,7 @@ class MusicPlayerView(discord.ui.View):
         interaction.guild.voice_client.stop()
         
         next_song = self.cog.queues[interaction.guild.id][0]
-        source = await discord.FFmpegOpusAudio.from_probe(next_song['url'], **self.cog.FFMPEG_OPTIONS)
+        source = await self.cog.make_source(next_song)
         interaction.guild.voice_client.play(
             source,
             after=lambda e: asyncio.run_coroutine_threadsafe(
@@ -26461,10 +28989,7 @@ class VolumeModal(discord.ui.Modal):
                         
                         interaction.guild.voice_client.stop()
                         
-                        source = await discord.FFmpegOpusAudio.from_probe(
-                            current_song['url'],
-                            **self.cog.FFMPEG_OPTIONS
-                        )
+                        source = await self.cog.make_source(current_song)
                         
                         interaction.guild.voice_client.play(
                             source,
@@ -26480,6 +29005,124 @@ class VolumeModal(discord.ui.Modal):
             await interaction.response.send_message("Enter a valid number!", ephemeral=True)
 
 
+class TrackResolver:
+    # Resolves queries to playable tracks off the event loop, with an LRU cache.
+    # Stream URLs handed out by YouTube expire, so cached entries carry an
+    # expiry and are re-resolved from their webpage URL before they go stale.
+
+    EXPIRE_PATTERN = re.compile(r'[?&/]expire[=/](\d+)')
+
+    def __init__(self, ydl_options, max_workers=None, max_entries=256, default_ttl=3600, refresh_margin=300):
+        max_workers = max_workers or int(os.getenv('MUSIC_RESOLVE_WORKERS', '2'))
+        self.ydl_options = ydl_options
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='yt-dlp')
+        self.semaphore = asyncio.Semaphore(max_workers)
+        self.cache = OrderedDict()
+        self.pending = {}
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.refresh_margin = refresh_margin
+        self.stats = {'hits': 0, 'misses': 0, 'refreshes': 0, 'errors': 0}
+
+    @staticmethod
+    def cache_key(query):
+        return query.strip().lower()
+
+    def _extract(self, query):
+        with yt_dlp.YoutubeDL(self.ydl_options) as ydl:
+            return ydl.extract_info(query, download=False)
+
+    def _build_track(self, info):
+        if info and 'entries' in info:
+            entries = [entry for entry in info['entries'] if entry]
+            info = entries[0] if entries else None
+        if not info or not info.get('url'):
+            return None
+
+        match = self.EXPIRE_PATTERN.search(info['url'])
+        expires_at = int(match.group(1)) if match else time.time() + self.default_ttl
+        seconds = int(info.get('duration') or 0)
+        return {
+            'title': info.get('title', 'Unknown'),
+            'url': info['url'],
+            'thumbnail': info.get('thumbnail'),
+            'duration': str(timedelta(seconds=seconds)),
+            'duration_seconds': seconds,
+            'webpage_url': info.get('webpage_url') or info['url'],
+            'expires_at': expires_at
+        }
+
+    def is_fresh(self, track, lifetime=0):
+        return track['expires_at'] - time.time() > self.refresh_margin + lifetime
+
+    def _get(self, key, lifetime):
+        track = self.cache.get(key)
+        if track is None:
+            return None
+        if not self.is_fresh(track, lifetime):
+            del self.cache[key]
+            return None
+        self.cache.move_to_end(key)
+        return track
+
+    def _put(self, track, *keys):
+        for key in keys:
+            self.cache[key] = track
+            self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+    async def resolve(self, query, lifetime=0, force=False):
+        # Return track metadata for a search term or URL, or None if nothing was found.
+        key = self.cache_key(query)
+        if not force:
+            track = self._get(key, lifetime)
+            if track is not None:
+                self.stats['hits'] += 1
+                return dict(track)
+
+        # Concurrent requests for the same query share a single extraction
+        if key in self.pending:
+            track = await asyncio.shield(self.pending[key])
+            return dict(track) if track else None
+
+        self.stats['misses'] += 1
+        future = self.pending[key] = asyncio.get_running_loop().create_future()
+        track = None
+        try:
+            target = query if query.startswith('http') else f"ytsearch:{query}"
+            async with self.semaphore:
+                info = await asyncio.get_running_loop().run_in_executor(self.executor, self._extract, target)
+            track = self._build_track(info)
+            if track:
+                self._put(track, key, self.cache_key(track['webpage_url']))
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"Error resolving '{query}': {e}")
+        finally:
+            del self.pending[key]
+            future.set_result(track)
+
+        return dict(track) if track else None
+
+    async def refresh(self, song, lifetime=0):
+        # Update a queued song's stream URL in place if it expires within lifetime seconds.
+        if 'expires_at' in song and self.is_fresh(song, lifetime):
+            return song
+
+        self.stats['refreshes'] += 1
+        track = await self.resolve(song.get('webpage_url') or song['url'], lifetime=lifetime)
+        if track:
+            song.update({key: track[key] for key in ('url', 'expires_at', 'webpage_url')})
+            song.pop('codec', None)
+            song.pop('bitrate', None)
+        return song
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.cache.clear()
+
+
 class MusicPlayer(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -26504,6 +29147,50 @@ class MusicPlayer(commands.Cog):
         }
         self.volume = 1.0
         self.loop = False
+        self.resolver = TrackResolver(self.YDL_OPTIONS)
+        self.prefetch_tasks = {}
+
+    def cog_unload(self):
+        for task in self.prefetch_tasks.values():
+            task.cancel()
+        self.resolver.close()
+
+    async def prepare(self, song):
+        await self.resolver.refresh(song, lifetime=song.get('duration_seconds', 0))
+        if 'codec' not in song:
+            song['codec'], song['bitrate'] = await discord.FFmpegOpusAudio.probe(song['url'])
+
+    async def make_source(self, song):
+        # Build an audio source for a queued song, reusing prefetched probe results when available.
+        await self.prepare(song)
+        return discord.FFmpegOpusAudio(song['url'], codec=song['codec'], bitrate=song['bitrate'], **self.FFMPEG_OPTIONS)
+
+    async def prefetch(self, song, delay=0):
+        try:
+            await asyncio.sleep(delay)
+            await self.prepare(song)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error prefetching {song.get('title')}: {e}")
+
+    def schedule_prefetch(self, guild_id, current=None):
+        # Resolve and probe the next queued song while the current one plays.
+        task = self.prefetch_tasks.pop(guild_id, None)
+        if task:
+            task.cancel()
+
+        queue = self.queues.get(guild_id)
+        if not queue:
+            return
+
+        song = queue[0]
+        # Stream URLs may expire while the current song plays, so don't resolve too early
+        delay = 0
+        lifetime = song.get('duration_seconds', 0) + (current or {}).get('duration_seconds', 0)
+        if current and not ('expires_at' in song and self.resolver.is_fresh(song, lifetime)):
+            delay = max(current.get('duration_seconds', 0) - 30, 0)
+        self.prefetch_tasks[guild_id] = self.bot.loop.create_task(self.prefetch(song, delay))
 
     @commands.command()
     async def player(self, ctx):
@@ -26544,24 +29231,10 @@ class MusicPlayer(commands.Cog):
 
 
     async def get_song_info(self, query):
-        try:
-            with yt_dlp.YoutubeDL(self.YDL_OPTIONS) as ydl:
-                if not query.startswith('http'):
-                    query = f"ytsearch:{query}"
-                info = ydl.extract_info(query, download=False)
-                if 'entries' in info:
-                    info = info['entries'][0]
-                
-                return {
-                    'title': info['title'],
-                    'url': info['url'],
-                    'thumbnail': info['thumbnail'],
-                    'duration': str(timedelta(seconds=info['duration'])),
-                    'webpage_url': info['webpage_url']
-                }
-        except Exception as e:
-            print(f"Error in get_song_info: {e}")
+        track = await self.resolver.resolve(query)
+        if not track:
             return None
+        return {key: track[key] for key in ('title', 'url', 'thumbnail', 'duration', 'webpage_url')}
 
 
     @commands.command()
@@ -26588,85 +29261,68 @@ class MusicPlayer(commands.Cog):
             print("\n=== SONG SEARCH ===")
 
             async with ctx.typing():
-                try:
-                    
-                    search_query = f"ytsearch:{query}"
-                    with yt_dlp.YoutubeDL(self.YDL_OPTIONS) as ydl:
-                        info = ydl.extract_info(search_query, download=False)
-                        if 'entries' in info and info['entries']:
-                            video = info['entries'][0]
-                            url = video['webpage_url']
-                            title = video['title']
-                            thumbnail = video['thumbnail']
-                            duration = str(timedelta(seconds=video['duration']))
-                            
-                            print(f"Found: {title}")
-                            url2 = video['url']
-                            source = await discord.FFmpegOpusAudio.from_probe(url2, **self.FFMPEG_OPTIONS)
-
-                    with yt_dlp.YoutubeDL(self.YDL_OPTIONS) as ydl:
-                        info = ydl.extract_info(url, download=False)
-                        url2 = info['url']
-                        source = await discord.FFmpegOpusAudio.from_probe(url2, **self.FFMPEG_OPTIONS)
-
-                        if ctx.guild.id not in self.queues:
-                            self.queues[ctx.guild.id] = []
-
-                        song_info = {
-                            'title': title,
-                            'url': url2,
-                            'thumbnail': thumbnail,
-                            'requester': ctx.author.name,
-                            'duration': duration,
-                            'requested_at': datetime.now().strftime("%H:%M:%S"),
-                            'channel': ctx.channel.id
-                        }
+                track = await self.resolver.resolve(query)
+                if not track:
+                    return await ctx.send("🔍 No results found! Try a different search term.")
+
+                title = track['title']
+                thumbnail = track['thumbnail']
+                duration = track['duration']
+                print(f"Found: {title}")
+
+                if ctx.guild.id not in self.queues:
+                    self.queues[ctx.guild.id] = []
+
+                song_info = {
+                    'title': title,
+                    'url': track['url'],
+                    'webpage_url': track['webpage_url'],
+                    'expires_at': track['expires_at'],
+                    'duration_seconds': track['duration_seconds'],
+                    'thumbnail': thumbnail,
+                    'requester': ctx.author.name,
+                    'duration': duration,
+                    'requested_at': datetime.now().strftime("%H:%M:%S"),
+                    'channel': ctx.channel.id
+                }
 
-                        self.queues[ctx.guild.id].append(song_info)
+                self.queues[ctx.guild.id].append(song_info)
 
-                        if not ctx.voice_client.is_playing():
-                            print("\n=== PLAYING SONG ===")
-                            ctx.voice_client.play(source, after=lambda e: self.bot.loop.create_task(self.play_next(ctx)))
-                            self.now_playing[ctx.guild.id] = title
+                if not ctx.voice_client.is_playing():
+                    print("\n=== PLAYING SONG ===")
+                    source = await self.make_source(song_info)
+                    ctx.voice_client.play(source, after=lambda e: self.bot.loop.create_task(self.play_next(ctx)))
+                    self.now_playing[ctx.guild.id] = title
 
-                            embed = discord.Embed(
-                                title="Now Playing 🎵",
-                                description=title,
-                                color=discord.Color.green()
-                            )
-                            embed.set_thumbnail(url=thumbnail)
-                            embed.add_field(name="Duration", value=duration, inline=True)
-                            embed.add_field(name="Requested by", value=ctx.author.name, inline=True)
-                            embed.add_field(name="Time", value=song_info['requested_at'], inline=True)
-                            embed.set_footer(text=f"Voice Channel: {voice_channel.name}")
-                            
-                            await ctx.send(embed=embed)
-                        else:
-                            print("\n=== ADDED TO QUEUE ===")
-                            embed = discord.Embed(
-                                title="Added to Queue 📝",
-                                description=title,
-                                color=discord.Color.blue()
-                            )
-                            embed.set_thumbnail(url=thumbnail)
-                            embed.add_field(name="Duration", value=duration, inline=True)
-                            embed.add_field(name="Requested by", value=ctx.author.name, inline=True)
-                            embed.add_field(name="Position", value=str(len(self.queues[ctx.guild.id])), inline=True)
-                            embed.set_footer(text=f"Queue Length: {len(self.queues[ctx.guild.id])}")
-                            
-                            await ctx.send(embed=embed)
+                    embed = discord.Embed(
+                        title="Now Playing 🎵",
+                        description=title,
+                        color=discord.Color.green()
+                    )
+                    embed.set_thumbnail(url=thumbnail)
+                    embed.add_field(name="Duration", value=duration, inline=True)
+                    embed.add_field(name="Requested by", value=ctx.author.name, inline=True)
+                    embed.add_field(name="Time", value=song_info['requested_at'], inline=True)
+                    embed.set_footer(text=f"Voice Channel: {voice_channel.name}")
 
-                except Exception as e:
-                    print(f"\n❌ Search Error: {str(e)}")
-                    if 'youtube.com' in query or 'youtu.be' in query:
-                        with yt_dlp.YoutubeDL(self.YDL_OPTIONS) as ydl:
-                            info = ydl.extract_info(query, download=False)
-                            url = info['url']
-                            title = info['title']
-                            thumbnail = info['thumbnail']
-                            duration = str(datetime.timedelta(seconds=info['duration']))
-                    else:
-                        return await ctx.send("🔍 No results found! Try a different search term.")
+                    await ctx.send(embed=embed)
+                else:
+                    print("\n=== ADDED TO QUEUE ===")
+                    embed = discord.Embed(
+                        title="Added to Queue 📝",
+                        description=title,
+                        color=discord.Color.blue()
+                    )
+                    embed.set_thumbnail(url=thumbnail)
+                    embed.add_field(name="Duration", value=duration, inline=True)
+                    embed.add_field(name="Requested by", value=ctx.author.name, inline=True)
+                    embed.add_field(name="Position", value=str(len(self.queues[ctx.guild.id])), inline=True)
+                    embed.set_footer(text=f"Queue Length: {len(self.queues[ctx.guild.id])}")
+
+                    await ctx.send(embed=embed)
+
+                if len(self.queues[ctx.guild.id]) == 1:
+                    self.schedule_prefetch(ctx.guild.id)
 
         except Exception as e:
             print(f"\n❌ ERROR: {str(e)}")
@@ -26686,7 +29342,10 @@ class MusicPlayer(commands.Cog):
 
         try:
             next_song = self.queues[ctx.guild.id].pop(0)
-            source = await discord.FFmpegOpusAudio.from_probe(next_song['url'], **self.FFMPEG_OPTIONS)
+            task = self.prefetch_tasks.pop(ctx.guild.id, None)
+            if task:
+                task.cancel()
+            source = await self.make_source(next_song)
             
             def after_callback(error):
                 if error:
@@ -26695,6 +29354,7 @@ class MusicPlayer(commands.Cog):
                 
             ctx.voice_client.play(source, after=after_callback)
             self.now_playing[ctx.guild.id] = next_song['title']
+            self.schedule_prefetch(ctx.guild.id, next_song)
             
             embed = discord.Embed(title="Now Playing 🎵", description=next_song['title'], color=discord.Color.green())
             embed.set_thumbnail(url=next_song['thumbnail'])
@@ -27330,6 +29990,19 @@ class MoodTracker(commands.Cog):
         
         self.check_moods_task.start()
         self.update_analytics_task.start()
+        self.bot.fanout.register('mood_prompt', self.deliver_mood_prompt)
+
+    def cog_unload(self):
+        self.check_moods_task.cancel()
+        self.update_analytics_task.cancel()
+        self.bot.fanout.unregister('mood_prompt')
+
+    async def deliver_mood_prompt(self, payload: Dict, member_id: int):
+        guild = self.bot.get_guild(payload["guild_id"])
+        member = guild.get_member(member_id) if guild else None
+        if member is None:
+            return False
+        await member.send(embed=self.mood_prompt_embed(), view=self.MoodSelectionView(self, member.id))
 
     @commands.group(name="setup_mood")
     @commands.has_permissions(administrator=True)
@@ -27706,21 +30379,30 @@ class MoodTracker(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def test_mood(self, ctx, role: discord.Role):
         
-        members = [member for member in ctx.guild.members if role in member.roles]
-        for member in members:
-            await self.send_mood_prompt(member)
-        await ctx.send(f"✅ Sent test prompts to {len(members)} members!")
+        status = await ctx.send(f"📨 Sending test prompts to {len(role.members)} members...")
 
-    async def send_mood_prompt(self, member):
-        
-        embed = discord.Embed(
+        async def progress(sent, failed, total, done):
+            if done:
+                await status.edit(content=f"✅ Sent test prompts to {sent} members! ({failed} could not be reached)")
+            else:
+                await status.edit(content=f"📨 Sending test prompts... {sent + failed}/{total}")
+
+        await self.bot.fanout.broadcast(
+            'mood_prompt', [member.id for member in role.members], {"guild_id": ctx.guild.id}, progress=progress
+        )
+
+    def mood_prompt_embed(self) -> discord.Embed:
+        return discord.Embed(
             title="🌟 Mood Check",
             description="How are you feeling?",
             color=discord.Color.blue()
         )
+
+    async def send_mood_prompt(self, member):
+        
         view = self.MoodSelectionView(self, member.id)
         try:
-            await member.send(embed=embed, view=view)
+            await member.send(embed=self.mood_prompt_embed(), view=view)
         except discord.Forbidden:
             pass
 
@@ -27749,11 +30431,11 @@ class MoodTracker(commands.Cog):
             if not role:
                 continue
                 
-            for member in role.members:
-                try:
-                    await self.send_mood_prompt(member)
-                except discord.Forbidden:
-                    continue
+            # Job id is tied to this round, so a restart resumes it instead of starting over
+            await self.bot.fanout.broadcast(
+                'mood_prompt', [member.id for member in role.members], {"guild_id": guild.id},
+                job_id=f"mood:{guild.id}:{int(current_time)}"
+            )
                     
             self.mood_configs[guild_id]['last_check'] = current_time
             self.save_mood_data()
@@ -28653,6 +31335,169 @@ class VerificationSetup(commands.Cog):
 
 
 
+class LevelingStore:
+    # Write-behind persistence for LevelingSystem. XP changes only mark (guild, user) keys
+    # dirty; a periodic flush upserts just those rows into SQLite from a worker thread.
+    # Server settings stay in the JSON file, rewritten atomically only when they change.
+    def __init__(self, db_path: str = "data/leveling.db", settings_file: str = "data/leveling_data.json",
+                 flush_interval: int = 15):
+        self.db_path = db_path
+        self.settings_file = settings_file
+        self.flush_interval = flush_interval
+        self.dirty_users = set()
+        self.deleted_guilds = set()
+        self.settings_dirty = False
+        self.flush_lock = asyncio.Lock()
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS user_xp (
+                guild_id INTEGER,
+                user_id INTEGER,
+                data TEXT NOT NULL,
+                PRIMARY KEY (guild_id, user_id)
+            ) WITHOUT ROWID
+        ''')
+        self.conn.commit()
+
+    def load(self) -> Tuple[Dict[int, Dict[int, Dict]], Dict]:
+        settings = {}
+        if os.path.exists(self.settings_file):
+            with open(self.settings_file, 'r') as f:
+                settings = json.load(f)
+
+        legacy_users = settings.pop('user_data', None)
+        if legacy_users:
+            # One-time migration from the old all-in-one JSON file.
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO user_xp (guild_id, user_id, data) VALUES (?, ?, ?)',
+                [
+                    (int(guild_id), int(user_id), json.dumps(data))
+                    for guild_id, guild_data in legacy_users.items()
+                    for user_id, data in guild_data.items()
+                ]
+            )
+            self.conn.commit()
+            self.settings_dirty = True
+
+        user_data: Dict[int, Dict[int, Dict]] = {}
+        for guild_id, user_id, data in self.conn.execute('SELECT guild_id, user_id, data FROM user_xp'):
+            user_data.setdefault(guild_id, {})[user_id] = json.loads(data)
+        return user_data, settings
+
+    def mark_dirty(self, guild_id: int, user_id: int):
+        self.dirty_users.add((guild_id, user_id))
+
+    def mark_settings_dirty(self):
+        self.settings_dirty = True
+
+    def delete_guild(self, guild_id: int):
+        self.dirty_users = {key for key in self.dirty_users if key[0] != guild_id}
+        self.deleted_guilds.add(guild_id)
+
+    async def flush(self, user_data: Dict[int, Dict[int, Dict]], settings_snapshot):
+        async with self.flush_lock:
+            dirty, self.dirty_users = self.dirty_users, set()
+            deleted, self.deleted_guilds = self.deleted_guilds, set()
+            settings_dirty, self.settings_dirty = self.settings_dirty, False
+
+            rows = []
+            for guild_id, user_id in dirty:
+                data = user_data.get(guild_id, {}).get(user_id)
+                if data is not None:
+                    rows.append((guild_id, user_id, json.dumps(data)))
+            settings = json.dumps(settings_snapshot(), indent=4) if settings_dirty else None
+
+            if not rows and not deleted and settings is None:
+                return
+
+            try:
+                await asyncio.to_thread(self._write, rows, deleted, settings)
+            except Exception as e:
+                self.dirty_users |= dirty
+                self.deleted_guilds |= deleted
+                self.settings_dirty = self.settings_dirty or settings_dirty
+                logger.error(f"Failed to flush leveling data: {e}")
+
+    def _write(self, rows, deleted, settings):
+        with self.conn:
+            if deleted:
+                self.conn.executemany('DELETE FROM user_xp WHERE guild_id = ?', [(guild_id,) for guild_id in deleted])
+            if rows:
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO user_xp (guild_id, user_id, data) VALUES (?, ?, ?)',
+                    rows
+                )
+
+        if settings is not None:
+            temp_file = f"{self.settings_file}.tmp"
+            with open(temp_file, 'w') as f:
+                f.write(settings)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.settings_file)
+
+    async def close(self, user_data: Dict[int, Dict[int, Dict]], settings_snapshot):
+        await self.flush(user_data, settings_snapshot)
+        self.conn.close()
+
+
+class BulkJobView(discord.ui.View):
+    # Live progress message for a bulk member job on the fanout engine, with a cancel
+    # button for the invoking moderator. Pass view.progress as the broadcast callback.
+    def __init__(self, fanout: FanoutEngine, job_id: str, title: str, author_id: int):
+        super().__init__(timeout=None)
+        self.fanout = fanout
+        self.job_id = job_id
+        self.title = title
+        self.author_id = author_id
+        self.message = None
+
+    def embed(self, description: str, color: discord.Color) -> discord.Embed:
+        return discord.Embed(title=self.title, description=description, color=color)
+
+    async def progress(self, sent: int, failed: int, total: int, done: bool):
+        if self.message is None:
+            return
+        if not done:
+            percent = (sent + failed) / total * 100 if total else 100
+            await self.message.edit(embed=self.embed(
+                f"Processed **{sent + failed}/{total}** members ({percent:.0f}%)\nFailed: {failed}",
+                discord.Color.blue()
+            ))
+            return
+
+        counts = await self.fanout.counts(self.job_id)
+        self.stop()
+        await self.message.edit(embed=self.embed(
+            f"Updated: **{counts.get(FanoutEngine.SENT, 0)}**\n"
+            f"Already up to date: **{counts.get(FanoutEngine.SKIPPED, 0)}**\n"
+            f"Failed: **{counts.get(FanoutEngine.FAILED, 0)}**",
+            discord.Color.green()
+        ), view=None)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id and not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("Only the moderator who started this job can cancel it.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.red, emoji="✖️")
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer()
+        await self.fanout.cancel(self.job_id)
+        counts = await self.fanout.counts(self.job_id)
+        self.stop()
+        await interaction.message.edit(embed=self.embed(
+            f"Cancelled after **{sum(counts.values()) - counts.get(FanoutEngine.PENDING, 0)}** of "
+            f"{sum(counts.values())} members.",
+            discord.Color.red()
+        ), view=None)
+
+
 class LevelingSystem(commands.Cog):                         
     def __init__(self, bot):
         self.bot = bot
@@ -28665,48 +31510,65 @@ class LevelingSystem(commands.Cog):
         self.xp_multipliers: Dict[int, Dict[int, float]] = {} 
         self.data_file = "data/leveling_data.json"
         self.leaderboard_channels: Dict[int, int] = {}    
+        self.leaderboard_messages: Dict[int, int] = {}
         self.announcement_channels: Dict[int, int] = {}   
+        self.rankings: Dict[int, RankedIndex] = {}
+        self.stale_leaderboards = set()
+        self.store = LevelingStore(settings_file=self.data_file)
         self.load_data()
         self.bot.loop.create_task(self.update_leaderboard_task())
         self.bot.loop.create_task(self.xp_decay_task())
+        self.bot.loop.create_task(self.persistence_task())
+        self.bot.fanout.register('level_role', self.deliver_level_role, skip=self.level_role_current,
+                                 route=lambda payload, user_id: ('member_roles', payload["guild_id"]),
+                                 route_rate=5.0, route_burst=10)
 
     def load_data(self):
         
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                
-                self.user_data = {
-                    int(guild_id): {
-                        int(user_id): user_data 
-                        for user_id, user_data in guild_data.items()
-                    } for guild_id, guild_data in data.get('user_data', {}).items()
-                }
-                self.roles = data.get('roles', {})
-                self.achievements = data.get('achievements', {})
-                self.xp_multipliers = data.get('xp_multipliers', {})
-                self.leaderboard_channels = data.get('leaderboard_channels', {})
-                self.announcement_channels = data.get('announcement_channels', {})
+        self.user_data, data = self.store.load()
+        self.roles = {
+            int(guild_id): {int(level): int(role_id) for level, role_id in levels.items()}
+            for guild_id, levels in data.get('roles', {}).items() if isinstance(levels, dict)
+        }
+        self.achievements = data.get('achievements', {})
+        self.xp_multipliers = data.get('xp_multipliers', {})
+        self.leaderboard_channels = {int(k): v for k, v in data.get('leaderboard_channels', {}).items()}
+        self.leaderboard_messages = {int(k): v for k, v in data.get('leaderboard_messages', {}).items()}
+        self.announcement_channels = data.get('announcement_channels', {})
+        self.rankings = {
+            guild_id: RankedIndex({user_id: data['xp'] for user_id, data in users.items()})
+            for guild_id, users in self.user_data.items()
+        }
+        self.stale_leaderboards = set(self.leaderboard_channels)
+
+    def settings_snapshot(self) -> Dict:
+        return {
+            'roles': self.roles,
+            'achievements': self.achievements,
+            'xp_multipliers': self.xp_multipliers,
+            'leaderboard_channels': self.leaderboard_channels,
+            'leaderboard_messages': self.leaderboard_messages,
+            'announcement_channels': self.announcement_channels
+        }
 
     def save_data(self):
-            
-            
-            cleaned_user_data = {}
-            for guild_id, guild_data in self.user_data.items():
-                cleaned_user_data[str(guild_id)] = {
-                    str(user_id): user_data
-                    for user_id, user_data in guild_data.items()
-                }
+        
+        self.store.mark_settings_dirty()
+
+    async def flush_data(self):
+        
+        await self.store.flush(self.user_data, self.settings_snapshot)
 
-            with open(self.data_file, 'w') as f:
-                json.dump({
-                    'user_data': cleaned_user_data,
-                    'roles': self.roles,
-                    'achievements': self.achievements,
-                    'xp_multipliers': self.xp_multipliers,
-                    'leaderboard_channels': self.leaderboard_channels,
-                    'announcement_channels': self.announcement_channels
-                }, f, indent=4)
+    async def persistence_task(self):
+        
+        while not self.bot.is_closed():
+            await asyncio.sleep(self.store.flush_interval)
+            await self.flush_data()
+
+    async def cog_unload(self):
+        
+        self.bot.fanout.unregister('level_role')
+        await self.store.close(self.user_data, self.settings_snapshot)
 
     def calculate_level(self, xp: int) -> int:
         
@@ -28716,6 +31578,44 @@ class LevelingSystem(commands.Cog):
         
         return (level + 1) ** 2 * 100
 
+    def ranking(self, guild_id: int) -> RankedIndex:
+        if guild_id not in self.rankings:
+            self.rankings[guild_id] = RankedIndex()
+        return self.rankings[guild_id]
+
+    def xp_changed(self, guild_id: int, user_id: int):
+        # Every XP write goes through here so the ranked index never needs a full re-sort
+        self.ranking(guild_id).update(user_id, self.user_data[guild_id][user_id]['xp'])
+        self.stale_leaderboards.add(guild_id)
+        self.store.mark_dirty(guild_id, user_id)
+
+    def level_role_target(self, member: discord.Member, level: int):
+        # The member's roles with only the highest configured level role they've reached
+        level_roles = self.roles.get(member.guild.id, {})
+        reached = [lvl for lvl in level_roles if lvl <= level]
+        keep = [role for role in member.roles if role.id not in level_roles.values() and not role.is_default()]
+        role = member.guild.get_role(level_roles[max(reached)]) if reached else None
+        return keep + [role] if role else keep
+
+    def member_level(self, guild_id: int, user_id: int) -> int:
+        return self.calculate_level(self.user_data.get(guild_id, {}).get(user_id, {}).get('xp', 0))
+
+    def level_role_current(self, payload: Dict, user_id: int) -> bool:
+        guild = self.bot.get_guild(payload["guild_id"])
+        member = guild.get_member(user_id) if guild else None
+        if member is None:
+            return False
+        target = self.level_role_target(member, self.member_level(guild.id, user_id))
+        return set(target) == {role for role in member.roles if not role.is_default()}
+
+    async def deliver_level_role(self, payload: Dict, user_id: int):
+        guild = self.bot.get_guild(payload["guild_id"])
+        member = guild.get_member(user_id) if guild else None
+        if member is None:
+            return False
+        # One role edit swaps the old level role for the new one
+        await member.edit(roles=self.level_role_target(member, self.member_level(guild.id, user_id)))
+
     async def add_xp(self, user_id: int, guild_id: int):
         
         
@@ -28746,11 +31646,11 @@ class LevelingSystem(commands.Cog):
         old_level = self.calculate_level(user_data['xp'] - xp_gain)
         new_level = self.calculate_level(user_data['xp'])
 
+        self.xp_changed(guild_id, user_id)
+
         if new_level > old_level:
             await self.handle_level_up(user_id, guild_id, new_level)
 
-        self.save_data()
-
 
     async def handle_level_up(self, user_id: int, guild_id: int, level: int):
 
@@ -28788,27 +31688,14 @@ class LevelingSystem(commands.Cog):
         except discord.HTTPException as e:
             print(f"Failed to send level-up announcement: {e}")
 
-        if guild_id in self.roles and level in self.roles[guild_id]:
-            role = discord.utils.get(guild.roles, id=self.roles[guild_id][level])
-            if role:
-                try:
-                    for lvl, role_id in self.roles[guild_id].items():
-                        if lvl != level and role_id in [r.id for r in member.roles]:
-                            previous_role = discord.utils.get(guild.roles, id=role_id)
-                            if previous_role:
-                                await member.remove_roles(previous_role)
-                                print(f"Removed previous level role: {previous_role.name}")
-
-                    await member.add_roles(role)
-                    print(f"Assigned role {role.name} to {member.display_name}")
-                except discord.Forbidden:
-                    print(f"Bot does not have permission to manage roles for {member.display_name}")
-                except discord.HTTPException as e:
-                    print(f"Failed to assign role: {e}")
-            else:
-                print(f"Role for level {level} not found")
-        else:
-            print(f"No role assigned for level {level}")
+        if level in self.roles.get(guild_id, {}) and not self.level_role_current({"guild_id": guild_id}, user_id):
+            try:
+                await self.deliver_level_role({"guild_id": guild_id}, user_id)
+                print(f"Updated level roles for {member.display_name}")
+            except discord.Forbidden:
+                print(f"Bot does not have permission to manage roles for {member.display_name}")
+            except discord.HTTPException as e:
+                print(f"Failed to assign role: {e}")
 
         await self.check_achievements(user_id, guild_id, level)
 
@@ -28822,6 +31709,7 @@ class LevelingSystem(commands.Cog):
         for achievement, data in self.achievements.items():
             if level >= data['required_level'] and achievement not in self.user_data[guild_id][user_id].get('achievements', []):
                 self.user_data[guild_id][user_id].setdefault('achievements', []).append(achievement)
+                self.store.mark_dirty(guild_id, user_id)
                 embed = discord.Embed(
                     title="🏆 Achievement Unlocked! 🏆",
                     description=f"🎉 {member.mention} has unlocked the **{achievement}** achievement! 🎉",
@@ -28834,12 +31722,13 @@ class LevelingSystem(commands.Cog):
         
         await self.bot.wait_until_ready()
         while not self.bot.is_closed():
-            if self.leaderboard_channels:
-                for guild_id, channel_id in self.leaderboard_channels.items():
-                    channel = self.bot.get_channel(channel_id)
-                    if channel:
-                        await self.update_leaderboard(channel)
-            await asyncio.sleep(1800)
+            # Edits are cheap now, so refresh often but only where the ranking changed
+            stale, self.stale_leaderboards = self.stale_leaderboards, set()
+            for guild_id in stale:
+                channel = self.bot.get_channel(self.leaderboard_channels.get(guild_id))
+                if channel:
+                    await self.update_leaderboard(channel)
+            await asyncio.sleep(300)
 
 
     async def update_leaderboard(self, channel: discord.TextChannel):
@@ -28851,33 +31740,40 @@ class LevelingSystem(commands.Cog):
         if guild_id not in self.user_data or not self.user_data[guild_id]:
             return
 
-        sorted_users = sorted(
-            self.user_data[guild_id].items(),
-            key=lambda x: x[1]['xp'],
-            reverse=True
-        )[:10]
-
         embed = discord.Embed(
             title="🏆 Live Leaderboard 🏆",
             description="Top 10 users by XP",
             color=discord.Color.green()
         )
 
-        for i, (user_id, data) in enumerate(sorted_users, 1):
+        for i, (user_id, xp) in enumerate(self.ranking(guild_id).top(10), 1):
             member = channel.guild.get_member(user_id)
             if member:
                 embed.add_field(
                     name=f"{i}. {member.display_name}",
-                    value=f"Level {self.calculate_level(data['xp'])} | {data['xp']} XP",
+                    value=f"Level {self.calculate_level(xp)} | {xp} XP",
                     inline=False
                 )
 
-        async for message in channel.history(limit=10):
-            if message.author == self.bot.user and "🏆 Live Leaderboard 🏆" in message.embeds[0].title:
-                await message.delete()
-                break
+        # The live channel keeps a single message, found by its stored id and edited in place
+        if self.leaderboard_channels[guild_id] != channel.id:
+            await channel.send(embed=embed)
+            return
 
-        await channel.send(embed=embed)
+        message_id = self.leaderboard_messages.get(guild_id)
+        if message_id:
+            try:
+                await channel.get_partial_message(message_id).edit(embed=embed)
+                return
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                print(f"Failed to edit leaderboard in {channel.name}: {e}")
+                return
+
+        message = await channel.send(embed=embed)
+        self.leaderboard_messages[guild_id] = message.id
+        self.save_data()
 
     async def xp_decay_task(self):
         
@@ -28888,14 +31784,12 @@ class LevelingSystem(commands.Cog):
                     last_message = datetime.fromisoformat(data['last_message'])
                     if (datetime.now() - last_message).days > 7:  
                         data['xp'] = max(0, int(data['xp'] * (1 - self.xp_decay_rate)))
-            self.save_data()
+                        self.xp_changed(guild_id, user_id)
             await asyncio.sleep(86400)  
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
+    @message_handler(guild_only=True, ignore_bots=True)
+    async def on_message(self, message: discord.Message, context: MessageContext):
         
-        if message.author.bot or not message.guild:
-            return
         await self.add_xp(message.author.id, message.guild.id)
 
 
@@ -28903,15 +31797,39 @@ class LevelingSystem(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def set_level_role(self, ctx, level: int, role: discord.Role):
         
-        self.roles[level] = role.id
+        self.roles.setdefault(ctx.guild.id, {})[level] = role.id
         self.save_data()
-        await ctx.send(f"✅ Role {role.name} will be assigned at level {level}.")
+        await ctx.send(f"✅ Role {role.name} will be assigned at level {level}. Use `!sync_level_roles` to update existing members.")
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def sync_level_roles(self, ctx):
+        
+        if not self.roles.get(ctx.guild.id):
+            await ctx.send("❌ No level roles are configured for this server.")
+            return
+
+        payload = {"guild_id": ctx.guild.id}
+        targets = [
+            user_id for user_id in self.user_data.get(ctx.guild.id, {})
+            if ctx.guild.get_member(user_id) and not self.level_role_current(payload, user_id)
+        ]
+        if not targets:
+            await ctx.send("✅ Every member already has the right level role.")
+            return
+
+        view = BulkJobView(self.bot.fanout, f"level_role:{ctx.guild.id}:{uuid.uuid4().hex}",
+                           "🔄 Syncing Level Roles", ctx.author.id)
+        view.message = await ctx.send(embed=view.embed(f"Queued **{len(targets)}** members", discord.Color.blue()),
+                                      view=view)
+        await self.bot.fanout.broadcast('level_role', targets, payload, job_id=view.job_id, progress=view.progress)
 
     @commands.command()
     @commands.has_permissions(administrator=True)
     async def set_leaderboard_channel(self, ctx, channel: discord.TextChannel):
         
         self.leaderboard_channels[ctx.guild.id] = channel.id
+        self.leaderboard_messages.pop(ctx.guild.id, None)
         self.save_data()
         await ctx.send(f"✅ Leaderboard will be updated in {channel.mention}.")
         await self.update_leaderboard(channel)
@@ -28931,7 +31849,7 @@ class LevelingSystem(commands.Cog):
         if guild_id not in self.user_data:
             self.user_data[guild_id] = {}
         self.user_data[guild_id][user.id] = {'xp': xp, 'last_message': datetime.now().isoformat()}
-        self.save_data()
+        self.xp_changed(guild_id, user.id)
         await ctx.send(f"✅ Set {user.mention}'s XP to {xp}.")
 
     @commands.command()
@@ -28941,7 +31859,9 @@ class LevelingSystem(commands.Cog):
         guild_id = ctx.guild.id
         if guild_id in self.user_data:
             del self.user_data[guild_id]
-            self.save_data()
+            self.rankings.pop(guild_id, None)
+            self.stale_leaderboards.add(guild_id)
+            self.store.delete_guild(guild_id)
             await ctx.send("✅ Reset all leveling data for this server.")
         else:
             await ctx.send("No leveling data found for this server.")
@@ -28964,6 +31884,24 @@ class LevelingSystem(commands.Cog):
         else:
             await ctx.send("You haven't earned any XP yet!")
 
+    @commands.command()
+    async def rank(self, ctx, member: Optional[discord.Member] = None):
+        
+        member = member or ctx.author
+        ranking = self.ranking(ctx.guild.id)
+        position = ranking.rank(member.id)
+        if position is None:
+            await ctx.send(f"{member.display_name} hasn't earned any XP yet!")
+            return
+
+        xp = ranking.score(member.id)
+        embed = discord.Embed(
+            title=f"🏅 {member.display_name}'s Rank",
+            description=f"Rank: **#{position}** of {len(ranking)}\nLevel: **{self.calculate_level(xp)}**\nXP: **{xp}**",
+            color=discord.Color.green()
+        )
+        await ctx.send(embed=embed)
+
     @commands.command()
     @commands.has_permissions(administrator=True)
     async def levelsetup(self, ctx, channel: Optional[discord.TextChannel] = None):
@@ -29038,7 +31976,7 @@ class LevelingSystem(commands.Cog):
 class CustomLogging(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.logging_config = {}  
+        self.logging_config = bot.config_manager.namespace("custom_logging")
 
     @commands.command()
     @commands.has_permissions(administrator=True)
@@ -29057,10 +31995,12 @@ class CustomLogging(commands.Cog):
 
         if channel:
             self.logging_config[guild_id][action] = channel.id
+            self.logging_config.save(guild_id)
             await ctx.send(f"✅ Logging for `{action}` has been enabled in {channel.mention}.")
         else:
             if action in self.logging_config[guild_id]:
                 del self.logging_config[guild_id][action]
+                self.logging_config.save(guild_id)
                 await ctx.send(f"✅ Logging for `{action}` has been disabled.")
             else:
                 await ctx.send(f"❌ Logging for `{action}` is already disabled.")
@@ -29090,11 +32030,11 @@ class CustomLogging(commands.Cog):
 
     async def log_action(self, guild_id, action, moderator, user, reason, duration=None):
         print(f"Logging {action} for {user} in guild {guild_id}")  # Debug print
-        if guild_id not in self.logging_config or action not in self.logging_config[guild_id]:
+        channel_id = self.logging_config.get(guild_id, {}).get(action)
+        if channel_id is None:
             print("Logging not configured for this action.")  # Debug print
             return
 
-        channel_id = self.logging_config[guild_id][action]
         channel = self.bot.get_channel(channel_id)
         if not channel:
             print(f"Channel {channel_id} not found.")  # Debug print
@@ -29119,7 +32059,7 @@ class MessagePurge(commands.Cog):
 
     @commands.command()
     @commands.has_permissions(manage_messages=True)
-    async def purge(self, ctx, condition: str, count: str = "nuke"):
+    async def purge(self, ctx, condition: str, count: str = "nuke", *filters: str):
 
         if count.lower() == "nuke":
             count = None  
@@ -29133,34 +32073,73 @@ class MessagePurge(commands.Cog):
                 await ctx.send("❌ Invalid count. Use a number or 'nuke'.")
                 return
 
-        def check(message):
-            if condition.lower() == "bots":
-                return message.author.bot
-            elif condition.lower() == "links":
-                return "http://" in message.content or "https://" in message.content
-            else:
-                try:
-                    user_id = int(condition)  
-                    return message.author.id == user_id
-                except ValueError:
-                    return False
+        try:
+            purge_filter = PurgeFilter([condition, *filters])
+        except ValueError as e:
+            await ctx.send(f"❌ {e}", delete_after=5)
+            return
 
-        if condition.lower() not in ["bots", "links"]:
-            try:
-                user_id = int(condition)  
-            except ValueError:
-                await ctx.send(f"❌ Invalid condition: `{condition}`. Use 'bots', 'links', or a valid user ID.", delete_after=5)
+        channel = ctx.channel
+        if purge_filter.wipe and count is None:
+            view = PurgeWipeView(ctx.author.id)
+            prompt = await ctx.send(embed=discord.Embed(
+                title="🧹 Wipe Channel",
+                description="Clone & replace recreates this channel empty, with its permissions and position. "
+                            "Deleting messages keeps the channel but is slow for old messages.",
+                color=discord.Color.orange()
+            ), view=view)
+            await view.wait()
+            if view.choice is None:
+                await prompt.edit(content="Purge cancelled.", embed=None, view=None, delete_after=5)
+                return
+            if view.choice == "clone":
+                clone = await PurgeJob.replace_channel(channel, reason=f"Channel wipe by {ctx.author}")
+                await clone.send(f"✅ Channel wiped by {ctx.author.mention}.", delete_after=10)
                 return
+            await prompt.delete()
 
-        deleted = await ctx.channel.purge(limit=count, check=check)
-        await ctx.send(f"✅ Deleted {len(deleted)} messages matching the condition: `{condition}`.", delete_after=5)
+        view = PurgeView(ctx.author.id)
+        status = await ctx.send(
+            embed=discord.Embed(title="🧹 Purge", description="Planning...", color=discord.Color.blue()),
+            view=view
+        )
+
+        async def progress(stage, done, total):
+            if stage == "scan":
+                description = f"Planning... {done} messages checked"
+            else:
+                description = f"Deleting... **{done}/{total}**"
+            await status.edit(embed=discord.Embed(title="🧹 Purge", description=description, color=discord.Color.blue()))
+
+        job = PurgeJob(channel, purge_filter, limit=count, before=status, progress=progress)
+        view.task = asyncio.create_task(job.run())
+        await asyncio.wait({view.task})
+        view.stop()
+
+        if view.task.cancelled():
+            total = job.plan.total if job.plan else "?"
+            result = f"✖️ Purge cancelled after deleting {job.deleted} of {total} messages."
+        elif isinstance(view.task.exception(), discord.Forbidden):
+            result = "❌ I don't have permission to delete messages here."
+        elif view.task.exception():
+            result = f"❌ Purge stopped after {job.deleted} messages: {view.task.exception()}"
+        else:
+            result = f"✅ Deleted {job.deleted} messages matching: `{' '.join([condition, *filters])}`."
+        await status.edit(embed=discord.Embed(title="🧹 Purge", description=result, color=discord.Color.green()),
+                          view=None, delete_after=5)
 
 
 
 class ReminderSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.reminders = {}
+        self.bot.timers.register('reminder', self.fire_reminder)
+
+    def cog_unload(self):
+        self.bot.timers.unregister('reminder')
+
+    def user_reminders(self, user_id: int):
+        return [job for job in self.bot.timers.pending('reminder') if job.payload['user_id'] == user_id]
 
     @commands.command(name="reminder")
     async def reminder(self, ctx):
@@ -29211,13 +32190,12 @@ class ReminderSystem(commands.Cog):
                     return
 
                 reminder_time = datetime.now(timezone.utc) + timedelta(seconds=duration_seconds)
-                self.reminders[ctx.author.id] = {
-                    "time": reminder_time,
+                await self.bot.timers.schedule('reminder', reminder_time.timestamp(), {
                     "message": message,
-                    "color": reminder_color,
+                    "color": reminder_color.value,
                     "channel": channel.id,
                     "user_id": ctx.author.id
-                }
+                })
 
                 embed = discord.Embed(
                     title="⏰ Reminder Set",
@@ -29227,8 +32205,6 @@ class ReminderSystem(commands.Cog):
                 embed.add_field(name="Message", value=message, inline=False)
                 await interaction.response.send_message(embed=embed)
 
-                await self.start_reminder(ctx.author.id)
-
             except ValueError as e:
                 await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
 
@@ -29243,31 +32219,63 @@ class ReminderSystem(commands.Cog):
 
         await ctx.send("Click the button below to set a reminder:", view=view)
 
+    def reminder_select(self, user_id: int, placeholder: str) -> Optional[discord.ui.Select]:
+        reminders = self.user_reminders(user_id)[:25]
+        if not reminders:
+            return None
+        return discord.ui.Select(
+            placeholder=placeholder,
+            options=[
+                discord.SelectOption(
+                    label=f"Reminder: {job.payload['message'][:50]}...",
+                    value=job.key,
+                    description=f"Due: {datetime.fromtimestamp(job.due, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')} UTC"
+                )
+                for job in reminders
+            ]
+        )
+
     @commands.command(name="editreminder")
     async def edit_reminder(self, ctx):
-        if ctx.author.id not in self.reminders:
+        select = self.reminder_select(ctx.author.id, "Select a reminder to edit")
+        if not select:
             await ctx.send("❌ You don't have any active reminders to edit.")
             return
 
-        reminder = self.reminders[ctx.author.id]
+        async def select_callback(interaction: discord.Interaction):
+            job = self.bot.timers.get(select.values[0])
+            if not job:
+                await interaction.response.send_message("❌ That reminder has already fired.", ephemeral=True)
+                return
+            await self.handle_reminder_selection(interaction, job)
 
         view = discord.ui.View()
-        select = discord.ui.Select(
-            placeholder="Select a reminder to edit",
-            options=[
-                discord.SelectOption(
-                    label=f"Reminder: {reminder['message'][:50]}...",
-                    value="edit_reminder",
-                    description=f"Due: {reminder['time'].strftime('%Y-%m-%d %H:%M:%S')}"
-                )
-            ]
-        )
-        select.callback = lambda interaction: self.handle_reminder_selection(interaction, reminder)
+        select.callback = select_callback
         view.add_item(select)
 
         await ctx.send("Select the reminder you want to edit:", view=view)
 
-    async def handle_reminder_selection(self, interaction: discord.Interaction, reminder):
+    @commands.command(name="cancelreminder")
+    async def cancel_reminder(self, ctx):
+        select = self.reminder_select(ctx.author.id, "Select a reminder to cancel")
+        if not select:
+            await ctx.send("❌ You don't have any active reminders to cancel.")
+            return
+
+        async def select_callback(interaction: discord.Interaction):
+            if await self.bot.timers.cancel(select.values[0]):
+                await interaction.response.send_message("🗑️ Reminder cancelled.", ephemeral=True)
+            else:
+                await interaction.response.send_message("❌ That reminder has already fired.", ephemeral=True)
+
+        view = discord.ui.View()
+        select.callback = select_callback
+        view.add_item(select)
+
+        await ctx.send("Select the reminder you want to cancel:", view=view)
+
+    async def handle_reminder_selection(self, interaction: discord.Interaction, job):
+        reminder = job.payload
 
         modal = discord.ui.Modal(title="Edit Reminder")
         modal.add_item(discord.ui.TextInput(
@@ -29304,8 +32312,9 @@ class ReminderSystem(commands.Cog):
                     return
 
                 reminder["message"] = new_message
-                reminder["time"] = datetime.now(timezone.utc) + timedelta(seconds=duration_seconds)
-                reminder["color"] = reminder_color
+                reminder["color"] = reminder_color.value
+                due = datetime.now(timezone.utc) + timedelta(seconds=duration_seconds)
+                await self.bot.timers.schedule('reminder', due.timestamp(), reminder, key=job.key)
 
                 embed = discord.Embed(
                     title="⏰ Reminder Updated",
@@ -29317,8 +32326,6 @@ class ReminderSystem(commands.Cog):
                 embed.add_field(name="New Color", value=f"{new_color}", inline=False)
                 await interaction.response.send_message(embed=embed)
 
-                await self.start_reminder(reminder["user_id"])
-
             except ValueError as e:
                 await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
 
@@ -29383,28 +32390,15 @@ class ReminderSystem(commands.Cog):
         except (ValueError, AttributeError):
             return None
 
-    async def start_reminder(self, user_id: int):
-        reminder = self.reminders.get(user_id)
-        if not reminder:
-            return
-
-        reminder_time = reminder["time"]
-        reminder_time = reminder["time"]
-        delay = (reminder_time - datetime.now(timezone.utc)).total_seconds()
-
-        if delay > 0:
-            await asyncio.sleep(delay)
-
-            channel = self.bot.get_channel(reminder["channel"])
-            if channel:
-                embed = discord.Embed(
-                    title="⏰ Reminder",
-                    description=reminder["message"],
-                    color=reminder["color"]
-                )
-                await channel.send(f"<@{reminder['user_id']}>", embed=embed)
-
-            self.reminders.pop(user_id, None)
+    async def fire_reminder(self, reminder: Dict, job):
+        channel = self.bot.get_channel(reminder["channel"])
+        if channel:
+            embed = discord.Embed(
+                title="⏰ Reminder",
+                description=reminder["message"],
+                color=reminder["color"]
+            )
+            await channel.send(f"<@{reminder['user_id']}>", embed=embed)
 
 
 class Snipe(commands.Cog):       
@@ -29413,8 +32407,33 @@ class Snipe(commands.Cog):
         self.deleted_messages = {} 
         self.edited_messages = {}  
         self.snipe_cooldown = {}  
-        self.snipe_duration = 300  
-        self.editsnipe_duration = 300  
+        self.default_duration = 300
+        self.durations = bot.config_manager.namespace("snipe")
+        self.bot.timers.register('snipe_expire', self.expire_snipe)
+
+    def cog_unload(self):
+        self.bot.timers.unregister('snipe_expire')
+
+    def get_duration(self, guild_id, key: str) -> int:
+        if guild_id is None:
+            return self.default_duration
+        return self.durations.get(guild_id, {}).get(key, self.default_duration)
+
+    def set_duration(self, guild_id, key: str, duration: int):
+        config = dict(self.durations.get(guild_id, {}))
+        config[key] = duration
+        self.durations[guild_id] = config
+
+    async def expire_snipe(self, payload: Dict, job):
+        store = self.deleted_messages if payload["kind"] == "delete" else self.edited_messages
+        store.pop(payload["channel_id"], None)
+
+    async def schedule_expiry(self, kind: str, channel_id: int, duration: int):
+        # Reusing the per-channel key pushes expiry back, so a newer snipe is never cut short
+        await self.bot.timers.schedule(
+            'snipe_expire', time.time() + duration, {"kind": kind, "channel_id": channel_id},
+            key=f"snipe:{kind}:{channel_id}", persist=False
+        )
 
     @commands.Cog.listener()
     async def on_message_delete(self, message):
@@ -29429,9 +32448,8 @@ class Snipe(commands.Cog):
             "attachments": [attachment.url for attachment in message.attachments]
         }
 
-        await asyncio.sleep(self.snipe_duration)  
-        if message.channel.id in self.deleted_messages:
-            del self.deleted_messages[message.channel.id]
+        guild_id = message.guild.id if message.guild else None
+        await self.schedule_expiry("delete", message.channel.id, self.get_duration(guild_id, "snipe_duration"))
 
     @commands.Cog.listener()
     async def on_message_edit(self, before, after):
@@ -29446,9 +32464,8 @@ class Snipe(commands.Cog):
             "timestamp": datetime.utcnow()
         }
 
-        await asyncio.sleep(self.editsnipe_duration)  
-        if before.channel.id in self.edited_messages:
-            del self.edited_messages[before.channel.id]
+        guild_id = before.guild.id if before.guild else None
+        await self.schedule_expiry("edit", before.channel.id, self.get_duration(guild_id, "editsnipe_duration"))
 
     @commands.command(name="configuresnipe")
     @commands.has_permissions(manage_messages=True)
@@ -29457,7 +32474,7 @@ class Snipe(commands.Cog):
         if duration < 0:
             await ctx.send("Duration cannot be negative.")
             return
-        self.snipe_duration = duration
+        self.set_duration(ctx.guild.id, "snipe_duration", duration)
         await ctx.send(f"Deleted messages will now be stored for {duration} seconds.")
 
     @commands.command(name="configuresnipeedit")
@@ -29467,7 +32484,7 @@ class Snipe(commands.Cog):
         if duration < 0:
             await ctx.send("Duration cannot be negative.")
             return
-        self.editsnipe_duration = duration
+        self.set_duration(ctx.guild.id, "editsnipe_duration", duration)
         await ctx.send(f"Edited messages will now be stored for {duration} seconds.")
 
     @commands.command(name="snipe_info")
@@ -29477,8 +32494,9 @@ class Snipe(commands.Cog):
             title="⚙️ Snipe Settings",
             color=discord.Color.green()
         )
-        embed.add_field(name="Deleted Messages Duration", value=f"{self.snipe_duration} seconds", inline=False)
-        embed.add_field(name="Edited Messages Duration", value=f"{self.editsnipe_duration} seconds", inline=False)
+        guild_id = ctx.guild.id if ctx.guild else None
+        embed.add_field(name="Deleted Messages Duration", value=f"{self.get_duration(guild_id, 'snipe_duration')} seconds", inline=False)
+        embed.add_field(name="Edited Messages Duration", value=f"{self.get_duration(guild_id, 'editsnipe_duration')} seconds", inline=False)
         await ctx.send(embed=embed)
 
     @commands.command(name="snipe")
@@ -29542,29 +32560,25 @@ class Snipe(commands.Cog):
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class AdvancedInviteTracker(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.invite_cache: Dict[int, Dict[str, Dict]] = {}  
-        self.known_joins: Dict[int, Dict] = {}  
-        self.data_file = "data/invite_tracking_data.json"
-        self.db_file = "data/invite_tracking.db"
-        self.setup_database()
-
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, "r") as f:
-                    data = json.load(f)
-                    self.invite_cache = data.get("invites", {})
-                    self.known_joins = data.get("known_joins", {})
-            except json.JSONDecodeError:
-                logger.error("Failed to load invite tracking data: Invalid JSON format")
+class InviteStore:
+    # aiosqlite store behind AdvancedInviteTracker. Invite snapshots and join records are
+    # queued in memory (latest value per guild / member wins) and written together in one
+    # transaction shortly afterwards, so a raid's worth of joins costs a few commits.
+    def __init__(self, db_path: str = "data/invite_tracking.db", flush_delay: float = 1.0):
+        self.db_path = db_path
+        self.flush_delay = flush_delay
+        self.db = None
+        self.invites: Dict[int, List[Tuple]] = {}
+        self.joins: Dict[int, Optional[Tuple]] = {}
+        self.flush_lock = asyncio.Lock()
+        self.flush_task = None
 
-    def setup_database(self):
-        
-        self.conn = sqlite3.connect(self.db_file)
-        self.cursor = self.conn.cursor()
-        self.cursor.execute('''
+    async def start(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.db = await aiosqlite.connect(self.db_path)
+        await self.db.execute("PRAGMA journal_mode=WAL")
+        await self.db.execute("PRAGMA synchronous=NORMAL")
+        await self.db.executescript("""
             CREATE TABLE IF NOT EXISTS invites (
                 guild_id INTEGER,
                 invite_code TEXT,
@@ -29572,93 +32586,235 @@ class AdvancedInviteTracker(commands.Cog):
                 inviter TEXT,
                 created_at TEXT,
                 PRIMARY KEY (guild_id, invite_code)
-            )
-        ''')
-        self.cursor.execute('''
+            );
             CREATE TABLE IF NOT EXISTS joins (
                 member_id INTEGER PRIMARY KEY,
                 guild_id INTEGER,
                 invite_code TEXT,
                 inviter TEXT,
                 joined_at TEXT
-            )
-        ''')
-        self.conn.commit()
+            );
+            CREATE INDEX IF NOT EXISTS idx_joins_guild ON joins (guild_id);
+        """)
+        await self.db.commit()
+
+    async def load_invites(self) -> Dict[int, Dict[str, Dict]]:
+        cache: Dict[int, Dict[str, Dict]] = {}
+        async with self.db.execute("SELECT guild_id, invite_code, uses, inviter, created_at FROM invites") as cursor:
+            async for guild_id, code, uses, inviter, created_at in cursor:
+                cache.setdefault(guild_id, {})[code] = {"uses": uses, "inviter": inviter, "created_at": created_at}
+        return cache
+
+    async def guild_joins(self, guild_id: int) -> List[Tuple]:
+        await self.flush()
+        async with self.db.execute(
+            "SELECT member_id, guild_id, invite_code, inviter, joined_at FROM joins WHERE guild_id = ?", (guild_id,)
+        ) as cursor:
+            return await cursor.fetchall()
+
+    def save_invites(self, guild_id: int, invites: Dict[str, Dict]):
+        self.invites[guild_id] = [
+            (guild_id, code, entry["uses"], entry["inviter"], entry["created_at"]) for code, entry in invites.items()
+        ]
+        self.schedule_flush()
+
+    def add_join(self, member_id: int, guild_id: int, invite_code: str, inviter: str, joined_at: str):
+        self.joins[member_id] = (member_id, guild_id, invite_code, inviter, joined_at)
+        self.schedule_flush()
+
+    def remove_join(self, member_id: int):
+        self.joins[member_id] = None
+        self.schedule_flush()
+
+    def schedule_flush(self):
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.get_running_loop().create_task(self.flush_later())
+
+    async def flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def flush(self):
+        async with self.flush_lock:
+            invites, self.invites = self.invites, {}
+            joins, self.joins = self.joins, {}
+            if not invites and not joins:
+                return
+            try:
+                if invites:
+                    await self.db.executemany("DELETE FROM invites WHERE guild_id = ?", [(guild_id,) for guild_id in invites])
+                    await self.db.executemany(
+                        "INSERT INTO invites (guild_id, invite_code, uses, inviter, created_at) VALUES (?, ?, ?, ?, ?)",
+                        [row for rows in invites.values() for row in rows]
+                    )
+                removed = [(member_id,) for member_id, row in joins.items() if row is None]
+                if removed:
+                    await self.db.executemany("DELETE FROM joins WHERE member_id = ?", removed)
+                added = [row for row in joins.values() if row is not None]
+                if added:
+                    await self.db.executemany(
+                        "INSERT OR REPLACE INTO joins (member_id, guild_id, invite_code, inviter, joined_at) "
+                        "VALUES (?, ?, ?, ?, ?)", added
+                    )
+                await self.db.commit()
+            except Exception as e:
+                await self.db.rollback()
+                # Keep anything that changed again meanwhile; retry the rest next flush
+                for guild_id, rows in invites.items():
+                    self.invites.setdefault(guild_id, rows)
+                for member_id, row in joins.items():
+                    self.joins.setdefault(member_id, row)
+                logger.error(f"Failed to flush invite tracking data: {e}")
+
+    async def close(self):
+        if self.flush_task:
+            self.flush_task.cancel()
+        if self.db:
+            await self.flush()
+            await self.db.close()
+            self.db = None
+
+
+class AdvancedInviteTracker(commands.Cog):
+    # Join attribution diffs invite use counts against a cache kept current by the
+    # invite create/delete events. Joins are queued per guild and one worker fetches the
+    # invite list for however many joined meanwhile, so a raid shares a few REST calls and
+    # on_member_join itself never waits on one.
+    def __init__(self, bot):
+        self.bot = bot
+        self.invite_cache: Dict[int, Dict[str, Dict]] = {}
+        self.store = InviteStore()
+        self.sync_concurrency = 4
+        self.sync_task = None
+        self.pending_joins: Dict[int, List[discord.Member]] = {}
+        self.join_tasks: Dict[int, asyncio.Task] = {}
+
+    async def cog_load(self):
+        await self.store.start()
+        self.invite_cache = await self.store.load_invites()
+        if self.bot.is_ready():
+            self.start_sync()
+
+    async def cog_unload(self):
+        for task in [self.sync_task, *self.join_tasks.values()]:
+            if task:
+                task.cancel()
+        await self.store.close()
 
     @commands.Cog.listener()
     async def on_ready(self):
-        
+        self.start_sync()
 
+    def start_sync(self):
+        # on_ready fires again after reconnects; never run two syncs at once
+        if self.sync_task is None or self.sync_task.done():
+            self.sync_task = self.bot.loop.create_task(self.sync_invites())
+
+    async def sync_invites(self):
         print('\033[95m' + '[+] ' + '\033[94m' + "Bot is ready. Syncing invites..." + '\033[0m')
-        for guild in self.bot.guilds:
-            try:
-                invites = await guild.invites()
-                self.invite_cache[guild.id] = {
-                    invite.code: {
-                        "uses": invite.uses,
-                        "inviter": invite.inviter.name if invite.inviter else "Unknown",
-                        "created_at": invite.created_at.isoformat() if invite.created_at else "Unknown"
-                    }
-                    for invite in invites
-                }
-                self.update_database(guild.id, invites)
-            except discord.Forbidden:
+        semaphore = asyncio.Semaphore(self.sync_concurrency)
+
+        async def sync(guild):
+            if not guild.me.guild_permissions.manage_guild:
                 logger.warning(f"Missing permission to fetch invites for guild: {guild.name}")
+                return
+            async with semaphore:
+                try:
+                    invites = await guild.invites()
+                except discord.HTTPException as e:
+                    logger.warning(f"Failed to fetch invites for guild {guild.name}: {e}")
+                    return
+            self.snapshot(guild.id, invites)
 
+        await asyncio.gather(*(sync(guild) for guild in self.bot.guilds))
         print('\033[95m' + '[√] ' + '\033[94m' + "Invite sync complete." + '\033[0m')
 
+    @staticmethod
+    def invite_entry(invite: discord.Invite) -> Dict:
+        return {
+            "uses": invite.uses or 0,
+            "max_uses": invite.max_uses or 0,
+            "inviter": invite.inviter.name if invite.inviter else "Unknown",
+            "created_at": invite.created_at.isoformat() if invite.created_at else "Unknown"
+        }
 
-    def update_database(self, guild_id: int, invites: List[discord.Invite]):
-        
-        for invite in invites:
-            self.cursor.execute('''
-                INSERT OR REPLACE INTO invites (guild_id, invite_code, uses, inviter, created_at)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (guild_id, invite.code, invite.uses, invite.inviter.name if invite.inviter else "Unknown", invite.created_at.isoformat() if invite.created_at else "Unknown"))
-        self.conn.commit()
+    def snapshot(self, guild_id: int, invites: List[discord.Invite]) -> Dict[str, Dict]:
+        before = self.invite_cache.get(guild_id, {})
+        self.invite_cache[guild_id] = {invite.code: self.invite_entry(invite) for invite in invites}
+        self.store.save_invites(guild_id, self.invite_cache[guild_id])
+        return before
+
+    def diff_invites(self, guild_id: int, invites: List[discord.Invite]) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+        # One (code, inviter) per use gained since the last snapshot, plus the limited invites
+        # that disappeared meanwhile. A vanished invite may have been used up by a join, but it
+        # may as well have been deleted or expired, so it is only a fallback.
+        before = self.snapshot(guild_id, invites)
+        after = self.invite_cache[guild_id]
+        used = []
+        for code, entry in after.items():
+            gained = entry["uses"] - before.get(code, {}).get("uses", 0)
+            used.extend([(code, entry["inviter"])] * max(gained, 0))
+        vanished = [(code, entry["inviter"]) for code, entry in before.items()
+                    if code not in after and entry.get("max_uses") and entry["uses"] < entry["max_uses"]]
+        return used, vanished
+
+    def credit_joins(self, guild_id: int, invites: List[discord.Invite], joined: int) -> List[Tuple[str, str]]:
+        # Counted uses go to the batch's members in order; each vanished invite covers at most
+        # one member the counted uses could not explain. Nothing carries over to the next batch.
+        used, vanished = self.diff_invites(guild_id, invites)
+        return used[:joined] + vanished[:max(joined - len(used), 0)]
+
+    @commands.Cog.listener()
+    async def on_invite_create(self, invite: discord.Invite):
+        if invite.guild is None:
+            return
+        invites = self.invite_cache.setdefault(invite.guild.id, {})
+        invites[invite.code] = self.invite_entry(invite)
+        self.store.save_invites(invite.guild.id, invites)
+
+    @commands.Cog.listener()
+    async def on_invite_delete(self, invite: discord.Invite):
+        # Limited invites stay cached so the next diff can fall back to them for a join
+        entry = self.invite_cache.get(getattr(invite.guild, 'id', None), {}).get(invite.code)
+        if entry and not entry.get("max_uses"):
+            del self.invite_cache[invite.guild.id][invite.code]
+            self.store.save_invites(invite.guild.id, self.invite_cache[invite.guild.id])
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
-        
-        try:
-            invites_before = self.invite_cache.get(member.guild.id, {})
-            current_invites = await member.guild.invites()
-
-            for invite in current_invites:
-                cached_invite = invites_before.get(invite.code)
-                if cached_invite and invite.uses > cached_invite["uses"]:
-                    inviter = invite.inviter.name if invite.inviter else "Unknown"
-                    invite_code = invite.code
-
-                    self.known_joins[member.id] = {
-                        "joined_at": member.joined_at.isoformat() if member.joined_at else "Unknown",
-                        "invite_code": invite_code,
-                        "inviter": inviter
-                    }
-                    self.cursor.execute('''
-                        INSERT OR REPLACE INTO joins (member_id, guild_id, invite_code, inviter, joined_at)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (member.id, member.guild.id, invite_code, inviter, member.joined_at.isoformat() if member.joined_at else "Unknown"))
-                    self.conn.commit()
-
-                    self.invite_cache[member.guild.id][invite.code]["uses"] = invite.uses
-                    await self.log_join(member, invite_code, inviter)
-                    break
+        guild_id = member.guild.id
+        self.pending_joins.setdefault(guild_id, []).append(member)
+        if guild_id not in self.join_tasks:
+            self.join_tasks[guild_id] = self.bot.loop.create_task(self.attribute_joins(member.guild))
 
-            self.backup_data()
+    async def attribute_joins(self, guild: discord.Guild):
+        try:
+            while self.pending_joins.get(guild.id):
+                members = self.pending_joins.pop(guild.id)
+                try:
+                    invites = await guild.invites()
+                except discord.Forbidden:
+                    logger.warning(f"Missing permission to fetch invites for guild: {guild.name}")
+                    return
+                except discord.HTTPException as e:
+                    logger.warning(f"Failed to fetch invites for guild {guild.name}: {e}")
+                    return
 
-        except discord.Forbidden:
-            logger.warning(f"Missing permission to fetch invites for guild: {member.guild.name}")
+                credits = self.credit_joins(guild.id, invites, len(members))
+                for member, (invite_code, inviter) in zip(members, credits):
+                    joined_at = member.joined_at.isoformat() if member.joined_at else "Unknown"
+                    self.store.add_join(member.id, guild.id, invite_code, inviter, joined_at)
+                    try:
+                        await self.log_join(member, invite_code, inviter)
+                    except discord.HTTPException as e:
+                        logger.warning(f"Failed to log join for {member}: {e}")
+        finally:
+            self.join_tasks.pop(guild.id, None)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
         
-        if member.id in self.known_joins:
-            del self.known_joins[member.id]
-            self.cursor.execute('DELETE FROM joins WHERE member_id = ?', (member.id,))
-            self.conn.commit()
-            self.backup_data()
-            logger.info(f"Member {member.name} ({member.id}) left the server.")
+        self.store.remove_join(member.id)
 
     async def log_join(self, member: discord.Member, invite_code: str, inviter: str):
         
@@ -29676,8 +32832,7 @@ class AdvancedInviteTracker(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def view_historic(self, ctx):
         
-        self.cursor.execute('SELECT * FROM joins WHERE guild_id = ?', (ctx.guild.id,))
-        joins = self.cursor.fetchall()
+        joins = await self.store.guild_joins(ctx.guild.id)
 
         if not joins:
             await ctx.send("📊 No historic join data available.")
@@ -29706,45 +32861,52 @@ class AdvancedInviteTracker(commands.Cog):
             embed.set_footer(text=f"Tracked {len(joins)} total joins.")
             await ctx.send(embed=embed)
 
-    def backup_data(self):
-        
-        data = {
-            "invites": self.invite_cache,
-            "known_joins": self.known_joins
-        }
-        with open(self.data_file, "w") as f:
-            json.dump(data, f, indent=4)
-
-    def cog_unload(self):
-        
-        self.conn.close()
-
 
 
 class Analytics(commands.Cog):
+    # The single writer for activity analytics: messages, reactions, voice minutes and
+    # commands go into bot.analytics, and the scheduled reports read its rollups. Invite
+    # figures come from AdvancedInviteTracker's cache rather than a second invite fetch.
+    INTERVAL_DAYS = {'daily': 1, 'weekly': 7, 'monthly': 30}
+
     def __init__(self, bot):
         self.bot = bot
-        self.invite_tracker = {} 
-        self.join_tracker = {}    
-        self.analytics_channels = {}  
-        self.analytics_tasks = {}  
+        self.voice_times = {}
+        self.join_tracker = {}
+        self.analytics_channels = {}
+        self.analytics_tasks = {}
+        self.setup_task = None
 
-    async def fetch_existing_invites(self):
-        for guild in self.bot.guilds:
-            if guild.id not in self.invite_tracker:
-                self.invite_tracker[guild.id] = {}
-            try:
-                invites = await guild.invites()
-                for invite in invites:
-                    self.invite_tracker[guild.id][invite.code] = {
-                        'code': invite.code,
-                        'creator': invite.inviter.name if invite.inviter else "Unknown",
-                        'uses': invite.uses,
-                        'max_uses': invite.max_uses,
-                        'expires_at': invite.expires_at
-                    }
-            except Exception as e:
-                print(f"Error fetching invites for guild {guild.name}: {e}")
+    async def cog_unload(self):
+        for task in [self.setup_task, *self.analytics_tasks.values()]:
+            if task:
+                task.cancel()
+
+    @message_handler(guild_only=True, ignore_bots=True)
+    async def on_message(self, message, context):
+        self.bot.analytics.record(message.author.id, message.guild.id, 'message')
+
+    @commands.Cog.listener()
+    async def on_command(self, ctx):
+        if ctx.guild and not ctx.author.bot:
+            self.bot.analytics.record(ctx.author.id, ctx.guild.id, 'command')
+
+    @commands.Cog.listener()
+    async def on_reaction_add(self, reaction, user):
+        if not reaction.message.guild or user.bot:
+            return
+        self.bot.analytics.record(user.id, reaction.message.guild.id, 'reaction')
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        if member.bot:
+            return
+            
+        if not before.channel and after.channel:
+            self.voice_times[member.id] = time.time()
+        elif before.channel and not after.channel and member.id in self.voice_times:
+            duration = time.time() - self.voice_times.pop(member.id)
+            self.bot.analytics.record(member.id, member.guild.id, 'voice', int(duration / 60))
 
     async def check_and_setup_analytics(self):
         while True:
@@ -29817,41 +32979,57 @@ class Analytics(commands.Cog):
         while True:
             print(f"Running analytics task for {interval} in guild {guild_id}")
             try:
-                if interval == 'daily':
-                    await asyncio.sleep(86400)
-                elif interval == 'weekly':
-                    await asyncio.sleep(604800)
-                elif interval == 'monthly':
-                    await asyncio.sleep(2592000)
+                await asyncio.sleep(self.INTERVAL_DAYS[interval] * 86400)
 
                 if guild_id not in self.analytics_channels or interval not in self.analytics_channels[guild_id]:
                     continue
 
-                embed = self._generate_analytics_report(guild_id, interval)
+                embed = await self._generate_analytics_report(guild_id, interval)
                 await self.analytics_channels[guild_id][interval].send(embed=embed)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 print(f"Error in _send_analytics for guild {guild_id}: {e}")
                 continue
 
-    def _generate_analytics_report(self, guild_id, interval):
+    async def _generate_analytics_report(self, guild_id, interval):
         embed = discord.Embed(
             title=f"📊 Server Analytics Report ({interval.capitalize()})",
             description="Detailed server activity and statistics",
             color=discord.Color.blue()
         )
 
-        guild_invites = self.invite_tracker.get(guild_id, {})
-        active_invites = [invite for invite in guild_invites.values() if invite['uses'] > 0]
-        expired_invites = [invite for invite in guild_invites.values() if invite['uses'] == 0]
+        days = self.INTERVAL_DAYS[interval]
+        totals = await self.bot.analytics.totals(guild_id, days)
+        embed.add_field(
+            name="💬 Activity",
+            value=f"Messages: {totals['message']}\nVoice: {totals['voice']} minutes\n"
+                  f"Reactions: {totals['reaction']}\nCommands: {totals['command']}",
+            inline=False
+        )
+
+        top = await self.bot.analytics.top_users(guild_id, days, limit=5)
+        if top:
+            embed.add_field(
+                name="🏆 Most Active",
+                value="\n".join(f"<@{user_id}>: {count} messages" for user_id, count in top),
+                inline=False
+            )
+
+        tracker = self.bot.get_cog("AdvancedInviteTracker")
+        guild_invites = tracker.invite_cache.get(guild_id, {}) if tracker else {}
+        active_invites = {code: invite for code, invite in guild_invites.items() if invite['uses'] > 0}
 
         embed.add_field(
             name="🔗 Invites",
-            value=f"Active: {len(active_invites)}\nExpired: {len(expired_invites)}\nTotal Uses: {sum(invite['uses'] for invite in guild_invites.values())}",
+            value=f"Active: {len(active_invites)}\nUnused: {len(guild_invites) - len(active_invites)}\n"
+                  f"Total Uses: {sum(invite['uses'] for invite in guild_invites.values())}",
             inline=False
         )
 
+        cutoff = datetime.now().date() - timedelta(days=days)
         guild_joins = self.join_tracker.get(guild_id, {})
-        total_joins = sum(guild_joins.values())
+        total_joins = sum(count for day, count in guild_joins.items() if day > cutoff)
         embed.add_field(
             name="👥 Member Joins",
             value=f"Total Joins ({interval}): {total_joins}",
@@ -29860,8 +33038,8 @@ class Analytics(commands.Cog):
 
         if active_invites:
             invite_details = "\n".join(
-                f"• {invite['code']}: {invite['uses']} uses (Created by {invite['creator']})"
-                for invite in active_invites
+                f"• {code}: {invite['uses']} uses (Created by {invite['inviter']})"
+                for code, invite in list(active_invites.items())[:15]
             )
             embed.add_field(name="Active Invites", value=invite_details, inline=False)
 
@@ -29874,56 +33052,45 @@ class Analytics(commands.Cog):
             self.join_tracker[guild_id] = {}
         today = datetime.now().date()
         self.join_tracker[guild_id][today] = self.join_tracker[guild_id].get(today, 0) + 1
+        # Reports look back a month at most
+        for day in [day for day in self.join_tracker[guild_id] if (today - day).days > 31]:
+            del self.join_tracker[guild_id][day]
 
     @commands.Cog.listener()
-    async def on_invite_create(self, invite):
-        guild_id = invite.guild.id
-        if guild_id not in self.invite_tracker:
-            self.invite_tracker[guild_id] = {}
-        self.invite_tracker[guild_id][invite.code] = {
-            'code': invite.code,
-            'creator': invite.inviter.name if invite.inviter else "Unknown",
-            'uses': invite.uses,
-            'max_uses': invite.max_uses,
-            'expires_at': invite.expires_at
-        }
+    async def on_ready(self):
+        if self.setup_task is None or self.setup_task.done():
+            self.setup_task = self.bot.loop.create_task(self.check_and_setup_analytics())
 
-    @commands.Cog.listener()
-    async def on_invite_delete(self, invite):
-        guild_id = invite.guild.id
-        if guild_id in self.invite_tracker and invite.code in self.invite_tracker[guild_id]:
-            del self.invite_tracker[guild_id][invite.code]
 
-    @commands.Cog.listener()
-    async def on_member_remove(self, member):
-        guild_id = member.guild.id
-        invites = await member.guild.invites()
-        if guild_id not in self.invite_tracker:
-            self.invite_tracker[guild_id] = {}
-        for invite in invites:
-            if invite.code in self.invite_tracker[guild_id]:
-                self.invite_tracker[guild_id][invite.code]['uses'] = invite.uses
-            else:
-                self.invite_tracker[guild_id][invite.code] = {
-                    'code': invite.code,
-                    'creator': invite.inviter.name if invite.inviter else "Unknown",
-                    'uses': invite.uses,
-                    'max_uses': invite.max_uses,
-                    'expires_at': invite.expires_at
-                }
 
-    @commands.Cog.listener()
-    async def on_ready(self):
-        await self.fetch_existing_invites()
-        self.bot.loop.create_task(self.check_and_setup_analytics())
+class LoggedFile(discord.File):
+    # A discord.File that remembers its byte length, taken while the upload was streamed
+    # in, so batching never has to seek through the file to measure it.
+    __slots__ = ('size',)
 
+    def __init__(self, fp, size: int, **kwargs):
+        super().__init__(fp, **kwargs)
+        self.size = size
 
 
 class WebhookLogger:
+    # Message/command logs are queued and shipped by background workers so command
+    # dispatch never waits on the logging webhook. Workers batch up to 10 embeds per send,
+    # flushing early before the batch's files would pass the webhook upload limit.
     def __init__(self, bot):
         self.bot = bot
         webhook_url = os.getenv('LOGGING_WEBHOOK_URL')
         
+        self.max_batch_embeds = 10
+        self.max_batch_files = 10
+        self.max_embed_chars = 6000
+        self.max_attachment_bytes = int(os.getenv('LOGGING_MAX_ATTACHMENT_MB', '8')) * 1024 * 1024
+        self.max_batch_bytes = int(os.getenv('LOGGING_MAX_UPLOAD_MB', '10')) * 1024 * 1024
+        self.overflow_policy = os.getenv('LOGGING_OVERFLOW_POLICY', 'drop_oldest').lower()
+        self.queue = asyncio.Queue(maxsize=int(os.getenv('LOGGING_QUEUE_SIZE', '1000')))
+        self.metrics = {'enqueued': 0, 'sent': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+        self.workers = []
+
         if webhook_url and webhook_url.lower() != 'none':
             self.webhook_url = webhook_url
             self.session = aiohttp.ClientSession()
@@ -29939,15 +33106,99 @@ class WebhookLogger:
                 if automod:
                     automod.link_whitelist.add(self.webhook_url)
                     automod.link_whitelist.add('discord.com/channels')
+
+            worker_count = max(1, int(os.getenv('LOGGING_WORKERS', '2')))
+            self.workers = [asyncio.create_task(self.worker()) for _ in range(worker_count)]
         else:
             self.webhook_url = None
             self.webhook_id = None
             self.session = None
 
-    async def send_to_webhook(self, content=None, embeds=None, files=None):
+    @property
+    def queue_depth(self) -> int:
+        return self.queue.qsize()
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {**self.metrics, 'queue_depth': self.queue_depth, 'queue_size': self.queue.maxsize, 'workers': len(self.workers)}
+
+    async def enqueue(self, builder, *args):
         if not self.webhook_url:
             return
 
+        item = (builder, args)
+        if self.overflow_policy == 'block':
+            await self.queue.put(item)
+        else:
+            try:
+                self.queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self.metrics['dropped'] += 1
+                if self.overflow_policy == 'drop_newest':
+                    return
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                except asyncio.QueueEmpty:
+                    pass
+                self.queue.put_nowait(item)
+        self.metrics['enqueued'] += 1
+
+    async def worker(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch_embeds:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await self.send_batch(batch)
+            except Exception as e:
+                print(f"Webhook logger worker error: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def send_batch(self, batch):
+        embeds, files, size, file_bytes = [], [], 0, 0
+
+        async def flush():
+            nonlocal embeds, files, size, file_bytes
+            if not embeds:
+                return
+            self.metrics['batches'] += 1
+            if await self.send_to_webhook(embeds=embeds, files=files):
+                self.metrics['sent'] += len(embeds)
+            else:
+                self.metrics['failed'] += len(embeds)
+            embeds, files, size, file_bytes = [], [], 0, 0
+
+        for builder, args in batch:
+            try:
+                embed, entry_files = await builder(*args)
+            except Exception as e:
+                self.metrics['failed'] += 1
+                print(f"Failed to build log entry: {e}")
+                continue
+
+            # Leave room for the "Webhook ID" footer suffix added in send_to_webhook.
+            embed_size = len(embed) + 64
+            entry_bytes = sum(file.size for file in entry_files)
+            if (len(embeds) >= self.max_batch_embeds
+                    or len(files) + len(entry_files) > self.max_batch_files
+                    or file_bytes + entry_bytes > self.max_batch_bytes
+                    or size + embed_size > self.max_embed_chars):
+                await flush()
+            embeds.append(embed)
+            files.extend(entry_files)
+            size += embed_size
+            file_bytes += entry_bytes
+        await flush()
+
+    async def send_to_webhook(self, content=None, embeds=None, files=None) -> bool:
+        if not self.webhook_url:
+            return False
+
         webhook = discord.Webhook.from_url(self.webhook_url, session=self.session)
 
         try:
@@ -29960,29 +33211,80 @@ class WebhookLogger:
                 await webhook.send(
                     content=content,
                     embeds=embeds,
-                    files=files
+                    files=files or discord.utils.MISSING
                 )
             elif embeds and isinstance(embeds[0], discord.Embed):
                 
                 await webhook.send(
                     content=content,
                     embed=embeds[0],
-                    files=files
+                    files=files or discord.utils.MISSING
                 )
             else:
                 
                 await webhook.send(
                     content=content,
-                    files=files
+                    files=files or discord.utils.MISSING
                 )
+            return True
         except Exception as e:
             print(f"Webhook send error details: {str(e)}")
+            return False
 
+    async def stream_attachment(self, attachment) -> Optional[LoggedFile]:
+        # Streams the attachment into a spooled temp file (kept in memory up to 1 MB) instead
+        # of reading the whole upload into a bytes object first.
+        if attachment.size > self.max_attachment_bytes:
+            return None
+
+        buffer = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+        try:
+            async with self.session.get(attachment.url) as response:
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    buffer.write(chunk)
+        except Exception:
+            buffer.close()
+            raise
+        size = buffer.tell()
+        buffer.seek(0)
+        return LoggedFile(buffer, size, filename=attachment.filename)
+
+    async def add_attachments(self, embed, attachments) -> List[LoggedFile]:
+        # One entry's files must fit in a single upload on their own, so anything past
+        # max_batch_bytes is linked instead of re-uploaded.
+        files = []
+        total = 0
+        for attachment in attachments:
+            file_info = (
+                f"📎 Name: {attachment.filename}\n"
+                f"📊 Size: {attachment.size:,} bytes\n"
+                f"📑 Type: {attachment.content_type}\n"
+                f"🔗 URL: {attachment.url}"
+            )
+            try:
+                if total + attachment.size > self.max_batch_bytes:
+                    file = None
+                else:
+                    file = await self.stream_attachment(attachment)
+                if file:
+                    files.append(file)
+                    total += attachment.size
+                elif attachment.size > self.max_attachment_bytes:
+                    file_info += f"\n⚠️ Not re-uploaded (over {self.max_attachment_bytes // (1024 * 1024)} MB)"
+                else:
+                    file_info += f"\n⚠️ Not re-uploaded (upload limit of {self.max_batch_bytes // (1024 * 1024)} MB reached)"
+                embed.add_field("File Attachment", file_info, inline=False)
+            except Exception as e:
+                embed.add_field("⚠️ File Error", f"Failed to process {attachment.filename}: {str(e)}", inline=False)
+        return files
 
     async def log_command(self, ctx):
         if not ctx.guild:
             return
-        
+        await self.enqueue(self.build_command_log, ctx)
+
+    async def build_command_log(self, ctx):
         embed = EmbedBuilder(
             f"Command Used in {ctx.guild.name}",
             f"Command: {ctx.command}\nArgs: {ctx.args[2:]}"
@@ -29998,38 +33300,19 @@ class WebhookLogger:
         message_link = f"https://discord.com/channels/{ctx.guild.id}/{ctx.channel.id}/{ctx.message.id}"
         embed.add_field("Message Link", message_link, inline=False)
         
-        files = []
-        if ctx.message.attachments:
-            for attachment in ctx.message.attachments:
-                try:
-                    file_data = await attachment.read()
-                    file = discord.File(io.BytesIO(file_data), filename=attachment.filename)
-                    files.append(file)
-                    
-                    file_info = (
-                        f"📎 Name: {attachment.filename}\n"
-                        f"📊 Size: {attachment.size:,} bytes\n"
-                        f"📑 Type: {attachment.content_type}\n"
-                        f"🔗 URL: {attachment.url}"
-                    )
-                    embed.add_field("File Attachment", file_info, inline=False)
-                except Exception as e:
-                    embed.add_field("⚠️ File Error", f"Failed to process {attachment.filename}: {str(e)}", inline=False)
-        
-        built_embed = embed.build()
-        if built_embed:
-            try:
-                await self.send_to_webhook(embeds=[built_embed], files=files)
-            except Exception as e:
-                print(f"Failed to send command log: {str(e)}")
+        files = await self.add_attachments(embed, ctx.message.attachments)
+        return embed.build(), files
 
     async def log_message(self, message):
         if not message.guild or not self.webhook_url or self.webhook_url.lower() == 'none':
             return
             
-        if message.webhook_id and message.webhook_id == int(self.webhook_url.split('/')[-2]):
+        if message.webhook_id and message.webhook_id == self.webhook_id:
             return
 
+        await self.enqueue(self.build_message_log, message)
+
+    async def build_message_log(self, message):
         embed = EmbedBuilder(
             f"Message in {message.guild.name}",
             message.content or "No content"
@@ -30058,7 +33341,9 @@ class WebhookLogger:
 
         if message.reference:
             try:
-                ref_msg = await message.channel.fetch_message(message.reference.message_id)
+                ref_msg = message.reference.cached_message or message.reference.resolved
+                if not isinstance(ref_msg, discord.Message):
+                    ref_msg = await message.channel.fetch_message(message.reference.message_id)
                 ref_info = f"Message: {ref_msg.content[:100]}...\nAuthor: {ref_msg.author}\nID: {message.reference.message_id}"
                 embed.add_field("Reply to", ref_info, inline=False)
             except:
@@ -30067,22 +33352,7 @@ class WebhookLogger:
         if message.edited_at:
             embed.add_field("Edited", message.edited_at.strftime("%Y-%m-%d %H:%M:%S"), inline=False)
 
-        files = []
-        for attachment in message.attachments:
-            try:
-                file_data = await attachment.read()
-                file = discord.File(io.BytesIO(file_data), filename=attachment.filename)
-                files.append(file)
-                
-                file_info = (
-                    f"📎 Name: {attachment.filename}\n"
-                    f"📊 Size: {attachment.size:,} bytes\n"
-                    f"📑 Type: {attachment.content_type}\n"
-                    f"🔗 URL: {attachment.url}"
-                )
-                embed.add_field("File Attachment", file_info, inline=False)
-            except Exception as e:
-                embed.add_field("⚠️ File Error", f"Failed to process {attachment.filename}: {str(e)}", inline=False)
+        files = await self.add_attachments(embed, message.attachments)
 
         message_link = f"https://discord.com/channels/{message.guild.id}/{message.channel.id}/{message.id}"
         embed.add_field("Message Link", message_link, inline=False)
@@ -30091,12 +33361,20 @@ class WebhookLogger:
         if message.author.avatar:
             embed.set_thumbnail(message.author.avatar.url)
 
-        built_embed = embed.build()
-        if built_embed:
+        return embed.build(), files
+
+    async def close(self, timeout: float = 10):
+        if self.workers:
             try:
-                await self.send_to_webhook(embeds=[built_embed], files=files)
-            except Exception as e:
-                print(f"Failed to send message log: {str(e)}")
+                await asyncio.wait_for(self.queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                print(f"Webhook logger closed with {self.queue_depth} entries still queued")
+            for worker in self.workers:
+                worker.cancel()
+            self.workers = []
+        if self.session:
+            await self.session.close()
+            self.session = None
 
     def __del__(self):
         if self.session:
@@ -30406,14 +33684,8 @@ class MinigamesCog(commands.Cog):
         
         await channel.send(embed=embed)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
-            
-        if message.channel.id not in self.active_games:
-            return
-            
+    @message_handler(ignore_bots=True, channels='active_games')
+    async def on_message(self, message, context):
         if not message.content.isdigit():
             return
             
@@ -30597,8 +33869,8 @@ class Config(commands.Cog):
         }
 
         snipe_config = {
-            "snipe_duration": snipe_cog.snipe_duration if snipe_cog else 0,
-            "editsnipe_duration": snipe_cog.editsnipe_duration if snipe_cog else 0
+            "snipe_duration": snipe_cog.get_duration(ctx.guild.id, "snipe_duration") if snipe_cog else 0,
+            "editsnipe_duration": snipe_cog.get_duration(ctx.guild.id, "editsnipe_duration") if snipe_cog else 0
         }
 
         leveling_config = {
@@ -30644,15 +33916,10 @@ class Config(commands.Cog):
             },
             "role_configs": role_configs_data,
             "automod": {
-                "caps_threshold": automod_cog.caps_threshold if automod_cog else 0.7,
-                "spam_threshold": getattr(automod_cog, 'spam_threshold', 5),
-                "spam_interval": getattr(automod_cog, 'spam_interval', 5),
-                "spam_timeout_minutes": getattr(automod_cog, 'spam_timeout_minutes', 10),
-                "banned_words": list(automod_cog.banned_words) if automod_cog else [],
-                "link_whitelist": list(automod_cog.link_whitelist) if automod_cog else [],
-                "link_filter_enabled": automod_cog.link_filter_enabled if automod_cog else True,
-                "caps_filter_enabled": getattr(automod_cog, 'caps_enabled', True),
-                "badwords_filter_enabled": getattr(automod_cog, 'badwords_enabled', True)
+                **(automod_cog.config.get(ctx.guild.id) if automod_cog else AutoModSettings()).to_dict(),
+                "banned_words": sorted(
+                    automod_cog.banned_words | automod_cog.config.get(ctx.guild.id).banned_words
+                ) if automod_cog else []
 
             },
             
@@ -30703,7 +33970,7 @@ class Config(commands.Cog):
                 "ghost_ping_counts": AntiGhostPing_cog.ghost_ping_counts if AntiGhostPing_cog else {},
                 "strict_mode": AntiGhostPing_cog.strict_mode if AntiGhostPing_cog else False,
                 "mod_log_channel": AntiGhostPing_cog.mod_log_channel.id if (AntiGhostPing_cog and AntiGhostPing_cog.mod_log_channel) else None,
-                "deletion_history": {str(k): [t.timestamp() for t in v] for k, v in AntiGhostPing_cog._deletion_history.items()} if AntiGhostPing_cog else {},
+                "deletion_history": {str(k): [time.time() - (time.monotonic() - t) for t in v] for k, v in AntiGhostPing_cog._deletion_history.items()} if AntiGhostPing_cog else {},
                 "rapid_delete_threshold": AntiGhostPing_cog._rapid_delete_threshold if AntiGhostPing_cog else 5,
                 "rapid_delete_timeframe": AntiGhostPing_cog._rapid_delete_timeframe if AntiGhostPing_cog else 60
             }
@@ -30750,14 +34017,16 @@ class Config(commands.Cog):
                 await ctx.send("This configuration file is for a different server!")
                 return
 
-            welcome_config = self.deserialize_color(config["welcome_config"])
-            self.bot.get_cog("WelcomeSystem").welcome_configs[ctx.guild.id] = welcome_config
+            # Sections may be missing when AutoConfigLoader keeps the guild's stored copy
+            if "welcome_config" in config:
+                welcome_config = self.deserialize_color(config["welcome_config"])
+                self.bot.get_cog("WelcomeSystem").welcome_configs[ctx.guild.id] = welcome_config
 
             if config["autorole"]:
                 self.bot.get_cog("ServerManagement").autorole_dict[ctx.guild.id] = config["autorole"]
 
             ticket_cog = self.bot.get_cog("TicketSystem")
-            if config["ticket_config"]:
+            if config.get("ticket_config"):
                 if config["ticket_config"].get("support_roles"):
                     ticket_cog.support_roles[ctx.guild.id] = config["ticket_config"]["support_roles"]
                 if config["ticket_config"].get("admin_roles"):
@@ -30832,15 +34101,12 @@ class Config(commands.Cog):
 
             automod = self.bot.get_cog("AutoMod")
             if automod and "automod" in config:
-                automod.caps_threshold = config["automod"]["caps_threshold"]
-                automod.spam_threshold = config["automod"]["spam_threshold"]
-                automod.spam_interval = config["automod"].get("spam_interval", 5)
-                automod.spam_timeout_minutes = config["automod"].get("spam_timeout_minutes", 10)
-                automod.banned_words = set(config["automod"]["banned_words"])
-                automod.link_whitelist = set(config["automod"]["link_whitelist"])
-                automod.link_filter_enabled = config["automod"].get("link_filter_enabled", True)
-                automod.caps_enabled = config["automod"].get("caps_filter_enabled", True)
-                automod.badwords_enabled = config["automod"].get("badwords_filter_enabled", True)
+                settings = AutoModSettings.from_dict(config["automod"])
+                settings.banned_words -= automod.banned_words
+                automod.config.settings[ctx.guild.id] = settings
+                automod.config.save(ctx.guild.id)
+                automod.spam_detector.clear_guild(ctx.guild.id)
+                automod.guild_matchers.pop(ctx.guild.id, None)
 
 
             analytics_cog = self.bot.get_cog("Analytics")
@@ -30923,8 +34189,8 @@ class Config(commands.Cog):
             if "snipe_config" in config:
                 snipe_cog = self.bot.get_cog("Snipe")
                 if snipe_cog:
-                    snipe_cog.snipe_duration = config["snipe_config"]["snipe_duration"]
-                    snipe_cog.editsnipe_duration = config["snipe_config"]["editsnipe_duration"]
+                    snipe_cog.set_duration(ctx.guild.id, "snipe_duration", config["snipe_config"]["snipe_duration"])
+                    snipe_cog.set_duration(ctx.guild.id, "editsnipe_duration", config["snipe_config"]["editsnipe_duration"])
 
             if "mute_config" in config:
                 mute_cog = self.bot.get_cog("MuteSystem")
@@ -30936,7 +34202,7 @@ class Config(commands.Cog):
                 leveling_cog = self.bot.get_cog("LevelingSystem")
                 if leveling_cog:
                     leveling_config = config["leveling_config"]
-                    leveling_cog.roles[ctx.guild.id] = leveling_config.get("roles", {})
+                    leveling_cog.roles[ctx.guild.id] = {int(level): int(role_id) for level, role_id in leveling_config.get("roles", {}).items()}
                     leveling_cog.xp_multipliers[ctx.guild.id] = {
                         k: float(v) if isinstance(v, (int, float, str)) else 1.0
                         for k, v in leveling_config.get("xp_multipliers", {}).items()
@@ -30961,12 +34227,14 @@ class Config(commands.Cog):
                     AntiGhostPing_cog.strict_mode = settings["strict_mode"]
                     if settings["mod_log_channel"]:
                         AntiGhostPing_cog.mod_log_channel = ctx.guild.get_channel(settings["mod_log_channel"])
-                    AntiGhostPing_cog._deletion_history = {
-                        int(k): [datetime.fromtimestamp(t) for t in v]
-                        for k, v in settings["deletion_history"].items()
-                    }
                     AntiGhostPing_cog._rapid_delete_threshold = settings["rapid_delete_threshold"]
                     AntiGhostPing_cog._rapid_delete_timeframe = settings["rapid_delete_timeframe"]
+                    # Exported as unix timestamps; the cog keeps monotonic ones
+                    AntiGhostPing_cog._deletion_history = OrderedDict(
+                        (int(k), deque((time.monotonic() - (time.time() - t) for t in v),
+                                       maxlen=AntiGhostPing_cog._rapid_delete_threshold))
+                        for k, v in settings["deletion_history"].items()
+                    )
 
 
             if "logging_config" in config:
@@ -31155,6 +34423,273 @@ class CreatorResponseCog(commands.Cog):
         for channel in channels_to_remove:
             del self.tracked_questions[channel]
 
+class GuildRestore:
+    # Restores a !backup file by diffing it against the live guild instead of wiping it.
+    # Roles, categories and channels are matched by id (backups that recorded one) or else
+    # by name, and only missing objects are created, drifted ones edited and extra ones
+    # deleted. Phases run in order since channels need the restored roles; calls within a
+    # phase run concurrently under a small semaphore and discord.py paces each route.
+    def __init__(self, guild: discord.Guild, backup: Dict, keep_channel_ids=(), concurrency: int = 5,
+                 progress=None):
+        self.guild = guild
+        self.backup = backup
+        self.keep_channel_ids = set(keep_channel_ids)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.progress = progress
+        self.stats: Dict[str, int] = defaultdict(int)
+        self.roles_by_name: Dict[str, discord.Role] = {}
+        self.categories: Dict[int, discord.CategoryChannel] = {}
+        self.extra_categories = []
+
+    @staticmethod
+    def match(entries: List[Dict], live: list, data_key, live_key):
+        # Pairs every backup entry with a live object, by id first and then by key among
+        # the unclaimed ones. Returns ([(entry, object or None)], unclaimed live objects).
+        by_id = {item.id: item for item in live}
+        matched = {}
+        for index, data in enumerate(entries):
+            item = by_id.get(data.get("id"))
+            if item is not None:
+                matched[index] = item
+        claimed = {item.id for item in matched.values()}
+        by_key = defaultdict(deque)
+        for item in live:
+            if item.id not in claimed:
+                by_key[live_key(item)].append(item)
+        for index, data in enumerate(entries):
+            if index not in matched and by_key[data_key(data)]:
+                item = matched[index] = by_key[data_key(data)].popleft()
+                claimed.add(item.id)
+        pairs = [(data, matched.get(index)) for index, data in enumerate(entries)]
+        return pairs, [item for item in live if item.id not in claimed]
+
+    @staticmethod
+    def role_changes(role: discord.Role, data: Dict) -> Dict:
+        wanted = {
+            "name": data["name"],
+            "color": discord.Color.from_str(data["color"]),
+            "permissions": discord.Permissions(data["permissions"]),
+            "hoist": data["hoist"],
+            "mentionable": data["mentionable"]
+        }
+        current = {
+            "name": role.name,
+            "color": role.color,
+            "permissions": role.permissions,
+            "hoist": role.hoist,
+            "mentionable": role.mentionable
+        }
+        return {field: value for field, value in wanted.items() if current[field] != value}
+
+    def wanted_overwrites(self, data: Dict) -> Dict:
+        wanted = {}
+        for overwrite in data.get("overwrites", []):
+            if overwrite["target_name"] == self.guild.default_role.name:
+                target = self.guild.default_role
+            else:
+                target = self.roles_by_name.get(overwrite["target_name"])
+            if target is not None:
+                allow, deny = overwrite["permissions"]
+                wanted[target] = discord.PermissionOverwrite.from_pair(discord.Permissions(allow), discord.Permissions(deny))
+        return wanted
+
+    def channel_changes(self, channel, data: Dict, category) -> Dict:
+        changes = {}
+        if channel.name != data["name"]:
+            changes["name"] = data["name"]
+        if channel.category_id != (category.id if category else None):
+            changes["category"] = category
+        if isinstance(channel, discord.TextChannel):
+            if (channel.topic or None) != (data.get("topic") or None):
+                changes["topic"] = data.get("topic")
+            if channel.nsfw != data.get("nsfw", False):
+                changes["nsfw"] = data.get("nsfw", False)
+            if channel.slowmode_delay != (data.get("slowmode_delay") or 0):
+                changes["slowmode_delay"] = data.get("slowmode_delay") or 0
+
+        # Role overwrites come from the backup; member overwrites are left as they are
+        wanted = self.wanted_overwrites(data)
+        live_roles = {t: o for t, o in channel.overwrites.items() if isinstance(t, discord.Role)}
+        if {t.id: [p.value for p in o.pair()] for t, o in live_roles.items()} != \
+                {t.id: [p.value for p in o.pair()] for t, o in wanted.items()}:
+            members = {t: o for t, o in channel.overwrites.items() if not isinstance(t, discord.Role)}
+            changes["overwrites"] = {**wanted, **members}
+        return changes
+
+    async def report(self, text: str):
+        if self.progress:
+            try:
+                await self.progress(text)
+            except Exception as e:
+                print(f"Restore progress callback failed: {e}")
+
+    async def gather(self, label: str, coros):
+        async def run(coro):
+            async with self.semaphore:
+                try:
+                    await coro
+                    self.stats[label] += 1
+                except Exception as e:
+                    print(f"Restore step failed ({label}): {e}")
+                    self.stats["failed"] += 1
+
+        await asyncio.gather(*(run(coro) for coro in coros))
+
+    async def restore_roles(self):
+        top = self.guild.me.top_role
+        live = [role for role in self.guild.roles if not role.is_default()]
+        pairs, extras = self.match(self.backup["roles"], live, lambda data: data["name"], lambda role: role.name)
+
+        edits, missing = [], []
+        for data, role in pairs:
+            if role is None:
+                missing.append(data)
+                continue
+            self.roles_by_name[data["name"]] = role
+            if not role.managed and role < top:
+                changes = self.role_changes(role, data)
+                if changes:
+                    edits.append(role.edit(**changes))
+        deletes = [role.delete() for role in extras if not role.managed and role < top]
+        await self.gather("roles edited", edits)
+        await self.gather("roles deleted", deletes)
+
+        # Backups list roles top first; creating bottom-up keeps their relative order
+        for data in reversed(missing):
+            try:
+                self.roles_by_name[data["name"]] = await self.guild.create_role(
+                    name=data["name"],
+                    color=discord.Color.from_str(data["color"]),
+                    permissions=discord.Permissions(data["permissions"]),
+                    hoist=data["hoist"],
+                    mentionable=data["mentionable"]
+                )
+                self.stats["roles created"] += 1
+            except discord.HTTPException as e:
+                print(f"Error creating role {data['name']}: {e}")
+                self.stats["failed"] += 1
+
+    async def restore_categories(self):
+        entries = self.backup["categories"]
+        pairs, self.extra_categories = self.match(
+            entries, list(self.guild.categories), lambda data: data["name"], lambda category: category.name
+        )
+
+        edits = []
+        for index, (data, category) in enumerate(pairs):
+            if category is None:
+                try:
+                    self.categories[index] = await self.guild.create_category(name=data["name"], position=data["position"])
+                    self.stats["categories created"] += 1
+                except discord.HTTPException as e:
+                    print(f"Error creating category {data['name']}: {e}")
+                    self.stats["failed"] += 1
+                continue
+            self.categories[index] = category
+            if category.name != data["name"]:
+                edits.append(category.edit(name=data["name"]))
+        await self.gather("categories edited", edits)
+
+    async def create_channel(self, data: Dict, category):
+        options = {"name": data["name"], "category": category, "position": data["position"],
+                   "overwrites": self.wanted_overwrites(data)}
+        if data["type"] == "voice":
+            await self.guild.create_voice_channel(**options)
+            return
+        channel = await self.guild.create_text_channel(
+            topic=data.get("topic"), nsfw=data.get("nsfw", False), slowmode_delay=data.get("slowmode_delay") or 0,
+            **options
+        )
+        if data.get("messages"):
+            webhook = await channel.create_webhook(name="RestoreBot")
+            for msg_data in reversed(data["messages"]):
+                try:
+                    await webhook.send(
+                        content=msg_data["content"],
+                        username=msg_data["author"],
+                        embeds=[discord.Embed.from_dict(e) for e in msg_data.get("embeds", [])]
+                    )
+                except Exception as e:
+                    print(f"Error restoring message: {e}")
+            await webhook.delete()
+
+    async def restore_channels(self):
+        entries = [
+            (data, self.categories.get(index))
+            for index, category_data in enumerate(self.backup["categories"])
+            for data in category_data["channels"]
+        ] + [(data, None) for data in self.backup.get("channels") or []]
+        live = [channel for channel in self.guild.channels if not isinstance(channel, discord.CategoryChannel)]
+        pairs, extras = self.match(
+            [data for data, _ in entries], live,
+            lambda data: (data["name"], data["type"]), lambda channel: (channel.name, str(channel.type))
+        )
+
+        edits, creates = [], []
+        for (data, channel), (_, category) in zip(pairs, entries):
+            if channel is not None:
+                changes = self.channel_changes(channel, data, category)
+                if changes:
+                    edits.append(channel.edit(**changes))
+            elif data["type"] in ("text", "voice"):
+                creates.append(self.create_channel(data, category))
+        deletes = [channel.delete() for channel in extras if channel.id not in self.keep_channel_ids]
+
+        await self.gather("channels edited", edits)
+        await self.gather("channels created", creates)
+        await self.gather("channels deleted", deletes)
+        await self.gather("categories deleted", [
+            category.delete() for category in self.extra_categories
+            if not any(channel.id in self.keep_channel_ids for channel in category.channels)
+        ])
+
+    async def restore_emojis(self):
+        wanted = {data["name"]: data for data in self.backup.get("emojis", [])}
+        live = {emoji.name for emoji in self.guild.emojis}
+
+        async with aiohttp.ClientSession() as session:
+            async def create(data):
+                async with session.get(data["url"]) as resp:
+                    if resp.status != 200:
+                        raise discord.DiscordException(f"emoji download failed with {resp.status}")
+                    image = await resp.read()
+                await self.guild.create_custom_emoji(name=data["name"], image=image)
+
+            await self.gather("emojis deleted", [emoji.delete() for emoji in self.guild.emojis if emoji.name not in wanted])
+            await self.gather("emojis created", [create(data) for name, data in wanted.items() if name not in live])
+
+    async def restore_webhooks(self):
+        try:
+            existing = {(webhook.name, webhook.channel_id) for webhook in await self.guild.webhooks()}
+        except discord.Forbidden:
+            return
+
+        async with aiohttp.ClientSession() as session:
+            async def create(channel, data):
+                avatar = None
+                if data.get("avatar"):
+                    async with session.get(data["avatar"]) as resp:
+                        if resp.status == 200:
+                            avatar = await resp.read()
+                await channel.create_webhook(name=data["name"], avatar=avatar)
+
+            creates = []
+            for data in self.backup.get("webhooks", []):
+                channel = discord.utils.get(self.guild.text_channels, name=data["channel"])
+                if channel and (data["name"], channel.id) not in existing:
+                    existing.add((data["name"], channel.id))
+                    creates.append(create(channel, data))
+            await self.gather("webhooks created", creates)
+
+    async def run(self) -> Dict[str, int]:
+        for label, phase in (("roles", self.restore_roles), ("categories", self.restore_categories),
+                             ("channels", self.restore_channels), ("emojis", self.restore_emojis),
+                             ("webhooks", self.restore_webhooks)):
+            await self.report(f"🔄 Restoring {label}...")
+            await phase()
+        return dict(self.stats)
+
+
 class BackupSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -31183,6 +34718,7 @@ class BackupSystem(commands.Cog):
         for role in reversed(ctx.guild.roles):
             if not role.is_default():
                 backup_data["roles"].append({
+                "id": role.id,
                 "name": role.name,
                 "color": str(role.color),
                 "permissions": int(role.permissions.value),  
@@ -31192,49 +34728,53 @@ class BackupSystem(commands.Cog):
             })
 
         await progress_msg.edit(content="📦 Backing up channels and categories...")
-        for category in ctx.guild.categories:
-            cat_data = {
-            "name": category.name,
-            "position": category.position,
-            "channels": []
-        }
 
-            for channel in category.channels:
-                chan_data = {
-                "name": channel.name,
-                "type": str(channel.type),
-                "position": channel.position,
-                "topic": getattr(channel, 'topic', None),
-                "slowmode_delay": getattr(channel, 'slowmode_delay', None),
-                "nsfw": getattr(channel, 'nsfw', False),
-                "overwrites": []
-            }
+        async def channel_data(channel):
+            chan_data = {
+            "id": channel.id,
+            "name": channel.name,
+            "type": str(channel.type),
+            "position": channel.position,
+            "topic": getattr(channel, 'topic', None),
+            "slowmode_delay": getattr(channel, 'slowmode_delay', None),
+            "nsfw": getattr(channel, 'nsfw', False),
+            "overwrites": []
+        }
 
-                for target, overwrite in channel.overwrites.items():
-                    allow, deny = overwrite.pair()
-                    chan_data["overwrites"].append({
-                    "target_name": target.name,
-                    "permissions": [int(allow.value), int(deny.value)]  
-                })
+            for target, overwrite in channel.overwrites.items():
+                allow, deny = overwrite.pair()
+                chan_data["overwrites"].append({
+                "target_name": target.name,
+                "permissions": [int(allow.value), int(deny.value)]  
+            })
 
-                if full and isinstance(channel, discord.TextChannel):
-                    messages = []
-                    try:
-                        async for msg in channel.history(limit=messages_limit):
-                            messages.append({
-                            "content": msg.content,
-                            "author": str(msg.author),
-                            "timestamp": str(msg.created_at),
-                            "attachments": [a.url for a in msg.attachments],
-                            "embeds": [e.to_dict() for e in msg.embeds],
-                            "pinned": msg.pinned
-                        })
-                    except discord.Forbidden:
-                        pass
-                    chan_data["messages"] = messages
+            if full and isinstance(channel, discord.TextChannel):
+                messages = []
+                try:
+                    async for msg in channel.history(limit=messages_limit):
+                        messages.append({
+                        "content": msg.content,
+                        "author": str(msg.author),
+                        "timestamp": str(msg.created_at),
+                        "attachments": [a.url for a in msg.attachments],
+                        "embeds": [e.to_dict() for e in msg.embeds],
+                        "pinned": msg.pinned
+                    })
+                except discord.Forbidden:
+                    pass
+                chan_data["messages"] = messages
+            return chan_data
 
-                cat_data["channels"].append(chan_data)
-            backup_data["categories"].append(cat_data)
+        for category, channels in ctx.guild.by_category():
+            if category is None:
+                backup_data["channels"] = [await channel_data(channel) for channel in channels]
+                continue
+            backup_data["categories"].append({
+            "id": category.id,
+            "name": category.name,
+            "position": category.position,
+            "channels": [await channel_data(channel) for channel in channels]
+        })
 
         await progress_msg.edit(content="📦 Backing up emojis...")
         backup_data["emojis"] = [{
@@ -31300,186 +34840,30 @@ class BackupSystem(commands.Cog):
             await ctx.send("Please provide a valid backup file (.json)")
             return
 
-        progress_msg = await ctx.send("🔄 Starting restoration process...")
-        backup_content = await attachment.read()
-        backup_data = json.loads(backup_content)
+        backup_data = json.loads(await attachment.read())
 
-        bot_member = ctx.guild.get_member(ctx.bot.user.id)
-        if not bot_member.guild_permissions.administrator:
+        if not ctx.guild.me.guild_permissions.administrator:
             await ctx.send("I need Administrator permissions to perform a full restore!")
             return
 
-        try:
-            bot_role = bot_member.top_role
-            positions = {r: r.position for r in ctx.guild.roles}
-            positions[bot_role] = len(positions) - 1 
-            await ctx.guild.edit_role_positions(positions=positions)
-        except Exception as e:
-            print(f"Could not move bot role: {e}")
-
-        try:
-            temp_channel = await ctx.guild.create_text_channel('temp-restore-status')
-            progress_msg = await temp_channel.send("🔄 Starting restoration process...")
-        except Exception as e:
-            print(f"Could not create temporary channel: {e}")
-            return
-
-        await progress_msg.edit(content="🗑️ Cleaning up existing server content...")
-    
-        temp_channel_id = temp_channel.id
-        try:
-            for channel in ctx.guild.channels:
-                if channel.id != temp_channel_id:
-                    try:
-                        await channel.delete()
-                        await asyncio.sleep(0.5)
-                    except discord.NotFound:
-                        continue
-        except Exception as e:
-            print(f"Error during channel cleanup: {e}")
-
-        try:
-            for role in reversed(ctx.guild.roles[1:]):
-                try:
-                    await role.delete()
-                    await asyncio.sleep(0.5)
-                except discord.NotFound:
-                    continue
-        except Exception as e:
-            print(f"Error during role cleanup: {e}")
-
-        try:
-            for emoji in ctx.guild.emojis:
-                try:
-                    await emoji.delete()
-                    await asyncio.sleep(0.5)
-                except discord.NotFound:
-                    continue
-        except Exception as e:
-            print(f"Error during emoji cleanup: {e}")
-
-        await progress_msg.edit(content="🔄 Restoring roles...")
-        roles_cache = {}
-        for role_data in reversed(backup_data["roles"]):
-            try:
-                role = await ctx.guild.create_role(
-                    name=role_data["name"],
-                    color=discord.Color.from_str(role_data["color"]),
-                    permissions=discord.Permissions(role_data["permissions"]),
-                    hoist=role_data["hoist"],
-                    mentionable=role_data["mentionable"]
-                )
-                roles_cache[role_data["name"]] = role
-                await asyncio.sleep(0.5)
-            except Exception as e:
-                print(f"Error creating role {role_data['name']}: {e}")
-
-        total_categories = len(backup_data["categories"])
-        for cat_index, cat_data in enumerate(backup_data["categories"], 1):
-            try:
-                category = await ctx.guild.create_category(name=cat_data["name"])
-                await progress_msg.edit(content=f"📁 Creating categories... ({cat_index}/{total_categories})")
-
-                total_channels = len(cat_data["channels"])
-                for chan_index, chan_data in enumerate(cat_data["channels"], 1):
-                    try:
-                        if chan_data["type"] == "text":
-                            channel = await category.create_text_channel(
-                            name=chan_data["name"],
-                            topic=chan_data.get("topic"),
-                            nsfw=chan_data.get("nsfw", False),
-                            slowmode_delay=chan_data.get("slowmode_delay", 0)
-                        )
-
-                            for overwrite in chan_data.get("overwrites", []):
-                                role = roles_cache.get(overwrite["target_name"])
-                                if role:
-                                    allow, deny = overwrite["permissions"]
-                                    await channel.set_permissions(
-                                        role,
-                                        overwrite=discord.PermissionOverwrite.from_pair(
-                                        discord.Permissions(allow),
-                                        discord.Permissions(deny)
-                                    )
-                                )
-
-                            if "messages" in chan_data:
-                                webhook = await channel.create_webhook(name="RestoreBot")
-                                for msg_data in reversed(chan_data["messages"]):
-                                    try:
-                                        await webhook.send(
-                                        content=msg_data["content"],
-                                        username=msg_data["author"],
-                                        embeds=[discord.Embed.from_dict(e) for e in msg_data.get("embeds", [])]
-                                    )
-                                        await asyncio.sleep(0.5)
-                                    except Exception as e:
-                                        print(f"Error restoring message: {e}")
-                                await webhook.delete()
-
-                        elif chan_data["type"] == "voice":
-                            channel = await category.create_voice_channel(name=chan_data["name"])
-                        
-                            for overwrite in chan_data.get("overwrites", []):
-                                role = roles_cache.get(overwrite["target_name"])
-                                if role:
-                                    allow, deny = overwrite["permissions"]
-                                    await channel.set_permissions(
-                                        role,
-                                        overwrite=discord.PermissionOverwrite.from_pair(
-                                        discord.Permissions(allow),
-                                        discord.Permissions(deny)
-                                    )
-                                )
-
-                        if chan_index % 5 == 0:
-                            await progress_msg.edit(content=f"💬 Creating channels in {cat_data['name']}... ({chan_index}/{total_channels})")
-                    
-                        await asyncio.sleep(0.5)
+        progress_msg = await ctx.send("🔄 Comparing the backup with the server...")
 
-                    except Exception as e:
-                        print(f"Error creating channel {chan_data['name']}: {e}")
-                        continue
+        async def progress(text):
+            await progress_msg.edit(content=text)
 
-            except Exception as e:
-                print(f"Error creating category {cat_data['name']}: {e}")
-                continue
-
-        await progress_msg.edit(content="🔄 Restoring emojis...")
-        async with aiohttp.ClientSession() as session:
-            total_emojis = len(backup_data["emojis"])
-            for emoji_index, emoji_data in enumerate(backup_data["emojis"], 1):
-                try:
-                    async with session.get(emoji_data["url"]) as resp:
-                        if resp.status == 200:
-                            emoji_bytes = await resp.read()
-                            await ctx.guild.create_custom_emoji(
-                            name=emoji_data["name"],
-                            image=emoji_bytes
-                        )
-                    if emoji_index % 5 == 0:
-                        await progress_msg.edit(content=f"🔄 Restoring emojis... ({emoji_index}/{total_emojis})")
-                    await asyncio.sleep(0.5)
-                except Exception as e:
-                    print(f"Error restoring emoji {emoji_data['name']}: {e}")
-
-        await progress_msg.edit(content="🔄 Restoring webhooks...")
-        for webhook_data in backup_data["webhooks"]:
-            try:
-                channel = discord.utils.get(ctx.guild.channels, name=webhook_data["channel"])
-                if channel and isinstance(channel, discord.TextChannel):
-                    await channel.create_webhook(
-                    name=webhook_data["name"],
-                    avatar=webhook_data.get("avatar")
-                )
-                    await asyncio.sleep(0.5)
-            except Exception as e:
-                print(f"Error restoring webhook {webhook_data['name']}: {e}")
+        started = time.monotonic()
+        restore = GuildRestore(ctx.guild, backup_data, keep_channel_ids={ctx.channel.id}, progress=progress)
+        stats = await restore.run()
 
         embed = EmbedBuilder(
         "✅ Restoration Complete",
-        "Server has been restored from backup"
+        f"Server matched to the backup in {time.monotonic() - started:.1f}s"
     ).set_color(discord.Color.green())
+        embed.add_field(
+            "Changes",
+            "\n".join(f"{label.capitalize()}: {count}" for label, count in sorted(stats.items())) or "Nothing to change",
+            inline=False
+        )
 
         await progress_msg.delete()
         await ctx.send(embed=embed.build())
@@ -31690,7 +35074,54 @@ class ModerationCommands(commands.Cog):
         self.ban_appeal_info = {}
         self.data_file = "moderation_data.json"
         self.load_data()
-        
+        self.bot.timers.register('tempban_expire', self.expire_tempban)
+        # Role edits share Discord's per-guild member bucket
+        self.bot.fanout.register('member_role', self.deliver_member_role, skip=self.member_role_current,
+                                 route=lambda payload, user_id: ('member_roles', payload["guild_id"]),
+                                 route_rate=5.0, route_burst=10)
+
+    def cog_unload(self):
+        self.bot.timers.unregister('tempban_expire')
+        self.bot.fanout.unregister('member_role')
+
+    def member_role_lookup(self, payload: Dict, user_id: int):
+        guild = self.bot.get_guild(payload["guild_id"])
+        if guild is None:
+            return None, None
+        return guild.get_member(user_id), guild.get_role(payload["role_id"])
+
+    def member_role_current(self, payload: Dict, user_id: int) -> bool:
+        member, role = self.member_role_lookup(payload, user_id)
+        if member is None or role is None:
+            return False
+        return (role in member.roles) == (payload["action"] == "add")
+
+    async def deliver_member_role(self, payload: Dict, user_id: int):
+        member, role = self.member_role_lookup(payload, user_id)
+        if member is None or role is None:
+            return False
+        if payload["action"] == "add":
+            await member.add_roles(role, reason=payload.get("reason"))
+        else:
+            await member.remove_roles(role, reason=payload.get("reason"))
+
+    async def expire_tempban(self, payload: Dict, job):
+        guild = self.bot.get_guild(payload["guild_id"])
+        if not guild:
+            return
+        channel = guild.get_channel(payload["channel_id"])
+        user = discord.Object(id=payload["user_id"])
+        try:
+            await guild.unban(user, reason="Temporary ban expired")
+            unban_embed = EmbedBuilder(
+                "🔓 Ban Expired",
+                f"<@{payload['user_id']}> has been automatically unbanned."
+            ).set_color(discord.Color.green())
+            if channel:
+                await channel.send(embed=unban_embed.build())
+        except:
+            if channel:
+                await channel.send(f"Failed to unban <@{payload['user_id']}> automatically.")
 
     def load_data(self):
         if os.path.exists(self.data_file):
@@ -31878,16 +35309,32 @@ class ModerationCommands(commands.Cog):
 
     @commands.command()
     @commands.has_permissions(administrator=True)
-    async def massrole(self, ctx, role: discord.Role):
+    async def massrole(self, ctx, role: discord.Role, action: str = "add"):
         
-        for member in ctx.guild.members:
-            await member.add_roles(role)
-    
-        embed = EmbedBuilder(
-        "✅ Mass Role Added",
-        f"Added {role.mention} to all members"
-    ).set_color(discord.Color.blue()).build()
-        await ctx.send(embed=embed)
+        action = action.lower()
+        if action not in ("add", "remove"):
+            await ctx.send("❌ Action must be `add` or `remove`.")
+            return
+        if role >= ctx.guild.me.top_role or role.managed:
+            await ctx.send("❌ I can't manage that role.")
+            return
+
+        # Members already in the target state never reach the queue
+        targets = [member.id for member in ctx.guild.members if (role in member.roles) != (action == "add")]
+        if not targets:
+            await ctx.send(f"✅ Every member already {'has' if action == 'add' else 'lacks'} {role.mention}.")
+            return
+
+        view = BulkJobView(self.bot.fanout, f"member_role:{ctx.guild.id}:{role.id}:{uuid.uuid4().hex}",
+                           f"{'✅ Mass Role Added' if action == 'add' else '➖ Mass Role Removed'}: {role.name}",
+                           ctx.author.id)
+        view.message = await ctx.send(embed=view.embed(f"Queued **{len(targets)}** members", discord.Color.blue()),
+                                      view=view)
+        await self.bot.fanout.broadcast(
+            'member_role', targets,
+            {"guild_id": ctx.guild.id, "role_id": role.id, "action": action, "reason": f"massrole by {ctx.author}"},
+            job_id=view.job_id, progress=view.progress
+        )
 
     @commands.command()
     async def servericon(self, ctx):
@@ -32012,17 +35459,11 @@ class ModerationCommands(commands.Cog):
             await logging_cog.log_action(ctx.guild, 'ban', ctx.author, user, reason)
 
         if ban_duration:
-            
-            await asyncio.sleep(total_seconds)
-            try:
-                await ctx.guild.unban(user, reason="Temporary ban expired")
-                unban_embed = EmbedBuilder(
-                    "🔓 Ban Expired",
-                    f"{user.mention} has been automatically unbanned."
-                ).set_color(discord.Color.green())
-                await ctx.send(embed=unban_embed.build())
-            except:
-                await ctx.send(f"Failed to unban {user.mention} automatically.")
+            await self.bot.timers.schedule(
+                'tempban_expire', time.time() + total_seconds,
+                {"guild_id": ctx.guild.id, "user_id": user.id, "channel_id": ctx.channel.id},
+                key=f"tempban:{ctx.guild.id}:{user.id}"
+            )
 
     async def get_appeal_info(self, guild_id):
         return self.ban_appeal_info.get(str(guild_id))
@@ -32598,23 +36039,28 @@ class MassMessageModal(discord.ui.Modal, title="Send Mass Message"):
         placeholder="Enter message to send to all servers..."
     )
 
+    def __init__(self, bot):
+        super().__init__()
+        self.bot = bot
+
     async def on_submit(self, interaction: discord.Interaction):
-        success = 0
-        failed = 0
-        for guild in interaction.client.guilds:
-            try:
-                channel = guild.system_channel or guild.text_channels[0]
-                await channel.send(self.message.value)
-                success += 1
-            except:
-                failed += 1
-                
+        guild_ids = [guild.id for guild in self.bot.guilds]
         embed = EmbedBuilder(
-            "📢 Mass Message Results",
-            f"Message sent to {success} servers\nFailed in {failed} servers"
+            "📢 Mass Message",
+            f"Sending to {len(guild_ids)} servers..."
         ).set_color(discord.Color.blue())
         await interaction.response.send_message(embed=embed.build(), ephemeral=True)
 
+        async def progress(sent, failed, total, done):
+            embed = EmbedBuilder(
+                "📢 Mass Message Results" if done else "📢 Mass Message",
+                f"Message sent to {sent} servers\nFailed in {failed} servers"
+                + ("" if done else f"\nProgress: {sent + failed}/{total}")
+            ).set_color(discord.Color.blue())
+            await interaction.edit_original_response(embed=embed.build())
+
+        await self.bot.fanout.broadcast('mass_message', guild_ids, {"content": self.message.value}, progress=progress)
+
 class ExecuteCommandModal(discord.ui.Modal, title="Execute Command"):
     guild_id = discord.ui.TextInput(
         label="Server ID",
@@ -32656,6 +36102,17 @@ class OwnerOnly(commands.Cog):
 
         self.TRUSTED_GUILDS = set()
         self._load_trusted_guilds()
+        self.bot.fanout.register('mass_message', self.deliver_mass_message)
+
+    def cog_unload(self):
+        self.bot.fanout.unregister('mass_message')
+
+    async def deliver_mass_message(self, payload: Dict, guild_id: int):
+        guild = self.bot.get_guild(guild_id)
+        channel = guild and (guild.system_channel or (guild.text_channels[0] if guild.text_channels else None))
+        if channel is None:
+            return False
+        await channel.send(payload["content"])
 
     def _load_trusted_guilds(self):
         
@@ -32914,6 +36371,79 @@ class OwnerOnly(commands.Cog):
             await ctx.send(f"❌ Error leaving server: {str(e)}")
             logger.error(f"Error in leaveserver command: {e}")
 
+    @commands.command(name="loggerstats")
+    async def logger_stats(self, ctx):
+        if not self.is_owner(ctx):
+            return await ctx.send("❌ You are not authorized to use this command.")
+
+        if not self.bot.webhook_logger or not self.bot.webhook_logger.webhook_url:
+            return await ctx.send("ℹ️ Webhook logging is not configured.")
+
+        metrics = self.bot.webhook_logger.get_metrics()
+        embed = EmbedBuilder(
+            "📨 Webhook Logger Metrics",
+            f"Overflow policy: `{self.bot.webhook_logger.overflow_policy}`"
+        ).set_color(discord.Color.blue())
+        embed.add_field("Queue Depth", f"{metrics['queue_depth']}/{metrics['queue_size']}")
+        embed.add_field("Workers", str(metrics['workers']))
+        embed.add_field("Enqueued", str(metrics['enqueued']))
+        embed.add_field("Sent", str(metrics['sent']))
+        embed.add_field("Batches", str(metrics['batches']))
+        embed.add_field("Dropped", str(metrics['dropped']))
+        embed.add_field("Failed", str(metrics['failed']))
+        await ctx.send(embed=embed.build())
+
+    @commands.command(name="dispatchstats")
+    async def dispatch_stats(self, ctx, limit: int = 15):
+        if not self.is_owner(ctx):
+            return await ctx.send("❌ You are not authorized to use this command.")
+
+        stats = self.bot.message_dispatcher.get_stats()[:max(1, min(limit, 25))]
+        embed = EmbedBuilder(
+            "📬 Message Handler Timings",
+            f"{len(self.bot.message_dispatcher.handlers)} registered handlers, sorted by total time"
+        ).set_color(discord.Color.blue())
+        for entry in stats:
+            embed.add_field(
+                entry['name'],
+                f"Calls: {entry['calls']} | Filtered: {entry['filtered']} | Errors: {entry['errors']}\n"
+                f"Avg: {entry['avg_ms']:.2f} ms | Max: {entry['max_ms']:.2f} ms | Total: {entry['total_ms']:.0f} ms",
+                inline=False
+            )
+        await ctx.send(embed=embed.build())
+
+    @commands.command(name="startupprofile")
+    async def startup_profile(self, ctx, limit: int = 10):
+        if not self.is_owner(ctx):
+            return await ctx.send("❌ You are not authorized to use this command.")
+
+        startup = self.bot.startup
+        ready = f"{startup.ready_after:.2f}s" if startup.ready_after is not None else "not ready yet"
+        embed = EmbedBuilder(
+            "⏱️ Startup Profile",
+            f"Ready after {ready} | {startup.cog_count('eager')} cogs loaded, "
+            f"{startup.cog_count('deferred')} deferred, {startup.cog_count('on demand')} loaded on demand"
+        ).set_color(discord.Color.blue())
+        embed.add_field(
+            "Phases",
+            "\n".join(f"{name}: {seconds * 1000:.0f} ms" for name, seconds in startup.phases.items()) or "None",
+            inline=False
+        )
+        slowest = startup.slowest_cogs(max(1, min(limit, 10)))
+        embed.add_field(
+            "Slowest Cogs",
+            "\n".join(f"{name} ({entry['mode']}): init {entry['init'] * 1000:.1f} ms | load {entry['load'] * 1000:.1f} ms"
+                      for name, entry in slowest) or "None",
+            inline=False
+        )
+        embed.add_field(
+            "Deferred Libraries",
+            "\n".join(f"{name}: imported on first use in {seconds * 1000:.0f} ms"
+                      for name, seconds in LazyModule.loaded.items()) or "None used yet",
+            inline=False
+        )
+        await ctx.send(embed=embed.build())
+
     @commands.command()
     async def reload_trusted(self, ctx):
         
@@ -32948,11 +36478,12 @@ class OwnerOnly(commands.Cog):
 class TicketSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.support_roles = {}
-        self.admin_roles = {}
-        self.ticket_categories = {}
-        self.ticket_logs = {}
-        self.ticket_panel_configs = {}
+        config = bot.config_manager
+        self.support_roles = config.namespace("ticket_support_roles")
+        self.admin_roles = config.namespace("ticket_admin_roles")
+        self.ticket_categories = config.namespace("ticket_categories")
+        self.ticket_logs = config.namespace("ticket_logs")
+        self.ticket_panel_configs = config.namespace("ticket_panel_configs")
 
     @commands.command()
     @commands.has_permissions(administrator=True)
@@ -34234,7 +37765,7 @@ class HelpView(discord.ui.View):
                 "title": "⚙️ Management Commands",
                 "color": discord.Color.blue(),
                 "commands": {
-                    f"{CMD_PREFIX}massrole <role>": "Add a role to all members",
+                    f"{CMD_PREFIX}massrole <role> [add|remove]": "Add or remove a role for all members",
                     f"{CMD_PREFIX}embed <title> <description>": "Create a custom embed message",
                     f"{CMD_PREFIX}say <channel> <message>": "Make the bot send a message",
                     f"{CMD_PREFIX}addchannel <channel> <user>": "Allows a user access to a channel",
@@ -34243,7 +37774,7 @@ class HelpView(discord.ui.View):
                     f"{CMD_PREFIX}invite_view": "Show all invite links and information about them",
                     f"{CMD_PREFIX}reminder": "Opens the reminder pannel",
                     f"{CMD_PREFIX}editreminder ": "Edit ur reminders with a panel",
-                    f"{CMD_PREFIX}purge <user| bots | links> <amount/nuke>": "Purge messages from a user, bots, or links",
+                    f"{CMD_PREFIX}purge <all | user | bots | links | regex:<pattern>> <amount/nuke> [after:<date>] [before:<date>]": "Purge matching messages; `all nuke` offers clone & replace",
                     f"{CMD_PREFIX}mood": "Opens the mood pannel",
                     f"{CMD_PREFIX}hide <optional| <channel>": "hides a channel",
                     f"{CMD_PREFIX}show <optional| <channel>": "shows a channel",
@@ -34308,7 +37839,7 @@ class HelpView(discord.ui.View):
                     f"{CMD_PREFIX}backup true": "Creates full backup including messages (up to 100 messages per channel) ",
                     f"{CMD_PREFIX}backup True 500": "Creates full backup with custom message limit (500 messages per channel in this example)",
                     f"{CMD_PREFIX}restore": "Restores a server from a backup file (attach the .json backup file with the command)| No Attachments (eg. txt/videos..) ",
-                    f"{CMD_PREFIX}copychannel <channel_id>": "Creates a complete 1:1 backup of a specific channel including all messages, files and settings",
+                    f"{CMD_PREFIX}copychannel <channel_id> [full|incremental]": "Creates a complete 1:1 backup of a specific channel including all messages, files and settings; incremental only adds messages since the last backup",
                     f"{CMD_PREFIX}pastechannel <attach zip>": "Restores a channel from backup (attach the backup ZIP file)",
                     f"{CMD_PREFIX}copyrole <role_id>": "Creates a complete backup of a specific role including all settings and members | Copies everything even Atachments",
                     f"{CMD_PREFIX}pasterole <attach zip>": "Restores a role from backup (attach the backup ZIP file)"
@@ -34411,8 +37942,10 @@ class HelpView(discord.ui.View):
                     f"{CMD_PREFIX}levelsetup": "Shows All infos/settings of the leveleling system",
                     f"{CMD_PREFIX}levelsetup <channel>": "Sets the channel where the leveling messages are sent",
                     f"{CMD_PREFIX}set_level_role <level> <role>": "Assign a role to a specific level.",
+                    f"{CMD_PREFIX}sync_level_roles": "Give every member the role for their current level.",
                     f"{CMD_PREFIX}leaderboard": "Display the server's leveling leaderboard.",
                     f"{CMD_PREFIX}my_level": "Check your current level and XP.",
+                    f"{CMD_PREFIX}rank [member]": "Show a member's position on the server leaderboard.",
                     f"{CMD_PREFIX}set_xp <user> <xp>": "Set a user's XP manually (Bot Owner only).",
                     f"{CMD_PREFIX}reset_levels": "Reset all leveling data for the server (Bot Owner only).",
                     f"{CMD_PREFIX}set_leaderboard_channel <channel>": "Set the channel for live-updating leaderboard.",
@@ -34806,6 +38339,7 @@ class HelpViewTwo(discord.ui.View):
                     f"{CMD_PREFIX}addprotected <role>": "Adds a role to the list of protected roles",
                     f"{CMD_PREFIX}removeprotected <role>": "Removes a role from the list of protected roles",
                     f"{CMD_PREFIX}setalertchannel <channel>": "Sets the alert channel",
+                    f"{CMD_PREFIX}setnukewindow <seconds>": "Sets how many seconds the AntiNuke limits count actions over",
                 }
             },
             "Translate System": {
@@ -35045,34 +38579,306 @@ class ReadabilityButton(discord.ui.Button):
             ephemeral=True
         )
 
+@dataclass
+class AutoModSettings:
+    caps_threshold: float = 0.7
+    spam_threshold: int = 5
+    spam_interval: int = 5
+    spam_timeout_minutes: int = 10
+    link_filter_enabled: bool = True
+    caps_enabled: bool = True
+    badwords_enabled: bool = True
+    link_whitelist: set = dataclasses.field(default_factory=set)
+    banned_words: set = dataclasses.field(default_factory=set)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'AutoModSettings':
+        return cls(
+            caps_threshold=float(data.get('caps_threshold', 0.7)),
+            spam_threshold=max(2, int(data.get('spam_threshold', 5))),
+            spam_interval=max(1, int(data.get('spam_interval', 5))),
+            spam_timeout_minutes=int(data.get('spam_timeout_minutes', 10)),
+            link_filter_enabled=data.get('link_filter_enabled', True),
+            caps_enabled=data.get('caps_filter_enabled', True),
+            badwords_enabled=data.get('badwords_filter_enabled', True),
+            link_whitelist=set(data.get('link_whitelist', [])),
+            banned_words={word.lower() for word in data.get('banned_words', [])}
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            'caps_threshold': self.caps_threshold,
+            'spam_threshold': self.spam_threshold,
+            'spam_interval': self.spam_interval,
+            'spam_timeout_minutes': self.spam_timeout_minutes,
+            'link_filter_enabled': self.link_filter_enabled,
+            'caps_filter_enabled': self.caps_enabled,
+            'badwords_filter_enabled': self.badwords_enabled,
+            'link_whitelist': sorted(self.link_whitelist),
+            'banned_words': sorted(self.banned_words)
+        }
+
+
+class AutoModConfigStore:
+    # Per-guild AutoMod settings, loaded lazily from the bot's ConfigManager automod category.
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.settings: Dict[int, AutoModSettings] = {}
+
+    def get(self, guild_id: int) -> AutoModSettings:
+        settings = self.settings.get(guild_id)
+        if settings is None:
+            manager = getattr(self.bot, 'config_manager', None)
+            data = manager.get_category(guild_id, 'automod') if manager else {}
+            settings = self.settings[guild_id] = AutoModSettings.from_dict(data or {})
+        return settings
+
+    def save(self, guild_id: int) -> bool:
+        manager = getattr(self.bot, 'config_manager', None)
+        if manager is None:
+            return False
+        # Keep keys owned by other config panels (e.g. "enabled") alongside ours
+        data = dict(manager.get_category(guild_id, 'automod') or {})
+        data.update(self.get(guild_id).to_dict())
+        return manager.set_category(guild_id, 'automod', data)
+
+    def update(self, guild_id: int, **values) -> AutoModSettings:
+        settings = self.get(guild_id)
+        for key, value in values.items():
+            setattr(settings, key, value)
+        self.save(guild_id)
+        return settings
+
+
+class SpamWindow:
+    __slots__ = ('stamps', 'head', 'expires')
+
+    def __init__(self, size: int):
+        self.stamps = [0.0] * size
+        self.head = 0
+        self.expires = 0.0
+
+    def hit(self, now: float, interval: float) -> bool:
+        # Record a message and report whether the last size messages all fall within interval.
+        stamps = self.stamps
+        stamps[self.head] = now
+        self.head = (self.head + 1) % len(stamps)
+        # After advancing, head points at the oldest of the retained timestamps
+        return now - stamps[self.head] <= interval
+
+    def reset(self, size: int):
+        self.stamps = [0.0] * size
+        self.head = 0
+
+
+class SpamDetector:
+    # Sliding-window message rate detector.
+    # Each active member gets a fixed-size ring buffer of their latest message
+    # timestamps, so a check is O(1). Members who go quiet are evicted by a
+    # hashed timer wheel; entries are only touched again when their slot comes
+    # up, at which point they are either dropped or rescheduled.
+
+    def __init__(self, tick: float = 1.0, slots: int = 64):
+        self.tick = tick
+        self.slots = slots
+        self.windows: Dict[int, Dict[int, SpamWindow]] = {}
+        self.wheel: List[List[Tuple[int, int]]] = [[] for _ in range(slots)]
+        self.current_tick = int(time.monotonic() / tick)
+        self.evicted = 0
+
+    def __len__(self):
+        return sum(len(users) for users in self.windows.values())
+
+    def _schedule(self, key: Tuple[int, int], deadline: float):
+        target = int(deadline / self.tick) + 1
+        target = min(max(target, self.current_tick + 1), self.current_tick + self.slots - 1)
+        self.wheel[target % self.slots].append(key)
+
+    def hit(self, guild_id: int, user_id: int, threshold: int, interval: float, now: float = None) -> bool:
+        now = time.monotonic() if now is None else now
+        users = self.windows.setdefault(guild_id, {})
+        window = users.get(user_id)
+        if window is None:
+            window = users[user_id] = SpamWindow(threshold)
+            self._schedule((guild_id, user_id), now + interval)
+        elif len(window.stamps) != threshold:
+            window.reset(threshold)
+
+        window.expires = now + interval
+        if window.hit(now, interval):
+            window.reset(threshold)
+            return True
+        return False
+
+    def clear_guild(self, guild_id: int):
+        self.windows.pop(guild_id, None)
+
+    def advance(self, now: float = None) -> int:
+        # Expire idle windows up to now and return how many were evicted.
+        now = time.monotonic() if now is None else now
+        target = int(now / self.tick)
+        # After a long stall every slot is due, so one full turn of the wheel is enough
+        self.current_tick = max(self.current_tick, target - self.slots)
+        evicted = 0
+
+        while self.current_tick < target:
+            self.current_tick += 1
+            index = self.current_tick % self.slots
+            bucket, self.wheel[index] = self.wheel[index], []
+            for key in bucket:
+                guild_id, user_id = key
+                users = self.windows.get(guild_id)
+                window = users.get(user_id) if users else None
+                if window is None:
+                    continue
+                if window.expires <= now:
+                    del users[user_id]
+                    if not users:
+                        del self.windows[guild_id]
+                    evicted += 1
+                else:
+                    self._schedule(key, window.expires)
+
+        self.evicted += evicted
+        return evicted
+
+
+class BannedWordMatcher:
+    # Aho-Corasick automaton over the banned word list. One linear pass over the text
+    # finds every banned term, so the per-message cost no longer grows with the list.
+    def __init__(self, words=()):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+        self.words = set()
+        self._dirty = False
+        for word in words:
+            self.add(word)
+        self.build()
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word.lower() in self.words
+
+    def add(self, word: str) -> bool:
+        word = word.lower()
+        if not word or word in self.words:
+            return False
+        self.words.add(word)
+
+        state = 0
+        for char in word:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(())
+                self.goto[state][char] = next_state
+            state = next_state
+        self.output[state] = self.output[state] + (word,)
+        self._dirty = True
+        return True
+
+    def build(self):
+        # Failure links only depend on the trie shape, so adding a word just marks them
+        # stale; they are recomputed once on the next scan instead of per message.
+        fail = [0] * len(self.goto)
+        merged = [tuple(out) for out in self.output]
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                fail[next_state] = target if target != next_state else 0
+                if merged[fail[next_state]]:
+                    merged[next_state] = merged[next_state] + merged[fail[next_state]]
+        self.fail = fail
+        self._merged_output = merged
+        self._dirty = False
+
+    @staticmethod
+    def _is_word_char(char: str) -> bool:
+        return char.isalnum() or char == "_"
+
+    def _on_boundary(self, text: str, pos: int) -> bool:
+        # Same semantics as the regex \b the filter used to compile per word.
+        before = pos > 0 and self._is_word_char(text[pos - 1])
+        after = pos < len(text) and self._is_word_char(text[pos])
+        return before != after
+
+    def finditer(self, text: str):
+        if self._dirty:
+            self.build()
+        text = text.lower()
+        goto, fail, output = self.goto, self.fail, self._merged_output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            end = index + 1
+            for word in output[state]:
+                start = end - len(word)
+                if self._on_boundary(text, start) and self._on_boundary(text, end):
+                    yield word, start, end
+
+    def search(self, text: str) -> Optional[Tuple[str, int, int]]:
+        return next(self.finditer(text), None)
+
+    def find_all(self, text: str) -> List[Tuple[str, int, int]]:
+        return list(self.finditer(text))
+
 class AutoMod(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.spam_check = {}  
-        self.caps_threshold = 0.7  
-        self.spam_threshold = 5  
-        self.spam_interval = 5  
-        self.spam_timeout_minutes = 10  
+        self.config = AutoModConfigStore(bot)
+        self.spam_detector = SpamDetector()
         self.link_whitelist = set()  
         self.banned_words = set()  
-        self.link_filter_enabled = True
         self.load_config() 
-        self.caps_enabled = True
-        self.badwords_enabled = True
 
-        self.banned_regex = {word: re.compile(rf'\b{re.escape(word)}\b', re.IGNORECASE) for word in self.banned_words}
+        self.banned_matcher = BannedWordMatcher(self.banned_words)
+        # Words added with !automod add_banned_word are stored per guild in its settings
+        self.guild_matchers: Dict[int, BannedWordMatcher] = {}
+        self.eviction_task = self.bot.loop.create_task(self.spam_eviction_task())
+
+    def cog_unload(self):
+        self.eviction_task.cancel()
+
+    def guild_matcher(self, guild_id: int) -> BannedWordMatcher:
+        matcher = self.guild_matchers.get(guild_id)
+        if matcher is None:
+            matcher = self.guild_matchers[guild_id] = BannedWordMatcher(self.config.get(guild_id).banned_words)
+        return matcher
+
+    async def spam_eviction_task(self):
+        
+        while not self.bot.is_closed():
+            await asyncio.sleep(self.spam_detector.tick)
+            self.spam_detector.advance()
 
 
     @commands.command()
     @commands.has_permissions(administrator=True)
     async def togglelinks(self, ctx):
-        self.link_filter_enabled = not self.link_filter_enabled
-        status = "enabled" if self.link_filter_enabled else "disabled"
+        settings = self.config.get(ctx.guild.id)
+        self.config.update(ctx.guild.id, link_filter_enabled=not settings.link_filter_enabled)
+        status = "enabled" if settings.link_filter_enabled else "disabled"
         
         embed = discord.Embed(
             title="🔗 Anti-Link Filter",
             description=f"Link filtering is now **{status}**",
-            color=discord.Color.green() if self.link_filter_enabled else discord.Color.red()
+            color=discord.Color.green() if settings.link_filter_enabled else discord.Color.red()
         )
         await ctx.send(embed=embed)
 
@@ -35472,7 +39278,7 @@ class AutoMod(commands.Cog):
     
     async def check_banned_words(self, message):
         
-        if not self.badwords_enabled:
+        if not self.config.get(message.guild.id).badwords_enabled:
             return False
         if message.author.bot:
             return False 
@@ -35507,23 +39313,20 @@ class AutoMod(commands.Cog):
                     content_to_check.append(field.name.lower())
                     content_to_check.append(field.value.lower())
 
+        guild_matcher = self.guild_matcher(message.guild.id)
         for content in content_to_check:
-            for word, pattern in self.banned_regex.items():
-                if pattern.search(content):
-                    await asyncio.sleep(1)  
-                    await message.delete()
-                    if not message.webhook_id:
-                        await self.send_warning(message.channel, message.author, "banned_words")
-                    return True
+            match = self.banned_matcher.search(content) or (guild_matcher and guild_matcher.search(content))
+            if match:
+                await asyncio.sleep(1)  
+                await message.delete()
+                if not message.webhook_id:
+                    await self.send_warning(message.channel, message.author, "banned_words")
+                return True
         return False
 
         
-    @commands.Cog.listener()
-    async def on_message(self, message):
-   
-        if isinstance(message.channel, discord.DMChannel):
-            return
-
+    @message_handler(guild_only=True, ignore_bots=True)
+    async def on_message(self, message, context):
         await self.check_message(message)
 
     async def check_message(self, message):
@@ -35551,47 +39354,36 @@ class AutoMod(commands.Cog):
         if not isinstance(message.author, discord.Member):
             return False
             
-        author_id = message.author.id
-        current_time = time.time()
-
-        if author_id not in self.spam_check:
-            self.spam_check[author_id] = {"messages": 1, "last_message": current_time}
-            return False
-
-        if current_time - self.spam_check[author_id]["last_message"] > 5:
-            self.spam_check[author_id] = {"messages": 1, "last_message": current_time}
-            return False
-
-        self.spam_check[author_id]["messages"] += 1
-        
-        if self.spam_check[author_id]["messages"] >= 5:
+        settings = self.config.get(message.guild.id)
+        if self.spam_detector.hit(message.guild.id, message.author.id, settings.spam_threshold, settings.spam_interval):
             try:
-                await message.author.timeout(duration=timedelta(minutes=self.spam_timeout_minutes), reason="Spam detection")
+                await message.author.timeout(duration=timedelta(minutes=settings.spam_timeout_minutes), reason="Spam detection")
                 await self.send_warning(message.channel, message.author, "spam")
                 return True
             except discord.Forbidden:
                 await message.channel.send("⚠️ Unable to timeout user - missing permissions.")
                 return False
 
-        self.spam_check[author_id]["last_message"] = current_time
         return False
 
 
     async def check_caps(self, message):
-        if not self.caps_enabled:
+        settings = self.config.get(message.guild.id)
+        if not settings.caps_enabled:
             return False
         if len(message.content) < 8:
             return False
 
         caps_ratio = sum(1 for c in message.content if c.isupper()) / len(message.content)
-        if caps_ratio > self.caps_threshold:
+        if caps_ratio > settings.caps_threshold:
             await message.delete()
             await self.send_warning(message.channel, message.author, "caps")
             return True
         return False
 
     async def check_links(self, message):
-        if not self.link_filter_enabled:  
+        settings = self.config.get(message.guild.id)
+        if not settings.link_filter_enabled:  
             return False
         if message.author.bot:
             return False
@@ -35645,7 +39437,8 @@ class AutoMod(commands.Cog):
 
         for content in content_to_check:
             if any(pattern in content for pattern in link_patterns):
-                if not any(allowed in content for allowed in self.link_whitelist):
+                whitelist = self.link_whitelist | settings.link_whitelist
+                if not any(allowed in content for allowed in whitelist):
                     try:
                         await asyncio.sleep(1)
                         await message.delete()
@@ -35689,8 +39482,9 @@ class AutoMod(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def automod(self, ctx, setting: str = None, value: str = None, timeout_minutes: int = None):
         
+        settings = self.config.get(ctx.guild.id)
         if timeout_minutes is None:
-            timeout_minutes = self.spam_timeout_minutes
+            timeout_minutes = settings.spam_timeout_minutes
 
         if setting is None:
             embed = EmbedBuilder(
@@ -35698,11 +39492,13 @@ class AutoMod(commands.Cog):
                 "Here are the current AutoMod settings and available commands:"
             ).set_color(discord.Color.blue())
 
-            embed.add_field("Spam Threshold", f"{self.spam_threshold} messages in {self.spam_interval} seconds")
-            embed.add_field("Spam Timeout", f"{self.spam_timeout_minutes} minutes")
-            embed.add_field("Caps Threshold", f"{self.caps_threshold * 100}%")
+            embed.add_field("Spam Threshold", f"{settings.spam_threshold} messages in {settings.spam_interval} seconds")
+            embed.add_field("Spam Timeout", f"{settings.spam_timeout_minutes} minutes")
+            embed.add_field("Caps Threshold", f"{settings.caps_threshold * 100}%")
+            embed.add_field("Tracked Members", str(len(self.spam_detector.windows.get(ctx.guild.id, {}))))
 
-            whitelist_display = "\n".join(list(self.link_whitelist)[:5]) if self.link_whitelist else "None"
+            whitelist = settings.link_whitelist | self.link_whitelist
+            whitelist_display = "\n".join(list(whitelist)[:5]) if whitelist else "None"
             embed.add_field("Whitelisted Links (First 5)", whitelist_display)
 
 
@@ -35713,6 +39509,8 @@ class AutoMod(commands.Cog):
                 "  - Set the maximum allowed percentage of caps in a message (0.0-1.0).\n"
                 "- `!automod spam_threshold <value> [timeout_minutes]`\n"
                 "  - Set the number of messages allowed before spam detection and the timeout duration.\n"
+                "- `!automod spam_interval <seconds>`\n"
+                "  - Set the time window the spam threshold is counted over.\n"
                 "- `!automod add_banned_word <word>`\n"
                 "  - Add a word to the banned words list.\n"
                 "- `!automod add_whitelist <url>`\n"
@@ -35735,38 +39533,46 @@ class AutoMod(commands.Cog):
             await ctx.send(embed=embed.build())
             return
 
-        settings = {
+        setting_types = {
             'caps_threshold': float,
             'spam_threshold': int,
+            'spam_interval': int,
             'add_banned_word': str,
             'add_whitelist': str
         }
 
-        if setting not in settings:
+        if setting not in setting_types:
             return await ctx.send("Invalid setting!")
 
         try:
-            if setting == 'spam_threshold':
-                self.spam_check = {}
-                self.spam_threshold = int(value)
-                self.spam_timeout_minutes = timeout_minutes
+            if setting in ['spam_threshold', 'spam_interval']:
+                if int(value) < (2 if setting == 'spam_threshold' else 1):
+                    raise ValueError
+                self.spam_detector.clear_guild(ctx.guild.id)
+                if setting == 'spam_threshold':
+                    self.config.update(ctx.guild.id, spam_threshold=int(value), spam_timeout_minutes=timeout_minutes)
+                else:
+                    self.config.update(ctx.guild.id, spam_interval=int(value))
 
                 embed = EmbedBuilder(
                     "⚙️ AutoMod Spam Settings Updated",
-                    f"Threshold: {value} messages in {self.spam_interval} seconds\nTimeout: {timeout_minutes} minutes"
+                    f"Threshold: {settings.spam_threshold} messages in {settings.spam_interval} seconds\nTimeout: {settings.spam_timeout_minutes} minutes"
                 ).set_color(discord.Color.green()).build()
 
             elif setting in ['add_banned_word', 'add_whitelist']:
                 if setting == 'add_banned_word':
-                    self.banned_words.add(value.lower())
+                    settings.banned_words.add(value.lower())
+                    self.config.save(ctx.guild.id)
+                    self.guild_matcher(ctx.guild.id).add(value)
                 else:
-                    self.link_whitelist.add(value.lower())
+                    settings.link_whitelist.add(value.lower())
+                    self.config.save(ctx.guild.id)
                 embed = EmbedBuilder(
                     "⚙️ AutoMod Updated",
                     f"Setting `{setting}` updated with value `{value}`"
                 ).set_color(discord.Color.green()).build()
             else:
-                setattr(self, setting, settings[setting](value))
+                self.config.update(ctx.guild.id, **{setting: setting_types[setting](value)})
                 embed = EmbedBuilder(
                     "⚙️ AutoMod Updated",
                     f"Setting `{setting}` updated to `{value}`"
@@ -35781,34 +39587,83 @@ class AutoMod(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def togglecaps(self, ctx):
         
-        self.caps_enabled = not getattr(self, 'caps_enabled', True)
-        status = "enabled" if self.caps_enabled else "disabled"
+        settings = self.config.get(ctx.guild.id)
+        self.config.update(ctx.guild.id, caps_enabled=not settings.caps_enabled)
+        status = "enabled" if settings.caps_enabled else "disabled"
         
         embed = discord.Embed(
             title="🔠 Caps Filter",
             description=f"Caps detection is now **{status}**",
-            color=discord.Color.green() if self.caps_enabled else discord.Color.red()
+            color=discord.Color.green() if settings.caps_enabled else discord.Color.red()
         )
         await ctx.send(embed=embed)
 
+    @commands.command()
+    @commands.is_owner()
+    async def automodbench(self, ctx, iterations: int = 200):
+        samples = [
+            "hey everyone, is the raid still happening tonight? bring snacks",
+            "this is a perfectly normal sentence with nothing interesting in it at all " * 4,
+            "lol that was such a promo move, total scheisse honestly",
+            "```py\nprint('hello world')\n``` anyone know why this fails on 3.12?",
+        ]
+        legacy_regex = {
+            word: re.compile(rf'\b{re.escape(word)}\b', re.IGNORECASE) for word in self.banned_matcher.words
+        }
+
+        def run_benchmark():
+            start = time.perf_counter()
+            for _ in range(iterations):
+                for content in samples:
+                    for pattern in legacy_regex.values():
+                        if pattern.search(content):
+                            break
+            regex_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                for content in samples:
+                    self.banned_matcher.search(content)
+            matcher_time = time.perf_counter() - start
+
+            mismatches = sum(
+                1 for content in samples
+                if any(p.search(content) for p in legacy_regex.values()) != (self.banned_matcher.search(content) is not None)
+            )
+            return regex_time, matcher_time, mismatches
+
+        regex_time, matcher_time, mismatches = await asyncio.to_thread(run_benchmark)
+        checks = iterations * len(samples)
+
+        embed = EmbedBuilder(
+            "⏱️ AutoMod Banned Word Benchmark",
+            f"{checks} messages checked against {len(self.banned_matcher)} banned words"
+        ).set_color(discord.Color.blue())
+        embed.add_field("Regex Loop", f"{regex_time * 1000:.1f} ms ({regex_time / checks * 1e6:.1f} µs/msg)")
+        embed.add_field("Matcher", f"{matcher_time * 1000:.1f} ms ({matcher_time / checks * 1e6:.1f} µs/msg)")
+        embed.add_field("Speedup", f"{regex_time / matcher_time:.1f}x" if matcher_time else "n/a")
+        embed.add_field("Result Mismatches", str(mismatches), inline=False)
+        await ctx.send(embed=embed.build())
+
     @commands.command()
     @commands.has_permissions(administrator=True)
     async def togglebadwords(self, ctx):
         
-        self.badwords_enabled = not getattr(self, 'badwords_enabled', True)
-        status = "enabled" if self.badwords_enabled else "disabled"
+        settings = self.config.get(ctx.guild.id)
+        self.config.update(ctx.guild.id, badwords_enabled=not settings.badwords_enabled)
+        status = "enabled" if settings.badwords_enabled else "disabled"
         
         embed = discord.Embed(
             title="🚫 Bad Words Filter",
             description=f"Bad words filter is now **{status}**",
-            color=discord.Color.green() if self.badwords_enabled else discord.Color.red()
+            color=discord.Color.green() if settings.badwords_enabled else discord.Color.red()
         )
         await ctx.send(embed=embed)
 
 class WelcomeSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.welcome_configs = {}
+        self.welcome_configs = bot.config_manager.namespace("welcome_system")
 
     @commands.group(invoke_without_command=True)
     @commands.has_permissions(administrator=True)
@@ -35836,6 +39691,7 @@ class WelcomeSystem(commands.Cog):
             self.welcome_configs[ctx.guild.id] = {}
             
         self.welcome_configs[ctx.guild.id]["message"] = message
+        self.welcome_configs.save(ctx.guild.id)
         
         preview = message.replace("{user}", ctx.author.mention)
         preview = preview.replace("{server}", ctx.guild.name)
@@ -35868,7 +39724,8 @@ class WelcomeSystem(commands.Cog):
         if ctx.guild.id not in self.welcome_configs:
             self.welcome_configs[ctx.guild.id] = {}
             
-        self.welcome_configs[ctx.guild.id]["color"] = colors[color.lower()]
+        self.welcome_configs[ctx.guild.id]["color"] = colors[color.lower()].value
+        self.welcome_configs.save(ctx.guild.id)
         
         embed = EmbedBuilder(
             "🎨 Welcome Color Set",
@@ -35928,6 +39785,7 @@ class WelcomeSystem(commands.Cog):
             self.welcome_configs[ctx.guild.id] = {}
             
         self.welcome_configs[ctx.guild.id]["channel_id"] = channel.id
+        self.welcome_configs.save(ctx.guild.id)
         
         embed = EmbedBuilder(
             "📝 Welcome Channel Set",
@@ -36028,6 +39886,7 @@ class WelcomeSystem(commands.Cog):
             
             if is_discord_cdn or is_valid_extension:
                 self.welcome_configs[ctx.guild.id]["banner_url"] = url
+                self.welcome_configs.save(ctx.guild.id)
                 
                 embed = EmbedBuilder(
                     "🖼️ Welcome Banner Set",
@@ -36041,6 +39900,7 @@ class WelcomeSystem(commands.Cog):
         else:
             
             self.welcome_configs[ctx.guild.id].pop("banner_url", None)
+            self.welcome_configs.save(ctx.guild.id)
             await ctx.send("✅ Welcome banner has been removed")
 
 class ReactionRoles(discord.ui.View):
@@ -37660,11 +41520,8 @@ class UserTracker(commands.Cog):
         self.bot = bot
         self.user_activity = {}
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author.bot:
-            return
-
+    @message_handler(ignore_bots=True)
+    async def on_message(self, message, context):
         user_id = message.author.id
         if user_id not in self.user_activity:
             self.user_activity[user_id] = {
@@ -37703,9 +41560,13 @@ class UserTracker(commands.Cog):
         embed.set_thumbnail(member.avatar.url if member.avatar else member.default_avatar.url)
         await ctx.send(embed=embed.build())
 
+IMPORT_FINISHED = time.perf_counter()
+
 TOKEN = os.getenv('D15C0RD_T0K3N')  # Do  NOT   hardcode your Discord Token here! 
 
 if __name__ == "__main__":
+    bot.renderer.start()
+    keep_alive()
 
     logging.basicConfig(                                        # Removable
         level=logging.INFO,
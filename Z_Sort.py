@@ -4,8 +4,8 @@ import random
 import json
 import csv
 import io
+import math
 import time
-import numpy as np
 
 
 class ZSortCommands(commands.Cog):
@@ -19,7 +19,7 @@ class ZSortCommands(commands.Cog):
         elapsed_time = time.time() - start_time
         stats = {
             "time_taken": elapsed_time,
-            "comparisons": len(arr) * int(np.log2(len(arr))) if len(arr) > 1 else 0,
+            "comparisons": len(arr) * int(math.log2(len(arr))) if len(arr) > 1 else 0,
             "swaps": len(arr),
             "recursion_depth": 0
         }
@@ -125,6 +125,8 @@ class ZSortCommands(commands.Cog):
         sorted(data.copy())
         timings['Python Timsort'] = time.time() - start
 
+        import numpy as np  # only the benchmark needs numpy, so it is not imported at startup
+
         start = time.time()
         np.sort(np.array(data.copy()))
         timings['Numpy sort'] = time.time() - start
@@ -8,6 +8,16 @@ from datetime import datetime
 
 init()
 
+# Export sections whose settings ConfigManager now stores. A guild's stored categories
+# are newer than any export, so these sections are left out of the replay when stored.
+STORED_SECTIONS = {
+    "welcome_config": ("welcome_system",),
+    "ticket_config": ("ticket_support_roles", "ticket_admin_roles", "ticket_categories", "ticket_logs"),
+    "automod": ("automod",),
+    "snipe_config": ("snipe",),
+    "logging_config": ("custom_logging",),
+}
+
 class AutoConfigLoader(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -37,6 +47,18 @@ class AutoConfigLoader(commands.Cog):
         
         return os.path.join(self.config_folder, latest_file)
     
+    def without_stored_sections(self, config_content, config_manager, guild):
+        config = json.loads(config_content)
+        stored = set(config_manager.load_config(guild.id))
+        skipped = [section for section, categories in STORED_SECTIONS.items()
+                   if section in config and stored.intersection(categories)]
+        if not skipped:
+            return config_content
+        for section in skipped:
+            del config[section]
+        print(f"{Fore.YELLOW}[CONFIG] {Fore.WHITE}Keeping stored settings for {guild.name}: {', '.join(skipped)}{Style.RESET_ALL}")
+        return json.dumps(config).encode()
+
     @commands.Cog.listener()
     async def on_ready(self):
         await asyncio.sleep(5)
@@ -60,7 +82,7 @@ class AutoConfigLoader(commands.Cog):
                         break
                 if target_channel:
                     break
-            
+
             try:
                
                 class CustomContext:
@@ -88,6 +110,10 @@ class AutoConfigLoader(commands.Cog):
                 
                 with open(latest_config, 'rb') as f:
                     config_content = f.read()
+
+                config_manager = getattr(self.bot, 'config_manager', None)
+                if config_manager:
+                    config_content = self.without_stored_sections(config_content, config_manager, target_channel.guild)
                 
                 attachment = CustomAttachment(os.path.basename(latest_config), config_content)
                 
@@ -1,9 +1,6 @@
-import asyncio
 import os
 import discord
 from discord.ext import commands
-import importlib
-import sys
 import traceback
 
 class CogManager(commands.Cog):
@@ -13,6 +10,17 @@ class CogManager(commands.Cog):
     def get_cog_names(self):
         
         return sorted(self.bot.cogs.keys())
+
+    def extension_record(self, cog):
+        # Cogs that come from the Extensions folder are reloaded through the ExtensionLoader,
+        # which keeps their dependency order and rolls back a failed reload
+        extension_loader = self.bot.get_cog('ExtensionLoader')
+        if extension_loader is None or not hasattr(extension_loader, 'find_record'):
+            return None, None
+        record = extension_loader.find_record(cog.__module__)
+        if record is None or record.filename not in extension_loader.loaded_extensions:
+            return extension_loader, None
+        return extension_loader, record
         
     @commands.command(name="reload")
     @commands.is_owner()
@@ -50,6 +58,19 @@ class CogManager(commands.Cog):
                 return
             
             cog_instance = self.bot.cogs[actual_cog_name]
+            extension_loader, record = self.extension_record(cog_instance)
+            if record:
+                results = await extension_loader.reload_many([record.filename])
+                if not all(results.values()):
+                    raise RuntimeError(f"{record.error or 'Reload failed'} (previous version kept)")
+                embed.description = f"✅ Successfully reloaded cog: `{actual_cog_name}` ({record.reload_ms:.0f} ms)"
+                embed.color = discord.Color.green()
+                dependents = [filename[:-3] for filename in results if filename != record.filename]
+                if dependents:
+                    embed.add_field(name="Also Reloaded (dependents)", value=", ".join(dependents), inline=False)
+                await message.edit(embed=embed)
+                return
+
             cog_class = cog_instance.__class__
             
             await self.bot.remove_cog(actual_cog_name)
@@ -102,6 +123,8 @@ class CogManager(commands.Cog):
                
                 if cog_name == self.__class__.__name__:
                     continue
+                if self.extension_record(cog_instance)[1]:
+                    continue
                     
                 cog_class = cog_instance.__class__
                 
@@ -114,6 +137,16 @@ class CogManager(commands.Cog):
                 success_cogs.append(cog_name)
             except Exception as e:
                 failed_cogs[cog_name] = f"{type(e).__name__}: {str(e)}"
+
+        extension_loader = self.bot.get_cog('ExtensionLoader')
+        if extension_loader and hasattr(extension_loader, 'reload_many'):
+            results = await extension_loader.reload_many(sorted(extension_loader.loaded_extensions))
+            for filename, success in results.items():
+                if success:
+                    success_cogs.append(filename[:-3])
+                else:
+                    record = extension_loader.records.get(filename)
+                    failed_cogs[filename[:-3]] = record.error if record and record.error else "Reload failed"
         
         if success_cogs:
         
@@ -201,93 +234,55 @@ class CogManager(commands.Cog):
                     await message.edit(embed=embed)
                     return
             
-            extensions_abs_path = os.path.abspath(extensions_dir)
-            if extensions_abs_path not in sys.path:
-                sys.path.insert(0, extensions_abs_path)
-            
-            try:
-                
-                module = importlib.import_module(cog_name)
-                importlib.reload(module)
-            except Exception as e:
-                embed.description = f"❌ Error importing module `{cog_name}`."
-                embed.add_field(
-                    name="Error",
-                    value=f"```py\n{type(e).__name__}: {str(e)}\n```",
-                    inline=False
-                )
+            extension_loader = self.bot.get_cog('ExtensionLoader')
+            if extension_loader is None:
+                embed.description = "❌ The ExtensionLoader is not loaded."
                 embed.color = discord.Color.red()
                 await message.edit(embed=embed)
                 return
-            
-            if not hasattr(module, 'setup'):
-                embed.description = f"❌ Module `{cog_name}` does not have a setup function."
+
+            # The loader also loads anything the extension lists in REQUIRES
+            if not await extension_loader.load_extension(cog_name):
+                record = extension_loader.find_record(cog_name)
+                error = record.error if record and record.error else "See the logs for details."
+                embed.description = f"❌ Error loading `{cog_name}`."
                 embed.add_field(
-                    name="Required Format",
-                    value=(
-                        "Your cog file must include a setup function:\n"
-                        "```py\ndef setup(bot):\n    bot.add_cog(YourCog(bot))\n```"
-                    ),
+                    name="Error",
+                    value=f"```py\n{error[:1000]}\n```",
                     inline=False
                 )
-                embed.color = discord.Color.red()
-                await message.edit(embed=embed)
-                return
-            
-            try:
-              
-                if asyncio.iscoroutinefunction(module.setup):
-                    await module.setup(self.bot)
-                else:
-                    module.setup(self.bot)
-                
-                loaded_cog_name = None
-                for name, cog in self.bot.cogs.items():
-                    if cog.__module__ == cog_name:
-                        loaded_cog_name = name
-                        break
-                
-                extension_loader = self.bot.get_cog('ExtensionLoader')
-                if extension_loader and hasattr(extension_loader, 'loaded_extensions'):
-                    extension_path = f"Extensions.{cog_name}"
-                    if extension_path not in extension_loader.loaded_extensions:
-                        extension_loader.loaded_extensions.append(extension_path)
-                
-                embed.description = f"✅ Successfully loaded cog: `{loaded_cog_name or cog_name}`"
-                embed.color = discord.Color.green()
-                
-                new_commands = []
-                if loaded_cog_name:
-                    cog = self.bot.get_cog(loaded_cog_name)
-                    if cog:
-                        for cmd in cog.get_commands():
-                            new_commands.append(f"`!{cmd.name}`")
-                
-                if new_commands:
+                if "no setup function" in error:
                     embed.add_field(
-                        name="New Commands Available",
-                        value=", ".join(new_commands),
+                        name="Required Format",
+                        value=(
+                            "Your cog file must include a setup function:\n"
+                            "```py\nasync def setup(bot):\n    await bot.add_cog(YourCog(bot))\n```"
+                        ),
                         inline=False
                     )
-                
-            except Exception as e:
-                embed.description = f"❌ Error during setup of `{cog_name}`."
-                embed.add_field(
-                    name="Error",
-                    value=f"```py\n{type(e).__name__}: {str(e)}\n```",
-                    inline=False
-                )
-                
-                traceback_text = "".join(traceback.format_exception(type(e), e, e.__traceback__))
-                if len(traceback_text) > 1024:
-                    traceback_text = traceback_text[:1021] + "..."
-                    
+                embed.color = discord.Color.red()
+                await message.edit(embed=embed)
+                return
+
+            record = extension_loader.find_record(cog_name)
+            loaded_cog_names = extension_loader.module_cogs(record.module_path) if record else []
+            load_time = f" ({record.load_ms:.0f} ms)" if record and record.load_ms is not None else ""
+            embed.description = f"✅ Successfully loaded cog: `{', '.join(loaded_cog_names) or cog_name}`{load_time}"
+            embed.color = discord.Color.green()
+
+            new_commands = []
+            for loaded_cog_name in loaded_cog_names:
+                cog = self.bot.get_cog(loaded_cog_name)
+                if cog:
+                    for cmd in cog.get_commands():
+                        new_commands.append(f"`!{cmd.name}`")
+
+            if new_commands:
                 embed.add_field(
-                    name="Traceback",
-                    value=f"```py\n{traceback_text}\n```",
+                    name="New Commands Available",
+                    value=", ".join(new_commands),
                     inline=False
                 )
-                embed.color = discord.Color.red()
         
         except Exception as e:
             
@@ -345,16 +340,16 @@ class CogManager(commands.Cog):
                 return
             
             cog_instance = self.bot.get_cog(actual_cog_name)
-            module_name = cog_instance.__module__ if cog_instance else None
+            extension_loader, record = self.extension_record(cog_instance)
             
-            await self.bot.remove_cog(actual_cog_name)
-            
-            if module_name:
-                extension_loader = self.bot.get_cog('ExtensionLoader')
-                if extension_loader and hasattr(extension_loader, 'loaded_extensions'):
-                    extension_path = f"Extensions.{module_name.split('.')[-1]}"
-                    if extension_path in extension_loader.loaded_extensions:
-                        extension_loader.loaded_extensions.remove(extension_path)
+            if record:
+                # Unloading the whole extension also unloads the extensions that require it
+                dependents = [filename[:-3] for filename in extension_loader.dependents(record.filename)]
+                await extension_loader.unload_extension(record.filename)
+                if dependents:
+                    embed.add_field(name="Also Unloaded (dependents)", value=", ".join(dependents), inline=False)
+            else:
+                await self.bot.remove_cog(actual_cog_name)
             
             embed.description = f"✅ Successfully unloaded cog: `{actual_cog_name}`"
             embed.color = discord.Color.green()
@@ -385,7 +380,7 @@ class CogManager(commands.Cog):
         extension_loader = self.bot.get_cog('ExtensionLoader')
         extension_list = []
         if extension_loader and hasattr(extension_loader, 'loaded_extensions'):
-            extension_list = [ext.split('.')[-1] for ext in extension_loader.loaded_extensions]
+            extension_list = [ext[:-3] + extension_loader.timing_text(ext) for ext in sorted(extension_loader.loaded_extensions)]
         
         if loaded_cogs:
            
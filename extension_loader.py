@@ -1,13 +1,18 @@
+from __future__ import annotations
+
 import os
 import sys
+import ast
 import asyncio
+import hashlib
 import importlib
-import traceback
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 import shutil
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from dotenv import load_dotenv
 
 import logging
@@ -49,19 +54,68 @@ handler.setFormatter(ColoredFormatter())
 logger.addHandler(handler)
 
 
+def read_requires(source: bytes) -> list[str]:
+    # Extensions name what they need with a module-level REQUIRES = ["other extension", ...].
+    # It is read from the source so the load order is known before anything is imported.
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return []
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "REQUIRES"
+                                                for target in node.targets):
+            try:
+                value = ast.literal_eval(node.value)
+            except ValueError:
+                return []
+            return [value] if isinstance(value, str) else [str(item) for item in value]
+    return []
+
+
+@dataclass
+class ExtensionRecord:
+    filename: str
+    module_path: str
+    file_path: Path
+    requires: list[str] = field(default_factory=list)
+    digest: str | None = None
+    failed_digest: str | None = None
+    seen: tuple | None = None
+    module: object = None
+    load_ms: float | None = None
+    reload_ms: float | None = None
+    reloads: int = 0
+    error: str | None = None
+
+
 class ExtensionLoader(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.extensions_dir = "Extensions"
         self.loaded_extensions: set[str] = set()
+        self.records: dict[str, ExtensionRecord] = {}
+        self.lock = asyncio.Lock()
+        self.startup_task = None
 
         load_dotenv()
         self.auto_load = os.getenv("AutoExtension", "Off").lower() == "on"
+        self.hot_reload = os.getenv("ExtensionHotReload", "Off").lower() == "on"
 
-    @commands.Cog.listener()
-    async def on_ready(self):
+    async def cog_load(self):
+        # Loading once per process, not per on_ready, so a reconnect does not re-run it
         if self.auto_load:
-            await self.load_all_extensions()
+            self.startup_task = asyncio.create_task(self.load_after_ready())
+        if self.hot_reload:
+            self.watch_extensions.start()
+
+    async def cog_unload(self):
+        self.watch_extensions.cancel()
+        if self.startup_task:
+            self.startup_task.cancel()
+
+    async def load_after_ready(self):
+        await self.bot.wait_until_ready()
+        await self.load_all_extensions()
 
     def _normalize_basename_candidates(self, raw: str) -> set[str]:
         base = raw.strip()
@@ -103,6 +157,208 @@ class ExtensionLoader(commands.Cog):
         filename = found_file.name  
         return filename, module_path, found_file
 
+    def _record(self, extension_name: str) -> ExtensionRecord:
+        filename, module_path, file_path = self._derive_file_and_module(extension_name)
+        record = self.records.get(filename)
+        if record is None:
+            record = self.records[filename] = ExtensionRecord(filename, module_path, file_path)
+        record.requires = []
+        for requirement in read_requires(file_path.read_bytes()):
+            try:
+                record.requires.append(self._derive_file_and_module(requirement)[0])
+            except FileNotFoundError:
+                raise FileNotFoundError(f"{filename} requires missing extension '{requirement}'")
+        return record
+
+    def plan(self, names, include_loaded=False) -> tuple[list[list[str]], dict[str, str]]:
+        # Groups the extensions and whatever they require (unless already loaded) into levels.
+        # Everything in a level only depends on earlier levels, so a level loads concurrently.
+        graph, errors, requested = {}, {}, set()
+        queue = [(name, True) for name in names]
+        while queue:
+            name, top = queue.pop()
+            try:
+                record = self._record(name)
+            except (FileNotFoundError, OSError) as e:
+                errors[name] = str(e)
+                continue
+            if top:
+                requested.add(record.filename)
+            if record.filename in graph:
+                continue
+            graph[record.filename] = record.requires
+            queue.extend((requirement, False) for requirement in record.requires
+                         if requirement not in self.loaded_extensions)
+
+        if not include_loaded:
+            graph = {filename: requires for filename, requires in graph.items()
+                     if filename not in self.loaded_extensions or filename in requested}
+        pending = {filename: {requirement for requirement in requires if requirement in graph}
+                   for filename, requires in graph.items()}
+        levels = []
+        while pending:
+            ready = sorted(filename for filename, requires in pending.items() if not requires)
+            if not ready:
+                for filename in pending:
+                    errors[filename] = "dependency cycle: " + ", ".join(sorted(pending))
+                break
+            levels.append(ready)
+            for filename in ready:
+                del pending[filename]
+            for requires in pending.values():
+                requires.difference_update(ready)
+        return levels, errors
+
+    def dependents(self, filename: str) -> list[str]:
+        found = []
+        queue = [filename]
+        while queue:
+            current = queue.pop()
+            for other in self.loaded_extensions:
+                record = self.records.get(other)
+                if record and current in record.requires and other not in found and other != filename:
+                    found.append(other)
+                    queue.append(other)
+        return found
+
+    def source_digest(self, record: ExtensionRecord) -> str:
+        # Hashes are cached per (mtime, size), so polling an unchanged folder reads no files
+        stat = record.file_path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        if record.seen is None or record.seen[0] != key:
+            record.seen = (key, hashlib.sha256(record.file_path.read_bytes()).hexdigest())
+        return record.seen[1]
+
+    def has_changed(self, filename: str) -> bool:
+        record = self.records.get(filename)
+        if record is None or not record.file_path.exists():
+            return False
+        return self.source_digest(record) != record.digest
+
+    def module_cogs(self, module_path: str) -> list[str]:
+        return [name for name, cog in self.bot.cogs.items() if cog.__module__ == module_path]
+
+    async def _import_and_setup(self, record: ExtensionRecord):
+        digest = self.source_digest(record)
+        spec = importlib.util.spec_from_file_location(record.module_path, record.file_path)
+        if not spec or not spec.loader:
+            raise FileNotFoundError(f"Spec konnte nicht erstellt werden für {record.filename}")
+
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[record.module_path] = module
+        spec.loader.exec_module(module)
+
+        if not hasattr(module, 'setup'):
+            raise ValueError(f"Extension {record.filename} has no setup function")
+        if asyncio.iscoroutinefunction(module.setup):
+            await module.setup(self.bot)
+        else:
+            module.setup(self.bot)
+            logger.warning(f"Extension {record.filename} uses a synchronous setup function. Consider updating to 'async def setup'.")
+
+        record.module = module
+        record.digest = digest
+        record.failed_digest = None
+        record.error = None
+
+    async def _discard_partial(self, record: ExtensionRecord):
+        for name in self.module_cogs(record.module_path):
+            await self.bot.remove_cog(name)
+        sys.modules.pop(record.module_path, None)
+
+    async def _load(self, filename: str, failed: set[str]) -> bool:
+        record = self.records[filename]
+        if filename in self.loaded_extensions:
+            return True
+        blocked = [requirement for requirement in record.requires if requirement in failed]
+        if blocked:
+            record.error = f"required extension failed: {', '.join(blocked)}"
+            logger.error(f"{Fore.RED}✗ Skipped {filename}: {record.error}")
+            return False
+        started = time.perf_counter()
+        try:
+            await self._import_and_setup(record)
+        except Exception as e:
+            await self._discard_partial(record)
+            record.error = f"{type(e).__name__}: {e}"
+            logger.error(f"{Fore.RED}Error loading {filename}: {e}")
+            return False
+        record.load_ms = (time.perf_counter() - started) * 1000
+        self.loaded_extensions.add(filename)
+        logger.info(f"{Fore.GREEN}✓ Successfully loaded: {filename} ({record.load_ms:.0f} ms)")
+        return True
+
+    async def _load_planned(self, names) -> dict[str, bool]:
+        levels, errors = self.plan(names)
+        results = {}
+        for name, error in errors.items():
+            logger.error(f"{Fore.RED}Error loading {name}: {error}")
+            if name in self.records:
+                self.records[name].error = error
+            results[name] = False
+        failed = set(results)
+        for level in levels:
+            outcomes = await asyncio.gather(*(self._load(filename, failed) for filename in level))
+            for filename, success in zip(level, outcomes):
+                results[filename] = success
+                if not success:
+                    failed.add(filename)
+        return results
+
+    async def _reload(self, filename: str) -> bool:
+        # Swaps the module and its cogs; if the new version fails to import or set up, the old
+        # module and the same cog instances are put back so the extension keeps working
+        record = self.records[filename]
+        old_module = sys.modules.get(record.module_path, record.module)
+        old_cogs = [self.bot.cogs[name] for name in self.module_cogs(record.module_path)]
+        digest = self.source_digest(record)
+        started = time.perf_counter()
+        for cog in old_cogs:
+            await self.bot.remove_cog(cog.qualified_name)
+        try:
+            await self._import_and_setup(record)
+        except Exception as e:
+            await self._discard_partial(record)
+            if old_module is not None:
+                sys.modules[record.module_path] = old_module
+            for cog in old_cogs:
+                await self.bot.add_cog(cog)
+            record.error = f"{type(e).__name__}: {e}"
+            record.failed_digest = digest
+            logger.error(f"{Fore.RED}Reloading {filename} failed, kept the previous version: {e}")
+            return False
+        record.reload_ms = (time.perf_counter() - started) * 1000
+        record.reloads += 1
+        logger.info(f"{Fore.GREEN}✓ Reloaded: {filename} ({record.reload_ms:.0f} ms)")
+        return True
+
+    async def _reload_planned(self, filenames, force=True) -> dict[str, bool | None]:
+        # Reloads the changed extensions and everything loaded that depends on them, requirements
+        # first. None marks extensions skipped because their source hash is unchanged.
+        targets = set()
+        for filename in filenames:
+            if force or self.has_changed(filename):
+                targets.add(filename)
+                targets.update(self.dependents(filename))
+        results = {filename: None for filename in filenames if filename not in targets}
+        levels, errors = self.plan(sorted(targets), include_loaded=True)
+        failed = set(errors)
+        for name in errors:
+            results[name] = False
+        for level in levels:
+            for filename in level:
+                record = self.records[filename]
+                if filename not in self.loaded_extensions:
+                    continue
+                if any(requirement in failed for requirement in record.requires):
+                    results[filename] = False
+                    failed.add(filename)
+                    continue
+                results[filename] = await self._reload(filename)
+                if not results[filename]:
+                    failed.add(filename)
+        return results
+
     async def load_all_extensions(self):
         logger.info(f"{Fore.CYAN}╔══════════════════════════════════════╗")
         logger.info(f"{Fore.CYAN}║      Auto-loading Extensions...      ║")
@@ -116,20 +372,17 @@ class ExtensionLoader(commands.Cog):
         extension_files = [f for f in os.listdir(self.extensions_dir)
                            if f.endswith('.py') and not f.startswith('_')]
 
-        success_count = 0
-        fail_count = 0
+        started = time.perf_counter()
+        async with self.lock:
+            new_files = [f for f in extension_files if f not in self.loaded_extensions]
+            results = await self._load_planned(new_files)
+            reloaded = await self._reload_planned([f for f in extension_files if f in self.loaded_extensions and f not in results],
+                                                  force=False)
+        results.update({f: success for f, success in reloaded.items() if success is not None})
 
-        for extension_file in extension_files:
-            try:
-                success = await self.load_extension(extension_file)
-                if success:
-                    success_count += 1
-                else:
-                    fail_count += 1
-            except Exception:
-                fail_count += 1
-                logger.error(f"{Fore.RED}✗ Failed to load: {extension_file}")
-                logger.error(traceback.format_exc())
+        success_count = sum(1 for success in results.values() if success)
+        fail_count = len(results) - success_count
+        unchanged = sum(1 for success in reloaded.values() if success is None)
 
         total = success_count + fail_count
         logger.info(f"{Fore.CYAN}╔══════════════════════════════════════╗")
@@ -137,45 +390,33 @@ class ExtensionLoader(commands.Cog):
         logger.info(f"{Fore.CYAN}╠══════════════════════════════════════╣")
         logger.info(f"{Fore.CYAN}║ {Fore.GREEN}Loaded: {success_count}{Fore.CYAN} | {Fore.RED}Failed: {fail_count}{Fore.CYAN} | Total: {total} ║")
         logger.info(f"{Fore.CYAN}╚══════════════════════════════════════╝")
+        logger.info(f"{Fore.CYAN}Unchanged: {unchanged} | Took {(time.perf_counter() - started) * 1000:.0f} ms")
 
     async def load_extension(self, extension_name: str):
-        try:
-            filename, module_path, file_path = self._derive_file_and_module(extension_name)
-            spec = importlib.util.spec_from_file_location(module_path, file_path)
-            if not spec or not spec.loader:
-                raise FileNotFoundError(f"Spec konnte nicht erstellt werden für {filename}")
-
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[module_path] = module
-            spec.loader.exec_module(module)
-
-            if hasattr(module, 'setup'):
-                if asyncio.iscoroutinefunction(module.setup):
-                    await module.setup(self.bot)
-                else:
-                    module.setup(self.bot)
-                    logger.warning(f"Extension {filename} uses a synchronous setup function. Consider updating to 'async def setup'.")
-                self.loaded_extensions.add(filename)
-                logger.info(f"{Fore.GREEN}✓ Successfully loaded: {filename}")
-                return True
-            else:
-                raise ValueError(f"Extension {filename} has no setup function")
-        except Exception as e:
-            logger.error(f"{Fore.RED}Error loading {extension_name}: {e}")
-            return False
+        async with self.lock:
+            results = await self._load_planned([extension_name])
+        return bool(results) and all(results.values())
 
     async def unload_extension(self, extension_name: str):
         try:
             filename, module_path, file_path = self._derive_file_and_module(extension_name)
 
-            for name, cog in list(self.bot.cogs.items()):
-                if hasattr(cog, '__module__') and cog.__module__ == module_path:
-                    await self.bot.remove_cog(name)
+            # Dependents go first so nothing is left holding the unloaded module
+            for dependent in reversed(self.dependents(filename)):
+                if dependent in self.loaded_extensions:
+                    await self.unload_extension(dependent)
+
+            for name in self.module_cogs(module_path):
+                await self.bot.remove_cog(name)
 
             if module_path in sys.modules:
                 del sys.modules[module_path]
 
             self.loaded_extensions.discard(filename)
+            record = self.records.get(filename)
+            if record:
+                record.module = None
+                record.digest = None
             logger.info(f"{Fore.GREEN}✓ Unloaded: {filename}")
             return True
         except Exception as e:
@@ -186,13 +427,11 @@ class ExtensionLoader(commands.Cog):
         try:
             filename, module_path, file_path = self._derive_file_and_module(extension_name)
 
-            if filename in self.loaded_extensions:
-                unload_success = await self.unload_extension(extension_name)
-                if not unload_success:
-                    logger.error(f"{Fore.RED}Failed to unload {filename} during reload.")
-                    return False
+            if filename not in self.loaded_extensions:
+                return await self.load_extension(extension_name)
 
-            return await self.load_extension(extension_name)
+            results = await self.reload_many([filename])
+            return all(results.values())
         except Exception as e:
             logger.error(f"{Fore.RED}Error reloading {extension_name}: {e}")
             return False
@@ -229,6 +468,48 @@ class ExtensionLoader(commands.Cog):
             logger.error(f"{Fore.RED}Fehler beim Entfernen der Extension {extension_name}: {e}")
             return False
 
+    async def reload_many(self, filenames, force: bool = True) -> dict[str, bool | None]:
+        async with self.lock:
+            return await self._reload_planned(filenames, force=force)
+
+    async def reload_changed(self, force: bool = False) -> dict[str, bool | None]:
+        return await self.reload_many(sorted(self.loaded_extensions), force=force)
+
+    def find_record(self, name: str) -> ExtensionRecord | None:
+        # Accepts a module path (cog.__module__), a file name or an extension name
+        if name.lower().endswith(".py"):
+            name = name[:-3]
+        for record in self.records.values():
+            if name in (record.module_path, record.filename[:-3], record.module_path.rsplit(".", 1)[-1]):
+                return record
+        return None
+
+    @tasks.loop(seconds=2)
+    async def watch_extensions(self):
+        changed = [filename for filename in sorted(self.loaded_extensions)
+                   if self.has_changed(filename)
+                   and self.source_digest(self.records[filename]) != self.records[filename].failed_digest]
+        if not changed:
+            return
+        logger.info(f"{Fore.CYAN}Detected changes in: {', '.join(changed)}")
+        async with self.lock:
+            await self._reload_planned(changed)
+
+    @watch_extensions.error
+    async def watch_extensions_error(self, error):
+        logger.error(f"{Fore.RED}Extension watcher error: {error}")
+
+    def timing_text(self, filename: str) -> str:
+        record = self.records.get(filename)
+        if record is None or record.load_ms is None:
+            return ""
+        text = f" · {record.load_ms:.0f} ms"
+        if record.reloads:
+            text += f" ({record.reloads} reloads, last {record.reload_ms:.0f} ms)"
+        if record.requires:
+            text += f" · needs {', '.join(name[:-3] for name in record.requires)}"
+        return text
+
     @commands.group(name="extension", aliases=["ext"], invoke_without_command=True)
     @commands.has_permissions(administrator=True)
     async def extension_group(self, ctx):
@@ -244,7 +525,14 @@ class ExtensionLoader(commands.Cog):
                   "`!extension unload <name>` - Unload an extension\n"
                   "`!extension reload <name>` - Reload an extension\n"
                   "`!extension remove <name>` - Remove (unload + delete with backup)\n"
-                  "`!extension reloadall` - Reload all extensions",
+                  "`!extension reloadall [force]` - Reload changed extensions (or all with force)\n"
+                  "`!extension watch [on/off]` - Hot reload extensions when their file changes",
+            inline=False
+        )
+        embed.add_field(
+            name="Dependencies",
+            value="An extension can set `REQUIRES = [\"other extension\"]`. Required extensions load first, "
+                  "independent ones load together, and dependents are reloaded with what they need.",
             inline=False
         )
         await ctx.send(embed=embed)
@@ -268,7 +556,7 @@ class ExtensionLoader(commands.Cog):
         loaded_list = ""
         for ext in sorted(self.loaded_extensions):
             ext_name = ext[:-3]
-            loaded_list += f"✅ {ext_name}\n"
+            loaded_list += f"✅ {ext_name}{self.timing_text(ext)}\n"
         if loaded_list:
             embed.add_field(name="Loaded Extensions", value=loaded_list, inline=False)
         else:
@@ -277,11 +565,14 @@ class ExtensionLoader(commands.Cog):
         not_loaded = [ext for ext in available_extensions if ext not in self.loaded_extensions]
         not_loaded_list = ""
         for ext in sorted(not_loaded):
-            not_loaded_list += f"❌ {ext[:-3]}\n"
+            record = self.records.get(ext)
+            error = f" · {record.error[:80]}" if record and record.error else ""
+            not_loaded_list += f"❌ {ext[:-3]}{error}\n"
         if not_loaded_list:
             embed.add_field(name="Available Extensions", value=not_loaded_list, inline=False)
 
-        embed.set_footer(text=f"Auto-loading is {'enabled' if self.auto_load else 'disabled'}")
+        embed.set_footer(text=f"Auto-loading is {'enabled' if self.auto_load else 'disabled'} | "
+                              f"Hot reload is {'on' if self.watch_extensions.is_running() else 'off'}")
         await ctx.send(embed=embed)
 
     @extension_group.command(name="load")
@@ -346,25 +637,30 @@ class ExtensionLoader(commands.Cog):
 
     @extension_group.command(name="reloadall")
     @commands.has_permissions(administrator=True)
-    async def reload_all_extensions(self, ctx):
+    async def reload_all_extensions(self, ctx, mode: str = None):
         if not self.loaded_extensions:
             await ctx.send("❌ No extensions are currently loaded.")
             return
 
-        extensions_to_reload = list(self.loaded_extensions)
-        success_count = 0
-        fail_count = 0
+        results = await self.reload_changed(force=mode == "force")
+        success_count = sum(1 for success in results.values() if success)
+        fail_count = sum(1 for success in results.values() if success is False)
+        unchanged = sum(1 for success in results.values() if success is None)
 
-        for extension in extensions_to_reload:
-          
-            name_no_ext = extension[:-3]
-            success = await self.reload_extension(name_no_ext)
-            if success:
-                success_count += 1
-            else:
-                fail_count += 1
+        await ctx.send(f"✅ Reloaded {success_count} extensions. Failed: {fail_count} | Unchanged: {unchanged}")
 
-        await ctx.send(f"✅ Reloaded {success_count} extensions. Failed: {fail_count}")
+    @extension_group.command(name="watch")
+    @commands.has_permissions(administrator=True)
+    async def watch_extensions_cmd(self, ctx, state: str = None):
+        if state is None:
+            enable = not self.watch_extensions.is_running()
+        else:
+            enable = state.lower() in ("on", "true", "enable", "1")
+        if enable and not self.watch_extensions.is_running():
+            self.watch_extensions.start()
+        elif not enable and self.watch_extensions.is_running():
+            self.watch_extensions.cancel()
+        await ctx.send(f"👀 Hot reload is now {'on' if enable else 'off'}.")
 
 
 def configure_all_loggers():
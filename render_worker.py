@@ -0,0 +1,154 @@
+import colorsys
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Runs inside the bot's render pool (see RenderService in Main_bot_3.py), so it must stay
+# importable without the bot: Pillow only, no discord objects in or out.
+
+FONT_SIZES = (12, 60)
+ASCII_RAMP = "@%#*+=-:. "
+ANSI_COLORS = {
+    30: (0, 0, 0),
+    31: (205, 49, 49),
+    32: (13, 188, 121),
+    33: (229, 229, 16),
+    34: (36, 114, 200),
+    35: (188, 63, 188),
+    36: (17, 168, 205),
+    37: (229, 229, 229)
+}
+MESSAGE_LIMIT = 1900
+
+_fonts = {}
+
+
+def load_font(size):
+    font = _fonts.get(size)
+    if font is None:
+        try:
+            font = ImageFont.truetype("arial.ttf", size)
+        except OSError:
+            try:
+                font = ImageFont.load_default(size=size)
+            except TypeError:
+                font = ImageFont.load_default()
+        _fonts[size] = font
+    return font
+
+
+def init_worker():
+    for size in FONT_SIZES:
+        load_font(size)
+
+
+def ping():
+    return True
+
+
+def to_png(img):
+    buffer = BytesIO()
+    img.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def activity_chart(hour_counts):
+    img = Image.new('RGB', (800, 400), color='white')
+    draw = ImageDraw.Draw(img)
+
+    draw.line([(50, 350), (750, 350)], fill='black', width=2)
+    draw.line([(50, 50), (50, 350)], fill='black', width=2)
+
+    max_count = max(hour_counts) or 1
+    bar_width = 25
+    for hour, count in enumerate(hour_counts):
+        bar_height = (count / max_count) * 250
+        x = 50 + (hour * 30)
+        draw.rectangle([(x, 350 - bar_height), (x + bar_width, 350)], fill='blue')
+
+    font = load_font(12)
+    for hour in range(0, 24, 3):
+        x = 50 + (hour * 30)
+        draw.text((x, 360), f"{hour:02d}:00", fill='black', font=font)
+
+    return to_png(img)
+
+
+def text_image(text, color):
+    img = Image.new('RGB', (500, 100), color='black')
+    draw = ImageDraw.Draw(img)
+    font = load_font(60)
+
+    text_width = draw.textlength(text, font=font)
+    x = (500 - text_width) / 2
+    y = (100 - 60) / 2
+    draw.text((x, y), text, fill=color, font=font)
+
+    return to_png(img)
+
+
+def color_preview(r, g, b, hex_text):
+    img = Image.new('RGB', (300, 100), (r, g, b))
+    draw = ImageDraw.Draw(img)
+
+    h, s, v = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+    text_color = (0, 0, 0) if (r + g + b) / 3 > 128 else (255, 255, 255)
+    draw.text((10, 10), f"RGB: ({r}, {g}, {b})", fill=text_color)
+    draw.text((10, 40), f"HEX: {hex_text}", fill=text_color)
+    draw.text((10, 70), f"HSV: ({int(h * 360)}°, {int(s * 100)}%, {int(v * 100)}%)", fill=text_color)
+
+    return to_png(img)
+
+
+def fit_image(image, width):
+    # Characters are roughly twice as tall as they are wide
+    height = max(1, int(image.height / image.width * width * 0.5))
+    rows = min(height, MESSAGE_LIMIT // (width + 1))
+    return image.resize((width, rows))
+
+
+def nearest_ansi(pixel):
+    return min(ANSI_COLORS, key=lambda code: sum((a - b) ** 2 for a, b in zip(pixel, ANSI_COLORS[code])))
+
+
+def image_ascii(data, width=60, color_width=24):
+    image = Image.open(BytesIO(data)).convert('RGB')
+
+    gray = fit_image(image, width).convert('L')
+    scale = (len(ASCII_RAMP) - 1) / 255
+    pixels = list(gray.getdata())
+    ascii_art = "\n".join(
+        "".join(ASCII_RAMP[int(value * scale)] for value in pixels[row:row + width])
+        for row in range(0, len(pixels), width)
+    )
+
+    small = fit_image(image, color_width)
+    lines = []
+    size = 0
+    for y in range(small.height):
+        line, current = [], None
+        for x in range(color_width):
+            code = nearest_ansi(small.getpixel((x, y)))
+            if code != current:
+                line.append(f"\u001b[{code}m")
+                current = code
+            line.append("█")
+        line = "".join(line) + "\u001b[0m"
+        size += len(line) + 1
+        if size > MESSAGE_LIMIT:
+            break
+        lines.append(line)
+
+    return ascii_art, "\n".join(lines)
+
+
+RENDERERS = {
+    "activity_chart": activity_chart,
+    "text_image": text_image,
+    "color_preview": color_preview,
+    "image_ascii": image_ascii
+}
+
+
+def render(kind, params):
+    return RENDERERS[kind](**params)
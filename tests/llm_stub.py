@@ -0,0 +1,46 @@
+import json
+
+from aiohttp import web
+
+# Minimal stand-in for the OpenAI and Anthropic streaming endpoints. Every request body
+# is recorded in `requests`; the reply streams `chunks` as SSE events, or returns
+# `error` = (status, message) as a JSON error instead.
+
+
+def sse(event) -> bytes:
+    return f"data: {json.dumps(event)}\n\n".encode()
+
+
+class StubLLM:
+    def __init__(self, chunks=("Hello", ", ", "world")):
+        self.chunks = list(chunks)
+        self.requests = []
+        self.error = None
+        self.app = web.Application()
+        self.app.router.add_post("/v1/chat/completions", self.chat_completions)
+        self.app.router.add_post("/v1/messages", self.messages)
+
+    async def stream_reply(self, request, events, done: bytes = None):
+        self.requests.append(await request.json())
+        if self.error:
+            status, message = self.error
+            return web.json_response({"error": {"message": message}}, status=status)
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for event in events:
+            await response.write(sse(event))
+        if done:
+            await response.write(done)
+        await response.write_eof()
+        return response
+
+    async def chat_completions(self, request):
+        events = [{"choices": [{"delta": {"content": chunk}}]} for chunk in self.chunks]
+        return await self.stream_reply(request, events, b"data: [DONE]\n\n")
+
+    async def messages(self, request):
+        events = [{"type": "message_start"}]
+        events += [{"type": "content_block_delta", "delta": {"text": chunk}} for chunk in self.chunks]
+        events.append({"type": "message_stop"})
+        return await self.stream_reply(request, events)
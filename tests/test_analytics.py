@@ -0,0 +1,46 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from Main_bot_3 import AnalyticsDatabase
+
+
+def test_rollups_cover_all_tiers_without_double_counting(tmp_path):
+    async def run():
+        analytics = AnalyticsDatabase(SimpleNamespace(loop=asyncio.get_running_loop()),
+                                      db_path=str(tmp_path / "analytics.db"), compact_interval=3600)
+        await analytics.start()
+        # Drive flushing and compaction by hand
+        for task in analytics.tasks:
+            task.cancel()
+        now = datetime.now()
+        old = (now - timedelta(days=70)).strftime('%Y-%m-%d 10:00:00')
+        recent = (now - timedelta(days=3)).strftime('%Y-%m-%d 10:00:00')
+        await analytics.db.executemany(
+            "INSERT INTO user_activity VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(1, 9, 5, 0, 0, 0, old), (1, 9, 2, 30, 0, 0, recent), (2, 9, 7, 0, 1, 0, recent)]
+        )
+        await analytics.db.commit()
+        await analytics.compact()
+        await analytics.compact()
+
+        analytics.record(1, 9, 'message')
+        analytics.record(1, 9, 'command')
+        analytics.record(3, 8, 'message')
+
+        all_time = await analytics.totals(9)
+        week = await analytics.totals(9, 7)
+        user = await analytics.totals(9, user_id=1)
+        top = await analytics.top_users(9, 7)
+        async with analytics.db.execute("SELECT COUNT(*) FROM user_activity WHERE timestamp = ?", (old,)) as cursor:
+            (old_raw,) = await cursor.fetchone()
+        await analytics.close()
+        return all_time, week, user, top, old_raw
+
+    all_time, week, user, top, old_raw = asyncio.run(run())
+    assert all_time == {'message': 15, 'voice': 30, 'reaction': 1, 'command': 1}
+    assert week == {'message': 10, 'voice': 30, 'reaction': 1, 'command': 1}
+    assert user == {'message': 8, 'voice': 30, 'reaction': 0, 'command': 1}
+    assert top == [(2, 7), (1, 3)]
+    # Raw hours past retention are gone, but their counts live on in the rollups
+    assert old_raw == 0
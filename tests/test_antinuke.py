@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+
+from Main_bot_3 import AntiNukeConfig, AntiNukeSystem, ConfigManager
+
+
+def test_violations_count_inside_a_sliding_window(tmp_path):
+    manager = ConfigManager(None, db_path=str(tmp_path / "config.db"))
+    antinuke = AntiNukeSystem(SimpleNamespace(config_manager=manager))
+
+    counts = [antinuke.record_violation(1, 2, "ban_limit", 3, 10, now=t) for t in (0, 4, 8, 15, 16)]
+    # The hit at 15s has left 0s and 4s behind; at 16s only 8, 15 and 16 remain
+    assert counts == [1, 2, 3, 2, 3]
+    assert antinuke.record_violation(1, 3, "ban_limit", 3, 10, now=16) == 1
+    assert antinuke.window_count(antinuke.violation_counts[1][2]["ban_limit"], 10, now=40) == 0
+    manager.close()
+
+
+def test_window_round_trips_through_config():
+    config = AntiNukeConfig.from_dict({"window": 30, "whitelist": [5]})
+    assert config.window == 30
+    assert AntiNukeConfig.from_dict(config.to_dict()) == config
+    assert AntiNukeConfig.from_dict({}).window == 10
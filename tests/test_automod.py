@@ -0,0 +1,48 @@
+import re
+
+from Main_bot_3 import BannedWordMatcher, SpamDetector
+
+
+def regex_matches(words, text):
+    found = []
+    for word in words:
+        for match in re.finditer(rf"\b{re.escape(word.lower())}\b", text.lower()):
+            found.append((word.lower(), match.start(), match.end()))
+    return sorted(found, key=lambda hit: (hit[2], hit[1]))
+
+
+def test_matcher_agrees_with_word_boundary_regex():
+    words = ["bad", "badword", "word", "he", "she", "hers", "a b"]
+    matcher = BannedWordMatcher(words)
+    for text in ["a badword here", "BAD!", "badwords", "ushers she he", "a b c", "xbad bad_ bad"]:
+        assert sorted(matcher.find_all(text), key=lambda hit: (hit[2], hit[1])) == regex_matches(words, text)
+
+
+def test_matcher_rebuilds_after_add():
+    matcher = BannedWordMatcher(["spam"])
+    assert matcher.search("eggs and ham") is None
+    assert matcher.add("Ham")
+    assert not matcher.add("ham")
+    assert "HAM" in matcher and len(matcher) == 2
+    assert matcher.search("eggs and ham") == ("ham", 9, 12)
+
+
+def test_spam_detector_fires_only_inside_window():
+    detector = SpamDetector()
+    assert not any(detector.hit(1, 2, threshold=3, interval=5, now=100 + i * 3) for i in range(5))
+    assert [detector.hit(1, 2, threshold=3, interval=5, now=200 + i) for i in range(3)] == [False, False, True]
+    # The window starts over after a detection
+    assert not detector.hit(1, 2, threshold=3, interval=5, now=203)
+
+
+def test_spam_detector_evicts_idle_members():
+    detector = SpamDetector(tick=1.0, slots=8)
+    detector.current_tick = 100
+    detector.hit(1, 2, threshold=3, interval=5, now=100)
+    detector.hit(1, 3, threshold=3, interval=5, now=100)
+    detector.hit(1, 3, threshold=3, interval=5, now=104)
+    assert detector.advance(now=106) == 1
+    assert len(detector) == 1 and 3 in detector.windows[1]
+    # A stall longer than the wheel still expires everything that is due
+    assert detector.advance(now=1000) == 1
+    assert len(detector) == 0 and not detector.windows
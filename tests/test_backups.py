@@ -0,0 +1,99 @@
+import asyncio
+import json
+import zipfile
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import discord
+
+from Main_bot_3 import ChannelBackupJob, GuildRestore
+
+
+class FakeAttachment:
+    def __init__(self, attachment_id, filename, data):
+        self.id = attachment_id
+        self.filename = filename
+        self.data = data
+
+    async def read(self):
+        await asyncio.sleep(0)
+        return self.data
+
+
+def fake_message(message_id, attachments=()):
+    return SimpleNamespace(
+        id=message_id,
+        content=f"message {message_id}",
+        author=SimpleNamespace(id=7),
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        attachments=list(attachments),
+        embeds=[]
+    )
+
+
+class FakeChannel:
+    name = "general"
+    topic = None
+    category = None
+    position = 0
+    slowmode_delay = 0
+    nsfw = False
+    overwrites = {}
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def history(self, limit=None, after=None, oldest_first=False):
+        for message in self.messages:
+            if after is None or message.id > after.id:
+                yield message
+
+
+def test_backup_streams_chunks_and_stores_duplicates_once(tmp_path):
+    same = b"same image bytes"
+    messages = [
+        fake_message(1, [FakeAttachment(11, "a.png", same)]),
+        fake_message(2, [FakeAttachment(12, "b.png", same), FakeAttachment(13, "c.txt", b"other")]),
+        fake_message(3)
+    ]
+    path = str(tmp_path / "backup.zip")
+    job = ChannelBackupJob(FakeChannel(messages), path, workers=2, chunk_size=2)
+    summary = asyncio.run(job.run())
+
+    assert summary == {"messages": 3, "attachments": 3, "deduped": 1, "last_message_id": 3}
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        assert [name for name in names if name.startswith("messages/")] == ["messages/00000.jsonl", "messages/00001.jsonl"]
+        assert len([name for name in names if name.startswith("attachments/")]) == 2
+        manifest = json.loads(archive.read("attachments.json"))
+        assert manifest["11"] == manifest["12"] != manifest["13"]
+        lines = archive.read("messages/00000.jsonl").decode().splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [1, 2]
+
+
+def test_incremental_backup_only_reads_newer_messages(tmp_path):
+    path = str(tmp_path / "incremental.zip")
+    job = ChannelBackupJob(FakeChannel([fake_message(i) for i in range(1, 6)]), path, after_id=3)
+    summary = asyncio.run(job.run())
+
+    assert summary["messages"] == 2 and summary["last_message_id"] == 5
+    with zipfile.ZipFile(path) as archive:
+        assert json.loads(archive.read("metadata.json"))["incremental_after"] == 3
+
+
+def test_match_prefers_ids_then_unclaimed_names():
+    live = [SimpleNamespace(id=1, name="mods"), SimpleNamespace(id=2, name="mods"), SimpleNamespace(id=3, name="old")]
+    entries = [{"name": "mods"}, {"id": 1, "name": "renamed"}, {"name": "new"}]
+    pairs, extras = GuildRestore.match(entries, live, lambda data: data["name"], lambda item: item.name)
+
+    assert [item.id if item else None for _, item in pairs] == [2, 1, None]
+    assert [item.id for item in extras] == [3]
+
+
+def test_role_changes_only_lists_drifted_fields():
+    role = SimpleNamespace(name="mods", color=discord.Color(0x00ff00), permissions=discord.Permissions(8),
+                           hoist=False, mentionable=True)
+    data = {"name": "mods", "color": "#00ff00", "permissions": 8, "hoist": True, "mentionable": True}
+    assert GuildRestore.role_changes(role, data) == {"hoist": True}
+    data["hoist"] = False
+    assert GuildRestore.role_changes(role, data) == {}
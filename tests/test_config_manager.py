@@ -0,0 +1,73 @@
+import json
+
+import discord
+
+from Main_bot_3 import ConfigManager
+
+
+def test_settings_round_trip_through_sqlite(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = ConfigManager(None, db_path="data/config.db")
+    manager.set_setting(1, "welcome", "color", discord.Color(0x123456))
+    manager.set_category(1, "roles", {"ids": {3, 1, 2}})
+    manager.set_category(2, "roles", {"ids": []})
+    manager.delete_category(2, "roles")
+    manager.close()
+
+    reopened = ConfigManager(None, db_path="data/config.db")
+    assert reopened.get_setting(1, "welcome", "color") == 0x123456
+    assert reopened.get_category(1, "roles") == {"ids": [1, 2, 3]}
+    assert reopened.guild_ids("roles") == {1}
+    assert not reopened.has_config(2)
+    reopened.close()
+
+
+def test_namespace_decodes_and_saves(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = ConfigManager(None, db_path="data/config.db")
+    limits = manager.namespace("limits", decode=set, encode=sorted, default=set)
+    limits[5].add("b")
+    limits.save(5)
+    assert 5 in limits and 6 not in limits
+    assert list(limits) == [5]
+    manager.close()
+
+    reopened = ConfigManager(None, db_path="data/config.db")
+    assert reopened.namespace("limits", decode=set, encode=sorted, default=set)[5] == {"b"}
+    reopened.close()
+
+
+def test_legacy_json_configs_are_imported_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    legacy = tmp_path / "data" / "server_configs"
+    legacy.mkdir(parents=True)
+    (legacy / "42.json").write_text(json.dumps({"automod": {"enabled": True}}))
+    (legacy / "notes.txt").write_text("ignored")
+    (legacy / "broken.json").write_text("{")
+
+    manager = ConfigManager(None, db_path="data/config.db")
+    assert manager.get_category(42, "automod") == {"enabled": True}
+    manager.set_category(42, "automod", {"enabled": False})
+    manager.close()
+
+    (legacy / "42.json").write_text(json.dumps({"automod": {"enabled": True}}))
+    reopened = ConfigManager(None, db_path="data/config.db")
+    assert reopened.get_category(42, "automod") == {"enabled": False}
+    reopened.close()
+
+
+def test_auto_config_replay_keeps_only_unstored_sections(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+
+    from auto_config_loader import AutoConfigLoader
+
+    monkeypatch.chdir(tmp_path)
+    manager = ConfigManager(None, db_path="data/config.db")
+    manager.set_category(1, "snipe", {"snipe_duration": 60})
+    loader = AutoConfigLoader(None)
+    export = json.dumps({"server_id": 1, "snipe_config": {}, "mute_config": {}, "leveling_config": {}}).encode()
+
+    replay = json.loads(loader.without_stored_sections(export, manager, SimpleNamespace(id=1, name="guild")))
+    assert set(replay) == {"server_id", "mute_config", "leveling_config"}
+    assert loader.without_stored_sections(export, manager, SimpleNamespace(id=2, name="other")) == export
+    manager.close()
@@ -0,0 +1,56 @@
+import asyncio
+
+from Main_bot_3 import ConversationStore
+
+
+def test_conversation_stays_within_token_budget(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ConversationStore("test", token_budget=60, max_turns=10)
+    key = (1, 2)
+
+    async def run():
+        for i in range(10):
+            await store.add_exchange(key, f"Question {i}. " + "x" * 40, f"Answer {i}. " + "y" * 40)
+        return await store.get(key)
+
+    conversation = asyncio.run(run())
+    assert conversation.tokens <= 60
+    assert sum(store.estimate_tokens(turn["content"]) for turn in conversation.turns) == conversation.tokens
+    assert conversation.turns[0]["role"] == "user"
+    assert "Question 0." in conversation.summary or "Answer" in conversation.summary
+    assert len(conversation.summary) <= store.summary_budget * 4
+
+
+def test_evicted_conversations_spill_and_reload(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ConversationStore("test", max_hot=2, max_per_guild=2)
+
+    async def run():
+        await store.add_exchange((1, 1), "hello", "hi")
+        await store.add_exchange((1, 2), "hello", "hi")
+        await store.add_exchange((2, 3), "hello", "hi")
+        assert (1, 1) not in store.hot
+        assert (tmp_path / "data" / "conversations" / "test" / "1_1.json").exists()
+
+        assert await store.messages((1, 1)) == [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "hi"}]
+        assert len(store.hot) == 2 and sum(store.guild_counts.values()) == 2
+        await store.clear_scope(2)
+        assert await store.messages((1, 2)) == []
+
+    asyncio.run(run())
+
+
+def test_concurrent_reads_share_one_reload(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ConversationStore("test", max_hot=1)
+
+    async def run():
+        await store.add_exchange((1, 1), "hello", "hi")
+        await store.add_exchange((1, 2), "other", "chat")
+        assert (1, 1) not in store.hot
+        first, second = await asyncio.gather(store.get((1, 1)), store.get((1, 1)))
+        assert first is second and len(first.turns) == 2
+        await store.flush()
+        assert not store.hot and not store.guild_counts
+
+    asyncio.run(run())
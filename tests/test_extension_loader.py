@@ -0,0 +1,121 @@
+import asyncio
+import os
+import sys
+
+import discord
+from discord.ext import commands
+
+from extension_loader import ExtensionLoader, read_requires
+
+EXTENSION = '''
+import asyncio
+from discord.ext import commands
+
+REQUIRES = {requires!r}
+VERSION = {version!r}
+
+
+class {name}Cog(commands.Cog):
+    pass
+
+
+async def setup(bot):
+    bot.events.append(("start", "{name}"))
+    await asyncio.sleep(0.05)
+    {body}
+    bot.events.append(("end", "{name}"))
+    await bot.add_cog({name}Cog())
+'''
+
+
+def write_extension(folder, name, requires=(), version=1, body="pass"):
+    path = folder / f"{name.lower()}.py"
+    path.write_text(EXTENSION.format(name=name, requires=list(requires), version=version, body=body))
+    return path
+
+
+def make_loader(tmp_path, monkeypatch):
+    for module in [name for name in sys.modules if name.startswith("Extensions.")]:
+        del sys.modules[module]
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Extensions").mkdir()
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+    bot.events = []
+    return ExtensionLoader(bot), tmp_path / "Extensions"
+
+
+def test_independent_extensions_load_together_before_dependents(tmp_path, monkeypatch):
+    loader, folder = make_loader(tmp_path, monkeypatch)
+    write_extension(folder, "Alpha")
+    write_extension(folder, "Beta")
+    write_extension(folder, "Gamma", requires=["alpha", "beta"])
+
+    async def run():
+        await loader.load_all_extensions()
+
+    asyncio.run(run())
+    events = loader.bot.events
+    assert loader.loaded_extensions == {"alpha.py", "beta.py", "gamma.py"}
+    assert {name for _, name in events[:2]} == {"Alpha", "Beta"} and events[0][0] == events[1][0] == "start"
+    assert events[-2:] == [("start", "Gamma"), ("end", "Gamma")]
+    assert loader.records["gamma.py"].load_ms is not None
+
+
+def test_failed_reload_keeps_the_previous_version(tmp_path, monkeypatch):
+    loader, folder = make_loader(tmp_path, monkeypatch)
+    path = write_extension(folder, "Alpha")
+    write_extension(folder, "Gamma", requires=["alpha"])
+
+    async def run():
+        assert await loader.load_extension("gamma")
+        old_cog = loader.bot.get_cog("AlphaCog")
+        old_module = sys.modules["Extensions.alpha"]
+
+        write_extension(folder, "Alpha", version=2, body="raise RuntimeError('broken')")
+        os.utime(path, ns=(1, 1))
+        results = await loader.reload_changed()
+        assert results["alpha.py"] is False
+        assert "broken" in loader.records["alpha.py"].error
+        assert loader.bot.get_cog("AlphaCog") is old_cog
+        assert sys.modules["Extensions.alpha"] is old_module
+
+        write_extension(folder, "Alpha", version=3)
+        os.utime(path, ns=(2, 2))
+        results = await loader.reload_changed()
+        assert results == {"alpha.py": True, "gamma.py": True}
+        assert sys.modules["Extensions.alpha"].VERSION == 3
+        assert loader.records["alpha.py"].reloads == 1
+
+        assert await loader.unload_extension("alpha")
+        assert not loader.loaded_extensions and not loader.bot.cogs
+
+    asyncio.run(run())
+
+
+def test_unchanged_sources_are_skipped(tmp_path, monkeypatch):
+    loader, folder = make_loader(tmp_path, monkeypatch)
+    path = write_extension(folder, "Alpha")
+
+    async def run():
+        assert await loader.load_extension("alpha")
+        os.utime(path, ns=(5, 5))
+        assert await loader.reload_changed() == {"alpha.py": None}
+        assert await loader.reload_changed(force=True) == {"alpha.py": True}
+
+    asyncio.run(run())
+    assert loader.bot.events.count(("end", "Alpha")) == 2
+
+
+def test_plan_reports_cycles_and_missing_requirements(tmp_path, monkeypatch):
+    loader, folder = make_loader(tmp_path, monkeypatch)
+    write_extension(folder, "One", requires=["two"])
+    write_extension(folder, "Two", requires=["one"])
+    write_extension(folder, "Three", requires=["nowhere"])
+    write_extension(folder, "Four")
+
+    levels, errors = loader.plan(["one", "three", "four"])
+    assert levels == [["four.py"]]
+    assert errors["one.py"].startswith("dependency cycle") and "two.py" in errors
+    assert "nowhere" in errors["three"]
+    assert read_requires(b"REQUIRES = 'solo'\n") == ["solo"]
+    assert read_requires(b"def broken(:\n") == []
@@ -0,0 +1,125 @@
+import asyncio
+
+from Main_bot_3 import FanoutEngine, TokenBucket
+
+
+class FakeBot:
+    async def wait_until_ready(self):
+        pass
+
+
+def test_statuses_are_checkpointed_in_batches(tmp_path):
+    delivered = []
+
+    async def handler(payload, target_id):
+        delivered.append(target_id)
+        return target_id % 5 != 0
+
+    async def run():
+        fanout = FanoutEngine(FakeBot(), db_path=str(tmp_path / "fanout.db"), rate=1000.0, route_rate=1000.0,
+                              checkpoint_size=10)
+        await fanout.start()
+        fanout.register('test', handler)
+        job_id = await fanout.broadcast('test', list(range(1, 26)) + [1])
+        await fanout.wait(job_id)
+        counts = await fanout.counts(job_id)
+        await fanout.close()
+        return counts
+
+    counts = asyncio.run(run())
+    assert sorted(delivered) == list(range(1, 26))
+    assert counts == {FanoutEngine.SENT: 20, FanoutEngine.FAILED: 5}
+
+
+def test_targets_sharing_a_route_share_its_bucket(tmp_path):
+    db_path = str(tmp_path / "fanout.db")
+    delivered = []
+
+    async def handler(payload, target_id):
+        delivered.append(target_id)
+
+    async def run():
+        fanout = FanoutEngine(FakeBot(), db_path=db_path, rate=1000.0, route_rate=0.5, route_burst=2,
+                              max_routes=2)
+        await fanout.start()
+        fanout.register('shared', handler, route=lambda payload, target_id: payload['channel'])
+        job_id = await fanout.broadcast('shared', [1, 2, 3], {'channel': 7})
+        await asyncio.sleep(0.2)
+        assert list(fanout.routes) == [7]
+        fanout.route_bucket(8)
+        fanout.route_bucket(9)
+        assert list(fanout.routes) == [8, 9]
+        await fanout.close()
+        assert not fanout.tasks
+
+        # Cancelling the job still checkpointed what was already sent
+        restored = FanoutEngine(FakeBot(), db_path=db_path)
+        await restored.start()
+        counts = await restored.counts(job_id)
+        await restored.close()
+        return counts
+
+    counts = asyncio.run(run())
+    assert len(delivered) == 2
+    assert counts == {FanoutEngine.PENDING: 1, FanoutEngine.SENT: 2}
+
+
+def test_defer_pushes_out_the_next_token():
+    bucket = TokenBucket(10.0, 5)
+    bucket.defer(0.5)
+    assert bucket.tokens <= 1 - 5
+
+
+def test_skipped_targets_spend_no_requests(tmp_path):
+    delivered = []
+
+    async def handler(payload, target_id):
+        delivered.append(target_id)
+
+    async def run():
+        fanout = FanoutEngine(FakeBot(), db_path=str(tmp_path / "fanout.db"), rate=1000.0)
+        await fanout.start()
+        fanout.register('roles', handler, skip=lambda payload, target_id: target_id in payload['has_role'],
+                        route=lambda payload, target_id: payload['guild'], route_rate=1000.0, route_burst=50)
+        job_id = await fanout.broadcast('roles', list(range(10)), {'guild': 1, 'has_role': [0, 3, 4]})
+        await fanout.wait(job_id)
+        counts = await fanout.counts(job_id)
+        bucket = fanout.routes[1]
+        await fanout.close()
+        return counts, bucket
+
+    counts, bucket = asyncio.run(run())
+    assert sorted(delivered) == [1, 2, 5, 6, 7, 8, 9]
+    assert counts == {FanoutEngine.SENT: 7, FanoutEngine.SKIPPED: 3}
+    assert bucket.rate == 1000.0 and bucket.capacity == 50
+
+
+def test_cancelled_jobs_are_not_resumed(tmp_path):
+    db_path = str(tmp_path / "fanout.db")
+    delivered = []
+
+    async def handler(payload, target_id):
+        delivered.append(target_id)
+
+    async def run():
+        fanout = FanoutEngine(FakeBot(), db_path=db_path, rate=1000.0, route_rate=0.5, route_burst=2)
+        await fanout.start()
+        fanout.register('slow', handler, route=lambda payload, target_id: 'one')
+        job_id = await fanout.broadcast('slow', [1, 2, 3, 4])
+        await asyncio.sleep(0.2)
+        await fanout.cancel(job_id)
+        assert job_id not in fanout.tasks
+        await fanout.close()
+
+        restored = FanoutEngine(FakeBot(), db_path=db_path)
+        await restored.start()
+        restored.register('slow', handler)
+        await asyncio.sleep(0.2)
+        counts = await restored.counts(job_id)
+        assert not restored.tasks
+        await restored.close()
+        return counts
+
+    counts = asyncio.run(run())
+    assert len(delivered) == 2
+    assert counts == {FanoutEngine.PENDING: 2, FanoutEngine.SENT: 2}
@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+
+from Main_bot_3 import AdvancedInviteTracker, InviteStore
+
+
+def invite(code, uses, max_uses=0, inviter="alice"):
+    return SimpleNamespace(code=code, uses=uses, max_uses=max_uses, inviter=SimpleNamespace(name=inviter),
+                           created_at=None)
+
+
+def test_diff_attributes_each_gained_use(tmp_path):
+    tracker = AdvancedInviteTracker(SimpleNamespace())
+    tracker.store = InviteStore(str(tmp_path / "invites.db"))
+
+    async def run():
+        await tracker.store.start()
+        tracker.snapshot(1, [invite("a", 2), invite("b", 0, inviter="bob"), invite("once", 0, max_uses=1)])
+        diff = tracker.diff_invites(1, [invite("a", 4), invite("b", 1, inviter="bob")])
+        await tracker.store.close()
+        return diff
+
+    used, vanished = asyncio.run(run())
+    assert used == [("a", "alice"), ("a", "alice"), ("b", "bob")]
+    assert vanished == [("once", "alice")]
+
+
+class FakeGuild:
+    id = 1
+    name = "guild"
+    text_channels = []
+
+    def __init__(self):
+        self.live = []
+
+    async def invites(self):
+        return self.live
+
+
+def member(member_id, guild):
+    return SimpleNamespace(id=member_id, guild=guild, joined_at=None)
+
+
+def test_deleted_limited_invite_does_not_claim_later_joins(tmp_path):
+    tracker = AdvancedInviteTracker(SimpleNamespace())
+    tracker.store = InviteStore(str(tmp_path / "invites.db"))
+    guild = FakeGuild()
+
+    async def join(*members, live):
+        guild.live = live
+        tracker.pending_joins[guild.id] = list(members)
+        await tracker.attribute_joins(guild)
+
+    async def run():
+        await tracker.store.start()
+        tracker.snapshot(1, [invite("staff", 3, max_uses=100, inviter="mod"), invite("pub", 0, inviter="pat")])
+        await tracker.on_invite_delete(SimpleNamespace(guild=guild, code="staff"))
+        await join(member(100, guild), live=[invite("pub", 1, inviter="pat")])
+        await join(member(101, guild), member(102, guild), live=[invite("pub", 3, inviter="pat")])
+
+        # A single-use invite used up in the same batch covers the one join nothing else explains
+        tracker.snapshot(1, [invite("pub", 3, inviter="pat"), invite("once", 0, max_uses=1, inviter="kim")])
+        await join(member(103, guild), member(104, guild), live=[invite("pub", 4, inviter="pat")])
+        joins = await tracker.store.guild_joins(1)
+        await tracker.store.close()
+        return sorted((member_id, code) for member_id, _, code, _, _ in joins)
+
+    assert asyncio.run(run()) == [(100, "pub"), (101, "pub"), (102, "pub"), (103, "pub"), (104, "once")]
+
+
+def test_store_batches_joins_and_snapshots(tmp_path):
+    db_path = str(tmp_path / "invites.db")
+
+    async def run():
+        store = InviteStore(db_path, flush_delay=60)
+        await store.start()
+        store.save_invites(1, {"a": {"uses": 1, "inviter": "alice", "created_at": "Unknown"}})
+        store.save_invites(1, {"b": {"uses": 3, "inviter": "bob", "created_at": "Unknown"}})
+        store.add_join(10, 1, "b", "bob", "2024-01-01")
+        store.add_join(11, 1, "b", "bob", "2024-01-01")
+        store.remove_join(11)
+        await store.close()
+
+        reopened = InviteStore(db_path)
+        await reopened.start()
+        invites = await reopened.load_invites()
+        joins = await reopened.guild_joins(1)
+        await reopened.close()
+        return invites, joins
+
+    invites, joins = asyncio.run(run())
+    assert invites == {1: {"b": {"uses": 3, "inviter": "bob", "created_at": "Unknown"}}}
+    assert joins == [(10, 1, "b", "bob", "2024-01-01")]
@@ -0,0 +1,45 @@
+import random
+
+from Main_bot_3 import RankedIndex
+
+
+def expected_order(scores):
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+def test_ranks_match_a_full_sort_under_random_updates():
+    rng = random.Random(7)
+    index = RankedIndex(load=4)
+    scores = {}
+
+    for step in range(2000):
+        member = rng.randrange(60)
+        if step % 9 == 0:
+            index.remove(member)
+            scores.pop(member, None)
+        else:
+            scores[member] = scores.get(member, 0) + rng.randint(0, 25)
+            index.update(member, scores[member])
+
+        if step % 50 == 0:
+            order = expected_order(scores)
+            assert index.top(10) == order[:10]
+            for position, (member, _) in enumerate(order, 1):
+                assert index.rank(member) == position
+
+    assert len(index) == len(scores)
+    assert index.top(len(scores) + 5) == expected_order(scores)
+
+
+def test_bulk_load_and_missing_members():
+    index = RankedIndex({1: 50, 2: 80, 3: 50}, load=2)
+    assert index.top(2) == [(2, 80), (1, 50)]
+    assert index.rank(3) == 3
+    assert index.rank(4) is None
+    assert index.score(2) == 80
+
+    for member in (1, 2, 3):
+        index.remove(member)
+    assert index.top(5) == []
+    index.update(9, 1)
+    assert index.rank(9) == 1
@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+from Main_bot_3 import LevelingStore
+
+
+def test_flush_writes_only_dirty_rows(tmp_path):
+    store = LevelingStore(db_path=str(tmp_path / "leveling.db"), settings_file=str(tmp_path / "settings.json"))
+    user_data = {1: {10: {"xp": 5}, 11: {"xp": 7}}, 2: {20: {"xp": 1}}}
+
+    async def run():
+        store.mark_dirty(1, 10)
+        store.mark_dirty(2, 20)
+        store.mark_settings_dirty()
+        await store.flush(user_data, lambda: {"roles": {}})
+        user_data[1][10]["xp"] = 6
+        store.mark_dirty(1, 10)
+        store.delete_guild(2)
+        await store.close(user_data, lambda: {"roles": {}})
+
+    asyncio.run(run())
+
+    reopened = LevelingStore(db_path=str(tmp_path / "leveling.db"), settings_file=str(tmp_path / "settings.json"))
+    users, settings = reopened.load()
+    assert users == {1: {10: {"xp": 6}}}
+    assert settings == {"roles": {}}
+    reopened.conn.close()
+
+
+def test_failed_flush_keeps_rows_dirty(tmp_path):
+    store = LevelingStore(db_path=str(tmp_path / "leveling.db"), settings_file=str(tmp_path / "settings.json"))
+    store.conn.close()
+
+    async def run():
+        store.mark_dirty(1, 10)
+        await store.flush({1: {10: {"xp": 1}}}, dict)
+
+    asyncio.run(run())
+    assert store.dirty_users == {(1, 10)}
+
+
+def test_legacy_user_data_is_migrated(tmp_path):
+    settings_file = tmp_path / "settings.json"
+    settings_file.write_text(json.dumps({"user_data": {"1": {"10": {"xp": 3}}}, "roles": {}}))
+    store = LevelingStore(db_path=str(tmp_path / "leveling.db"), settings_file=str(settings_file))
+    users, settings = store.load()
+    assert users == {1: {10: {"xp": 3}}}
+    assert settings == {"roles": {}}
+    assert store.settings_dirty
+    store.conn.close()
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from llm_stub import StubLLM
+from Main_bot_3 import LLMError, LLMGateway, TokenBucket
+
+
+def test_token_bucket_allows_burst_then_paces():
+    async def run():
+        bucket = TokenBucket(rate=20, capacity=3)
+        start = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        burst = time.monotonic() - start
+        for _ in range(2):
+            await bucket.acquire()
+        return burst, time.monotonic() - start
+
+    burst, total = asyncio.run(run())
+    assert burst < 0.05
+    assert 0.08 <= total < 0.5
+
+
+def run_with_stub(monkeypatch, test, chunks=("Hello", ", ", "world")):
+    async def run():
+        stub = StubLLM(chunks)
+        server = TestServer(stub.app)
+        await server.start_server()
+        base_url = str(server.make_url("/v1"))
+        monkeypatch.setenv("OPENAI_BASE_URL", base_url)
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", base_url)
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        gateway = LLMGateway(guild_concurrency=1, rate=100, burst=10)
+        try:
+            await test(gateway, stub)
+        finally:
+            await gateway.close()
+            await server.close()
+
+    asyncio.run(run())
+
+
+def test_stream_yields_openai_deltas(monkeypatch):
+    async def test(gateway, stub):
+        chunks = [chunk async for chunk in gateway.stream(
+            "openai", "gpt", [{"role": "user", "content": "hi"}], guild_id=1, system="be brief"
+        )]
+        assert chunks == ["Hello", ", ", "world"]
+        sent = stub.requests[0]
+        assert sent["stream"] is True
+        assert sent["messages"][0] == {"role": "system", "content": "be brief"}
+
+    run_with_stub(monkeypatch, test)
+
+
+def test_stream_yields_anthropic_deltas(monkeypatch):
+    async def test(gateway, stub):
+        reply = await gateway.complete("anthropic", "claude", [{"role": "user", "content": "hi"}], system="sys")
+        assert reply == "Hello, world"
+        assert stub.requests[0]["system"] == "sys"
+
+    run_with_stub(monkeypatch, test)
+
+
+def test_stream_raises_api_errors(monkeypatch):
+    async def test(gateway, stub):
+        stub.error = (429, "slow down")
+        with pytest.raises(LLMError) as error:
+            await gateway.complete("openai", "gpt", [], guild_id=1)
+        assert error.value.status == 429 and str(error.value) == "slow down"
+        assert gateway.semaphores[1]._value == 1
+
+    run_with_stub(monkeypatch, test)
+
+
+def test_abandoned_stream_releases_its_slot(monkeypatch):
+    async def test(gateway, stub):
+        stream = gateway.stream("openai", "gpt", [], guild_id=1)
+        assert await stream.__anext__() == "Hello"
+        assert gateway.semaphores[1].locked()
+        await stream.aclose()
+        assert not gateway.semaphores[1].locked()
+
+        async def send(**kwargs):
+            raise RuntimeError("channel gone")
+
+        with pytest.raises(RuntimeError):
+            await gateway.relay(gateway.stream("openai", "gpt", [], guild_id=1), send)
+        assert not gateway.semaphores[1].locked()
+
+    run_with_stub(monkeypatch, test)
+
+
+def test_relay_rolls_over_long_replies(monkeypatch):
+    async def test(gateway, stub):
+        sent = []
+
+        class Message:
+            def __init__(self, content):
+                self.content = content
+                sent.append(self)
+
+            async def edit(self, content):
+                self.content = content
+
+        async def send(content):
+            return Message(content)
+
+        text = await gateway.relay(gateway.stream("openai", "gpt", []), send, limit=6)
+        assert text == "Hello, world"
+        assert [message.content for message in sent] == ["Hello,", " world"]
+
+    run_with_stub(monkeypatch, test)
@@ -0,0 +1,34 @@
+from Main_bot_3 import PollTally
+
+
+def test_tally_matches_full_recount():
+    poll = {
+        'options': ['a', 'b', 'c'],
+        'votes': {'1': [0], '2': [0, 2], '3': [1]},
+        'ratings': {'0': {'1': 5, '2': 3}, '2': {'1': 1}},
+        'weighted_votes': {'1': {'0': 2, '1': 1}},
+        'ranked_votes': {'1': [2, 0, 1], '2': [0, 2, 1]}
+    }
+    tally = PollTally.from_poll(poll)
+    assert tally.counts == [2, 1, 1]
+    assert tally.average_rating(0) == 4 and tally.average_rating(1) == 0
+    assert tally.raters == {'1': 2, '2': 1}
+    assert tally.points == [2, 1, 0]
+    assert tally.rank_points == [5, 2, 5]
+    assert tally.first_choices == [1, 0, 1]
+
+
+def test_tally_applies_vote_changes_by_delta():
+    tally = PollTally(3)
+    tally.set_choices([], [0])
+    tally.set_choices([0], [1, 2])
+    assert tally.counts == [0, 1, 1]
+
+    tally.set_rating('1', 0, None, 4)
+    tally.set_rating('1', 0, 4, 2)
+    assert tally.rating_counts[0] == 1 and tally.average_rating(0) == 2
+
+    tally.set_ranking([], [0, 1, 2])
+    tally.set_ranking([0, 1, 2], [2, 1, 0])
+    assert tally.rank_points == [1, 2, 3]
+    assert tally.first_choices == [0, 0, 1]
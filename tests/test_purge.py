@@ -0,0 +1,102 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from Main_bot_3 import PurgeFilter, PurgeJob
+
+
+def message(message_id, age_days=0, bot=False, author_id=1, content=""):
+    return SimpleNamespace(
+        id=message_id,
+        created_at=discord.utils.utcnow() - timedelta(days=age_days),
+        author=SimpleNamespace(id=author_id, bot=bot),
+        content=content
+    )
+
+
+class FakeChannel:
+    def __init__(self, messages):
+        self.messages = messages
+        self.bulk_calls = []
+        self.single_deletes = []
+        self.history_args = None
+
+    async def history(self, limit=None, after=None, before=None):
+        self.history_args = (limit, after, before)
+        for item in self.messages[:limit]:
+            yield item
+
+    async def delete_messages(self, objects):
+        self.bulk_calls.append([obj.id for obj in objects])
+
+    def get_partial_message(self, message_id):
+        channel = self
+
+        class Partial:
+            async def delete(self):
+                channel.single_deletes.append(message_id)
+
+        return Partial()
+
+
+def test_filter_terms_are_combined():
+    purge_filter = PurgeFilter(["<@!42>", "regex:buy\\s+now", "after:2024-01-02"])
+    assert purge_filter.after.year == 2024 and purge_filter.before is None
+    assert purge_filter.matches(message(1, author_id=42, content="BUY  now!"))
+    assert not purge_filter.matches(message(2, author_id=7, content="buy now"))
+    assert not purge_filter.matches(message(3, author_id=42, content="hello"))
+    assert PurgeFilter(["all"]).wipe
+    assert not PurgeFilter(["bots"]).wipe
+
+    with pytest.raises(ValueError):
+        PurgeFilter(["regex:("])
+    with pytest.raises(ValueError):
+        PurgeFilter(["somebody"])
+
+
+@pytest.mark.parametrize("pattern", ["(a+)+$", "(\\w*)*x", "((ab)+c?)+", "(?:x|y{2,})*", "a" * 101])
+def test_catastrophic_regexes_are_refused(pattern):
+    with pytest.raises(ValueError):
+        PurgeFilter(["regex:" + pattern])
+
+
+@pytest.mark.parametrize("pattern", ["(ab)+", "(a+b)", "[(+]+", "\\(a+\\)+", "(free|cheap)\\s+nitro+"])
+def test_ordinary_regexes_are_allowed(pattern):
+    assert PurgeFilter(["regex:" + pattern]).checks
+
+
+def test_plan_splits_bulk_batches_from_the_old_tail():
+    messages = [message(i, bot=i % 2 == 0) for i in range(250)]
+    messages += [message(1000 + i, age_days=20, bot=True) for i in range(3)]
+    channel = FakeChannel(messages)
+    updates = []
+
+    async def progress(stage, done, total):
+        updates.append((stage, done, total))
+
+    job = PurgeJob(channel, PurgeFilter(["bots"]), progress=progress, progress_interval=0)
+    deleted = asyncio.run(job.run())
+
+    assert [len(batch) for batch in job.plan.bulk] == [100, 25]
+    assert job.plan.tail == [1000, 1001, 1002]
+    assert channel.bulk_calls == job.plan.bulk
+    assert channel.single_deletes == [1000, 1001, 1002]
+    assert deleted == 128
+    assert updates[-1] == ("delete", 128, 128)
+
+
+def test_batches_too_old_for_bulk_delete_fall_back_to_single_deletes():
+    channel = FakeChannel([message(i) for i in range(3)])
+
+    async def reject(objects):
+        response = SimpleNamespace(status=400, reason="Bad Request")
+        raise discord.HTTPException(response, {"code": PurgeJob.TOO_OLD_TO_BULK_DELETE, "message": "too old"})
+
+    channel.delete_messages = reject
+    job = PurgeJob(channel, PurgeFilter(["all"]), limit=2)
+    assert asyncio.run(job.run()) == 2
+    assert channel.single_deletes == [0, 1]
+    assert channel.history_args[0] == 2
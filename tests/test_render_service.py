@@ -0,0 +1,82 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from Main_bot_3 import RenderBusy, RenderService
+
+
+def make_service(**kwargs):
+    service = RenderService(workers=2, **kwargs)
+    service.executor = ThreadPoolExecutor(2)
+    return service
+
+
+def test_identical_renders_are_coalesced_and_cached():
+    async def run():
+        service = make_service()
+        first, second = await asyncio.gather(
+            service.render("text_image", text="hi", color="#FFFFFF"),
+            service.render("text_image", color="#FFFFFF", text="hi")
+        )
+        assert first is second and first.startswith(b"\x89PNG")
+        assert (service.misses, service.hits) == (1, 1)
+
+        assert await service.render("text_image", text="hi", color="#FFFFFF") is first
+        assert (service.misses, service.hits) == (1, 2)
+        service.close()
+
+    asyncio.run(run())
+
+
+def test_cache_is_bounded_by_bytes():
+    async def run():
+        service = make_service()
+        image = await service.render("color_preview", r=1, g=2, b=3, hex_text="#010203")
+        service.cache_bytes = len(image) * 2 + 1
+        for r in range(2, 6):
+            await service.render("color_preview", r=r, g=2, b=3, hex_text="x")
+        assert len(service.cache) == 2
+        assert service.cache_size <= service.cache_bytes
+        service.close()
+
+    asyncio.run(run())
+
+
+def test_full_queue_fails_fast():
+    async def run():
+        service = make_service(max_pending=1)
+        results = await asyncio.gather(
+            service.render("color_preview", r=1, g=0, b=0, hex_text="a"),
+            service.render("color_preview", r=2, g=0, b=0, hex_text="b"),
+            return_exceptions=True
+        )
+        assert isinstance(results[0], bytes)
+        assert isinstance(results[1], RenderBusy)
+        assert service.pending == 0
+        service.close()
+
+    asyncio.run(run())
+
+
+def test_started_process_pool_falls_back_to_threads_after_a_crash():
+    service = RenderService(workers=1)
+    service.start()
+    assert isinstance(service.executor, ProcessPoolExecutor)
+
+    async def run():
+        image = await service.render("text_image", text="fork", color="#FFFFFF")
+        assert image.startswith(b"\x89PNG")
+
+        for process in list(service.executor._processes.values()):
+            process.kill()
+            process.join()
+        with pytest.raises(BrokenProcessPool):
+            await service.render("text_image", text="dead", color="#FFFFFF")
+
+        assert await service.render("text_image", text="alive", color="#FFFFFF")
+        assert isinstance(service.executor, ThreadPoolExecutor)
+        service.close()
+
+    asyncio.run(run())
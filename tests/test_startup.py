@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+
+from discord import app_commands
+from discord.ext import commands
+
+from Main_bot_3 import CogSpec, LazyModule, StartupProfile, message_handler
+
+
+class Tools(commands.Cog):
+    @commands.command(aliases=["calc"])
+    async def calculate(self, ctx):
+        pass
+
+    @commands.group()
+    async def notes(self, ctx):
+        pass
+
+    @notes.command()
+    async def add(self, ctx):
+        pass
+
+
+class Greeter(commands.Cog):
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        pass
+
+
+class Filtered(commands.Cog):
+    @message_handler(ignore_bots=True)
+    async def on_message(self, message, context):
+        pass
+
+
+class Slash(commands.Cog):
+    @app_commands.command()
+    async def ping(self, interaction):
+        pass
+
+
+def test_lazy_module_imports_on_first_attribute():
+    sys.modules.pop("colorsys", None)
+    colorsys = LazyModule("colorsys")
+    assert "colorsys" not in sys.modules
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules and "colorsys" in LazyModule.loaded
+
+
+def test_only_plain_command_cogs_are_deferred():
+    assert CogSpec(Tools, lazy=True).can_defer()
+    assert not CogSpec(Tools).can_defer()
+    for cls in (Greeter, Filtered, Slash):
+        assert not CogSpec(cls, lazy=True).can_defer()
+    assert sorted(CogSpec(Tools, lazy=True).command_names()) == ["calc", "calculate", "notes"]
+
+
+def test_profile_lists_slowest_loaded_cogs():
+    profile = StartupProfile()
+    profile.record_cog("Fast", "eager", 0.001, 0.001)
+    profile.record_cog("Slow", "eager", 0.2, 0.1)
+    profile.record_cog("Later", "deferred")
+    assert [name for name, _ in profile.slowest_cogs()] == ["Slow", "Fast"]
+    assert profile.cog_count("deferred") == 1
+    assert profile.summary(limit=1)[-1] == "  Slow: 300.0 ms"
+
+
+def test_importing_the_bot_does_not_load_pillow():
+    code = "import sys, Main_bot_3; print('PIL' in sys.modules, 'render_worker' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, timeout=120)
+    assert result.stdout.split()[-2:] == ["False", "False"], result.stderr
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from Main_bot_3 import TimerService
+
+
+class FakeBot:
+    async def wait_until_ready(self):
+        pass
+
+
+def test_jobs_fire_in_due_order_and_survive_restart(tmp_path):
+    db_path = str(tmp_path / "timers.db")
+    fired = []
+
+    async def handler(payload, job):
+        fired.append(payload['n'])
+
+    async def run():
+        timers = TimerService(FakeBot(), db_path=db_path)
+        await timers.start()
+        timers.register('test', handler)
+        now = time.time()
+        await timers.schedule('test', now + 0.3, {'n': 3})
+        await timers.schedule('test', now + 0.1, {'n': 1}, key='moved')
+        await timers.schedule('test', now + 0.2, {'n': 2})
+        await timers.schedule('test', now + 0.05, {'n': 0}, key='cancelled')
+        await timers.cancel('cancelled')
+        await timers.reschedule('moved', now + 0.15)
+        await timers.schedule('test', now + 60, {'n': 9}, key='later')
+        await asyncio.sleep(0.5)
+        await timers.close()
+
+        restored = TimerService(FakeBot(), db_path=db_path)
+        await restored.start()
+        keys = [job.key for job in restored.pending('test')]
+        await restored.close()
+        return keys
+
+    assert asyncio.run(run()) == ['later']
+    assert fired == [1, 2, 3]
+
+
+def test_jobs_without_handler_are_parked_until_registered(tmp_path):
+    fired = []
+
+    async def handler(payload, job):
+        fired.append(job.key)
+
+    async def run():
+        timers = TimerService(FakeBot(), db_path=str(tmp_path / "timers.db"))
+        await timers.start()
+        await timers.schedule('late', time.time(), key='parked', persist=False)
+        await asyncio.sleep(0.05)
+        assert not fired and timers.parked['late']
+        timers.register('late', handler)
+        await asyncio.sleep(0.05)
+        await timers.close()
+
+    asyncio.run(run())
+    assert fired == ['parked']
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import random
+from collections import Counter
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import Main_bot_3
+from Main_bot_3 import EMOJI_MATCHER, EmojiMatcher, HyperLogLog, MessageContext, SpaceSaving, WordAnalytics, WordBucket
+
+
+def test_space_saving_keeps_heavy_hitters_within_the_error_bound():
+    rng = random.Random(7)
+    stream = ["hot"] * 500 + ["warm"] * 300 + ["mild"] * 150 + [f"rare{rng.randrange(2000)}" for _ in range(2000)]
+    rng.shuffle(stream)
+    sketch = SpaceSaving(16)
+    for item in stream:
+        sketch.add(item)
+
+    true = Counter(stream)
+    bound = len(stream) / sketch.capacity
+    assert [item for item, _ in sketch.top(3)] == ["hot", "warm", "mild"]
+    assert len(sketch.counts) == 16
+    for item, count in sketch.counts.items():
+        assert true[item] <= count <= true[item] + bound
+
+    left, right = SpaceSaving(16), SpaceSaving(16)
+    for index, item in enumerate(stream):
+        (left if index % 2 else right).add(item)
+    left.merge(right)
+    assert [item for item, _ in left.top(3)] == ["hot", "warm", "mild"]
+
+
+def test_hyperloglog_estimates_stay_within_a_few_percent():
+    for cardinality in (1000, 50000):
+        sketch = HyperLogLog()
+        for value in range(cardinality):
+            sketch.add_hash(HyperLogLog.hash(f"user{value}"))
+            sketch.add_hash(HyperLogLog.hash(f"user{value % 100}"))
+        assert abs(sketch.count() - cardinality) / cardinality < 0.1
+
+    evens, odds = HyperLogLog(), HyperLogLog()
+    for value in range(20000):
+        (odds if value % 2 else evens).add_hash(HyperLogLog.hash(str(value)))
+    evens.merge(odds)
+    assert abs(evens.count() - 20000) / 20000 < 0.1
+    assert HyperLogLog().count() == 0
+
+
+def test_emoji_matcher_keeps_zwj_and_skin_tone_sequences_whole():
+    family = "\U0001F468\u200d\U0001F469\u200d\U0001F467"
+    thumbs = "\U0001F44D\U0001F3FD"
+    text = f"gg {family}{thumbs}\U0001F44D and \U0001F3F3\ufe0f\u200d\U0001F308!"
+    assert EMOJI_MATCHER.findall(text) == [family, thumbs, "\U0001F44D", "\U0001F3F3\ufe0f\u200d\U0001F308"]
+    assert EMOJI_MATCHER.findall("plain text") == []
+
+    matcher = EmojiMatcher(["\U0001F44D", "\U0001F44D\U0001F3FD"])
+    assert matcher.findall("\U0001F44D\U0001F3FD\U0001F3FD\U0001F44D") == ["\U0001F44D\U0001F3FD", "\U0001F44D"]
+
+
+def chat(content, author_id=1, channel_id=5):
+    return SimpleNamespace(
+        content=content,
+        author=SimpleNamespace(id=author_id, bot=False),
+        guild=SimpleNamespace(id=9),
+        channel=SimpleNamespace(id=channel_id),
+        created_at=datetime.now(timezone.utc),
+        mentions=[],
+        raw_mentions=[]
+    )
+
+
+def test_word_buckets_roll_up_into_tiers(monkeypatch):
+    clock = [datetime(2024, 1, 10, 12, 30, tzinfo=timezone.utc).timestamp()]
+    monkeypatch.setattr(Main_bot_3, "time", SimpleNamespace(time=lambda: clock[0]))
+    cog = WordAnalytics(None)
+
+    async def say(content, author_id=1, hours_later=0):
+        clock[0] += hours_later * 3600
+        message = chat(content, author_id)
+        await cog.on_message(message, MessageContext(message))
+
+    async def run():
+        await say("pizza pizza tonight")
+        await say("pizza again \U0001F44D\U0001F3FD", author_id=2, hours_later=2)
+        return await cog.summary(9, "hour"), await cog.summary(9, "day"), await cog.summary(9, "week")
+
+    hour, day, week = asyncio.run(run())
+    assert (hour.messages, day.messages, week.messages) == (1, 2, 2)
+    assert day.top_words.top(1) == [("pizza", 3)]
+    assert day.emojis.counts == {"\U0001F44D\U0001F3FD": 1}
+    assert day.users.counts == {"1": 3, "2": 3} and day.active_users.count() == 2
+    assert hour.active_users.count() == 1
+
+    tiers = cog.buckets[9]
+    assert (len(tiers["hour"]), len(tiers["day"]), len(tiers["month"])) == (2, 1, 1)
+    stored = tiers["day"][next(iter(tiers["day"]))]
+    copy = WordBucket.from_dict(stored.start, json.loads(json.dumps(stored.to_dict())))
+    assert copy.to_dict() == stored.to_dict()
+
+    async def fill():
+        for _ in range(60):
+            await say("tick", hours_later=1)
+
+    asyncio.run(fill())
+    assert len(tiers["hour"]) == WordAnalytics.TIERS["hour"][1]